@@ -0,0 +1,94 @@
+"""Micro-benchmark: rendering 5,000-row frames with iterrows() vs Col specs.
+
+"before" replays the old per-row loops (``for _, row in df.iterrows()`` with
+``pd.notna(row.get(...))`` checks); "after" renders the same fields with
+utils.formatting.render_rows. Both must produce identical lines.
+
+    python benchmarks/bench_formatting.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.formatting import Col, format_money, money, render_rows  # noqa: E402
+
+ROWS = 5000
+REPEAT = 3
+
+QUOTE_FIELDS = [
+    ("open", "开盘", ""), ("high", "最高", ""), ("low", "最低", ""), ("close", "收盘", ""),
+    ("pre_close", "昨收", ""), ("change", "涨跌额", ""), ("pct_chg", "涨跌幅", "%"),
+    ("vol", "成交量", "手"), ("amount", "成交额", "千元"),
+]
+INCOME_FIELDS = [
+    ("total_revenue", "营收"), ("total_cogs", "营业总成本"), ("oper_cost", "营业成本"),
+    ("operate_profit", "营业利润"), ("total_profit", "利润总额"), ("n_income", "净利"),
+]
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    data = {
+        "ts_code": rng.choice(["000001.SZ", "600000.SH", "300750.SZ"], rows),
+        "trade_date": [f"2024{m:02d}{d:02d}" for m, d in zip(rng.integers(1, 13, rows), rng.integers(1, 29, rows))],
+    }
+    for field, *_ in QUOTE_FIELDS + INCOME_FIELDS:
+        # Two-decimal values across several magnitudes, like upstream quotes and statements
+        values = np.round(rng.normal(0, 1, rows) * 10.0 ** rng.integers(1, 11, rows), 2)
+        values[rng.random(rows) < 0.1] = np.nan
+        data[field] = values
+    return pd.DataFrame(data)
+
+
+def legacy_quote(df):
+    lines = []
+    for _, row in df.iterrows():
+        info = []
+        if pd.notna(row.get("trade_date")): info.append(f"日期:{row['trade_date']}")
+        if pd.notna(row.get("ts_code")): info.append(f"代码:{row['ts_code']}")
+        for field, label, unit in QUOTE_FIELDS:
+            if pd.notna(row.get(field)):
+                info.append(f"{label}:{row[field]}{unit}")
+        lines.append(" | ".join(info))
+    return lines
+
+
+def legacy_income(df):
+    lines = []
+    for _, row in df.iterrows():
+        info = []
+        if pd.notna(row.get("ts_code")): info.append(f"代码: {row['ts_code']}")
+        for field, label in INCOME_FIELDS:
+            if pd.notna(row.get(field)):
+                info.append(f"{label}: {format_money(row[field])}")
+        lines.append(" | ".join(info))
+    return lines
+
+
+QUOTE_COLUMNS = [Col("trade_date", "日期"), Col("ts_code", "代码")] + [
+    Col(field, label, unit) for field, label, unit in QUOTE_FIELDS
+]
+INCOME_COLUMNS = [Col("ts_code", "代码")] + [Col(field, label, convert=money) for field, label in INCOME_FIELDS]
+
+
+def main():
+    df = make_frame(ROWS)
+    cases = [
+        ("quote", lambda: legacy_quote(df), lambda: render_rows(df, QUOTE_COLUMNS, sep=":")),
+        ("income", lambda: legacy_income(df), lambda: render_rows(df, INCOME_COLUMNS)),
+    ]
+    print(f"{ROWS} rows, best of {REPEAT}")
+    for name, before_fn, after_fn in cases:
+        assert before_fn() == after_fn(), f"{name}: outputs differ"
+        before = min(timeit.repeat(before_fn, number=1, repeat=REPEAT))
+        after = min(timeit.repeat(after_fn, number=1, repeat=REPEAT))
+        print(f"{name:7s} before: {before * 1e3:8.1f} ms  after: {after * 1e3:7.1f} ms  speedup: {before / after:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
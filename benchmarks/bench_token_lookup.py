@@ -0,0 +1,48 @@
+"""Micro-benchmark: per-call cost of resolving the data token.
+
+"before" replays the old lookup path (init_env_file() + load_dotenv() +
+os.getenv on every call); "after" is the in-memory get_data_token().
+
+    python benchmarks/bench_token_lookup.py
+"""
+import logging
+import os
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dotenv import load_dotenv  # noqa: E402
+
+from utils import token_manager  # noqa: E402
+
+ITERATIONS = 2000
+
+
+def legacy_get_data_token():
+    token_manager.init_env_file()
+    load_dotenv(token_manager.ENV_FILE)
+    return os.getenv("TINYSHARE_TOKEN") or os.getenv("MINISHARE_DATA_TOKEN")
+
+
+def main():
+    # Keep stderr readable; the old path logged several lines per call too.
+    logging.getLogger("minishare_mcp").setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        token_manager.ENV_FILE = Path(tmp) / ".minishare_mcp" / ".env"
+        token_manager.ENV_FILE.parent.mkdir(parents=True)
+        token_manager.ENV_FILE.write_text("MINISHARE_DATA_TOKEN=bench-token\n")
+
+        before = timeit.timeit(legacy_get_data_token, number=ITERATIONS)
+        token_manager.get_data_token()  # initial load, as at server startup
+        after = timeit.timeit(token_manager.get_data_token, number=ITERATIONS)
+
+    print(f"before: {before / ITERATIONS * 1e6:8.2f} us/call")
+    print(f"after:  {after / ITERATIONS * 1e6:8.2f} us/call")
+    print(f"speedup: {before / after:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,26 @@
 import sys
 import argparse
-import traceback
+import threading
 from mcp.server.fastmcp import FastMCP
-from utils.logger import log_debug
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from utils.logger import log_debug, log_error, log_warning
+from utils.metrics import metrics
+from utils.tracing import TRACE_FILE, tracer
+from utils.code_resolver import code_resolver
+from utils.security_master import security_master
+from utils.sync import SYNC_DATASETS, resolve_sync_categories, start_sync
+from utils.trade_calendar import trading_calendar
+from utils.circuit import circuit_summary
+from utils.retry import upstream_retries
+from utils.upstream import cache_summary
+from utils.executor import DEFAULT_QUEUE_DEPTH, DEFAULT_WORKERS, ThreadedToolRegistrar, ToolExecutor
 from utils.token_manager import (
     set_data_token, get_data_token,
     set_corpus_token, get_corpus_token,
+    get_pro_client,
 )
 from tools import register_all_tools
-import tinyshare as ts  # minishare 数据 SDK（pip 包名仍为 tinyshare）
 
 
 # ---------------------------------------------------------------------------
@@ -23,11 +35,10 @@ def setup_data_token_impl(token: str) -> str:
         current = get_data_token()
         if not current:
             return "Token 配置未能验证，请重试。"
-        ts.pro_api(current)
+        get_pro_client()
         return "行情数据授权码配置成功！"
     except Exception as e:
-        log_debug(f"ERROR in setup_data_token: {str(e)}")
-        traceback.print_exc(file=sys.stderr)
+        log_error("setup_data_token failed: %s", e, exc_info=True)
         return f"Token 配置失败：{str(e)}"
 
 
@@ -38,8 +49,7 @@ def setup_corpus_token_impl(token: str) -> str:
         set_corpus_token(token)
         return "资讯语料授权码配置成功！"
     except Exception as e:
-        log_debug(f"ERROR in setup_corpus_token: {str(e)}")
-        traceback.print_exc(file=sys.stderr)
+        log_error("setup_corpus_token failed: %s", e, exc_info=True)
         return f"Token 配置失败：{str(e)}"
 
 
@@ -51,7 +61,7 @@ def check_token_status_impl() -> str:
     parts = []
     if data_token:
         try:
-            ts.pro_api(data_token)
+            get_pro_client()
             parts.append("行情数据授权码：正常")
         except Exception as e:
             parts.append(f"行情数据授权码：无效或过期 ({str(e)[:80]})")
@@ -63,6 +73,8 @@ def check_token_status_impl() -> str:
     else:
         parts.append("资讯语料授权码：未配置")
 
+    parts.append(cache_summary())
+    parts.append(circuit_summary())
     return " | ".join(parts)
 
 
@@ -103,7 +115,33 @@ def register_tool_aliases(mcp: FastMCP):
             continue
         real_tool = tm._tools[real_name]
         tm.add_tool(real_tool.fn, name=alias, description=real_tool.description)
-        log_debug(f"Registered alias '{alias}' -> '{real_name}'")
+        log_debug("Registered alias '%s' -> '%s'", alias, real_name)
+
+def warm_reference_data():
+    """Load in-process reference data in the background so the first tool
+    call does not pay for it. Skipped when no data token is configured."""
+    if not get_data_token():
+        return
+
+    def warm():
+        try:
+            pro = get_pro_client()
+            trading_calendar.ensure_loaded(pro)
+            if security_master.ensure_loaded(pro):
+                code_resolver.warm()
+        except Exception as e:
+            log_warning("Reference data warm-up failed: %s", e)
+
+    threading.Thread(target=warm, name="reference-warmup", daemon=True).start()
+
+
+def register_metrics_route(mcp: FastMCP):
+    """Serve tool/upstream metrics in Prometheus text format at /metrics (SSE mode)."""
+
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics_endpoint(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 
 def create_mcp_server(port: int = 8000) -> FastMCP:
     mcp = FastMCP(
@@ -111,7 +149,7 @@ def create_mcp_server(port: int = 8000) -> FastMCP:
         host="0.0.0.0",
         port=port,
     )
-    log_debug(f"FastMCP instance created on port {port}.")
+    log_debug("FastMCP instance created on port %s.", port)
     return mcp
 
 
@@ -120,27 +158,56 @@ if __name__ == "__main__":
     parser.add_argument("--stdio", action="store_true", help="Run in stdio mode")
     parser.add_argument("--category", action="append", help="Tool category (stock, fund, corpus). Can be repeated.")
     parser.add_argument("--port", type=int, default=8000, help="Port (default 8000)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Worker threads for tool calls (default {DEFAULT_WORKERS}, env MINISHARE_MCP_WORKERS)")
+    parser.add_argument("--queue-depth", type=int, default=DEFAULT_QUEUE_DEPTH,
+                        help=f"Tool calls allowed to wait for a worker (default {DEFAULT_QUEUE_DEPTH}, env MINISHARE_MCP_QUEUE_DEPTH)")
+    parser.add_argument("--sync", action="append",
+                        help=f"Post-close cross-section sync categories ({', '.join(SYNC_DATASETS)}, or none). "
+                             "Can be repeated or comma-separated; defaults to env MINISHARE_MCP_SYNC, "
+                             "else follows --category.")
+    parser.add_argument("--sync-offline", action="store_true",
+                        help="Run the sync against a fake client into a private store (for testing)")
+    parser.add_argument("--trace-file", default=TRACE_FILE,
+                        help="Append one JSON line per traced tool call (span tree of upstream calls) "
+                             "to this file (default env MINISHARE_MCP_TRACE_FILE, off when empty)")
     args = parser.parse_args()
 
+    tracer.configure(args.trace_file)
     mcp = create_mcp_server(port=args.port)
+    # Tools are plain blocking functions; run them on a bounded thread pool so
+    # one slow upstream call does not stall the event loop for other clients.
+    registrar = ThreadedToolRegistrar(mcp, ToolExecutor(args.workers, args.queue_depth))
 
     # Token management tools
-    mcp.tool(name="setup_data_token")(setup_data_token_impl)
-    mcp.tool(name="setup_corpus_token")(setup_corpus_token_impl)
-    mcp.tool(name="check_token_status")(check_token_status_impl)
+    registrar.tool(name="setup_data_token")(setup_data_token_impl)
+    registrar.tool(name="setup_corpus_token")(setup_corpus_token_impl)
+    registrar.tool(name="check_token_status")(check_token_status_impl)
 
     # Register data/corpus tools
     categories = args.category if args.category else None
     print(f"Categories: {categories}", file=sys.stderr)
-    register_all_tools(mcp, categories=categories)
-    log_debug(f"Registered tools: {categories if categories else 'ALL'}")
+    register_all_tools(registrar, categories=categories)
+    log_debug("Registered tools: %s", categories if categories else 'ALL')
 
     # Register aliases for tool names that models commonly hallucinate
     register_tool_aliases(mcp)
 
-    if args.stdio:
-        print("Starting in stdio mode...", file=sys.stderr, flush=True)
-        mcp.run(transport='stdio')
-    else:
-        print(f"Starting SSE server on 0.0.0.0:{args.port}/sse ...", file=sys.stderr, flush=True)
-        mcp.run(transport='sse')
+    warm_reference_data()
+    try:
+        sync_categories = resolve_sync_categories(args.sync, categories)
+    except ValueError as exc:
+        parser.error(str(exc))
+    start_sync(sync_categories, offline=args.sync_offline)
+
+    try:
+        if args.stdio:
+            print("Starting in stdio mode...", file=sys.stderr, flush=True)
+            mcp.run(transport='stdio')
+        else:
+            register_metrics_route(mcp)
+            print(f"Starting SSE server on 0.0.0.0:{args.port}/sse (metrics at /metrics) ...", file=sys.stderr, flush=True)
+            mcp.run(transport='sse')
+    finally:
+        # Wake tool workers sleeping in a retry backoff so shutdown is prompt.
+        upstream_retries.close()
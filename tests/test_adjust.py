@@ -0,0 +1,108 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from tools.stock.quote import daily as daily_module
+from tools.stock.quote import quote_utils
+from utils.adjust import AdjustmentEngine
+
+BARS = pd.DataFrame({
+    "ts_code": ["600519.SH"] * 4 + ["000300.SH"],
+    "trade_date": ["20260810", "20260811", "20260812", "20260813", "20260813"],
+    "open": [10.0, 10.0, 5.0, 5.0, 4000.0],
+    "high": [11.0, 11.0, 6.0, 6.0, 4010.0],
+    "low": [9.0, 9.0, 4.0, 4.0, 3990.0],
+    "close": [10.0, 10.0, 5.0, 5.0, 4000.0],
+    "pre_close": [10.0, 10.0, 5.0, 5.0, 3990.0],
+    "change": [0.0, 0.0, 0.0, 0.0, 10.0],
+})
+
+
+class FactorClient:
+    def __init__(self, factors):
+        self.factors = factors
+        self.calls = []
+
+    def adj_factor(self, ts_code, limit, offset, start_date="", end_date="", fields=""):
+        self.calls.append((start_date, end_date))
+        rows = [(day, factor) for day, factor in self.factors.items()
+                if day >= start_date and (not end_date or day <= end_date)]
+        return pd.DataFrame(rows[offset:offset + limit], columns=["trade_date", "adj_factor"])
+
+
+class AdjustmentEngineTests(unittest.TestCase):
+    def setUp(self):
+        # A 2-for-1 split takes effect on 0812.
+        self.pro = FactorClient({"20260810": 1.0, "20260811": 1.0, "20260812": 2.0, "20260813": 2.0})
+        self.now = [0.0]
+        self.engine = AdjustmentEngine(refresh_after=600, clock=lambda: self.now[0], today=lambda: "20260814")
+
+    def test_forward_and_backward_adjustment(self):
+        qfq = self.engine.adjust(self.pro, BARS, "qfq", codes=["600519.SH"])
+        self.assertEqual(qfq["close"].tolist(), [5.0, 5.0, 5.0, 5.0, 4000.0])
+        self.assertEqual(qfq["high"].tolist()[:2], [5.5, 5.5])
+        self.assertEqual(qfq.attrs["adj"], "qfq")
+
+        hfq = self.engine.adjust(self.pro, BARS, "hfq", codes=["600519.SH"])
+        self.assertEqual(hfq["close"].tolist()[:4], [10.0, 10.0, 10.0, 10.0])
+        self.assertEqual(hfq["change"].tolist()[:4], [0.0, 0.0, 0.0, 0.0])
+        self.assertEqual(self.pro.calls, [("20260810", "")])
+
+    def test_new_factor_fetches_only_the_tail(self):
+        self.engine.adjust(self.pro, BARS, "qfq", codes=["600519.SH"])
+        self.pro.factors["20260814"] = 4.0
+        self.engine.adjust(self.pro, BARS, "qfq", codes=["600519.SH"])
+        self.assertEqual(len(self.pro.calls), 1)
+
+        self.now[0] = 601
+        qfq = self.engine.adjust(self.pro, BARS, "qfq", codes=["600519.SH"])
+        self.assertEqual(self.pro.calls[-1], ("20260814", ""))
+        self.assertEqual(qfq["close"].tolist()[:4], [2.5, 2.5, 2.5, 2.5])
+
+        earlier = pd.DataFrame({"ts_code": ["600519.SH"], "trade_date": ["20260807"], "close": [10.0]})
+        self.pro.factors["20260807"] = 1.0
+        self.engine.adjust(self.pro, earlier, "hfq")
+        self.assertEqual(self.pro.calls[-1], ("20260807", "20260809"))
+        self.assertEqual(self.engine.stats()["series"], 1)
+
+    def test_codes_without_factors_are_reported(self):
+        pro = mock.Mock()
+        pro.adj_factor.side_effect = ConnectionError("timed out")
+        result = self.engine.adjust(pro, BARS, "qfq", codes=["600519.SH"])
+        self.assertEqual(result["ts_code"].tolist(), ["000300.SH"])
+        self.assertIn("timed out", result.attrs["failed_codes"]["600519.SH"])
+
+    def test_every_code_failing_raises(self):
+        bars = BARS[BARS["ts_code"] == "600519.SH"]
+        pro = mock.Mock()
+        pro.adj_factor.side_effect = ConnectionError("timed out")
+        with self.assertRaisesRegex(ConnectionError, "timed out"):
+            self.engine.adjust(pro, bars, "qfq")
+
+        with self.assertRaisesRegex(ValueError, "600519.SH\\(无复权因子数据\\)"):
+            self.engine.adjust(FactorClient({}), bars, "qfq")
+
+    def test_daily_tool_adj_parameter(self):
+        pro = mock.Mock()
+        pro.daily.return_value = BARS[BARS["ts_code"] == "600519.SH"]
+        pro.adj_factor.side_effect = FactorClient({"20260810": 1.0, "20260812": 2.0}).adj_factor
+        tools = {}
+
+        class ToolCapture:
+            def tool(self):
+                def register(function):
+                    tools[function.__name__] = function
+                    return function
+                return register
+
+        with mock.patch.object(daily_module, "get_pro_client", return_value=pro), \
+                mock.patch.object(quote_utils, "adjustment_engine", self.engine):
+            daily_module.register_daily_tools(ToolCapture())
+            output = tools["daily"](ts_code="600519.SH", start_date="20260810", end_date="20260813", adj="qfq")
+            self.assertIn("日线行情数据 (前复权)", output)
+            self.assertIn("adj 仅支持", tools["daily"](ts_code="600519.SH", adj="xyz"))
+
+
+if __name__ == "__main__":
+    unittest.main()
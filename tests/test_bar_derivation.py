@@ -0,0 +1,166 @@
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from tools.stock.quote import quote_utils
+from tools.stock.quote.bar_derivation import BarDeriver
+from tools.stock.quote.quote_utils import fetch_quote_data
+from utils.cache import CST
+from utils.resample import PeriodBarCache
+from utils.trade_calendar import TradingCalendar
+
+NOW = datetime(2026, 8, 19, 18, tzinfo=CST)
+# Weekdays from 2026-07-01 except a holiday on Friday 2026-07-17.
+OPEN_DAYS = [day for day in pd.bdate_range("20260701", "20260831").strftime("%Y%m%d") if day != "20260717"]
+
+
+def daily_bars(code="600519.SH", end="20260819"):
+    days = [day for day in OPEN_DAYS if day <= end]
+    close = np.round(100 + np.arange(len(days)) * 0.5, 2)
+    return pd.DataFrame({
+        "ts_code": code, "trade_date": days, "open": close - 0.2, "high": close + 1, "low": close - 1,
+        "close": close, "pre_close": close - 0.5, "vol": 1000.0, "amount": 5000.0,
+    })
+
+
+def calendar():
+    pro = mock.Mock()
+    pro.trade_cal.return_value = pd.DataFrame({"cal_date": OPEN_DAYS})
+    pro.index_daily.return_value = pd.DataFrame({"trade_date": [day for day in OPEN_DAYS if day <= "20260819"][::-1]})
+    cal = TradingCalendar(clock=lambda: NOW)
+    cal.ensure_loaded(pro)
+    return cal
+
+
+class BarDeriverTests(unittest.TestCase):
+    def setUp(self):
+        self.store = mock.Mock()
+        self.store.supports.return_value = True
+        self.background = []
+        self.deriver = BarDeriver(
+            enabled=True, verify_rate=1.0, store=self.store, calendar=calendar(), clock=lambda: NOW,
+            sample=lambda: 0.0, run_in_background=self.background.append,
+        )
+        self.fetch_daily = mock.Mock(side_effect=lambda source, codes, params: daily_bars())
+        self.cache = mock.patch("utils.resample.period_bars", PeriodBarCache())
+        self.cache.start()
+        self.addCleanup(self.cache.stop)
+
+    def derive(self, endpoint="weekly", **params):
+        params = params or {"start_date": "20260708", "end_date": "20260819"}
+        return self.deriver.derive(mock.Mock(), endpoint, ["600519.SH"], params, self.fetch_daily)
+
+    def test_weekly_bars_follow_the_exchange_calendar(self):
+        bars = self.derive()
+
+        self.fetch_daily.assert_called_once_with("daily", ["600519.SH"], {"start_date": "20260706", "end_date": "20260819"})
+        # The week of 0817 is still open; the holiday week closes on Thursday.
+        self.assertEqual(bars["trade_date"].tolist(), ["20260710", "20260716", "20260724", "20260731", "20260807", "20260814"])
+        first = bars.iloc[0]
+        # daily 手/千元 become weekly 股/元.
+        self.assertEqual((first["open"], first["vol"], first["amount"]), (101.3, 500000.0, 25000000.0))
+        self.assertEqual(first["pre_close"], 101.0)
+        self.assertAlmostEqual(first["change"], first["close"] - 101.0)
+        self.assertAlmostEqual(first["pct_chg"], first["change"] / 101.0)
+
+    def test_monthly_drops_the_open_month(self):
+        bars = self.derive("monthly", start_date="20260701", end_date="20260819")
+        self.assertEqual(bars["trade_date"].tolist(), ["20260731"])
+
+    def test_falls_back_to_upstream(self):
+        self.assertIsNone(self.derive("index_weekly"))
+        self.assertIsNone(self.derive(trade_date="20260814"))
+        self.assertIsNone(self.derive(end_date="20260814"))
+        self.assertIsNone(self.derive("daily", start_date="20260701"))
+        self.store.supports.return_value = False
+        self.assertIsNone(self.derive())
+        self.fetch_daily.assert_not_called()
+
+    def test_sampled_results_are_checked_against_upstream(self):
+        bars = self.derive()
+        upstream = bars.copy()
+        verified = self.deriver.verify("weekly", bars, mock.Mock(return_value=upstream.iloc[:-1]), {})
+        self.assertTrue(verified)
+        self.assertEqual(len(self.background), 1)
+
+        upstream.loc[2, "vol"] += 1000
+        self.assertFalse(self.deriver.verify("weekly", bars, mock.Mock(return_value=upstream), {}))
+        self.assertEqual(self.deriver.disabled, {"weekly": "vol"})
+        self.assertIsNone(self.derive())
+
+
+# 000001.SZ in the week of 2018-10-15 as upstream returns it: daily vol in
+# 手 and amount in 千元, weekly vol in 股, amount in 元 and pct_chg a fraction.
+UPSTREAM_DAILY = pd.DataFrame({
+    "ts_code": "000001.SZ",
+    "trade_date": ["20181015", "20181016", "20181017", "20181018", "20181019"],
+    "open": [10.76, 10.60, 10.48, 10.55, 10.30],
+    "high": [10.84, 10.70, 10.66, 10.62, 10.75],
+    "low": [10.55, 10.40, 10.42, 10.20, 10.25],
+    "close": [10.58, 10.45, 10.60, 10.30, 10.70],
+    "pre_close": [10.83, 10.58, 10.45, 10.60, 10.30],
+    "change": [-0.25, -0.13, 0.15, -0.30, 0.40],
+    "pct_chg": [-2.3084, -1.2287, 1.4354, -2.8302, 3.8835],
+    "vol": [800000.0, 700000.0, 900000.0, 850000.0, 886580.06],
+    "amount": [853000.0, 735000.0, 948000.0, 880000.0, 894659.0],
+})
+UPSTREAM_WEEKLY = pd.DataFrame({
+    "ts_code": ["000001.SZ"], "trade_date": ["20181019"], "close": [10.70], "open": [10.76], "high": [10.84],
+    "low": [10.20], "pre_close": [10.83], "change": [-0.13], "pct_chg": [-0.0120],
+    "vol": [413658006.0], "amount": [4.310659e+09],
+})
+
+
+class UpstreamUnitTests(unittest.TestCase):
+    def test_derived_weekly_matches_upstream_units(self):
+        now = datetime(2018, 10, 22, 18, tzinfo=CST)
+        days = list(pd.bdate_range("20181008", "20181026").strftime("%Y%m%d"))
+        pro = mock.Mock()
+        pro.trade_cal.return_value = pd.DataFrame({"cal_date": days})
+        pro.index_daily.return_value = pd.DataFrame({"trade_date": [day for day in days if day <= "20181022"][::-1]})
+        cal = TradingCalendar(clock=lambda: now)
+        cal.ensure_loaded(pro)
+        store = mock.Mock()
+        store.supports.return_value = True
+        deriver = BarDeriver(enabled=True, verify_rate=0, store=store, calendar=cal, clock=lambda: now)
+
+        with mock.patch("utils.resample.period_bars", PeriodBarCache()):
+            bars = deriver.derive(pro, "weekly", ["000001.SZ"], {"start_date": "20181015", "end_date": "20181019"},
+                                  lambda source, codes, params: UPSTREAM_DAILY)
+
+        row = bars.iloc[0]
+        self.assertAlmostEqual(row["vol"], 413658006.0, places=2)
+        self.assertAlmostEqual(row["amount"], 4.310659e+09, places=2)
+        self.assertAlmostEqual(row["pct_chg"], -0.0120, places=4)
+        self.assertTrue(deriver.verify("weekly", bars, mock.Mock(return_value=UPSTREAM_WEEKLY), {}))
+        self.assertEqual(deriver.disabled, {})
+
+
+class DerivedQuoteDataTests(unittest.TestCase):
+    def test_weekly_and_monthly_reuse_the_daily_fetch(self):
+        store = mock.Mock()
+        store.supports.return_value = True
+        deriver = BarDeriver(enabled=True, verify_rate=0, store=store, calendar=calendar(), clock=lambda: NOW)
+        pro = mock.Mock()
+        pro.daily.return_value = daily_bars()
+
+        with mock.patch.object(quote_utils, "bar_deriver", deriver), \
+                mock.patch("utils.resample.period_bars", PeriodBarCache()):
+            for period in ("weekly", "monthly"):
+                df = fetch_quote_data(
+                    pro, stock_api=period, index_api=f"index_{period}", period=period,
+                    ts_code="600519.SH", start_date="20260701", end_date="20260819",
+                )
+                self.assertFalse(df.empty)
+
+        pro.weekly.assert_not_called()
+        pro.monthly.assert_not_called()
+        self.assertEqual(pro.daily.call_count, 2)
+        self.assertEqual(deriver.stats()["derived"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
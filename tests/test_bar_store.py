@@ -0,0 +1,127 @@
+import importlib.util
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from utils.bar_store import BarStore, merge_ranges, missing_ranges
+from utils.cache import ResponseCache
+from utils.upstream import UpstreamClient
+
+
+def fake_daily(calls):
+    """Upstream stand-in returning one bar per weekday for each requested code."""
+    def daily(ts_code, start_date, end_date, **kwargs):
+        calls.append((ts_code, start_date, end_date))
+        days = pd.bdate_range(start_date, end_date).strftime("%Y%m%d")
+        rows = [
+            {"ts_code": code, "trade_date": day, "close": float(day[-2:]), "vol": 100.0}
+            for code in ts_code.split(",")
+            for day in days
+        ]
+        return pd.DataFrame(rows, columns=["ts_code", "trade_date", "close", "vol"]).iloc[::-1]
+
+    return daily
+
+
+class RangeTests(unittest.TestCase):
+    def test_merge_joins_adjacent_days(self):
+        self.assertEqual(
+            merge_ranges([("20240105", "20240110"), ("20240101", "20240104"), ("20240201", "20240202")]),
+            [("20240101", "20240110"), ("20240201", "20240202")],
+        )
+
+    def test_missing_ranges(self):
+        covered = [("20240105", "20240110"), ("20240201", "20240202")]
+        self.assertEqual(
+            missing_ranges(covered, "20240101", "20240205"),
+            [("20240101", "20240104"), ("20240111", "20240131"), ("20240203", "20240205")],
+        )
+        self.assertEqual(missing_ranges(covered, "20240106", "20240109"), [])
+
+
+@unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow not installed")
+class BarStoreTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.calls = []
+        self.daily = fake_daily(self.calls)
+        self.store = BarStore(self.root, today=lambda: "20240620")
+
+    def test_only_uncovered_ranges_are_fetched_and_survive_restart(self):
+        first = self.store.fetch("daily", self.daily, {"ts_code": "000001.SZ", "start_date": "20231225", "end_date": "20240110"})
+        self.assertEqual(self.calls, [("000001.SZ", "20231225", "20240110")])
+        self.assertEqual(first["trade_date"].iloc[0], "20240110")
+
+        restarted = BarStore(self.root, today=lambda: "20240620")
+        df = restarted.fetch(
+            "daily", self.daily,
+            {"ts_code": "000001.SZ", "start_date": "20240101", "end_date": "20240115", "fields": "trade_date,close"},
+        )
+
+        self.assertEqual(self.calls[1:], [("000001.SZ", "20240111", "20240115")])
+        self.assertEqual(list(df.columns), ["trade_date", "close"])
+        self.assertEqual(df["trade_date"].tolist(), list(pd.bdate_range("20240101", "20240115").strftime("%Y%m%d"))[::-1])
+
+    def test_multi_code_gaps_are_batched_and_recent_days_fetched_live(self):
+        self.store.fetch("daily", self.daily, {"ts_code": "000001.SZ", "start_date": "20240610", "end_date": "20240614"})
+        self.calls.clear()
+
+        df = self.store.fetch("daily", self.daily, {"ts_code": "000001.SZ,600000.SH", "start_date": "20240610", "end_date": "20240620"})
+
+        self.assertEqual(
+            self.calls,
+            [
+                ("000001.SZ", "20240615", "20240619"),
+                ("600000.SH", "20240610", "20240619"),
+                ("000001.SZ,600000.SH", "20240620", "20240620"),
+            ],
+        )
+        self.assertEqual(len(df), 2 * 9)
+
+        self.calls.clear()
+        self.store.fetch("daily", self.daily, {"ts_code": "000001.SZ,600000.SH", "start_date": "20240610", "end_date": "20240619"})
+        self.assertEqual(self.calls, [])
+
+    def test_rewritten_day_replaces_the_stored_row(self):
+        stored = pd.DataFrame([{"ts_code": "000001.SZ", "trade_date": "20240105", "close": 10.0, "vol": 100.0}])
+        self.store._write("daily", "000001.SZ", stored, "20240105", "20240105")
+        self.store._write("daily", "000001.SZ", stored.assign(close=10.5), "20240105", "20240105")
+
+        df = self.store._read("daily", "000001.SZ", "20240101", "20240131")
+        self.assertEqual(df["close"].tolist(), [10.5])
+
+    def test_unsupported_params_bypass_store(self):
+        self.assertFalse(self.store.supports("daily", {"trade_date": "20240110"}))
+        self.assertFalse(self.store.supports("fund_nav", {"ts_code": "510300.SH", "market": "E", "start_date": "20240101"}))
+        self.assertFalse(self.store.supports("income", {"ts_code": "000001.SZ", "start_date": "20240101"}))
+        self.assertTrue(self.store.supports("fund_nav", {"ts_code": "510300.SH", "nav_date": "20240110"}))
+
+    def test_upstream_client_reads_through_its_store(self):
+        sdk = mock.Mock()
+        sdk.daily.side_effect = self.daily
+        pro = UpstreamClient(sdk, "data", cache=ResponseCache(max_bytes=0), store=self.store)
+
+        pro.daily(ts_code="000001.SZ", start_date="20240101", end_date="20240105")
+        pro.daily(ts_code="000001.SZ", start_date="20240102", end_date="20240104")
+
+        self.assertEqual(self.calls, [("000001.SZ", "20240101", "20240105")])
+
+
+class UpstreamWithoutStoreTests(unittest.TestCase):
+    def test_store_none_disables_the_bar_store(self):
+        sdk = mock.Mock()
+        sdk.daily.return_value = pd.DataFrame({"ts_code": ["000001.SZ"]})
+        with mock.patch("utils.upstream.bar_store") as shared:
+            UpstreamClient(sdk, "data", cache=ResponseCache(max_bytes=0), store=None).daily(
+                ts_code="000001.SZ", start_date="20240101", end_date="20240105")
+
+        shared.supports.assert_not_called()
+        sdk.daily.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
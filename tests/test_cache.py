@@ -0,0 +1,109 @@
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import pandas as pd
+
+from utils.cache import CST, DATA_CLASS_TTLS, ResponseCache, normalize_params, ttl_for
+from utils.upstream import UpstreamClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ResponseCacheTests(unittest.TestCase):
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = ResponseCache(max_bytes=1024, clock=clock)
+        cache.set("k", "v", ttl=10, nbytes=1)
+
+        self.assertEqual(cache.get("k"), "v")
+        clock.now += 10
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+        self.assertEqual(cache.stats()["bytes"], 0)
+
+    def test_least_recently_used_entry_is_evicted_over_budget(self):
+        cache = ResponseCache(max_bytes=100)
+        cache.set("a", 1, ttl=60, nbytes=40)
+        cache.set("b", 2, ttl=60, nbytes=40)
+        cache.get("a")
+        cache.set("c", 3, ttl=60, nbytes=40)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+        cache.set("huge", 4, ttl=60, nbytes=101)
+        self.assertIsNone(cache.get("huge"))
+
+
+class CacheKeyTests(unittest.TestCase):
+    def test_normalize_params_ignores_blank_values_and_field_spacing(self):
+        self.assertEqual(
+            normalize_params({"ts_code": " 000001.SZ ", "start_date": "", "end_date": None, "fields": "a, b,c"}),
+            normalize_params({"fields": "a,b,c", "ts_code": "000001.SZ"}),
+        )
+        self.assertNotEqual(normalize_params({"fields": "a,b"}), normalize_params({"fields": "b,a"}))
+
+    def test_eod_ttl_runs_until_next_close_unless_window_is_past(self):
+        published = lambda day: day <= "20240607"
+        friday_noon = datetime(2024, 6, 7, 12, 0, tzinfo=CST)
+        self.assertEqual(ttl_for("daily", {"ts_code": "000001.SZ"}, friday_noon, published), 3.5 * 3600)
+
+        friday_evening = datetime(2024, 6, 7, 16, 0, tzinfo=CST)
+        self.assertEqual(ttl_for("daily", {}, friday_evening, published), (3 * 24 - 0.5) * 3600)
+
+        self.assertEqual(ttl_for("daily", {"end_date": "20240531"}, friday_noon), DATA_CLASS_TTLS["history"])
+        self.assertEqual(ttl_for("stock_basic", {}), DATA_CLASS_TTLS["reference"])
+        self.assertEqual(ttl_for("news", {}), DATA_CLASS_TTLS["corpus"])
+
+    def test_eod_ttl_is_short_until_the_close_is_published(self):
+        friday_evening = datetime(2024, 6, 7, 16, 0, tzinfo=CST)
+        published = lambda day: day <= "20240606"
+        for params in ({}, {"trade_date": "20240607"}, {"end_date": "20240607"}):
+            self.assertEqual(ttl_for("daily", params, friday_evening, published), DATA_CLASS_TTLS["default"])
+            self.assertEqual(ttl_for("daily", params, friday_evening), DATA_CLASS_TTLS["default"])
+        # Over the weekend Friday's bars are still the ones that may be missing.
+        saturday = datetime(2024, 6, 8, 10, 0, tzinfo=CST)
+        self.assertEqual(ttl_for("daily", {"end_date": "20240607"}, saturday, published), DATA_CLASS_TTLS["default"])
+        self.assertEqual(ttl_for("daily", {"end_date": "20240606"}, friday_evening, published), DATA_CLASS_TTLS["history"])
+
+
+class UpstreamClientTests(unittest.TestCase):
+    def setUp(self):
+        self.sdk = mock.Mock()
+        self.sdk.daily.return_value = pd.DataFrame({"ts_code": ["000001.SZ"], "close": [10.0]})
+        self.cache = ResponseCache(max_bytes=1024 * 1024)
+        self.pro = UpstreamClient(self.sdk, "data", cache=self.cache, store=None)
+
+    def test_repeated_call_is_served_from_cache(self):
+        first = self.pro.daily(ts_code="000001.SZ", fields="ts_code,close")
+        first.loc[0, "close"] = 99.0
+        second = self.pro.daily(ts_code="000001.SZ ", fields="ts_code, close")
+
+        self.sdk.daily.assert_called_once_with(ts_code="000001.SZ", fields="ts_code,close")
+        self.assertEqual(second.loc[0, "close"], 10.0)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_errors_are_not_cached(self):
+        self.sdk.income.side_effect = [RuntimeError("boom"), pd.DataFrame({"x": [1]})]
+
+        with self.assertRaises(RuntimeError):
+            self.pro.income(ts_code="000001.SZ")
+        self.assertEqual(len(self.pro.income(ts_code="000001.SZ")), 1)
+        self.assertEqual(self.sdk.income.call_count, 2)
+
+    def test_missing_endpoint_raises_attribute_error(self):
+        sdk = mock.Mock(spec=["daily"])
+        self.assertIsNone(getattr(UpstreamClient(sdk, "corpus", cache=self.cache, store=None), "irm_qa_sz", None))
+
+
+if __name__ == "__main__":
+    unittest.main()
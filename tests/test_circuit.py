@@ -0,0 +1,146 @@
+import unittest
+
+import pandas as pd
+
+from server import check_token_status_impl
+from utils.cache import ResponseCache
+from utils.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakers, CircuitOpenError, circuit_summary
+from utils.cross_section import CrossSectionStore
+from utils.metrics import MetricsRegistry
+from utils.retry import RetryBudget, RetryPolicy
+from utils.singleflight import SingleFlight
+from utils.upstream import UpstreamClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def fail():
+    raise ConnectionError("处理服务端响应失败")
+
+
+def succeed():
+    return "ok"
+
+
+class FakeClient:
+    def __init__(self):
+        self.down = False
+        self.calls = 0
+
+    def income(self, **params):
+        self.calls += 1
+        if self.down:
+            fail()
+        return pd.DataFrame({"ts_code": [params["ts_code"]], "revenue": [1.0]})
+
+
+class CircuitBreakerTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker("daily", window=60, error_rate=0.5, min_calls=4, cooldown=30, clock=self.clock)
+
+    def trip(self):
+        for _ in range(4):
+            with self.assertRaises(ConnectionError):
+                self.breaker.call(fail)
+
+    def test_opens_on_error_rate_and_fails_fast(self):
+        self.breaker.call(succeed)
+        self.breaker.call(succeed)
+        with self.assertRaises(ConnectionError):
+            self.breaker.call(fail)
+        self.assertEqual(self.breaker.state, CLOSED)
+        with self.assertRaises(ConnectionError):
+            self.breaker.call(fail)
+
+        self.assertEqual(self.breaker.state, OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(succeed)
+        self.assertEqual(self.breaker.snapshot()["rejected"], 1)
+
+    def test_old_outcomes_leave_the_window(self):
+        for _ in range(3):
+            with self.assertRaises(ConnectionError):
+                self.breaker.call(fail)
+        self.clock.now += 61
+        self.breaker.call(succeed)
+
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.snapshot()["calls"], 1)
+
+    def test_bad_request_errors_do_not_count(self):
+        for _ in range(4):
+            with self.assertRaises(ValueError):
+                self.breaker.call(lambda: (_ for _ in ()).throw(ValueError("参数错误")))
+
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_half_open_probe_closes_or_reopens(self):
+        self.trip()
+        self.clock.now += 30
+        with self.assertRaises(ConnectionError):
+            self.breaker.call(fail)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.snapshot()["opened"], 2)
+
+        self.clock.now += 30
+        self.assertEqual(self.breaker.call(succeed), "ok")
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_one_probe_at_a_time(self):
+        self.trip()
+        self.clock.now += 30
+
+        def probe():
+            self.assertEqual(self.breaker.state, HALF_OPEN)
+            with self.assertRaises(CircuitOpenError):
+                self.breaker.call(succeed)
+            return "probed"
+
+        self.assertEqual(self.breaker.call(probe), "probed")
+
+
+class UpstreamCircuitTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.sdk = FakeClient()
+        self.circuits = CircuitBreakers(
+            lambda endpoint: CircuitBreaker(endpoint, min_calls=2, cooldown=30, clock=self.clock))
+        self.cache = ResponseCache(max_bytes=1 << 20, clock=self.clock, stale_for=3600)
+        self.pro = UpstreamClient(
+            self.sdk, "data", cache=self.cache, store=None, flights=SingleFlight(),
+            sections=CrossSectionStore(), circuits=self.circuits,
+            retries=RetryPolicy(budget=RetryBudget(capacity=0, refill=0)),
+        )
+
+    def test_open_circuit_serves_stale_cache_or_fails_fast(self):
+        self.pro.income(ts_code="000001.SZ")
+        self.clock.now += 1.5 * 3600
+        self.sdk.down = True
+        for code in ("600000.SH", "600519.SH"):
+            with self.assertRaises(ConnectionError):
+                self.pro.income(ts_code=code)
+        calls = self.sdk.calls
+
+        stale = self.pro.income(ts_code="000001.SZ")
+        self.assertEqual(stale["ts_code"].tolist(), ["000001.SZ"])
+        with self.assertRaises(CircuitOpenError):
+            self.pro.income(ts_code="000002.SZ")
+
+        self.assertEqual(self.sdk.calls, calls)
+        self.assertEqual(self.cache.stats()["stale_hits"], 1)
+        self.assertIn("income 熔断", circuit_summary(self.circuits))
+
+    def test_state_is_exported(self):
+        self.assertIn("上游熔断：", check_token_status_impl())
+        self.assertIn("minishare_circuit_state", MetricsRegistry().render())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from tools.stock.quote import quote_utils
+from utils.code_resolver import CodeResolver
+from utils.security_master import SecurityMaster
+
+
+def resolver_client():
+    pro = mock.Mock()
+    stocks = pd.DataFrame(
+        [
+            {"ts_code": "600519.SH", "symbol": "600519", "name": "贵州茅台", "cnspell": "gzmt",
+             "fullname": "贵州茅台酒股份有限公司", "list_status": "L"},
+            {"ts_code": "000001.SZ", "symbol": "000001", "name": "平安银行", "cnspell": "payh",
+             "fullname": "平安银行股份有限公司", "list_status": "L"},
+            {"ts_code": "601318.SH", "symbol": "601318", "name": "中国平安", "cnspell": "zgpa",
+             "fullname": "中国平安保险(集团)股份有限公司", "list_status": "L"},
+        ]
+    )
+    pro.stock_basic.side_effect = lambda list_status, **kwargs: stocks if list_status == "L" else pd.DataFrame()
+    pro.index_basic.return_value = pd.DataFrame({"ts_code": ["000001.SH"], "name": ["上证指数"]})
+    pro.index_classify.return_value = pd.DataFrame()
+    pro.etf_basic.return_value = pd.DataFrame({"ts_code": ["510300.SH"], "csname": ["沪深300ETF"], "list_status": ["L"]})
+    pro.fund_basic.return_value = pd.DataFrame()
+    pro.namechange.return_value = pd.DataFrame({"ts_code": ["000001.SZ"], "name": ["深发展A"]})
+    return pro
+
+
+class CodeResolverTests(unittest.TestCase):
+    def setUp(self):
+        master = SecurityMaster()
+        master.ensure_loaded(resolver_client())
+        self.resolver = CodeResolver(master)
+
+    def test_exact_aliases(self):
+        resolve = self.resolver.resolve
+        self.assertEqual(resolve("贵州茅台"), "600519.SH")
+        self.assertEqual(resolve(" GZMT "), "600519.SH")
+        self.assertEqual(resolve("600519"), "600519.SH")
+        self.assertEqual(resolve("贵州茅台酒股份有限公司"), "600519.SH")
+        self.assertEqual(resolve("深发展A"), "000001.SZ")
+        self.assertEqual(resolve("沪深３００ＥＴＦ"), "510300.SH")
+
+    def test_prefix_and_fuzzy_matches(self):
+        resolve = self.resolver.resolve
+        self.assertEqual(resolve("贵州茅"), "600519.SH")
+        self.assertEqual(resolve("平安银行股份"), "000001.SZ")
+        self.assertEqual(resolve("贵洲茅台"), "600519.SH")
+
+    def test_codes_and_unknown_tokens_pass_through(self):
+        resolve = self.resolver.resolve
+        self.assertEqual(resolve("000001.sh"), "000001.SH")
+        self.assertEqual(resolve("不存在的公司"), "不存在的公司")
+        self.assertEqual(resolve("pa"), "pa")
+        self.assertEqual(resolve("6005"), "6005")
+
+    def test_split_ts_codes_resolves_names(self):
+        with mock.patch.object(quote_utils, "code_resolver", self.resolver):
+            codes = quote_utils.split_ts_codes("贵州茅台,平安银行，600519.SH、payh")
+
+        self.assertEqual(codes, ["600519.SH", "000001.SZ"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from tools.stock.quote.quote_utils import fetch_quote_data
+from utils import cross_section
+from utils.cross_section import CrossSectionStore, fetch_codes_for_day, fetch_cross_section
+
+DAY = "20260814"
+MARKET = [f"{number:06d}.SZ" for number in range(1, 101)]
+
+
+def market_client():
+    pro = mock.Mock()
+    pro.daily.side_effect = lambda **params: pd.DataFrame(
+        {"ts_code": MARKET, "trade_date": params.get("trade_date", DAY), "close": range(len(MARKET))}
+    ).iloc[params.get("offset", 0):]
+    pro.index_daily.side_effect = lambda **params: pd.DataFrame(
+        [{"ts_code": params["ts_code"], "trade_date": DAY, "close": 3000}]
+    )
+    return pro
+
+
+class CrossSectionStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.store = CrossSectionStore(max_dates=2)
+        self.store.put("daily", DAY, pd.DataFrame({"ts_code": MARKET[:3], "close": [1.0, 2.0, 3.0]}))
+
+    def test_select_and_lookup(self):
+        frame = self.store.select("daily", DAY, [MARKET[2], MARKET[0]], "close")
+        self.assertEqual(frame["close"].tolist(), [1.0, 3.0])
+        # A code the complete section lacks did not trade: it has no rows.
+        self.assertEqual(self.store.select("daily", DAY, [MARKET[0], "999999.SZ"])["ts_code"].tolist(), MARKET[:1])
+        lookup = self.store.lookup("daily", {"trade_date": DAY, "ts_code": f"{MARKET[0]},999999.SZ"})
+        self.assertEqual(lookup["ts_code"].tolist(), MARKET[:1])
+        self.assertTrue(self.store.select("daily", DAY, ["999999.SZ"]).empty)
+        self.assertIsNone(self.store.select("daily", DAY, None, "pct_chg"))
+        self.assertEqual(len(self.store.lookup("daily", {"start_date": DAY, "end_date": DAY})), 3)
+        self.assertIsNone(self.store.lookup("daily", {"trade_date": DAY, "limit": 10}))
+
+    def test_oldest_dates_are_dropped(self):
+        frame = pd.DataFrame({"ts_code": MARKET[:1]})
+        self.store.put("daily", "20260817", frame)
+        self.store.put("daily", "20260813", frame)
+        self.assertEqual(self.store.dates("daily"), [DAY, "20260817"])
+
+    def test_fetch_cross_section_pages_until_a_short_page(self):
+        pro = mock.Mock()
+        pro.fund_nav.side_effect = [pd.DataFrame({"ts_code": ["a"] * 2000}), pd.DataFrame({"ts_code": ["b"]})]
+        frame = fetch_cross_section(pro, "fund_nav", DAY)
+        self.assertEqual(len(frame), 2001)
+        self.assertEqual(pro.fund_nav.call_args.kwargs, {"nav_date": DAY, "limit": 2000, "offset": 2000})
+        self.assertNotIn("truncated", frame.attrs)
+
+    def test_section_at_the_page_cap_is_not_stored(self):
+        pro = mock.Mock()
+        pro.fund_nav.return_value = pd.DataFrame({"ts_code": ["a"] * 2000})
+        with mock.patch.object(cross_section, "MAX_PAGES", 2):
+            frame = fetch_cross_section(pro, "fund_nav", DAY)
+        self.assertTrue(frame.attrs["truncated"])
+
+        self.store.put("fund_nav", DAY, frame)
+        self.assertFalse(self.store.has("fund_nav", DAY))
+
+
+class FetchCodesForDayTests(unittest.TestCase):
+    def setUp(self):
+        self.store = CrossSectionStore()
+        self.pro = market_client()
+
+    def plan(self, codes, params, **kwargs):
+        return fetch_codes_for_day(self.pro, "daily", codes, params, store=self.store, min_codes=30, **kwargs)
+
+    def test_many_codes_use_one_cross_section_then_reuse_it(self):
+        frame = self.plan(MARKET[:40], {"trade_date": DAY})
+        self.assertEqual(frame["ts_code"].tolist(), MARKET[:40])
+        self.pro.daily.assert_called_once_with(trade_date=DAY, limit=5000, offset=0)
+
+        frame = self.plan(MARKET[50:52], {"start_date": DAY, "end_date": DAY}, fields="ts_code,close")
+        self.assertEqual(frame["close"].tolist(), [50, 51])
+        self.assertEqual(self.pro.daily.call_count, 1)
+
+    def test_falls_back_to_per_code_calls(self):
+        self.assertIsNone(self.plan(MARKET[:5], {"trade_date": DAY}))
+        self.assertIsNone(self.plan(MARKET[:40], {"start_date": "20260801", "end_date": DAY}))
+        self.assertIsNone(self.plan(MARKET[:40], {"trade_date": DAY, "offset": 10}))
+        self.assertIsNone(fetch_codes_for_day(self.pro, "weekly", MARKET, {"trade_date": DAY}, store=self.store))
+        self.pro.daily.assert_not_called()
+
+        self.plan(MARKET[:40], {"trade_date": DAY})
+        self.assertIsNone(self.plan(MARKET[:40], {"trade_date": DAY}, fields="ts_code,pct_chg"))
+        self.assertEqual(self.pro.daily.call_count, 1)
+
+    def test_codes_missing_from_the_section_get_no_rows(self):
+        frame = self.plan(MARKET[:40] + ["999999.SZ"], {"trade_date": DAY})
+        self.assertEqual(frame["ts_code"].tolist(), MARKET[:40])
+        self.assertEqual(len(self.plan(["999999.SZ"] + MARKET[:2], {"trade_date": DAY})), 2)
+        self.assertEqual(self.pro.daily.call_count, 1)
+
+    def test_fetch_quote_data_splits_index_codes_from_the_cross_section(self):
+        with mock.patch.object(cross_section, "cross_sections", self.store):
+            df = fetch_quote_data(
+                self.pro, stock_api="daily", index_api="index_daily", period="daily",
+                ts_code=",".join(MARKET[:40] + ["000300.SH"]), trade_date=DAY,
+            )
+        self.assertEqual(len(df), 41)
+        self.assertEqual(self.pro.daily.call_count, 1)
+        self.pro.index_daily.assert_called_once_with(trade_date=DAY, ts_code="000300.SH")
+
+
+if __name__ == "__main__":
+    unittest.main()
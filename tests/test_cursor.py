@@ -0,0 +1,153 @@
+import re
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+import tools.fund.fund_nav as fund_nav_module
+import tools.stock.quote.stk_limit as stk_limit_module
+from utils.cache import frame_nbytes
+from utils.cursor import CursorStore, estimate_tokens, fetch_page, paginate
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"ts_code": [f"{index:06d}.SZ" for index in range(rows)], "close": range(rows)})
+
+
+def render(page: pd.DataFrame):
+    return ("代码:" + page["ts_code"] + " | 收盘:" + page["close"].astype(str)).tolist()
+
+
+def cursor_of(text: str) -> str:
+    return re.search(r'fetch_page\(cursor="([^"]+)"\)', text).group(1)
+
+
+class PaginateTests(unittest.TestCase):
+    def test_pages_walk_the_whole_result(self):
+        store = CursorStore(max_bytes=1 << 20)
+        lines = paginate(frame(120), render, "测试", store=store)
+
+        self.assertEqual(len(lines), 51)
+        self.assertIn("共 120 条，已显示至第 50 条", lines[-1])
+        second = fetch_page(cursor_of(lines[-1]), store=store)
+        self.assertIn("第 51-100 条 / 共 120 条", second)
+        self.assertIn("代码:000050.SZ", second)
+        third = fetch_page(cursor_of(second), store=store)
+        self.assertIn("代码:000119.SZ", third)
+        self.assertNotIn("fetch_page", third)
+        self.assertEqual(store.stats()["pages"], 2)
+
+    def test_small_results_open_no_cursor(self):
+        store = CursorStore(max_bytes=1 << 20)
+
+        self.assertEqual(len(paginate(frame(10), render, "测试", store=store)), 10)
+        self.assertEqual(store.stats()["cursors"], 0)
+
+    def test_token_budget_shortens_the_page(self):
+        store = CursorStore(max_bytes=1 << 20)
+        per_row = estimate_tokens(render(frame(1))[0]) + 1
+        lines = paginate(frame(120), render, "测试", token_budget=per_row * 10, store=store)
+
+        self.assertEqual(len(lines), 11)
+        self.assertIn("@10", lines[-1])
+
+    def test_unknown_or_expired_cursor(self):
+        clock = FakeClock()
+        store = CursorStore(max_bytes=1 << 20, ttl=60, clock=clock)
+        cursor = cursor_of(paginate(frame(120), render, "测试", store=store)[-1])
+
+        self.assertIn("不存在或已过期", fetch_page("deadbeef@50", store=store))
+        clock.now += 59
+        self.assertIn("第 51-100 条", fetch_page(cursor, store=store))
+        clock.now += 60
+        self.assertIn("不存在或已过期", fetch_page(cursor, store=store))
+        self.assertEqual(store.stats()["expirations"], 1)
+
+    def test_memory_bound_evicts_least_recently_used(self):
+        data = frame(120)
+        store = CursorStore(max_bytes=frame_nbytes(data) * 2)
+        first = store.open(data, render)
+        second = store.open(data, render)
+        store.get(first)
+        store.open(data, render)
+
+        self.assertIsNotNone(store.get(first))
+        self.assertIsNone(store.get(second))
+        self.assertEqual(store.stats()["evictions"], 1)
+        self.assertIsNone(CursorStore(max_bytes=10).open(data, render))
+
+    def test_oversized_result_falls_back_to_plain_note(self):
+        lines = paginate(frame(120), render, "测试", store=CursorStore(max_bytes=10))
+
+        self.assertEqual(lines[-1], "... (共 120 条，仅显示前 50 条)")
+
+
+class ToolPaginationTests(unittest.TestCase):
+    def test_follow_up_pages_do_not_call_upstream(self):
+        rows = pd.DataFrame({
+            "trade_date": "20260814",
+            "ts_code": [f"{index:06d}.SZ" for index in range(80)],
+            "pre_close": 10.0,
+            "up_limit": 11.0,
+            "down_limit": 9.0,
+        })
+        pro = mock.Mock()
+        pro.stk_limit.return_value = rows
+        container = {}
+
+        class ToolCapture:
+            def tool(self):
+                def register(function):
+                    container["stk_limit"] = function
+                    return function
+
+                return register
+
+        with mock.patch.object(stk_limit_module, "get_pro_client", return_value=pro):
+            stk_limit_module.register_stk_limit_tools(ToolCapture())
+            output = container["stk_limit"](trade_date="20260814")
+
+        self.assertEqual(output.count("代码:"), 50)
+        page = fetch_page(cursor_of(output))
+        self.assertEqual(page.count("代码:"), 30)
+        self.assertIn("代码:000079.SZ", page)
+        self.assertEqual(pro.stk_limit.call_count, 1)
+
+    def test_long_series_pages_instead_of_eliding_the_middle(self):
+        dates = pd.date_range("2026-01-01", periods=120).strftime("%Y%m%d")
+        rows = pd.DataFrame({"ts_code": "510300.SH", "nav_date": dates, "unit_nav": 1.0})
+        pro = mock.Mock()
+        pro.fund_nav.return_value = rows
+        container = {}
+
+        class ToolCapture:
+            def tool(self):
+                def register(function):
+                    container["fund_nav"] = function
+                    return function
+
+                return register
+
+        with mock.patch.object(fund_nav_module, "get_pro_client", return_value=pro):
+            fund_nav_module.register_fund_nav_tools(ToolCapture())
+            output = container["fund_nav"](ts_code="510300.SH")
+
+        self.assertNotIn("中间省略", output)
+        self.assertEqual(output.count("日期:"), 50)
+        self.assertIn("日期: 20260430", output)
+        page = fetch_page(cursor_of(output))
+        self.assertEqual(page.count("日期:"), 50)
+        self.assertIn("日期: 20260310", page)
+        self.assertEqual(pro.fund_nav.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
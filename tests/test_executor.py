@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from mcp.server.fastmcp import FastMCP
+
+from tools.fund.fund_daily import register_fund_daily_tools
+from utils.executor import ThreadedToolRegistrar, ToolExecutor
+
+
+class ToolExecutorTests(unittest.TestCase):
+    def test_registered_tools_keep_schema_and_become_async(self):
+        async def run():
+            mcp = FastMCP("executor-test")
+            register_fund_daily_tools(ThreadedToolRegistrar(mcp, ToolExecutor(2, 0)))
+            return {tool.name: tool for tool in await mcp.list_tools()}, mcp
+
+        tools, mcp = asyncio.run(run())
+        self.assertEqual(tools["fund_daily"].inputSchema["required"], ["ts_code"])
+        self.assertTrue(mcp._tool_manager._tools["fund_daily"].is_async)
+
+    def test_blocking_calls_run_concurrently_on_workers(self):
+        executor = ToolExecutor(max_workers=4, queue_depth=0)
+        threads = set()
+
+        def slow(value):
+            threads.add(threading.get_ident())
+            time.sleep(0.2)
+            return value * 2
+
+        async def run():
+            wrapped = executor.wrap(slow)
+            return await asyncio.gather(*(wrapped(i) for i in range(4)))
+
+        started = time.monotonic()
+        results = asyncio.run(run())
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(results, [0, 2, 4, 6])
+        self.assertNotIn(threading.get_ident(), threads)
+        self.assertLess(elapsed, 0.6)
+        executor.shutdown()
+
+    def test_calls_beyond_queue_depth_are_rejected(self):
+        executor = ToolExecutor(max_workers=1, queue_depth=1)
+        release = threading.Event()
+
+        def blocked():
+            release.wait(2)
+            return "done"
+
+        async def run():
+            wrapped = executor.wrap(blocked)
+            first = asyncio.ensure_future(wrapped())
+            second = asyncio.ensure_future(wrapped())
+            await asyncio.sleep(0.05)
+            with self.assertRaisesRegex(RuntimeError, "服务繁忙"):
+                await wrapped()
+            release.set()
+            return await asyncio.gather(first, second)
+
+        self.assertEqual(asyncio.run(run()), ["done", "done"])
+        executor.shutdown()
+
+    def test_cancelled_calls_free_their_slot(self):
+        executor = ToolExecutor(max_workers=1, queue_depth=1)
+        release = threading.Event()
+        ran = []
+
+        def blocked(label):
+            ran.append(label)
+            release.wait(2)
+            return label
+
+        async def run():
+            wrapped = executor.wrap(blocked)
+            first = asyncio.ensure_future(wrapped("first"))
+            queued = asyncio.ensure_future(wrapped("queued"))
+            await asyncio.sleep(0.05)
+            queued.cancel()
+            await asyncio.sleep(0)
+            self.assertEqual(executor.in_flight, 1)
+            third = asyncio.ensure_future(wrapped("third"))
+            await asyncio.sleep(0.05)
+
+            # A running call keeps its worker, and its slot, until it returns.
+            first.cancel()
+            await asyncio.sleep(0)
+            self.assertEqual(executor.in_flight, 2)
+            release.set()
+            return await third
+
+        self.assertEqual(asyncio.run(run()), "third")
+        executor.shutdown()
+        self.assertEqual(ran, ["first", "third"])
+        self.assertEqual(executor.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
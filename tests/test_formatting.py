@@ -0,0 +1,82 @@
+import math
+import unittest
+
+import pandas as pd
+
+from utils.formatting import (
+    Col,
+    format_money,
+    join_parts,
+    map_values,
+    money,
+    render_column,
+    render_rows,
+    truncate,
+)
+
+
+def legacy_rows(df, fields, sep):
+    """Reference: the per-row loop the tools used before render_rows."""
+    lines = []
+    for _, row in df.iterrows():
+        info = []
+        for field, label, unit in fields:
+            if pd.notna(row.get(field)):
+                info.append(f"{label}{sep}{row[field]}{unit}")
+        lines.append(" | ".join(info))
+    return lines
+
+
+class RenderRowsTests(unittest.TestCase):
+    def test_matches_iterrows_output(self):
+        df = pd.DataFrame(
+            {
+                "ts_code": ["000001.SZ", None, "600000.SH"],
+                "close": [10.5, 11.25, math.nan],
+                "vol": [1200, 300, 45],
+                "pct_chg": [1.0, math.nan, -0.333],
+            }
+        )
+        fields = [("ts_code", "代码", ""), ("close", "收盘", ""), ("vol", "成交量", "手"), ("pct_chg", "涨跌幅", "%"),
+                  ("missing", "缺失", "")]
+        columns = [Col(field, label, unit) for field, label, unit in fields]
+
+        self.assertEqual(render_rows(df, columns, sep=":"), legacy_rows(df, fields, ":"))
+
+    def test_format_spec_and_all_missing_row(self):
+        df = pd.DataFrame({"mkv": [1234567.891, math.nan]})
+
+        lines = render_rows(df, [Col("mkv", "市值", "元", fmt=",.2f")])
+
+        self.assertEqual(lines, ["市值: 1,234,567.89元", ""])
+
+    def test_convert_returning_missing_skips_value(self):
+        df = pd.DataFrame({"cash": [0.5, 0.0, -1.0]})
+        col = Col("cash", "派息", "元", convert=lambda s: s.where(s > 0))
+
+        self.assertEqual(render_column(df, col).tolist(), ["派息: 0.5元", "", ""])
+
+    def test_join_parts_skips_empty_entries(self):
+        joined = join_parts([["a", "", ""], ["", "", "c"], ["b", "", "d"]], joiner=",")
+
+        self.assertEqual(joined.tolist(), ["a,b", "", "c,d"])
+
+
+class ConvertHelperTests(unittest.TestCase):
+    def test_money_matches_format_money(self):
+        values = pd.Series([123456789.0, -98765.4321, 9999.5, 10000.0, 12, -3e12])
+        self.assertEqual(money(values).tolist(), [format_money(value) for value in values])
+
+        mixed = pd.Series(["abc", 250000.0], dtype=object)
+        self.assertEqual(money(mixed).tolist(), ["abc", "25.00万"])
+
+    def test_truncate_and_map_values(self):
+        text = pd.Series(["短", "长" * 60])
+        self.assertEqual(truncate(50)(text).tolist(), ["短", "长" * 50 + "..."])
+
+        status = map_values({"L": "上市", "D": "摘牌"})(pd.Series(["L", "X"]))
+        self.assertEqual(status.tolist(), ["上市", "X"])
+
+
+if __name__ == "__main__":
+    unittest.main()
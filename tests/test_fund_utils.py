@@ -0,0 +1,67 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from tools.fund import fund_nav as fund_nav_module
+from tools.fund.fund_utils import fetch_multi_code
+
+
+class ToolCapture:
+    def __init__(self):
+        self.tools = {}
+
+    def tool(self):
+        def register(function):
+            self.tools[function.__name__] = function
+            return function
+
+        return register
+
+
+class FetchMultiCodeTests(unittest.TestCase):
+    def test_single_code_is_one_plain_call(self):
+        api = mock.Mock(return_value=pd.DataFrame([{"ts_code": "510330.SH"}]))
+
+        fetch_multi_code(api, {"ts_code": "510330.SH", "trade_date": "20260814"}, fields="ts_code")
+
+        api.assert_called_once_with(trade_date="20260814", fields="ts_code", ts_code="510330.SH")
+
+    def test_codes_are_deduplicated_fetched_concurrently_and_kept_in_order(self):
+        threads = set()
+
+        def api(**params):
+            threads.add(threading.get_ident())
+            time.sleep(0.1)
+            return pd.DataFrame([{"ts_code": params["ts_code"], "nav_date": "20260814"}])
+
+        started = time.monotonic()
+        df = fetch_multi_code(api, {"ts_code": "510330.SH, 159919.SZ,510330.SH，510300.SH"})
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(df["ts_code"].tolist(), ["510330.SH", "159919.SZ", "510300.SH"])
+        self.assertGreater(len(threads), 1)
+        self.assertLess(elapsed, 0.25)
+
+    def test_fund_nav_reports_failed_codes(self):
+        pro = mock.Mock()
+
+        def fund_nav(**params):
+            if params["ts_code"] == "000002.OF":
+                raise ConnectionError("timed out")
+            return pd.DataFrame([{"ts_code": params["ts_code"], "nav_date": "20260814", "unit_nav": 1.2}])
+
+        pro.fund_nav.side_effect = fund_nav
+        container = ToolCapture()
+        with mock.patch.object(fund_nav_module, "get_pro_client", return_value=pro):
+            fund_nav_module.register_fund_nav_tools(container)
+            output = container.tools["fund_nav"](ts_code="000001.OF,000002.OF")
+
+        self.assertIn("代码: 000001.OF", output)
+        self.assertIn("查询失败代码: 000002.OF(timed out)", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import ast
+import logging
+import pathlib
+import unittest
+from logging.handlers import QueueHandler
+
+from utils import logger as log
+
+
+class Counting:
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "value"
+
+
+class LoggerTests(unittest.TestCase):
+    def setUp(self):
+        level = log.logger.level
+        self.addCleanup(log.logger.setLevel, level)
+
+    def test_debug_arguments_are_not_formatted_when_disabled(self):
+        log.logger.setLevel(logging.INFO)
+        argument = Counting()
+        log.log_debug("tool called with %s", argument)
+        log.log_sampled("tool", "tool called with %s", argument)
+
+        self.assertEqual(argument.formatted, 0)
+
+    def test_sampled_lines_keep_one_in_every(self):
+        log.logger.setLevel(logging.DEBUG)
+        with self.assertLogs(log.logger, level="DEBUG") as captured:
+            for index in range(10):
+                log.log_sampled("sampling-test", "call %d", index, every=4)
+
+        self.assertEqual([record.getMessage() for record in captured.records], ["call 0", "call 4", "call 8"])
+
+    def test_records_are_handed_to_a_queue(self):
+        self.assertTrue(any(isinstance(handler, QueueHandler) for handler in log.logger.handlers))
+
+    def test_frame_summary_is_lazy(self):
+        summary = log.frame_summary(None)
+
+        self.assertIn("type=NoneType", str(summary))
+
+    def test_log_calls_pass_arguments_instead_of_formatting(self):
+        root = pathlib.Path(__file__).resolve().parent.parent
+        eager = []
+        for path in root.glob("**/*.py"):
+            if "tests" in path.parts or ".git" in path.parts:
+                continue
+            for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+                if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                        and node.func.id in ("log_debug", "log_info", "log_warning", "log_error", "log_sampled")):
+                    continue
+                message = node.args[1 if node.func.id == "log_sampled" else 0]
+                if isinstance(message, (ast.JoinedStr, ast.BinOp)):
+                    eager.append(f"{path.relative_to(root)}:{node.lineno}")
+
+        self.assertEqual(eager, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
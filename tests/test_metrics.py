@@ -0,0 +1,115 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+from mcp.server.fastmcp import FastMCP
+from starlette.testclient import TestClient
+
+from server import register_metrics_route
+from utils.cache import ResponseCache
+from utils.cross_section import CrossSectionStore
+from utils.fanout import fan_out
+from utils.logger import handle_exception
+from utils.metrics import MetricsRegistry, metrics
+from utils.singleflight import SingleFlight
+from utils.upstream import UpstreamClient
+
+
+class FakeClient:
+    def daily(self, **params):
+        return pd.DataFrame({"ts_code": [params.get("ts_code")] * 3, "close": [1.0, 2.0, 3.0]})
+
+    def broken(self, **params):
+        raise ValueError("bad request")
+
+
+def client() -> UpstreamClient:
+    return UpstreamClient(
+        FakeClient(), "data", cache=ResponseCache(max_bytes=1 << 20), store=None,
+        flights=SingleFlight(), sections=CrossSectionStore(),
+    )
+
+
+class MetricsTests(unittest.TestCase):
+    def setUp(self):
+        metrics.clear()
+
+    def test_upstream_calls_are_attributed_to_the_tool(self):
+        pro = client()
+
+        @handle_exception
+        def quotes(codes):
+            fan_out(lambda code: pro.daily(ts_code=code), codes.split(","))
+            pro.daily(ts_code="000001.SZ")
+            return "ok"
+
+        self.assertEqual(quotes("000001.SZ,600000.SH"), "ok")
+
+        self.assertEqual(metrics.requests[("quotes", "daily", "upstream")], 2)
+        self.assertEqual(metrics.requests[("quotes", "daily", "cache")], 1)
+        self.assertEqual(metrics.rows[("quotes", "daily")], 9)
+        self.assertEqual(metrics.tool_calls[("quotes", "ok")], 1)
+        self.assertEqual(metrics.output_bytes["quotes"], 2)
+        per_call = metrics.upstream_per_call["quotes"]
+        self.assertEqual((per_call.count, per_call.total), (1, 2))
+
+    def test_failures_are_counted(self):
+        pro = client()
+
+        @handle_exception
+        def failing():
+            return pro.broken(ts_code="000001.SZ")
+
+        with self.assertRaises(ValueError):
+            failing()
+
+        self.assertEqual(metrics.tool_calls[("failing", "error")], 1)
+        self.assertEqual(metrics.requests[("failing", "broken", "error")], 1)
+
+    def test_bar_store_hits_are_not_upstream_calls(self):
+        store = mock.Mock()
+        store.supports.return_value = True
+        store.fetch.side_effect = lambda endpoint, remote, params: pd.DataFrame({"close": [1.0, 2.0]})
+        pro = UpstreamClient(
+            FakeClient(), "data", cache=ResponseCache(max_bytes=0), store=store,
+            flights=SingleFlight(), sections=CrossSectionStore(),
+        )
+
+        @handle_exception
+        def quotes():
+            pro.daily(ts_code="000001.SZ", start_date="20240101", end_date="20240105")
+            store.fetch.side_effect = lambda endpoint, remote, params: remote(**params)
+            pro.daily(ts_code="000002.SZ", start_date="20240101", end_date="20240105")
+            return "ok"
+
+        quotes()
+
+        self.assertEqual(metrics.requests[("quotes", "daily", "store")], 1)
+        self.assertEqual(metrics.requests[("quotes", "daily", "upstream")], 1)
+        self.assertEqual(metrics.upstream_per_call["quotes"].total, 1)
+        text = metrics.render()
+        self.assertIn('minishare_upstream_requests_total{tool="quotes",endpoint="daily",source="stale"} 0', text)
+
+    def test_render_prometheus_text(self):
+        registry = MetricsRegistry(clock=iter([0.0, 0.3]).__next__)
+        with registry.invocation("daily"):
+            registry.record_call("daily", "upstream", rows=5)
+
+        text = registry.render()
+        self.assertIn('minishare_tool_calls_total{tool="daily",status="ok"} 1', text)
+        self.assertIn('minishare_tool_latency_seconds_bucket{tool="daily",le="0.25"} 0', text)
+        self.assertIn('minishare_tool_latency_seconds_bucket{tool="daily",le="0.5"} 1', text)
+        self.assertIn('minishare_upstream_rows_total{tool="daily",endpoint="daily"} 5', text)
+        self.assertIn("# TYPE minishare_tool_upstream_calls histogram", text)
+
+    def test_metrics_route_next_to_sse(self):
+        mcp = FastMCP("metrics-test")
+        register_metrics_route(mcp)
+
+        response = TestClient(mcp.sse_app()).get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("minishare_response_cache_lookups_total", response.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,9 +7,11 @@ from tools.stock.quote.quote_utils import (
     fetch_quote_data,
     format_quote_data,
     is_index_code,
+    plan_quote_batches,
     split_ts_codes,
 )
 from tools.stock.quote import daily as daily_module
+from tools.stock.quote import quote_utils
 
 
 class FakeProClient:
@@ -186,6 +188,102 @@ class QuoteUtilsTests(unittest.TestCase):
         self.assertEqual(df["ts_code"].tolist(), ["000001.SZ"])
         pro.sw_daily.assert_called_once_with(trade_date="20260814", ts_code="801080.SI")
 
+    def test_partial_failures_are_reported_per_code(self):
+        pro = mock.Mock()
+
+        def daily(**params):
+            if params["ts_code"] == "600000.SH":
+                raise ConnectionError("处理服务端响应失败")
+            return pd.DataFrame(
+                [{"ts_code": params["ts_code"], "trade_date": "20260814", "close": 10}]
+            )
+
+        pro.daily.side_effect = daily
+        df = fetch_quote_data(
+            pro,
+            stock_api="daily",
+            index_api="index_daily",
+            period="daily",
+            ts_code="000001.SZ,600000.SH,000002.SZ",
+        )
+
+        self.assertEqual(df["ts_code"].tolist(), ["000001.SZ", "000002.SZ"])
+        self.assertIn("600000.SH", df.attrs["failed_codes"])
+        output = format_quote_data(df, "daily", ["000001.SZ", "600000.SH", "000002.SZ"])
+        self.assertIn("查询失败代码:600000.SH(处理服务端响应失败)", output)
+        self.assertNotIn("未找到代码", output)
+
+    def test_stock_codes_are_batched_into_one_upstream_call(self):
+        pro = mock.Mock()
+        pro.daily.return_value = pd.DataFrame(
+            [
+                {"ts_code": "000001.SZ", "trade_date": "20260814", "close": 10},
+                {"ts_code": "600000.SH", "trade_date": "20260814", "close": 8},
+            ]
+        )
+        pro.index_daily.return_value = pd.DataFrame(
+            [{"ts_code": "000300.SH", "trade_date": "20260814", "close": 4000}]
+        )
+
+        df = fetch_quote_data(
+            pro,
+            stock_api="daily",
+            index_api="index_daily",
+            period="daily",
+            ts_code="000001.SZ,000300.SH,600000.SH",
+            trade_date="20260814",
+        )
+
+        pro.daily.assert_called_once_with(trade_date="20260814", ts_code="000001.SZ,600000.SH")
+        pro.index_daily.assert_called_once_with(trade_date="20260814", ts_code="000300.SH")
+        self.assertEqual(set(df["ts_code"]), {"000001.SZ", "600000.SH", "000300.SH"})
+
+    def test_batches_are_sized_to_row_cap_and_split_when_full(self):
+        tasks = plan_quote_batches(
+            [f"{600000 + index}.SH" for index in range(10)],
+            "daily",
+            "index_daily",
+            {"start_date": "20200101", "end_date": "20251231"},
+        )
+        # ~1790 estimated bars per code over six years -> three codes per batch.
+        self.assertEqual([len(codes) for _, codes in tasks], [3, 3, 3, 1])
+
+        calls = []
+
+        def daily(**params):
+            codes = params["ts_code"].split(",")
+            calls.append(codes)
+            rows = 6000 if len(codes) > 1 else 10
+            return pd.DataFrame({"ts_code": [codes[0]] * rows, "trade_date": ["20260814"] * rows})
+
+        pro = mock.Mock()
+        pro.daily.side_effect = daily
+        with mock.patch.object(quote_utils, "MAX_CODES_PER_BATCH", 2):
+            df = fetch_quote_data(
+                pro,
+                stock_api="daily",
+                index_api="index_daily",
+                period="daily",
+                ts_code="000001.SZ,000002.SZ",
+                trade_date="20260814",
+            )
+
+        self.assertEqual(calls, [["000001.SZ", "000002.SZ"], ["000001.SZ"], ["000002.SZ"]])
+        self.assertEqual(len(df), 20)
+
+    def test_all_codes_failing_raises_first_error(self):
+        pro = mock.Mock()
+        pro.daily.side_effect = ValueError("参数校验失败")
+
+        with self.assertRaisesRegex(ValueError, "参数校验失败"):
+            fetch_quote_data(
+                pro,
+                stock_api="daily",
+                index_api="index_daily",
+                period="daily",
+                ts_code="000001.SZ,000002.SZ",
+            )
+
     def test_format_lists_missing_requested_codes(self):
         df = pd.DataFrame([{"ts_code": "801080.SI", "trade_date": "20260814"}])
 
@@ -0,0 +1,137 @@
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from tools.stock.quote.quote_utils import fetch_quote_data
+from utils.cache import CST
+from utils.resample import PeriodBarCache, period_bounds, period_keys, resample_bars
+
+NOW = datetime(2026, 8, 19, 10, tzinfo=CST)
+
+
+def daily_bars(codes=("801080.SI", "000300.SH"), start="20260105", end="20260818"):
+    days = pd.bdate_range(start, end).strftime("%Y%m%d")
+    rng = np.random.default_rng(7)
+    frames = []
+    for code in codes:
+        close = 100 + rng.normal(0, 1, len(days)).cumsum()
+        frames.append(pd.DataFrame({
+            "ts_code": code, "trade_date": days, "open": close - 0.5, "high": close + 1,
+            "low": close - 1, "close": close, "vol": rng.uniform(1, 10, len(days)),
+            "amount": rng.uniform(10, 100, len(days)),
+        }))
+    return pd.concat(frames, ignore_index=True).iloc[::-1].reset_index(drop=True)
+
+
+def pandas_resample(daily, frequency):
+    daily = daily.sort_values(["ts_code", "trade_date"])
+    period = pd.to_datetime(daily["trade_date"], format="%Y%m%d").dt.to_period(frequency).astype(str)
+    grouped = daily.groupby(["ts_code", period], sort=False).agg(
+        trade_date=("trade_date", "max"), open=("open", "first"), high=("high", "max"),
+        low=("low", "min"), close=("close", "last"), vol=("vol", "sum"), amount=("amount", "sum"),
+    )
+    return grouped.reset_index(drop=True)
+
+
+class PeriodKeyTests(unittest.TestCase):
+    def test_keys_and_bounds(self):
+        dates = ["20260810", "20260816", "20260817", "20261231"]
+        self.assertEqual(len(set(period_keys(dates[:2], "weekly"))), 1)
+        self.assertEqual(len(set(period_keys(dates[1:3], "weekly"))), 2)
+        week = period_keys(["20260814"], "weekly")[0]
+        self.assertEqual(period_bounds(week, "weekly"), ("20260810", "20260816"))
+        quarter = period_keys(["20261231"], "quarterly")[0]
+        self.assertEqual(period_bounds(quarter, "quarterly"), ("20261001", "20261231"))
+        self.assertEqual(period_bounds(period_keys(["20240215"], "monthly")[0], "monthly"), ("20240201", "20240229"))
+        self.assertEqual(period_bounds(2026, "yearly"), ("20260101", "20261231"))
+
+
+class ResampleBarsTests(unittest.TestCase):
+    def setUp(self):
+        self.cache = PeriodBarCache()
+        self.daily = daily_bars()
+
+    def resample(self, period, daily=None, **kwargs):
+        kwargs.setdefault("start_date", "20260105")
+        return resample_bars(self.daily if daily is None else daily, period, cache=self.cache,
+                             clock=lambda: NOW, **kwargs)
+
+    def test_matches_pandas_groupby(self):
+        for period, frequency in (("weekly", "W-SUN"), ("monthly", "M"), ("quarterly", "Q")):
+            result = self.resample(period)
+            expected = pandas_resample(self.daily, frequency)
+            pd.testing.assert_frame_equal(
+                result[list(expected.columns)].reset_index(drop=True), expected, check_dtype=False,
+            )
+            first_close = result["close"].shift(1)
+            same_code = result["ts_code"].eq(result["ts_code"].shift(1))
+            np.testing.assert_allclose(result["pre_close"][same_code], first_close[same_code])
+            self.assertTrue(result["pre_close"][~same_code].isna().all())
+
+    def test_completed_periods_are_reused(self):
+        first = self.resample("monthly")
+        # Feb-Jul for both codes: January starts before start_date, August is open.
+        self.assertEqual(self.cache.stats()["bars"], 12)
+
+        self.cache.hits = self.cache.misses = 0
+        second = self.resample("monthly")
+        self.assertEqual((self.cache.hits, self.cache.misses), (12, 4))
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_partially_covered_periods_are_not_cached(self):
+        self.resample("monthly", start_date="20260101", end_date="20260610",
+                      daily=self.daily[self.daily["trade_date"] <= "20260610"])
+        cached = self.cache.get("801080.SI", "monthly")
+        self.assertEqual(sorted(period_bounds(key, "monthly")[0] for key in cached),
+                         ["20260101", "20260201", "20260301", "20260401", "20260501"])
+
+        self.cache.clear()
+        self.resample("monthly", start_date="")
+        cached = self.cache.get("801080.SI", "monthly")
+        self.assertEqual(min(period_bounds(key, "monthly")[0] for key in cached), "20260201")
+
+    def test_truncated_response_does_not_cache_the_oldest_period(self):
+        # A newest-first response cut at the row cap lost January's first rows.
+        daily = self.daily[self.daily["trade_date"] >= "20260115"].copy()
+        daily.attrs["truncated"] = True
+        self.resample("monthly", start_date="20260101", daily=daily)
+        cached = self.cache.get("801080.SI", "monthly")
+        self.assertEqual(min(period_bounds(key, "monthly")[0] for key in cached), "20260201")
+
+        self.cache.clear()
+        with mock.patch("tools.stock.quote.quote_utils.ROW_LIMITS", {"index_daily": len(daily) // 2}):
+            pro = mock.Mock()
+            pro.index_daily.return_value = daily[daily["ts_code"] == "000300.SH"].reset_index(drop=True)
+            pro.index_daily.return_value.attrs.clear()
+            with mock.patch("utils.resample.period_bars", self.cache):
+                fetch_quote_data(
+                    pro, stock_api="index_daily", index_api="index_daily", period="quarterly",
+                    ts_code="000300.SH", start_date="20260101", end_date="20260818",
+                )
+        self.assertEqual([period_bounds(key, "quarterly")[0] for key in self.cache.get("000300.SH", "quarterly")],
+                         ["20260401"])
+        self.assertNotIn("truncated", pro.index_daily.return_value.attrs)
+
+
+class ResampledPeriodTests(unittest.TestCase):
+    def test_quarterly_bars_for_index_codes_only(self):
+        pro = mock.Mock()
+        daily = daily_bars(codes=("000300.SH",), start="20250102", end="20251231")
+        pro.index_daily.return_value = daily
+
+        df = fetch_quote_data(
+            pro, stock_api="index_daily", index_api="index_daily", period="quarterly",
+            ts_code="000300.SH,600519.SH", start_date="20250101", end_date="20251231",
+        )
+
+        self.assertEqual(df["trade_date"].tolist(), ["20250331", "20250630", "20250930", "20251231"])
+        self.assertAlmostEqual(df["vol"].sum(), daily["vol"].sum())
+        self.assertIn("600519.SH", df.attrs["failed_codes"])
+        pro.index_daily.assert_called_once_with(start_date="20250101", end_date="20251231", ts_code="000300.SH")
+
+
+if __name__ == "__main__":
+    unittest.main()
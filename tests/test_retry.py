@@ -0,0 +1,138 @@
+import unittest
+
+import pandas as pd
+
+from utils.cache import ResponseCache
+from utils.cross_section import CrossSectionStore
+from utils.fanout import fan_out
+from utils.logger import handle_exception
+from utils.metrics import metrics
+from utils.retry import RetryBudget, RetryPolicy, is_transient
+from utils.singleflight import SingleFlight
+from utils.upstream import UpstreamClient
+
+
+def policy(capacity: float = 10, delays=None) -> RetryPolicy:
+    """Policy that records its backoff ceilings instead of sleeping for them."""
+    budget = RetryBudget(capacity=capacity, refill=0, clock=lambda: 0.0)
+    ceilings = delays if delays is not None else []
+
+    def jitter(low, high):
+        ceilings.append(high)
+        return 0.0
+
+    return RetryPolicy(budget=budget, jitter=jitter)
+
+
+class Flaky:
+    """Raises the given errors in turn, then returns "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = {}
+
+    def daily(self, **params):
+        code = params["ts_code"]
+        self.calls[code] = self.calls.get(code, 0) + 1
+        if code == "FLAKY.SZ" and self.calls[code] == 1:
+            raise ConnectionError("connection reset by peer")
+        return pd.DataFrame({"ts_code": [code], "close": [1.0]})
+
+
+class RetryTests(unittest.TestCase):
+    def test_classification(self):
+        self.assertTrue(is_transient(ConnectionError("reset")))
+        self.assertTrue(is_transient(Exception("处理服务端响应失败")))
+        self.assertFalse(is_transient(TypeError("unsupported operand")))
+        self.assertFalse(is_transient(FileNotFoundError("bars.parquet")))
+        self.assertFalse(is_transient(Exception("抱歉，您没有访问该接口的权限")))
+
+    def test_backoff_grows_exponentially_up_to_attempts(self):
+        ceilings = []
+        func = Flaky(TimeoutError(), TimeoutError(), TimeoutError())
+
+        with self.assertRaises(TimeoutError):
+            policy(delays=ceilings).call("daily", func)
+
+        self.assertEqual(func.calls, 3)
+        self.assertEqual(ceilings, [0.5, 1.0])
+
+    def test_endpoint_rules(self):
+        ceilings = []
+        self.assertEqual(policy(delays=ceilings).call("news", Flaky(Exception("rate limit"))), "ok")
+        self.assertEqual(ceilings, [2.0])
+
+        minute_bars = Flaky(TimeoutError(), TimeoutError())
+        with self.assertRaises(TimeoutError):
+            policy().call("stk_mins", minute_bars)
+        self.assertEqual(minute_bars.calls, 2)
+
+    def test_programming_errors_are_not_retried(self):
+        func = Flaky(TypeError("bad argument"))
+        with self.assertRaises(TypeError):
+            policy().call("daily", func)
+        self.assertEqual(func.calls, 1)
+
+    def test_budget_limits_retries_across_calls(self):
+        retries = policy(capacity=1)
+
+        self.assertEqual(retries.call("daily", Flaky(TimeoutError())), "ok")
+        second = Flaky(TimeoutError())
+        with self.assertRaises(TimeoutError):
+            retries.call("daily", second)
+
+        self.assertEqual(second.calls, 1)
+        self.assertEqual((retries.stats()["retries"], retries.stats()["exhausted"]), (1, 1))
+
+    def test_budget_refills_over_time(self):
+        now = [0.0]
+        budget = RetryBudget(capacity=2, refill=0.5, clock=lambda: now[0])
+        self.assertTrue(budget.take())
+        self.assertTrue(budget.take())
+        self.assertFalse(budget.take())
+        now[0] = 2.0
+        self.assertTrue(budget.take())
+
+    def test_closed_policy_does_not_retry(self):
+        retries = policy()
+        retries.close()
+        func = Flaky(TimeoutError())
+        with self.assertRaises(TimeoutError):
+            retries.call("daily", func)
+        self.assertEqual(func.calls, 1)
+
+    def test_only_the_failing_sub_call_is_retried(self):
+        metrics.clear()
+        sdk = FakeClient()
+        pro = UpstreamClient(
+            sdk, "data", cache=ResponseCache(max_bytes=1 << 20), store=None,
+            flights=SingleFlight(), sections=CrossSectionStore(), retries=policy(),
+        )
+        runs = []
+
+        @handle_exception
+        def quotes(codes):
+            runs.append(codes)
+            fan_out(lambda code: pro.daily(ts_code=code), codes.split(","))
+            return "ok"
+
+        self.assertEqual(quotes("000001.SZ,FLAKY.SZ"), "ok")
+
+        self.assertEqual(runs, ["000001.SZ,FLAKY.SZ"])
+        self.assertEqual(sdk.calls, {"000001.SZ": 1, "FLAKY.SZ": 2})
+        self.assertEqual(metrics.retries["quotes"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from tools.stock.basic import stock_basic as stock_basic_module
+from utils import security_master as security_master_module
+from utils.formatting import _get_stock_name
+from utils.security_master import SecurityMaster
+
+STOCKS = pd.DataFrame(
+    [
+        {"ts_code": "000001.SZ", "name": "平安银行", "cnspell": "payh", "industry": "银行", "area": "深圳",
+         "market": "主板", "exchange": "SZSE", "list_status": "L", "is_hs": "S", "list_date": "19910403"},
+        {"ts_code": "600036.SH", "name": "招商银行", "cnspell": "zsyh", "industry": "银行", "area": "深圳",
+         "market": "主板", "exchange": "SSE", "list_status": "L", "is_hs": "H", "list_date": "20020409"},
+        {"ts_code": "000002.SZ", "name": "万科A", "cnspell": "wka", "industry": "全国地产", "area": "深圳",
+         "market": "主板", "exchange": "SZSE", "list_status": "L", "is_hs": "S", "list_date": "19910129"},
+        {"ts_code": "600001.SH", "name": "邯郸钢铁", "cnspell": "hdgt", "industry": "普钢", "area": "河北",
+         "market": "主板", "exchange": "SSE", "list_status": "D", "is_hs": "N", "list_date": "19980122"},
+    ]
+)
+
+
+def master_client():
+    pro = mock.Mock()
+
+    def stock_basic(list_status, **kwargs):
+        return STOCKS[STOCKS["list_status"] == list_status].reset_index(drop=True)
+
+    pro.stock_basic.side_effect = stock_basic
+    pro.index_basic.return_value = pd.DataFrame({"ts_code": ["000300.SH"], "name": ["沪深300"]})
+    pro.index_classify.return_value = pd.DataFrame({"index_code": ["801780.SI"], "industry_name": ["银行"], "level": ["L1"]})
+    pro.etf_basic.return_value = pd.DataFrame({"ts_code": ["510300.SH"], "csname": ["沪深300ETF"], "list_status": ["L"]})
+    pro.fund_basic.side_effect = lambda market, **kwargs: pd.DataFrame(
+        {"ts_code": ["110011.OF"], "name": ["易方达优质精选"], "status": ["L"]} if market == "O" else {}
+    )
+    return pro
+
+
+class SecurityMasterTests(unittest.TestCase):
+    def setUp(self):
+        self.pro = master_client()
+        self.master = SecurityMaster()
+        self.assertTrue(self.master.ensure_loaded(self.pro))
+
+    def test_lookups_cover_every_asset_type(self):
+        self.assertEqual(self.master.name_of("600036.SH"), "招商银行")
+        self.assertEqual(self.master.name_of("801780.SI"), "银行")
+        self.assertEqual(self.master.name_of("510300.SH"), "沪深300ETF")
+        self.assertEqual(self.master.name_of("110011.OF"), "易方达优质精选")
+        self.assertIsNone(self.master.name_of("999999.SZ"))
+        self.assertEqual(self.master.lookup("000300.SH")["asset_type"], "index")
+        self.assertEqual(self.master.codes_by_cnspell("PAYH"), ["000001.SZ"])
+        self.assertEqual(self.master.codes_by_name("万科A"), ["000002.SZ"])
+
+    def test_filtered_stock_listing(self):
+        banks = self.master.stocks(list_status="L", area="深圳", industry="银行")
+        self.assertEqual(banks["ts_code"].tolist(), ["000001.SZ", "600036.SH"])
+        self.assertEqual(self.master.stocks(ts_codes=["600001.SH", "000002.SZ"], list_status="L")["ts_code"].tolist(), ["000002.SZ"])
+        self.assertTrue(self.master.stocks(industry="银行", exchange="BSE").empty)
+
+    def test_failed_build_is_not_retried_immediately(self):
+        pro = mock.Mock()
+        pro.stock_basic.side_effect = ConnectionError("down")
+        master = SecurityMaster()
+
+        self.assertFalse(master.ensure_loaded(pro))
+        self.assertFalse(master.ensure_loaded(pro))
+        self.assertEqual(pro.stock_basic.call_count, 1)
+
+
+class SecurityMasterToolTests(unittest.TestCase):
+    def setUp(self):
+        self.pro = master_client()
+        self.master = SecurityMaster()
+        self.master.ensure_loaded(self.pro)
+        self.pro.reset_mock()
+        patcher = mock.patch.object(security_master_module, "security_master", self.master)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(stock_basic_module, "security_master", self.master)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stock_basic_filters_without_upstream_calls(self):
+        tools = {}
+
+        class ToolCapture:
+            def tool(self):
+                def register(function):
+                    tools[function.__name__] = function
+                    return function
+
+                return register
+
+        with mock.patch.object(stock_basic_module, "get_pro_client", return_value=self.pro):
+            stock_basic_module.register_stock_basic_tools(ToolCapture())
+            output = tools["stock_basic"](industry="银行", limit=1)
+            missing = tools["stock_basic"](area="北京")
+            no_industry = tools["stock_basic"](area="深圳", industry="普钢")
+            no_area = tools["stock_basic"](area="北京", industry="银行")
+            no_stock = tools["stock_basic"](name="不存在", area="深圳")
+
+        self.pro.stock_basic.assert_not_called()
+        self.assertIn("--- size: 1 ---", output)
+        self.assertIn("代码: 000001.SZ | 名称: 平安银行", output)
+        self.assertEqual(missing, "未找到地域为 '北京' 的股票")
+        self.assertEqual(no_industry, "未找到行业为 '普钢' 的股票")
+        self.assertEqual(no_area, "未找到地域为 '北京' 的股票")
+        self.assertEqual(no_stock, "未找到符合条件的股票基础信息")
+
+    def test_stock_name_helper_uses_master(self):
+        with mock.patch("utils.formatting.security_master", self.master):
+            self.assertEqual(_get_stock_name(self.pro, "000001.SZ"), "平安银行")
+        self.pro.stock_basic.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pandas as pd
+
+from utils.cache import ResponseCache
+from utils.singleflight import SingleFlight
+from utils.upstream import UpstreamClient
+
+WAITERS = 8
+
+
+def wait_for_waiters(group: SingleFlight, count: int):
+    deadline = time.monotonic() + 5
+    while group.collapsed < count and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+class SingleFlightTests(unittest.TestCase):
+    def test_concurrent_callers_share_one_execution(self):
+        group = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            release.wait(5)
+            return object()
+
+        with ThreadPoolExecutor(WAITERS) as pool:
+            futures = [pool.submit(group.do, "key", slow) for _ in range(WAITERS)]
+            wait_for_waiters(group, WAITERS - 1)
+            release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(group.stats(), {"executed": 1, "collapsed": WAITERS - 1, "in_flight": 0})
+
+    def test_error_reaches_every_waiter_and_is_not_remembered(self):
+        group = SingleFlight()
+        release = threading.Event()
+
+        def failing():
+            release.wait(5)
+            raise ConnectionError("upstream down")
+
+        with ThreadPoolExecutor(3) as pool:
+            futures = [pool.submit(group.do, "key", failing) for _ in range(3)]
+            wait_for_waiters(group, 2)
+            release.set()
+            for future in futures:
+                with self.assertRaises(ConnectionError):
+                    future.result()
+
+        self.assertEqual(group.do("key", lambda: "ok"), "ok")
+
+
+class UpstreamCoalescingTests(unittest.TestCase):
+    def test_identical_concurrent_calls_hit_upstream_once(self):
+        release = threading.Event()
+        sdk = mock.Mock()
+
+        def daily_basic(**kwargs):
+            release.wait(5)
+            return pd.DataFrame({"ts_code": ["000001.SZ"], "turnover_rate": [1.5]})
+
+        sdk.daily_basic.side_effect = daily_basic
+        group = SingleFlight()
+        pro = UpstreamClient(sdk, "data", cache=ResponseCache(max_bytes=0), store=None, flights=group)
+
+        with ThreadPoolExecutor(WAITERS) as pool:
+            futures = [pool.submit(pro.daily_basic, trade_date="20240614") for _ in range(WAITERS)]
+            wait_for_waiters(group, WAITERS - 1)
+            release.set()
+            frames = [future.result() for future in futures]
+
+        self.assertEqual(sdk.daily_basic.call_count, 1)
+        frames[0].loc[0, "turnover_rate"] = 0.0
+        self.assertEqual(frames[1].loc[0, "turnover_rate"], 1.5)
+
+    def test_late_follower_rechecks_the_cache_inside_the_flight(self):
+        sdk = mock.Mock()
+        sdk.daily_basic.return_value = pd.DataFrame({"ts_code": ["000001.SZ"], "turnover_rate": [1.5]})
+        cache = ResponseCache(max_bytes=1 << 20)
+        pro = UpstreamClient(sdk, "data", cache=cache, store=None, flights=SingleFlight())
+        pro.daily_basic(trade_date="20240614")
+
+        # The follower's lookup ran just before the leader stored its result.
+        real_get = cache.get
+        missed = []
+
+        def get(*args, **kwargs):
+            if not missed:
+                missed.append(True)
+                return None
+            return real_get(*args, **kwargs)
+
+        with mock.patch.object(cache, "get", side_effect=get):
+            frame = pro.daily_basic(trade_date="20240614")
+
+        self.assertEqual(frame["turnover_rate"].tolist(), [1.5])
+        self.assertEqual(sdk.daily_basic.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import base64
+import json
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import tools.stock.quote.stk_limit as stk_limit_module
+from utils.structured import structured_output, validate_output_format
+
+
+def bars() -> pd.DataFrame:
+    df = pd.DataFrame({
+        "ts_code": ["000001.SZ", "600000.SH"],
+        "trade_date": ["20260814", "20260814"],
+        "close": [12.345678901234, np.nan],
+        "vol": [1000, 2000],
+    })
+    df.attrs["adj"] = "qfq"
+    return df
+
+
+class StructuredOutputTests(unittest.TestCase):
+    def test_column_json_keeps_precision_and_nulls(self):
+        payload = json.loads(structured_output(bars(), "json"))
+
+        self.assertEqual(payload["rows"], 2)
+        self.assertEqual(payload["columns"], ["ts_code", "trade_date", "close", "vol"])
+        self.assertEqual(payload["data"]["close"], [12.345678901234, None])
+        self.assertEqual(payload["data"]["vol"], [1000, 2000])
+        self.assertEqual(payload["meta"], {"adj": "qfq"})
+
+    def test_column_json_maps_inf_to_null(self):
+        df = pd.DataFrame({"pe": [np.inf, -np.inf, 8.5], "note": ["a", float("inf"), None]})
+        payload = json.loads(structured_output(df, "json"))
+
+        self.assertEqual(payload["data"]["pe"], [None, None, 8.5])
+        self.assertEqual(payload["data"]["note"], ["a", None, None])
+
+    def test_column_json_maps_pd_na_to_null(self):
+        df = pd.DataFrame({
+            "vol": pd.array([1, pd.NA], dtype="Int64"),
+            "close": pd.array([pd.NA, 2.5], dtype="Float64"),
+            "name": ["平安银行", pd.NA],
+        })
+        payload = json.loads(structured_output(df, "json"))
+
+        self.assertEqual(payload["data"], {"vol": [1, None], "close": [None, 2.5], "name": ["平安银行", None]})
+
+    def test_column_json_keeps_list_cells_and_numpy_scalars(self):
+        df = pd.DataFrame({"tags": [["a", "b"], np.array([1, 2]), None],
+                           "mixed": pd.Series([np.int64(3), "x", np.float64(0.5)], dtype=object)})
+        payload = json.loads(structured_output(df, "json"))
+
+        self.assertEqual(payload["data"]["tags"], [["a", "b"], [1, 2], None])
+        self.assertEqual(payload["data"]["mixed"], [3, "x", 0.5])
+
+    def test_arrow_ipc_round_trips(self):
+        payload = json.loads(structured_output(bars(), "arrow"))
+        table = pa.ipc.open_stream(base64.b64decode(payload["data"])).read_all()
+
+        restored = table.to_pandas()
+        self.assertEqual(payload["rows"], 2)
+        self.assertEqual(restored["close"].iloc[0], 12.345678901234)
+        self.assertTrue(np.isnan(restored["close"].iloc[1]))
+        self.assertEqual(restored["ts_code"].tolist(), ["000001.SZ", "600000.SH"])
+
+    def test_auto_picks_arrow_for_large_frames(self):
+        with mock.patch("utils.structured.ARROW_MIN_ROWS", 2):
+            self.assertEqual(json.loads(structured_output(bars(), "auto"))["format"], "arrow")
+        with mock.patch("utils.structured.ARROW_MIN_ROWS", 3):
+            self.assertEqual(json.loads(structured_output(bars(), "auto"))["format"], "json")
+
+    def test_validation(self):
+        self.assertIsNone(validate_output_format("json"))
+        self.assertIsNone(validate_output_format(""))
+        self.assertIn("output_format", validate_output_format("csv"))
+
+    def test_tool_returns_every_row_in_json(self):
+        rows = pd.DataFrame({
+            "trade_date": "20260814",
+            "ts_code": [f"{index:06d}.SZ" for index in range(80)],
+            "up_limit": 11.0,
+        })
+        pro = mock.Mock()
+        pro.stk_limit.return_value = rows
+        container = {}
+
+        class ToolCapture:
+            def tool(self):
+                def register(function):
+                    container["stk_limit"] = function
+                    return function
+
+                return register
+
+        with mock.patch.object(stk_limit_module, "get_pro_client", return_value=pro):
+            stk_limit_module.register_stk_limit_tools(ToolCapture())
+            payload = json.loads(container["stk_limit"](trade_date="20260814", output_format="json"))
+            text = container["stk_limit"](trade_date="20260814")
+
+        self.assertEqual(len(payload["data"]["ts_code"]), 80)
+        self.assertTrue(text.startswith("--- 每日涨跌停价格 (Total: 80) ---"))
+
+
+if __name__ == "__main__":
+    unittest.main()
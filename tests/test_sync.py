@@ -0,0 +1,120 @@
+import os
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import pandas as pd
+
+from utils.cache import CST, ResponseCache
+from utils.cross_section import CrossSectionStore
+from utils.singleflight import SingleFlight
+from utils.sync import SYNC_DATASETS, FakeSyncClient, SyncDaemon, resolve_sync_categories
+from utils.trade_calendar import TradingCalendar
+from utils.upstream import UpstreamClient
+
+CODES = ["000001.SZ", "600000.SH", "600519.SH"]
+
+
+class Clock:
+    def __init__(self, moment):
+        self.moment = moment
+
+    def __call__(self):
+        return self.moment
+
+
+class SyncDaemonTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock(datetime(2026, 8, 14, 17, tzinfo=CST))
+        self.client = FakeSyncClient(CODES)
+        self.store = CrossSectionStore()
+        self.daemon = SyncDaemon(
+            lambda: self.client, ["stock"], store=self.store,
+            calendar=TradingCalendar(clock=self.clock), clock=self.clock,
+        )
+
+    def data_calls(self):
+        return [call for call in self.client.calls if call[0] in SYNC_DATASETS["stock"]]
+
+    def test_pass_pulls_every_dataset_once(self):
+        results = self.daemon.run_once()
+
+        self.assertEqual(results, {endpoint: len(CODES) for endpoint in SYNC_DATASETS["stock"]})
+        self.assertEqual(self.store.dates("daily"), ["20260814"])
+        self.assertEqual(self.data_calls()[0], ("daily", {"trade_date": "20260814"}, 5000, 0))
+
+        self.assertEqual(self.daemon.run_once(), {})
+        self.assertEqual(len(self.data_calls()), len(SYNC_DATASETS["stock"]))
+
+    def test_before_the_close_targets_the_previous_trading_day(self):
+        self.daemon.run_once()
+        self.clock.moment = datetime(2026, 8, 17, 10, tzinfo=CST)
+        self.assertEqual(self.daemon.target_date(), "20260814")
+
+    def test_unpublished_datasets_are_retried(self):
+        with mock.patch.object(FakeSyncClient, "moneyflow", create=True,
+                               side_effect=[pd.DataFrame(), pd.DataFrame({"ts_code": CODES})]):
+            self.assertEqual(self.daemon.run_once()["moneyflow"], 0)
+            self.assertEqual(self.daemon.run_once(), {"moneyflow": len(CODES)})
+
+    def test_truncated_section_is_neither_stored_nor_pulled_again(self):
+        with mock.patch("utils.sync.fetch_cross_section") as fetch:
+            frame = pd.DataFrame({"ts_code": CODES})
+            frame.attrs["truncated"] = True
+            fetch.return_value = frame
+            self.daemon.run_once()
+            self.assertFalse(self.store.has("daily", "20260814"))
+            calls = fetch.call_count
+            self.daemon.run_once()
+        self.assertEqual(fetch.call_count, calls)
+
+    def test_failed_dataset_does_not_stop_the_pass(self):
+        with mock.patch.object(FakeSyncClient, "top_list", create=True, side_effect=RuntimeError("boom")):
+            results = self.daemon.run_once()
+        self.assertIsInstance(results["top_list"], RuntimeError)
+        self.assertEqual(results["daily"], len(CODES))
+
+
+class SyncedCallTests(unittest.TestCase):
+    def setUp(self):
+        self.sections = CrossSectionStore()
+        self.sections.put("daily", "20260814", FakeSyncClient(CODES).daily(trade_date="20260814"))
+        self.sdk = mock.Mock()
+        self.client = UpstreamClient(
+            self.sdk, "data", cache=ResponseCache(max_bytes=0), store=None,
+            flights=SingleFlight(), sections=self.sections,
+        )
+
+    def test_per_code_call_for_synced_day_is_served_from_memory(self):
+        frame = self.client.daily(ts_code="600519.SH,000001.SZ", start_date="20260814", end_date="20260814")
+        self.assertEqual(frame["ts_code"].tolist(), ["000001.SZ", "600519.SH"])
+        frame = self.client.daily(trade_date="20260814", fields="ts_code,close")
+        self.assertEqual(list(frame.columns), ["ts_code", "close"])
+        self.sdk.daily.assert_not_called()
+
+    def test_other_calls_go_upstream(self):
+        self.sdk.daily.return_value = pd.DataFrame({"ts_code": ["000001.SZ"]})
+        self.client.daily(ts_code="000001.SZ", start_date="20260801", end_date="20260814")
+        self.client.daily(trade_date="20260814", fields="ts_code,pct_chg")
+        self.client.daily(trade_date="20260813")
+        self.assertEqual(self.sdk.daily.call_count, 3)
+
+
+class ResolveSyncCategoriesTests(unittest.TestCase):
+    @mock.patch.dict(os.environ, {"MINISHARE_MCP_SYNC": ""})
+    def test_defaults_follow_tool_categories(self):
+        self.assertEqual(resolve_sync_categories(None, ["fund"]), ["fund"])
+        self.assertEqual(resolve_sync_categories(None, ["stock", "corpus"]), ["stock", "finance"])
+        self.assertEqual(resolve_sync_categories(None, None), ["stock", "finance", "fund"])
+
+    @mock.patch.dict(os.environ, {"MINISHARE_MCP_SYNC": "fund"})
+    def test_explicit_values_win(self):
+        self.assertEqual(resolve_sync_categories(None, ["stock"]), ["fund"])
+        self.assertEqual(resolve_sync_categories(["stock,fund", "stock"], None), ["stock", "fund"])
+        self.assertEqual(resolve_sync_categories(["none"], None), [])
+        with self.assertRaises(ValueError):
+            resolve_sync_categories(["bonds"], None)
+
+
+if __name__ == "__main__":
+    unittest.main()
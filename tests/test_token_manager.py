@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from utils import token_manager
+
+
+class TokenManagerTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env_file = Path(self.tmp.name) / ".env"
+        patches = [
+            mock.patch.object(token_manager, "ENV_FILE", self.env_file),
+            mock.patch.object(token_manager, "_token_state", {"loaded": False, "mtime": None, "checked_at": 0.0}),
+            mock.patch.object(token_manager, "_TOKENS", {}),
+            mock.patch.object(token_manager, "_CLIENTS", {}),
+            mock.patch.dict(os.environ, {}, clear=False),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        for key in ("TINYSHARE_TOKEN", "MINISHARE_DATA_TOKEN", "MINISHARE_TOKEN", "MINISHARE_CORPUS_TOKEN"):
+            os.environ.pop(key, None)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_token_is_served_from_memory_until_file_changes(self):
+        self.env_file.write_text("MINISHARE_DATA_TOKEN=first\n")
+        self.assertEqual(token_manager.get_data_token(), "first")
+
+        with mock.patch.object(token_manager, "dotenv_values") as dotenv_values:
+            self.assertEqual(token_manager.get_data_token(), "first")
+            dotenv_values.assert_not_called()
+
+        self.env_file.write_text("MINISHARE_DATA_TOKEN=second\n")
+        os.utime(self.env_file, (0, 12345))
+        token_manager._token_state["checked_at"] = 0.0
+        self.assertEqual(token_manager.get_data_token(), "second")
+
+    def test_client_is_pooled_and_rebuilt_after_set_token(self):
+        self.env_file.write_text("MINISHARE_DATA_TOKEN=first\n")
+        with mock.patch.object(token_manager.ts, "pro_api", side_effect=lambda token: object()) as pro_api, \
+                mock.patch.object(token_manager.ts, "set_token"):
+            client = token_manager.get_pro_client()
+            self.assertIs(token_manager.get_pro_client(), client)
+            self.assertEqual(pro_api.call_count, 1)
+
+            token_manager.set_data_token("second")
+            self.assertEqual(token_manager.get_data_token(), "second")
+            self.assertIsNot(token_manager.get_pro_client(), client)
+            pro_api.assert_called_with("second")
+
+
+if __name__ == "__main__":
+    unittest.main()
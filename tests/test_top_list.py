@@ -4,9 +4,16 @@ from unittest import mock
 import pandas as pd
 
 from tools.stock.quote import top_list as top_list_module
+from tools.stock.quote import trade_date_utils
+from utils.trade_calendar import CALENDAR_START, TradingCalendar
 
 
 class TopListTests(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(trade_date_utils, "trading_calendar", TradingCalendar())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_end_date_maps_to_previous_trading_day(self):
         pro = mock.Mock()
         pro.trade_cal.return_value = pd.DataFrame(
@@ -30,7 +37,7 @@ class TopListTests(unittest.TestCase):
             output = container["top_list"](end_date="20260815")
 
         pro.trade_cal.assert_called_once_with(
-            start_date="20260726", end_date="20260815", is_open="1"
+            exchange="SSE", start_date=CALENDAR_START, end_date=mock.ANY, is_open="1", fields="cal_date"
         )
         pro.top_list.assert_called_once_with(trade_date="20260814")
         self.assertIn("日期:20260814", output)
@@ -57,9 +64,8 @@ class TopListTests(unittest.TestCase):
             container["top_list"](end_date="20260815")
 
         pro.index_daily.assert_called_once_with(
-            ts_code="000001.SH", start_date="20260726", end_date="20260815"
+            ts_code="000001.SH", start_date=mock.ANY, end_date=mock.ANY
         )
-        pro.trade_cal.assert_not_called()
         pro.top_list.assert_called_once_with(trade_date="20260814")
 
     def test_ts_code_also_receives_a_resolved_trade_date(self):
@@ -106,11 +112,32 @@ class TopListTests(unittest.TestCase):
             top_list_module.register_top_list_tools(ToolCapture())
             container["top_list"](start_date="20260815")
 
-        pro.trade_cal.assert_called_once_with(
-            start_date="20260815", end_date="20260904", is_open="1"
-        )
         pro.top_list.assert_called_once_with(trade_date="20260817")
 
+    def test_repeat_calls_resolve_without_upstream_calendar_requests(self):
+        pro = mock.Mock()
+        pro.trade_cal.return_value = pd.DataFrame({"cal_date": ["20260813", "20260814"]})
+        pro.index_daily.return_value = pd.DataFrame({"trade_date": ["20260814"]})
+        pro.top_list.return_value = pd.DataFrame([{"trade_date": "20260814", "ts_code": "000001.SZ"}])
+        container = {}
+
+        class ToolCapture:
+            def tool(self):
+                def register(function):
+                    container["top_list"] = function
+                    return function
+
+                return register
+
+        with mock.patch.object(top_list_module, "get_pro_client", return_value=pro):
+            top_list_module.register_top_list_tools(ToolCapture())
+            for _ in range(3):
+                container["top_list"](end_date="20260815")
+
+        self.assertEqual(pro.trade_cal.call_count, 1)
+        self.assertEqual(pro.index_daily.call_count, 1)
+        self.assertEqual(pro.top_list.call_count, 3)
+
 
 if __name__ == "__main__":
     unittest.main()
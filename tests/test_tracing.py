@@ -0,0 +1,96 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from utils.cache import ResponseCache
+from utils.cross_section import CrossSectionStore
+from utils.fanout import fan_out
+from utils.logger import handle_exception
+from utils.singleflight import SingleFlight
+from utils.tracing import Tracer
+from utils.upstream import UpstreamClient
+
+
+class FakeClient:
+    def daily(self, **params):
+        if params["ts_code"] == "BAD.SZ":
+            raise ValueError("unknown code")
+        return pd.DataFrame({"ts_code": [params["ts_code"]] * 2, "close": [1.0, 2.0]})
+
+
+def client() -> UpstreamClient:
+    return UpstreamClient(
+        FakeClient(), "data", cache=ResponseCache(max_bytes=1 << 20), store=None,
+        flights=SingleFlight(), sections=CrossSectionStore(),
+    )
+
+
+class TracingTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "traces.jsonl")
+
+    def traces(self):
+        with open(self.path, encoding="utf-8") as file:
+            return [json.loads(line) for line in file]
+
+    def test_tool_call_exports_span_tree(self):
+        tracer = Tracer(self.path)
+        pro = client()
+
+        @handle_exception
+        def quotes(ts_code):
+            fan_out(lambda code: pro.daily(ts_code=code), ts_code.split(","), label="quote_batch")
+            return "ok"
+
+        with mock.patch("utils.logger.tracer", tracer), mock.patch("utils.upstream.tracer", tracer), \
+                mock.patch("utils.fanout.tracer", tracer):
+            quotes(ts_code="000001.SZ,BAD.SZ")
+
+        (trace,) = self.traces()
+        spans = {span["id"]: span for span in trace["spans"]}
+        self.assertEqual(trace["tool"], "quotes")
+        self.assertEqual(spans[0]["attrs"], {"params": "{'ts_code': '000001.SZ,BAD.SZ'}"})
+        batches = [span for span in spans.values() if span["name"] == "quote_batch"]
+        self.assertEqual(len(batches), 2)
+        self.assertTrue(all(span["parent"] == 0 for span in batches))
+        calls = [span for span in spans.values() if span["name"] == "daily"]
+        self.assertEqual({spans[span["parent"]]["name"] for span in calls}, {"quote_batch"})
+        good = next(span for span in calls if "000001.SZ" in span["attrs"]["params"])
+        bad = next(span for span in calls if "BAD.SZ" in span["attrs"]["params"])
+        self.assertEqual((good["attrs"]["rows"], good["attrs"]["source"]), (2, "upstream"))
+        self.assertIn("unknown code", bad["error"])
+        self.assertIn("unknown code", spans[bad["parent"]]["error"])
+
+    def test_failed_tool_records_error(self):
+        tracer = Tracer(self.path)
+
+        @handle_exception
+        def broken():
+            raise KeyError("field")
+
+        with mock.patch("utils.logger.tracer", tracer), self.assertRaises(KeyError):
+            broken()
+
+        self.assertIn("KeyError", self.traces()[0]["error"])
+
+    def test_disabled_or_unsampled_calls_are_free(self):
+        disabled = Tracer("")
+        with disabled.trace("daily") as root:
+            with disabled.span("daily") as child:
+                self.assertIsNone(root)
+                self.assertIsNone(child)
+
+        unsampled = Tracer(self.path, sample_rate=0.5, sample=lambda: 0.9)
+        with unsampled.trace("daily") as root:
+            self.assertIsNone(root)
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pandas as pd
+
+from utils.cache import CST
+from utils.trade_calendar import PUBLISH_RECHECK, TradingCalendar, last_close
+
+OPEN_DAYS = ["20260810", "20260811", "20260812", "20260813", "20260814", "20260817", "20260818"]
+
+
+class Clock:
+    def __init__(self, moment):
+        self.moment = moment
+
+    def __call__(self):
+        return self.moment
+
+
+def calendar_client(index_days):
+    pro = mock.Mock()
+    pro.trade_cal.return_value = pd.DataFrame({"cal_date": OPEN_DAYS})
+    pro.index_daily.side_effect = lambda **params: pd.DataFrame(
+        {"trade_date": [day for day in index_days if params["start_date"] <= day <= params["end_date"]][::-1]}
+    )
+    return pro
+
+
+class TradingCalendarTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock(datetime(2026, 8, 14, 12, tzinfo=CST))
+        self.calendar = TradingCalendar(clock=self.clock)
+        self.index_days = ["20260812", "20260813"]
+        self.pro = calendar_client(self.index_days)
+        self.calendar.ensure_loaded(self.pro)
+
+    def test_navigation_queries(self):
+        calendar = self.calendar
+        self.assertTrue(calendar.is_open("20260814"))
+        self.assertFalse(calendar.is_open("20260815"))
+        self.assertEqual(calendar.previous("20260816"), "20260814")
+        self.assertEqual(calendar.previous("20260814", inclusive=False), "20260813")
+        self.assertEqual(calendar.next("20260815"), "20260817")
+        self.assertEqual(calendar.next("20260817", inclusive=False), "20260818")
+        self.assertEqual(calendar.shift("20260814", 1), "20260817")
+        self.assertEqual(calendar.shift("20260815", 1), "20260817")
+        self.assertEqual(calendar.shift("20260815", -2), "20260813")
+        self.assertEqual(calendar.shift("20260818", 5), "")
+        self.assertEqual(calendar.between("20260813", "20260817"), ["20260813", "20260814", "20260817"])
+
+    def test_latest_is_capped_by_published_index_data(self):
+        self.assertEqual(self.calendar.published_through, "20260813")
+        self.assertEqual(self.calendar.latest(), "20260813")
+        self.assertEqual(self.calendar.latest(before="20260812"), "20260812")
+        self.assertEqual(self.calendar.latest_completed(), "20260813")
+
+    def test_refreshes_incrementally_once_after_each_close(self):
+        self.calendar.ensure_loaded(self.pro)
+        self.assertEqual(self.pro.index_daily.call_count, 1)
+
+        self.index_days.append("20260814")
+        self.clock.moment = datetime(2026, 8, 14, 16, tzinfo=CST)
+        self.calendar.ensure_loaded(self.pro)
+        self.calendar.ensure_loaded(self.pro)
+
+        self.assertEqual(self.pro.trade_cal.call_count, 1)
+        self.assertEqual(self.pro.index_daily.call_count, 2)
+        self.assertEqual(self.pro.index_daily.call_args.kwargs["start_date"], "20260813")
+        self.assertEqual(self.calendar.latest(), "20260814")
+
+    def test_bar_published_late_after_the_close_is_picked_up(self):
+        self.clock.moment = datetime(2026, 8, 14, 16, tzinfo=CST)
+        self.calendar.ensure_loaded(self.pro)
+        self.calendar.ensure_loaded(self.pro)
+        self.assertEqual(self.pro.index_daily.call_count, 2)
+        self.assertEqual(self.calendar.latest(), "20260813")
+
+        self.index_days.append("20260814")
+        self.clock.moment += timedelta(seconds=PUBLISH_RECHECK)
+        self.calendar.ensure_loaded(self.pro)
+        self.assertEqual(self.calendar.latest(), "20260814")
+
+        self.clock.moment += timedelta(seconds=PUBLISH_RECHECK)
+        self.calendar.ensure_loaded(self.pro)
+        self.assertEqual(self.pro.index_daily.call_count, 3)
+
+    def test_holiday_close_does_not_wait_for_a_bar(self):
+        pro = calendar_client(["20260812", "20260813"])
+        pro.trade_cal.return_value = pd.DataFrame({"cal_date": [day for day in OPEN_DAYS if day != "20260814"]})
+        clock = Clock(datetime(2026, 8, 14, 16, tzinfo=CST))
+        calendar = TradingCalendar(clock=clock)
+        calendar.ensure_loaded(pro)
+        clock.moment += timedelta(seconds=PUBLISH_RECHECK)
+        calendar.ensure_loaded(pro)
+
+        self.assertEqual(pro.index_daily.call_count, 1)
+
+    def test_last_close_skips_weekends(self):
+        sunday = datetime(2026, 8, 16, 10, tzinfo=CST)
+        self.assertEqual(last_close(sunday), datetime(2026, 8, 14, 15, 30, tzinfo=CST))
+
+
+if __name__ == "__main__":
+    unittest.main()
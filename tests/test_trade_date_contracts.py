@@ -12,6 +12,8 @@ from tools.stock.quote import (
 )
 from tools.stock.quote import trade_date_utils
 from tools.stock.quote.trade_date_utils import resolve_trade_date
+from utils.cache import CST
+from utils.trade_calendar import TradingCalendar
 
 
 class ToolCapture:
@@ -33,6 +35,11 @@ def register(module, register_name):
 
 
 class TradeDateContractTests(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(trade_date_utils, "trading_calendar", TradingCalendar())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def fresh_calendar_client(self):
         pro = mock.Mock()
         pro.index_daily.return_value = pd.DataFrame({"trade_date": ["20260814"]})
@@ -41,21 +48,15 @@ class TradeDateContractTests(unittest.TestCase):
 
     def test_default_latest_uses_previous_completed_day(self):
         pro = mock.Mock()
-        pro.index_daily.side_effect = lambda **params: pd.DataFrame(
-            {"trade_date": [params["end_date"]]}
-        )
-
-        class FixedDateTime(datetime):
-            @classmethod
-            def now(cls, tz=None):
-                return cls(2026, 8, 17, 12)
+        # Monday noon: the calendar knows today is open, but its bar is not final.
+        pro.trade_cal.return_value = pd.DataFrame({"cal_date": ["20260813", "20260814", "20260817"]})
+        pro.index_daily.return_value = pd.DataFrame({"trade_date": ["20260817", "20260814", "20260813"]})
+        calendar = TradingCalendar(clock=lambda: datetime(2026, 8, 17, 12, tzinfo=CST))
 
-        with mock.patch.object(trade_date_utils, "datetime", FixedDateTime):
+        with mock.patch.object(trade_date_utils, "trading_calendar", calendar):
             result = resolve_trade_date(pro)
 
-        params = pro.index_daily.call_args.kwargs
-        self.assertEqual(params["end_date"], "20260816")
-        self.assertEqual(result, "20260816")
+        self.assertEqual(result, "20260814")
 
     def test_suspend_d_auto_prefers_fresh_index_data(self):
         pro = self.fresh_calendar_client()
@@ -69,7 +70,6 @@ class TradeDateContractTests(unittest.TestCase):
         pro.index_daily.assert_called_once_with(
             ts_code="000001.SH", start_date=mock.ANY, end_date=mock.ANY
         )
-        pro.trade_cal.assert_not_called()
         pro.suspend_d.assert_called_once_with(trade_date="20260814")
         self.assertIn("日期:20260814", output)
 
@@ -14,6 +14,8 @@ from .stock.basic.bak_basic import register_bak_basic_tools
 from .stock.quote.daily import register_daily_tools
 from .stock.quote.weekly import register_weekly_tools
 from .stock.quote.monthly import register_monthly_tools
+from .stock.quote.quarterly import register_quarterly_tools
+from .stock.quote.yearly import register_yearly_tools
 from .stock.quote.daily_basic import register_daily_basic_tools
 from .stock.quote.stk_limit import register_stk_limit_tools
 from .stock.quote.suspend_d import register_suspend_d_tools
@@ -27,9 +29,10 @@ from .stock.quote.top_list import register_top_list_tools
 from .stock.finance import register_finance_tools
 from .fund import register_fund_tools
 from .corpus import register_corpus_tools
+from .pagination import register_pagination_tools
 
 from typing import List, Optional
-from utils.logger import log_debug
+from utils.logger import log_debug, log_warning
 
 def register_stock_tools(mcp):
     """Register all stock-related tools."""
@@ -48,6 +51,8 @@ def register_stock_tools(mcp):
     register_daily_tools(mcp)
     register_weekly_tools(mcp)
     register_monthly_tools(mcp)
+    register_quarterly_tools(mcp)
+    register_yearly_tools(mcp)
     register_daily_basic_tools(mcp)
     register_stk_limit_tools(mcp)
     register_suspend_d_tools(mcp)
@@ -80,12 +85,15 @@ def register_all_tools(mcp, categories: Optional[List[str]] = None):
         log_debug("No tool categories specified, registering ALL tools.")
         for category, register_func in category_map.items():
             register_func(mcp)
-            log_debug(f"Registered tool category: {category}")
+            log_debug("Registered tool category: %s", category)
     else:
         # Register simplified list of requested categories
         for category in categories:
             if category in category_map:
                 category_map[category](mcp)
-                log_debug(f"Registered tool category: {category}")
+                log_debug("Registered tool category: %s", category)
             else:
-                log_debug(f"Warning: Unknown tool category '{category}' skipped.")
+                log_warning("Unknown tool category '%s' skipped.", category)
+
+    # Result cursors are shared by every category.
+    register_pagination_tools(mcp)
@@ -1,12 +1,14 @@
-import pandas as pd
-from utils.logger import log_debug, handle_exception
+from utils.logger import frame_summary, handle_exception, log_debug, log_sampled
 from utils.token_manager import get_corpus_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_anns_d_tools(mcp):
     @mcp.tool()
     @handle_exception
     def anns_d(ts_code: str = '', ann_date: str = '', start_date: str = '', end_date: str = '',
-               limit: int = 50) -> str:
+               limit: int = 50, output_format: str = 'text') -> str:
         """
         获取上市公司公告列表（含标题与详情链接）。数据自2023年起，实时更新。
 
@@ -19,8 +21,12 @@ def register_anns_d_tools(mcp):
             start_date: 开始日期 YYYYMMDD（可选）
             end_date: 结束日期 YYYYMMDD（可选）
             limit: 返回条数上限，默认50，最大2000
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool anns_d called: ts_code={ts_code}, ann_date={ann_date}")
+        log_debug("Tool anns_d called: ts_code=%s, ann_date=%s", ts_code, ann_date)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         if not any([ts_code, ann_date, start_date, end_date]):
             return "错误：至少提供一个筛选条件（ts_code/ann_date/start_date/end_date）"
 
@@ -30,23 +36,20 @@ def register_anns_d_tools(mcp):
         }.items() if v}
         pro = get_corpus_client()
         df = pro.anns_d(**params)
-        log_debug(f"anns_d API returned: type={type(df).__name__}, empty={getattr(df, 'empty', 'N/A')}, shape={getattr(df, 'shape', 'N/A')}, columns={list(getattr(df, 'columns', []))}")
+        log_sampled("anns_d.response", "anns_d API returned: %s", frame_summary(df))
         if df.empty:
             return "未找到符合条件的公告数据"
 
-        result = [f"--- 上市公司公告 (Total: {len(df)}) ---"]
-        display_cap = min(30, len(df))
-        for _, row in df.head(display_cap).iterrows():
-            parts = []
-            if pd.notna(row.get('ann_date')): parts.append(f"日期:{row['ann_date']}")
-            if pd.notna(row.get('ts_code')): parts.append(f"代码:{row['ts_code']}")
-            if pd.notna(row.get('name')): parts.append(f"名称:{row['name']}")
-            if pd.notna(row.get('title')): parts.append(f"标题:{row['title']}")
-            if pd.notna(row.get('url')): parts.append(f"链接:{row['url']}")
-            result.append(" | ".join(parts))
+        if is_structured(output_format):
+            return structured_output(df, output_format)
 
-        if len(df) > display_cap:
-            result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
-        output = "\n".join(result)
-        log_debug(f"anns_d RETURNING: len={len(output)}, content={output[:500]}")
-        return output
+        result = [f"--- 上市公司公告 (Total: {len(df)}) ---"]
+        columns = [
+            Col('ann_date', '日期'),
+            Col('ts_code', '代码'),
+            Col('name', '名称'),
+            Col('title', '标题'),
+            Col('url', '链接'),
+        ]
+        result.extend(paginate(df, lambda page: render_rows(page, columns, sep=":"), "上市公司公告", max_rows=30))
+        return "\n".join(result)
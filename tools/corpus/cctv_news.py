@@ -1,33 +1,41 @@
-import pandas as pd
-from utils.logger import log_debug, handle_exception
+from utils.logger import frame_summary, handle_exception, log_debug, log_sampled
 from utils.token_manager import get_corpus_client
+from utils.formatting import text_column
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_cctv_news_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def cctv_news(date: str, limit: int = 100) -> str:
+    def cctv_news(date: str, limit: int = 100, output_format: str = "text") -> str:
         """
         获取央视新闻联播文字稿数据。
 
         参数:
             date: 日期，格式 YYYYMMDD（必填），如 20260725
             limit: 单次返回条数上限，默认100
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool cctv_news called: date={date}")
+        log_debug("Tool cctv_news called: date=%s", date)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_corpus_client()
         df = pro.cctv_news(date=date, limit=limit)
-        df_type = type(df).__name__
-        df_empty = getattr(df, "empty", "N/A")
-        df_shape = getattr(df, "shape", "N/A")
-        df_cols = list(getattr(df, "columns", []))
-        log_debug(f"API returned: type={df_type}, empty={df_empty}, shape={df_shape}, columns={df_cols}")
+        log_sampled("cctv_news.response", "cctv_news API returned: %s", frame_summary(df))
         if df.empty:
             return "未找到该日期的央视新闻联播数据"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         result = [f"--- 央视新闻联播 {date} (Total: {len(df)}) ---"]
-        for _, row in df.head(50).iterrows():
-            d = row.get('date', '')
-            title = row.get('title', '')
-            content = str(row.get('content', ''))[:200]
-            result.append(f"[{d}] {title}\n  {content}")
+
+        def render(page):
+            d = text_column(page, 'date')
+            title = text_column(page, 'title')
+            content = text_column(page, 'content', width=200)
+            return ("[" + d + "] " + title + "\n  " + content).tolist()
+
+        result.extend(paginate(df, render, "央视新闻联播"))
         return "\n".join(result)
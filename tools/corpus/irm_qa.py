@@ -1,12 +1,17 @@
 import pandas as pd
-from utils.logger import log_debug, handle_exception
+
+from utils.logger import frame_summary, handle_exception, log_debug, log_sampled, log_warning
 from utils.token_manager import get_corpus_client
+from utils.formatting import Col, join_parts, render_column, text_column
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_irm_qa_tools(mcp):
     @mcp.tool()
     @handle_exception
     def irm_qa(ts_code: str = '', trade_date: str = '', start_date: str = '',
-               end_date: str = '', limit: int = 20, offset: int = 0) -> str:
+               end_date: str = '', limit: int = 20, offset: int = 0,
+               output_format: str = 'text') -> str:
         """
         获取上市公司董秘互动问答数据（上交所+深交所）。
 
@@ -17,8 +22,12 @@ def register_irm_qa_tools(mcp):
             end_date: 结束日期 YYYYMMDD（可选）
             limit: 返回条数上限，默认20
             offset: 分页位移量，默认0
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool irm_qa called: ts_code={ts_code}")
+        log_debug("Tool irm_qa called: ts_code=%s", ts_code)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_corpus_client()
         params = {key: value for key, value in {
             'ts_code': ts_code,
@@ -29,34 +38,38 @@ def register_irm_qa_tools(mcp):
             'offset': offset,
         }.items() if value}
 
+        columns = [
+            Col('ts_code', '代码'),
+            Col('name', '名称'),
+            Col('trade_date', '日期'),
+        ]
+
+        def render(page):
+            parts = [render_column(page, col, sep=":") for col in columns]
+            parts.append("问:" + text_column(page, 'q', width=100))
+            parts.append("答:" + text_column(page, 'a', width=200))
+            return join_parts(parts).tolist()
+
         results = []
+        frames = []
         for method_name in ['irm_qa_sh', 'irm_qa_sz']:
             try:
                 method = getattr(pro, method_name, None)
                 if method is None:
                     continue
                 df = method(**params)
-                df_type = type(df).__name__
-                df_empty = getattr(df, "empty", "N/A")
-                df_shape = getattr(df, "shape", "N/A")
-                df_cols = list(getattr(df, "columns", []))
-                log_debug(f"API returned: type={df_type}, empty={df_empty}, shape={df_shape}, columns={df_cols}")
+                log_sampled("irm_qa.response", "%s API returned: %s", method_name, frame_summary(df))
                 if not df.empty:
+                    frames.append(df)
                     results.append(f"--- {method_name} ({len(df)} 条) ---")
-                    for _, row in df.head(10).iterrows():
-                        parts = []
-                        if pd.notna(row.get('ts_code')): parts.append(f"代码:{row['ts_code']}")
-                        if pd.notna(row.get('name')): parts.append(f"名称:{row['name']}")
-                        if pd.notna(row.get('trade_date')): parts.append(f"日期:{row['trade_date']}")
-                        q = str(row.get('q', ''))[:100]
-                        a = str(row.get('a', ''))[:200]
-                        parts.append(f"问:{q}")
-                        parts.append(f"答:{a}")
-                        results.append(" | ".join(parts))
+                    # Each exchange gets its own cursor, ten answers per page
+                    results.extend(paginate(df, render, f"董秘问答 {method_name}", max_rows=10))
             except Exception as e:
-                log_debug(f"irm_qa {method_name} failed: {e}")
+                log_warning("irm_qa %s failed: %s", method_name, e)
                 continue
 
         if not results:
             return "未找到董秘问答数据"
+        if is_structured(output_format):
+            return structured_output(pd.concat(frames, ignore_index=True), output_format)
         return "\n".join(results)
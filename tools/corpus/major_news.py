@@ -1,11 +1,13 @@
-import pandas as pd
-from utils.logger import log_debug, handle_exception
+from utils.logger import frame_summary, handle_exception, log_debug, log_sampled
 from utils.token_manager import get_corpus_client
+from utils.formatting import text_column
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_major_news_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def major_news(start_date: str, end_date: str, limit: int = 500, offset: int = 0) -> str:
+    def major_news(start_date: str, end_date: str, limit: int = 500, offset: int = 0, output_format: str = 'text') -> str:
         """
         获取重大新闻数据（含标题、正文、来源、链接）。支持按时间范围筛选。
 
@@ -14,27 +16,29 @@ def register_major_news_tools(mcp):
             end_date: 结束时间，格式 YYYY-MM-DD HH:mm:ss（必填）
             limit: 单次返回条数上限，默认500
             offset: 跳过前 offset 条，用于分页
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool major_news called: start={start_date}, end={end_date}")
+        log_debug("Tool major_news called: start=%s, end=%s", start_date, end_date)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_corpus_client()
         df = pro.major_news(start_date=start_date, end_date=end_date, limit=limit, offset=offset)
-        df_type = type(df).__name__
-        df_empty = getattr(df, "empty", "N/A")
-        df_shape = getattr(df, "shape", "N/A")
-        df_cols = list(getattr(df, "columns", []))
-        log_debug(f"API returned: type={df_type}, empty={df_empty}, shape={df_shape}, columns={df_cols}")
+        log_sampled("major_news.response", "major_news API returned: %s", frame_summary(df))
         if df.empty:
             return "未找到符合条件的重大新闻数据"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         result = [f"--- 重大新闻 (Total: {len(df)}) ---"]
-        display_cap = min(30, len(df))
-        for _, row in df.head(display_cap).iterrows():
-            title = row.get('title', '')
-            pub_time = row.get('pub_time', '')
-            news_src = row.get('src', '')
-            content = str(row.get('content', ''))[:300]
-            result.append(f"[{pub_time}] {title} ({news_src})\n  {content}")
 
-        if len(df) > display_cap:
-            result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
+        def render(page):
+            title = text_column(page, 'title')
+            pub_time = text_column(page, 'pub_time')
+            news_src = text_column(page, 'src')
+            content = text_column(page, 'content', width=300)
+            return ("[" + pub_time + "] " + title + " (" + news_src + ")\n  " + content).tolist()
+
+        result.extend(paginate(df, render, "重大新闻", max_rows=30))
         return "\n".join(result)
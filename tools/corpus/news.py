@@ -1,11 +1,13 @@
-import pandas as pd
-from utils.logger import log_debug, handle_exception
+from utils.logger import frame_summary, handle_exception, log_debug, log_sampled
 from utils.token_manager import get_corpus_client
+from utils.formatting import text_column
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_news_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def news(start_date: str, end_date: str, src: str = '', limit: int = 500, offset: int = 0) -> str:
+    def news(start_date: str, end_date: str, src: str = '', limit: int = 500, offset: int = 0, output_format: str = 'text') -> str:
         """
         获取财经新闻快讯数据。支持按来源和时间范围筛选。
 
@@ -15,29 +17,31 @@ def register_news_tools(mcp):
             src: 新闻来源（可选）：sina-新浪, wallstreetcn-华尔街见闻, 10jqka-同花顺, cls-财联社, eastmoney-东方财富
             limit: 单次返回条数上限，默认500，最大1500
             offset: 跳过前 offset 条，用于分页
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool news called: start={start_date}, end={end_date}, src={src}")
+        log_debug("Tool news called: start=%s, end=%s, src=%s", start_date, end_date, src)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_corpus_client()
         params = {'start_date': start_date, 'end_date': end_date, 'limit': limit, 'offset': offset}
         if src:
             params['src'] = src
 
         df = pro.news(**params)
-        df_type = type(df).__name__
-        df_empty = getattr(df, "empty", "N/A")
-        df_shape = getattr(df, "shape", "N/A")
-        df_cols = list(getattr(df, "columns", []))
-        log_debug(f"API returned: type={df_type}, empty={df_empty}, shape={df_shape}, columns={df_cols}")
+        log_sampled("news.response", "news API returned: %s", frame_summary(df))
         if df.empty:
             return "未找到符合条件的新闻数据"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         result = [f"--- 新闻快讯 (Total: {len(df)}) ---"]
-        display_cap = min(50, len(df))
-        for _, row in df.head(display_cap).iterrows():
-            dt = row.get('datetime', '')
-            content = str(row.get('content', ''))[:200]
-            result.append(f"[{dt}] {content}")
 
-        if len(df) > display_cap:
-            result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
+        def render(page):
+            dt = text_column(page, 'datetime')
+            content = text_column(page, 'content', width=200)
+            return ("[" + dt + "] " + content).tolist()
+
+        result.extend(paginate(df, render, "新闻快讯"))
         return "\n".join(result)
@@ -1,12 +1,14 @@
-import pandas as pd
-from utils.logger import log_debug, handle_exception
+from utils.logger import frame_summary, handle_exception, log_debug, log_sampled
 from utils.token_manager import get_corpus_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_npr_tools(mcp):
     @mcp.tool()
     @handle_exception
     def npr(org: str = '', start_date: str = '', end_date: str = '',
-            ptype: str = '', limit: int = 30) -> str:
+            ptype: str = '', limit: int = 30, output_format: str = 'text') -> str:
         """
         获取政策法规数据（国家各部委发布的政策文件）。
 
@@ -16,8 +18,12 @@ def register_npr_tools(mcp):
             end_date: 结束日期（可选）
             ptype: 政策类型（可选）
             limit: 返回条数上限，默认30
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool npr called: limit={limit}")
+        log_debug("Tool npr called: limit=%s", limit)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_corpus_client()
         api_params = {key: value for key, value in {
             'org': org,
@@ -27,20 +33,19 @@ def register_npr_tools(mcp):
             'limit': limit,
         }.items() if value}
         df = pro.npr(**api_params)
-        df_type = type(df).__name__
-        df_empty = getattr(df, "empty", "N/A")
-        df_shape = getattr(df, "shape", "N/A")
-        df_cols = list(getattr(df, "columns", []))
-        log_debug(f"API returned: type={df_type}, empty={df_empty}, shape={df_shape}, columns={df_cols}")
+        log_sampled("npr.response", "npr API returned: %s", frame_summary(df))
         if df.empty:
             return "未找到政策法规数据"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         result = [f"--- 政策法规 (Total: {len(df)}) ---"]
-        for _, row in df.head(30).iterrows():
-            parts = []
-            if pd.notna(row.get('pubtime')): parts.append(f"时间:{row['pubtime']}")
-            if pd.notna(row.get('title')): parts.append(f"标题:{row['title']}")
-            if pd.notna(row.get('puborg')): parts.append(f"机构:{row['puborg']}")
-            if pd.notna(row.get('ptype')): parts.append(f"类型:{row['ptype']}")
-            result.append(" | ".join(parts))
+        columns = [
+            Col('pubtime', '时间'),
+            Col('title', '标题'),
+            Col('puborg', '机构'),
+            Col('ptype', '类型'),
+        ]
+        result.extend(paginate(df, lambda page: render_rows(page, columns, sep=":"), "政策法规"))
         return "\n".join(result)
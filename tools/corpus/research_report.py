@@ -1,13 +1,15 @@
-import pandas as pd
-from utils.logger import log_debug, handle_exception
+from utils.logger import frame_summary, handle_exception, log_debug, log_sampled
 from utils.token_manager import get_corpus_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_research_report_tools(mcp):
     @mcp.tool()
     @handle_exception
     def research_report(ts_code: str = '', trade_date: str = '', start_date: str = '', end_date: str = '',
                         report_type: str = '', inst_csname: str = '', ind_name: str = '',
-                        limit: int = 20, fields: str = '') -> str:
+                        limit: int = 20, fields: str = '', output_format: str = 'text') -> str:
         """
         获取券商研究报告（个股研报、行业研报、宏观研究等）。数据自2021年起覆盖，每日增量更新。
 
@@ -21,8 +23,12 @@ def register_research_report_tools(mcp):
             ind_name: 行业名称（可选）
             limit: 返回条数上限，默认20
             fields: 上游返回字段（可选）。默认不返回 abstr；需要摘要时指定 fields，例如 "trade_date,title,abstr"
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool research_report called: ts_code={ts_code}, trade_date={trade_date}")
+        log_debug("Tool research_report called: ts_code=%s, trade_date=%s", ts_code, trade_date)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         if not any([ts_code, trade_date, start_date, end_date, report_type, inst_csname, ind_name]):
             return "错误：至少提供一个筛选条件（ts_code/trade_date/start_date/end_date/report_type 等）"
 
@@ -35,27 +41,22 @@ def register_research_report_tools(mcp):
         }.items() if v}
         pro = get_corpus_client()
         df = pro.research_report(**params)
-        df_type = type(df).__name__
-        df_empty = getattr(df, "empty", "N/A")
-        df_shape = getattr(df, "shape", "N/A")
-        df_cols = list(getattr(df, "columns", []))
-        log_debug(f"API returned: type={df_type}, empty={df_empty}, shape={df_shape}, columns={df_cols}")
+        log_sampled("research_report.response", "research_report API returned: %s", frame_summary(df))
         if df.empty:
             return "未找到符合条件的研报数据"
 
-        result = [f"--- 券商研报 (Total: {len(df)}) ---"]
-        display_cap = min(20, len(df))
-        for _, row in df.head(display_cap).iterrows():
-            parts = []
-            if pd.notna(row.get('trade_date')): parts.append(f"日期:{row['trade_date']}")
-            if pd.notna(row.get('title')): parts.append(f"标题:{row['title']}")
-            if pd.notna(row.get('report_type')): parts.append(f"类型:{row['report_type']}")
-            if pd.notna(row.get('inst_csname')): parts.append(f"机构:{row['inst_csname']}")
-            if pd.notna(row.get('name')): parts.append(f"个股:{row['name']}")
-            if pd.notna(row.get('ind_name')): parts.append(f"行业:{row['ind_name']}")
-            if pd.notna(row.get('abstr')): parts.append(f"摘要:{row['abstr']}")
-            result.append(" | ".join(parts))
+        if is_structured(output_format):
+            return structured_output(df, output_format)
 
-        if len(df) > display_cap:
-            result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
+        result = [f"--- 券商研报 (Total: {len(df)}) ---"]
+        columns = [
+            Col('trade_date', '日期'),
+            Col('title', '标题'),
+            Col('report_type', '类型'),
+            Col('inst_csname', '机构'),
+            Col('name', '个股'),
+            Col('ind_name', '行业'),
+            Col('abstr', '摘要'),
+        ]
+        result.extend(paginate(df, lambda page: render_rows(page, columns, sep=":"), "券商研报", max_rows=20))
         return "\n".join(result)
@@ -1,11 +1,14 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
+from .fund_utils import failed_codes_note, fetch_multi_code
 
 def register_etf_basic_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def etf_basic(ts_code: str = "", index_code: str = "", list_date: str = "", list_status: str = "", exchange: str = "", mgr: str = "", limit: int = None, offset: int = None) -> str:
+    def etf_basic(ts_code: str = "", index_code: str = "", list_date: str = "", list_status: str = "", exchange: str = "", mgr: str = "", limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取国内ETF基础信息，包括了QDII。
         
@@ -18,8 +21,12 @@ def register_etf_basic_tools(mcp):
             mgr: 管理人（简称，e.g.华夏基金)
             limit: 单次返回数据长度
             offset: 请求数据的开始位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool etf_basic called with ts_code='{ts_code}', mgr='{mgr}'...")
+        log_debug("Tool etf_basic called with ts_code='%s', mgr='%s'...", ts_code, mgr)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         params = {
             'ts_code': ts_code,
@@ -35,41 +42,8 @@ def register_etf_basic_tools(mcp):
         
         fields = 'ts_code,csname,extname,cname,index_code,index_name,setup_date,list_date,list_status,exchange,mgr_name,custod_name,mgt_fee,etf_type'
         
-        if ts_code and ',' in ts_code:
-            code_list = [c.strip() for c in ts_code.split(',') if c.strip()]
-            df_list = []
-            for code in code_list:
-                params = {
-                    'ts_code': code,
-                    'index_code': index_code,
-                    'list_date': list_date,
-                    'list_status': list_status,
-                    'exchange': exchange,
-                    'mgr': mgr,
-                    'limit': limit,
-                    'offset': offset
-                }
-                api_params = {k: v for k, v in params.items() if v}
-                temp_df = pro.etf_basic(**api_params, fields=fields)
-                if not temp_df.empty:
-                    df_list.append(temp_df)
-            if df_list:
-                df = pd.concat(df_list, ignore_index=True)
-            else:
-                df = pd.DataFrame()
-        else:
-            params = {
-                'ts_code': ts_code,
-                'index_code': index_code,
-                'list_date': list_date,
-                'list_status': list_status,
-                'exchange': exchange,
-                'mgr': mgr,
-                'limit': limit,
-                'offset': offset
-            }
-            api_params = {k: v for k, v in params.items() if v}
-            df = pro.etf_basic(**api_params, fields=fields)
+        df = fetch_multi_code(pro.etf_basic, api_params, fields=fields)
+        failed_note = failed_codes_note(df)
             
         if df.empty:
             return "未找到符合条件的ETF基础信息"
@@ -82,22 +56,20 @@ def register_etf_basic_tools(mcp):
                 return f"未找到管理人包含 '{mgr}' 的ETF"
         # --------------------------------------------------
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         result = [f"--- size: {len(df)} ---"]
-        display_cap = 50
-        display_df = df.head(display_cap)
-        
-        for _, row in display_df.iterrows():
-            info_parts = []
-            if pd.notna(row.get('ts_code')): info_parts.append(f"代码: {row['ts_code']}")
-            if pd.notna(row.get('extname')): info_parts.append(f"简称: {row['extname']}")
-            if pd.notna(row.get('index_name')): info_parts.append(f"指数: {row['index_name']}")
-            if pd.notna(row.get('exchange')): info_parts.append(f"交易所: {row['exchange']}")
-            if pd.notna(row.get('mgr_name')): info_parts.append(f"管理人: {row['mgr_name']}")
-            if pd.notna(row.get('etf_type')): info_parts.append(f"类型: {row['etf_type']}")
-            
-            result.append(" | ".join(info_parts))
-            
-        if len(df) > display_cap:
-             result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
-             
+        columns = [
+            Col('ts_code', '代码'),
+            Col('extname', '简称'),
+            Col('index_name', '指数'),
+            Col('exchange', '交易所'),
+            Col('mgr_name', '管理人'),
+            Col('etf_type', '类型'),
+        ]
+        result.extend(paginate(df, lambda page: render_rows(page, columns), "ETF基础信息"))
+
+        if failed_note:
+            result.append(failed_note)
         return "\n".join(result)
@@ -1,11 +1,13 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_etf_index_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def etf_index(ts_code: str = "", name: str = "", pub_date: str = "", base_date: str = "", limit: int = None, offset: int = None) -> str:
+    def etf_index(ts_code: str = "", name: str = "", pub_date: str = "", base_date: str = "", limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取ETF基准指数列表信息。
         
@@ -16,8 +18,12 @@ def register_etf_index_tools(mcp):
             base_date: 指数基期（格式：YYYYMMDD）
             limit: 单次返回数据长度
             offset: 请求数据的开始位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool etf_index called with ts_code='{ts_code}', name='{name}'...")
+        log_debug("Tool etf_index called with ts_code='%s', name='%s'...", ts_code, name)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         params = {
             'ts_code': ts_code,
@@ -72,24 +78,22 @@ def register_etf_index_tools(mcp):
              df = df.sort_values(by='pub_date', ascending=False)
         # --------------------------------------------------------
 
+        # A user limit keeps only the most recent entries of the over-fetched list
+        if limit:
+            df = df.head(limit)
+
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         result = [f"--- size: {len(df)} ---"]
         
-        # Now apply the user's requested limit for *display*
-        actual_limit = limit if limit else 50
-        display_df = df.head(actual_limit)
-        
-        for _, row in display_df.iterrows():
-            info_parts = []
-            if pd.notna(row.get('ts_code')): info_parts.append(f"代码: {row['ts_code']}")
-            if pd.notna(row.get('indx_name')): info_parts.append(f"名称: {row['indx_name']}")
-            # if pd.notna(row.get('indx_csname')): info_parts.append(f"简称: {row['indx_csname']}")
-            if pd.notna(row.get('pub_date')): info_parts.append(f"发布日期: {row['pub_date']}")
-            if pd.notna(row.get('base_date')): info_parts.append(f"基期: {row['base_date']}")
-            if pd.notna(row.get('bp')): info_parts.append(f"基点: {row['bp']}")
-            
-            result.append(" | ".join(info_parts))
-            
-        if len(df) > actual_limit:
-             result.append(f"... (共 {len(df)} 条，仅显示前 {actual_limit} 条)")
-             
+        columns = [
+            Col('ts_code', '代码'),
+            Col('indx_name', '名称'),
+            Col('pub_date', '发布日期'),
+            Col('base_date', '基期'),
+            Col('bp', '基点'),
+        ]
+        result.extend(paginate(df, lambda page: render_rows(page, columns), "ETF基准指数"))
+
         return "\n".join(result)
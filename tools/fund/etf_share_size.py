@@ -1,11 +1,16 @@
 import pandas as pd
+from typing import List
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
+from .fund_utils import failed_codes_note, fetch_multi_code
 
 def register_etf_share_size_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def etf_share_size(ts_code: str = "", trade_date: str = "", start_date: str = "", end_date: str = "", exchange: str = "", limit: int = None, offset: int = None) -> str:
+    def etf_share_size(ts_code: str = "", trade_date: str = "", start_date: str = "", end_date: str = "", exchange: str = "", limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取ETF每日份额和规模数据。
         
@@ -17,8 +22,12 @@ def register_etf_share_size_tools(mcp):
             exchange: 交易所 (SSE上交所 SZSE深交所)
             limit: 单次返回数据长度（最大5000行）
             offset: 请求数据的开始位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool etf_share_size called with ts_code='{ts_code}', trade_date='{trade_date}'...")
+        log_debug("Tool etf_share_size called with ts_code='%s', trade_date='%s'...", ts_code, trade_date)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         params = {
             'ts_code': ts_code,
@@ -33,20 +42,8 @@ def register_etf_share_size_tools(mcp):
         
         fields = 'trade_date,ts_code,etf_name,total_share,total_size,nav,close,exchange'
         
-        if ts_code and ',' in ts_code:
-            code_list = [c.strip() for c in ts_code.split(',') if c.strip()]
-            df_list = []
-            for code in code_list:
-                api_params['ts_code'] = code
-                temp_df = pro.etf_share_size(**api_params, fields=fields)
-                if not temp_df.empty:
-                    df_list.append(temp_df)
-            if df_list:
-                df = pd.concat(df_list, ignore_index=True)
-            else:
-                df = pd.DataFrame()
-        else:
-            df = pro.etf_share_size(**api_params, fields=fields)
+        df = fetch_multi_code(pro.etf_share_size, api_params, fields=fields)
+        failed_note = failed_codes_note(df)
         if df.empty:
             return "未找到符合条件的ETF份额规模数据"
 
@@ -65,44 +62,26 @@ def register_etf_share_size_tools(mcp):
         elif 'trade_date' in df.columns:
             df = df.sort_values(by='trade_date', ascending=False)
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         result = [f"--- size: {len(df)} ---"]
-        # Truncation logic: Show Head + Tail if too long
-        display_cap = 50
-        if len(df) > display_cap:
-            # Show top 45 and bottom 5 to allow seeing the start/end of the period
-            head_df = df.head(45)
-            tail_df = df.tail(5)
-            
-            # Process Head
-            for _, row in head_df.iterrows():
-                result.append(format_row(row))
-            
-            result.append(f"... (中间省略 {len(df) - 50} 条) ...")
-            
-            # Process Tail
-            for _, row in tail_df.iterrows():
-                result.append(format_row(row))
-        else:
-            for _, row in df.iterrows():
-                result.append(format_row(row))
-             
+        result.extend(paginate(df, format_rows, "ETF份额规模"))
+
+        if failed_note:
+            result.append(failed_note)
         return "\n".join(result)
 
-def format_row(row) -> str:
-    info_parts = []
-    if pd.notna(row.get('ts_code')): info_parts.append(f"代码: {row['ts_code']}")
-    if pd.notna(row.get('trade_date')): info_parts.append(f"日期: {row['trade_date']}")
-    if pd.notna(row.get('etf_name')): info_parts.append(f"名称: {row['etf_name']}")
-    
+COLUMNS = [
+    Col('ts_code', '代码'),
+    Col('trade_date', '日期'),
+    Col('etf_name', '名称'),
     # Formatting numbers for readability
-    if pd.notna(row.get('total_share')): 
-        share = row['total_share']
-        info_parts.append(f"份额: {share:,.2f}万份")
-    if pd.notna(row.get('total_size')): 
-        size = row['total_size']
-        info_parts.append(f"规模: {size:,.2f}万元")
-    
-    if pd.notna(row.get('nav')): info_parts.append(f"净值: {row['nav']}")
-    if pd.notna(row.get('close')): info_parts.append(f"收盘: {row['close']}")
-    
-    return " | ".join(info_parts)
+    Col('total_share', '份额', '万份', fmt=',.2f'),
+    Col('total_size', '规模', '万元', fmt=',.2f'),
+    Col('nav', '净值'),
+    Col('close', '收盘'),
+]
+
+def format_rows(df: pd.DataFrame) -> List[str]:
+    return render_rows(df, COLUMNS)
@@ -1,11 +1,14 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
+from .fund_utils import failed_codes_note, fetch_multi_code
 
 def register_fund_adj_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def fund_adj(ts_code: str = "", trade_date: str = "", start_date: str = "", end_date: str = "", limit: int = None, offset: int = None) -> str:
+    def fund_adj(ts_code: str = "", trade_date: str = "", start_date: str = "", end_date: str = "", limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取基金复权因子，用于计算基金复权行情。
         
@@ -16,8 +19,12 @@ def register_fund_adj_tools(mcp):
             end_date: 结束日期 (YYYYMMDD)
             limit: 单次返回数据长度（最大2000行）
             offset: 请求数据的开始位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool fund_adj called with ts_code='{ts_code}', trade_date='{trade_date}'...")
+        log_debug("Tool fund_adj called with ts_code='%s', trade_date='%s'...", ts_code, trade_date)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         params = {
             'ts_code': ts_code,
@@ -31,20 +38,8 @@ def register_fund_adj_tools(mcp):
         
         fields = 'ts_code,trade_date,adj_factor'
         
-        if ts_code and ',' in ts_code:
-            code_list = [c.strip() for c in ts_code.split(',') if c.strip()]
-            df_list = []
-            for code in code_list:
-                api_params['ts_code'] = code
-                temp_df = pro.fund_adj(**api_params, fields=fields)
-                if not temp_df.empty:
-                    df_list.append(temp_df)
-            if df_list:
-                df = pd.concat(df_list, ignore_index=True)
-            else:
-                df = pd.DataFrame()
-        else:
-            df = pro.fund_adj(**api_params, fields=fields)
+        df = fetch_multi_code(pro.fund_adj, api_params, fields=fields)
+        failed_note = failed_codes_note(df)
         if df.empty:
             return "未找到符合条件的基金复权因子数据"
 
@@ -52,19 +47,17 @@ def register_fund_adj_tools(mcp):
         if 'trade_date' in df.columns:
             df = df.sort_values(by='trade_date', ascending=False)
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         result = [f"--- size: {len(df)} ---"]
-        display_cap = 50
-        display_df = df.head(display_cap)
-        
-        for _, row in display_df.iterrows():
-            info_parts = []
-            if pd.notna(row.get('ts_code')): info_parts.append(f"代码: {row['ts_code']}")
-            if pd.notna(row.get('trade_date')): info_parts.append(f"日期: {row['trade_date']}")
-            if pd.notna(row.get('adj_factor')): info_parts.append(f"复权因子: {row['adj_factor']}")
-            
-            result.append(" | ".join(info_parts))
-            
-        if len(df) > display_cap:
-             result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
-             
+        columns = [
+            Col('ts_code', '代码'),
+            Col('trade_date', '日期'),
+            Col('adj_factor', '复权因子'),
+        ]
+        result.extend(paginate(df, lambda page: render_rows(page, columns), "基金复权因子"))
+
+        if failed_note:
+            result.append(failed_note)
         return "\n".join(result)
@@ -1,11 +1,13 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_fund_company_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def fund_company(name: str = "", province: str = "", limit: int = None, offset: int = None) -> str:
+    def fund_company(name: str = "", province: str = "", limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取公募基金管理人（基金公司）列表。
         **默认按成立日期倒序排列（新成立的在前）。**
@@ -15,8 +17,12 @@ def register_fund_company_tools(mcp):
             province: 省份 (本地筛选，支持模糊匹配)
             limit: 单次返回数据长度
             offset: 请求数据的开始位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool fund_company called with name='{name}', province='{province}'...")
+        log_debug("Tool fund_company called with name='%s', province='%s'...", name, province)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         
         # API takes no parameters, returns all data
@@ -41,29 +47,17 @@ def register_fund_company_tools(mcp):
         if 'setup_date' in df.columns:
             df = df.sort_values(by='setup_date', ascending=False)
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         result = [f"--- size: {len(df)} ---"]
-        display_cap = 50
-        
-        # Apply strict limit if provided
-        if limit:
-            display_df = df.head(limit)
-        else:
-            display_df = df.head(display_cap)
-        
-        for _, row in display_df.iterrows():
-            info_parts = []
-            if pd.notna(row.get('name')): info_parts.append(f"公司: {row['name']}")
-            # if pd.notna(row.get('shortname')): info_parts.append(f"简称: {row['shortname']}")
-            if pd.notna(row.get('province')): info_parts.append(f"省份: {row['province']}")
-            if pd.notna(row.get('city')): info_parts.append(f"城市: {row['city']}")
-            if pd.notna(row.get('setup_date')): info_parts.append(f"成立: {row['setup_date']}")
-            if pd.notna(row.get('manager')): info_parts.append(f"总经理: {row['manager']}")
-            
-            result.append(" | ".join(info_parts))
-            
-        if limit and len(df) > limit:
-             result.append(f"... (共 {len(df)} 条，仅显示前 {limit} 条)")
-        elif not limit and len(df) > display_cap:
-             result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
-             
+        columns = [
+            Col('name', '公司'),
+            Col('province', '省份'),
+            Col('city', '城市'),
+            Col('setup_date', '成立'),
+            Col('manager', '总经理'),
+        ]
+        result.extend(paginate(df, lambda page: render_rows(page, columns), "公募基金管理人"))
+
         return "\n".join(result)
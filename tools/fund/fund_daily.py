@@ -1,11 +1,17 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.adjust import ADJ_MODES, adjustment_engine
+from utils.cross_section import fetch_codes_for_day
+from utils.structured import is_structured, structured_output, validate_output_format
+from tools.stock.quote.quote_utils import split_ts_codes, validate_adj
+from .fund_utils import failed_codes_note, fetch_multi_code
 
 def register_fund_daily_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def fund_daily(ts_code: str, trade_date: str = "", start_date: str = "", end_date: str = "", limit: int = None, offset: int = None) -> str:
+    def fund_daily(ts_code: str, trade_date: str = "", start_date: str = "", end_date: str = "", limit: int = None, offset: int = None, adj: str = "", output_format: str = "text") -> str:
         """
         获取ETF/基金日线行情收盘数据。
         
@@ -16,9 +22,18 @@ def register_fund_daily_tools(mcp):
             end_date: 结束日期 (YYYYMMDD)
             limit: 单次返回数据长度（最大2000行）
             offset: 请求数据的开始位移量
+            adj: 复权类型 (qfq 前复权 / hfq 后复权, 默认不复权; 基于 fund_adj 复权因子)
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool fund_daily called with ts_code='{ts_code}', trade_date='{trade_date}'...")
+        log_debug("Tool fund_daily called with ts_code='%s', trade_date='%s'...", ts_code, trade_date)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         
+        adj_error = validate_adj(adj)
+        if adj_error:
+            return adj_error
+
         # Clean inputs
         if ts_code:
             ts_code = ts_code.replace(" ", "")
@@ -36,20 +51,12 @@ def register_fund_daily_tools(mcp):
         
         fields = 'ts_code,trade_date,open,high,low,close,pre_close,change,pct_chg,vol,amount'
         
-        if ts_code and ',' in ts_code:
-            code_list = [c.strip() for c in ts_code.split(',') if c.strip()]
-            df_list = []
-            for code in code_list:
-                api_params['ts_code'] = code
-                temp_df = pro.fund_daily(**api_params, fields=fields)
-                if not temp_df.empty:
-                    df_list.append(temp_df)
-            if df_list:
-                df = pd.concat(df_list, ignore_index=True)
-            else:
-                df = pd.DataFrame()
-        else:
-            df = pro.fund_daily(**api_params, fields=fields)
+        df = fetch_codes_for_day(pro, "fund_daily", split_ts_codes(ts_code), api_params, fields=fields)
+        if df is None:
+            df = fetch_multi_code(pro.fund_daily, api_params, fields=fields)
+        if adj:
+            df = adjustment_engine.adjust(pro, df, adj, factor_api="fund_adj")
+        failed_note = failed_codes_note(df)
         if df.empty:
             return "未找到符合条件的ETF/基金日线行情数据"
 
@@ -58,26 +65,24 @@ def register_fund_daily_tools(mcp):
         if 'trade_date' in df.columns:
             df = df.sort_values(by='trade_date', ascending=False)
 
-        result = [f"--- size: {len(df)} ---"]
-        display_cap = 50
-        display_df = df.head(display_cap)
-        display_df = display_df.iloc[::-1].reset_index(drop=True)  # chronological for charts
-        
-        for _, row in display_df.iterrows():
-            info_parts = []
-            if pd.notna(row.get('ts_code')): info_parts.append(f"代码: {row['ts_code']}")
-            if pd.notna(row.get('trade_date')): info_parts.append(f"日期: {row['trade_date']}")
-            if pd.notna(row.get('close')): info_parts.append(f"收: {row['close']}")
-            if pd.notna(row.get('open')): info_parts.append(f"开: {row['open']}")
-            if pd.notna(row.get('high')): info_parts.append(f"高: {row['high']}")
-            if pd.notna(row.get('low')): info_parts.append(f"低: {row['low']}")
-            if pd.notna(row.get('pct_chg')): info_parts.append(f"涨跌幅: {row['pct_chg']}%")
-            if pd.notna(row.get('vol')): info_parts.append(f"量: {row['vol']}")
-            if pd.notna(row.get('amount')): info_parts.append(f"额: {row['amount']}")
-            
-            result.append(" | ".join(info_parts))
-            
-        if len(df) > display_cap:
-             result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
-             
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
+        result = [f"--- size: {len(df)} ({ADJ_MODES[adj]}) ---" if adj else f"--- size: {len(df)} ---"]
+        columns = [
+            Col('ts_code', '代码'),
+            Col('trade_date', '日期'),
+            Col('close', '收'),
+            Col('open', '开'),
+            Col('high', '高'),
+            Col('low', '低'),
+            Col('pct_chg', '涨跌幅', '%'),
+            Col('vol', '量'),
+            Col('amount', '额'),
+        ]
+        # Pages are newest first; rows within a page in chronological order for charts
+        result.extend(paginate(df, lambda page: render_rows(page.iloc[::-1], columns), "ETF/基金日线行情"))
+
+        if failed_note:
+            result.append(failed_note)
         return "\n".join(result)
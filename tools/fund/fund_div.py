@@ -1,11 +1,16 @@
 import pandas as pd
+from typing import List
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
+from .fund_utils import failed_codes_note, fetch_multi_code
 
 def register_fund_div_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def fund_div(ann_date: str = "", ex_date: str = "", pay_date: str = "", ts_code: str = "", limit: int = None, offset: int = None) -> str:
+    def fund_div(ann_date: str = "", ex_date: str = "", pay_date: str = "", ts_code: str = "", limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取公募基金分红数据。
         
@@ -16,8 +21,12 @@ def register_fund_div_tools(mcp):
             ts_code: 基金代码
             limit: 单次返回数据长度
             offset: 请求数据的开始位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool fund_div called with ts_code='{ts_code}', ann_date='{ann_date}'...")
+        log_debug("Tool fund_div called with ts_code='%s', ann_date='%s'...", ts_code, ann_date)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         
         # Construct API parameters
@@ -35,20 +44,8 @@ def register_fund_div_tools(mcp):
         
         fields = 'ts_code,ann_date,imp_anndate,base_date,div_proc,record_date,ex_date,pay_date,earpay_date,net_ex_date,div_cash,base_unit,ear_distr,ear_amount,account_date,base_year'
         
-        if ts_code and ',' in ts_code:
-            code_list = [c.strip() for c in ts_code.split(',') if c.strip()]
-            df_list = []
-            for code in code_list:
-                api_params['ts_code'] = code
-                temp_df = pro.fund_div(**api_params, fields=fields)
-                if not temp_df.empty:
-                    df_list.append(temp_df)
-            if df_list:
-                df = pd.concat(df_list, ignore_index=True)
-            else:
-                df = pd.DataFrame()
-        else:
-            df = pro.fund_div(**api_params, fields=fields)
+        df = fetch_multi_code(pro.fund_div, api_params, fields=fields)
+        failed_note = failed_codes_note(df)
         
         if df.empty:
             return "未找到符合条件的基金分红数据"
@@ -60,45 +57,24 @@ def register_fund_div_tools(mcp):
         if 'ann_date' in df.columns:
             df = df.sort_values(by='ann_date', ascending=False)
             
-        display_cap = 50
-        
-        # Smart Truncation Logic
-        if not limit and len(df) > display_cap:
-            head_df = df.head(45)
-            tail_df = df.tail(5)
-            
-            for _, row in head_df.iterrows():
-                result.append(format_row(row))
-            
-            result.append(f"... (中间省略 {len(df) - 50} 条数据) ...")
-            
-            for _, row in tail_df.iterrows():
-                result.append(format_row(row))
-        else:
-            if limit:
-                display_df = df.head(limit)
-            else:
-                display_df = df.head(display_cap)
-            
-            for _, row in display_df.iterrows():
-                result.append(format_row(row))
-                
-            if limit and len(df) > limit:
-                 result.append(f"... (共 {len(df)} 条，仅显示前 {limit} 条)")
-            elif not limit and len(df) > display_cap:
-                 result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
-             
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
+        result.extend(paginate(df, format_rows, "公募基金分红"))
+
+        if failed_note:
+            result.append(failed_note)
         return "\n".join(result)
 
-def format_row(row) -> str:
-    info_parts = []
-    if pd.notna(row.get('ts_code')): info_parts.append(f"代码: {row['ts_code']}")
-    if pd.notna(row.get('ann_date')): info_parts.append(f"公告: {row['ann_date']}")
-    if pd.notna(row.get('ex_date')): info_parts.append(f"除息: {row['ex_date']}")
-    if pd.notna(row.get('pay_date')): info_parts.append(f"派息: {row['pay_date']}")
-    
-    if pd.notna(row.get('div_cash')): info_parts.append(f"每股派息: {row['div_cash']}元")
-    if pd.notna(row.get('ear_distr')): info_parts.append(f"可分配: {row['ear_distr']}")
-    if pd.notna(row.get('div_proc')): info_parts.append(f"进度: {row['div_proc']}")
-    
-    return " | ".join(info_parts)
+COLUMNS = [
+    Col('ts_code', '代码'),
+    Col('ann_date', '公告'),
+    Col('ex_date', '除息'),
+    Col('pay_date', '派息'),
+    Col('div_cash', '每股派息', '元'),
+    Col('ear_distr', '可分配'),
+    Col('div_proc', '进度'),
+]
+
+def format_rows(df: pd.DataFrame) -> List[str]:
+    return render_rows(df, COLUMNS)
@@ -1,11 +1,14 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows, truncate
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
+from .fund_utils import failed_codes_note, fetch_multi_code
 
 def register_fund_manager_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def fund_manager(ts_code: str = "", ann_date: str = "", name: str = "", limit: int = None, offset: int = None) -> str:
+    def fund_manager(ts_code: str = "", ann_date: str = "", name: str = "", limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取公募基金经理数据，包括基金经理简历等数据。
         
@@ -15,8 +18,12 @@ def register_fund_manager_tools(mcp):
             name: 基金经理姓名
             limit: 单次返回数据长度
             offset: 请求数据的开始位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool fund_manager called with ts_code='{ts_code}', name='{name}'...")
+        log_debug("Tool fund_manager called with ts_code='%s', name='%s'...", ts_code, name)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         
         # Construct API parameters
@@ -33,60 +40,31 @@ def register_fund_manager_tools(mcp):
         
         fields = 'ts_code,ann_date,name,gender,birth_year,edu,nationality,begin_date,end_date,resume'
         
-        if ts_code and ',' in ts_code:
-            code_list = [c.strip() for c in ts_code.split(',') if c.strip()]
-            df_list = []
-            for code in code_list:
-                api_params['ts_code'] = code
-                temp_df = pro.fund_manager(**api_params, fields=fields)
-                if not temp_df.empty:
-                    df_list.append(temp_df)
-            if df_list:
-                df = pd.concat(df_list, ignore_index=True)
-            else:
-                df = pd.DataFrame()
-        else:
-            df = pro.fund_manager(**api_params, fields=fields)
+        df = fetch_multi_code(pro.fund_manager, api_params, fields=fields)
+        failed_note = failed_codes_note(df)
         
         if df.empty:
             return "未找到符合条件的基金经理信息"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         # Format output
         result = [f"--- size: {len(df)} ---"]
         
-        # Display logic: If limit is small, show all. If large, cap at 50 for display unless requested.
-        display_cap = 50
-        if limit:
-            display_df = df.head(limit)
-        else:
-            display_df = df.head(display_cap)
-            
-        for _, row in display_df.iterrows():
-            info_parts = []
-            if pd.notna(row.get('ts_code')): info_parts.append(f"基金代码: {row['ts_code']}")
-            if pd.notna(row.get('name')): info_parts.append(f"姓名: {row['name']}")
-            if pd.notna(row.get('gender')): info_parts.append(f"性别: {row['gender']}")
-            if pd.notna(row.get('edu')): info_parts.append(f"学历: {row['edu']}")
-            if pd.notna(row.get('nationality')): info_parts.append(f"国籍: {row['nationality']}")
-            if pd.notna(row.get('begin_date')): info_parts.append(f"任职: {row['begin_date']}")
-            if pd.notna(row.get('end_date')): info_parts.append(f"离任: {row['end_date']}")
-            
-            # Resume might be long, put it at the end or truncate if needed
-            # For now, just append it.
-            resume = row.get('resume')
-            if pd.notna(resume):
-                # Truncate resume if too long for a single line view
-                if len(resume) > 50:
-                    resume_short = resume[:50] + "..."
-                    info_parts.append(f"简历: {resume_short}")
-                else:
-                    info_parts.append(f"简历: {resume}")
+        columns = [
+            Col('ts_code', '基金代码'),
+            Col('name', '姓名'),
+            Col('gender', '性别'),
+            Col('edu', '学历'),
+            Col('nationality', '国籍'),
+            Col('begin_date', '任职'),
+            Col('end_date', '离任'),
+            # Resume might be long, truncate it for a single line view
+            Col('resume', '简历', convert=truncate(50)),
+        ]
+        result.extend(paginate(df, lambda page: render_rows(page, columns), "公募基金经理"))
 
-            result.append(" | ".join(info_parts))
-            
-        if limit and len(df) > limit:
-             result.append(f"... (共 {len(df)} 条，仅显示前 {limit} 条)")
-        elif not limit and len(df) > display_cap:
-             result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
-             
+        if failed_note:
+            result.append(failed_note)
         return "\n".join(result)
@@ -1,11 +1,16 @@
 import pandas as pd
+from typing import List
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
+from .fund_utils import failed_codes_note, fetch_multi_code
 
 def register_fund_nav_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def fund_nav(ts_code: str = "", nav_date: str = "", market: str = "", start_date: str = "", end_date: str = "", limit: int = None, offset: int = None) -> str:
+    def fund_nav(ts_code: str = "", nav_date: str = "", market: str = "", start_date: str = "", end_date: str = "", limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取公募基金净值数据。
         
@@ -17,8 +22,12 @@ def register_fund_nav_tools(mcp):
             end_date: 净值结束日期 (YYYYMMDD)
             limit: 单次返回数据长度
             offset: 请求数据的开始位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool fund_nav called with ts_code='{ts_code}', nav_date='{nav_date}'...")
+        log_debug("Tool fund_nav called with ts_code='%s', nav_date='%s'...", ts_code, nav_date)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         
         # Construct API parameters
@@ -37,20 +46,8 @@ def register_fund_nav_tools(mcp):
         
         fields = 'ts_code,ann_date,nav_date,unit_nav,accum_nav,accum_div,net_asset,total_netasset,adj_nav'
         
-        if ts_code and ',' in ts_code:
-            code_list = [c.strip() for c in ts_code.split(',') if c.strip()]
-            df_list = []
-            for code in code_list:
-                api_params['ts_code'] = code
-                temp_df = pro.fund_nav(**api_params, fields=fields)
-                if not temp_df.empty:
-                    df_list.append(temp_df)
-            if df_list:
-                df = pd.concat(df_list, ignore_index=True)
-            else:
-                df = pd.DataFrame()
-        else:
-            df = pro.fund_nav(**api_params, fields=fields)
+        df = fetch_multi_code(pro.fund_nav, api_params, fields=fields)
+        failed_note = failed_codes_note(df)
         
         if df.empty:
             return "未找到符合条件的基金净值数据"
@@ -71,43 +68,23 @@ def register_fund_nav_tools(mcp):
         elif 'nav_date' in df.columns:
             df = df.sort_values(by='nav_date', ascending=False)
 
-        display_cap = 50
-        
-        # Smart Truncation Logic for Time Series
-        if not limit and len(df) > display_cap and not is_cross_section:
-            head_df = df.head(45)
-            tail_df = df.tail(5)
-            
-            for _, row in head_df.iterrows():
-                result.append(format_row(row))
-            
-            result.append(f"... (中间省略 {len(df) - 50} 条数据) ...")
-            
-            for _, row in tail_df.iterrows():
-                result.append(format_row(row))
-        else:
-             if limit:
-                 display_df = df.head(limit)
-             else:
-                 display_df = df.head(display_cap)
-                 
-             for _, row in display_df.iterrows():
-                result.append(format_row(row))
-                
-             if limit and len(df) > limit:
-                 result.append(f"... (共 {len(df)} 条，仅显示前 {limit} 条)")
-             elif not limit and len(df) > display_cap:
-                 result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
-             
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
+        result.extend(paginate(df, format_rows, "公募基金净值"))
+
+        if failed_note:
+            result.append(failed_note)
         return "\n".join(result)
 
-def format_row(row) -> str:
-    info_parts = []
-    if pd.notna(row.get('ts_code')): info_parts.append(f"代码: {row['ts_code']}")
-    if pd.notna(row.get('nav_date')): info_parts.append(f"日期: {row['nav_date']}")
-    if pd.notna(row.get('unit_nav')): info_parts.append(f"单位: {row['unit_nav']}")
-    if pd.notna(row.get('accum_nav')): info_parts.append(f"累计: {row['accum_nav']}")
-    if pd.notna(row.get('adj_nav')): info_parts.append(f"复权: {row['adj_nav']}")
-    if pd.notna(row.get('net_asset')): info_parts.append(f"资产: {row['net_asset']}")
-    
-    return " | ".join(info_parts)
+COLUMNS = [
+    Col('ts_code', '代码'),
+    Col('nav_date', '日期'),
+    Col('unit_nav', '单位'),
+    Col('accum_nav', '累计'),
+    Col('adj_nav', '复权'),
+    Col('net_asset', '资产'),
+]
+
+def format_rows(df: pd.DataFrame) -> List[str]:
+    return render_rows(df, COLUMNS)
@@ -1,11 +1,16 @@
 import pandas as pd
+from typing import List
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
+from .fund_utils import failed_codes_note, fetch_multi_code
 
 def register_fund_portfolio_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def fund_portfolio(ts_code: str = "", symbol: str = "", ann_date: str = "", start_date: str = "", end_date: str = "", period: str = "", limit: int = None, offset: int = None) -> str:
+    def fund_portfolio(ts_code: str = "", symbol: str = "", ann_date: str = "", start_date: str = "", end_date: str = "", period: str = "", limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取公募基金持仓数据，季度更新。
         
@@ -18,8 +23,12 @@ def register_fund_portfolio_tools(mcp):
             period: 权益登记日(季度截止日, e.g. 20230630)
             limit: 单次返回数据长度
             offset: 请求数据的开始位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool fund_portfolio called with ts_code='{ts_code}', symbol='{symbol}', period='{period}'...")
+        log_debug("Tool fund_portfolio called with ts_code='%s', symbol='%s', period='%s'...", ts_code, symbol, period)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         
         # Construct API parameters
@@ -39,20 +48,8 @@ def register_fund_portfolio_tools(mcp):
         
         fields = 'ts_code,ann_date,end_date,symbol,mkv,amount,stk_mkv_ratio,stk_float_ratio'
         
-        if ts_code and ',' in ts_code:
-            code_list = [c.strip() for c in ts_code.split(',') if c.strip()]
-            df_list = []
-            for code in code_list:
-                api_params['ts_code'] = code
-                temp_df = pro.fund_portfolio(**api_params, fields=fields)
-                if not temp_df.empty:
-                    df_list.append(temp_df)
-            if df_list:
-                df = pd.concat(df_list, ignore_index=True)
-            else:
-                df = pd.DataFrame()
-        else:
-            df = pro.fund_portfolio(**api_params, fields=fields)
+        df = fetch_multi_code(pro.fund_portfolio, api_params, fields=fields)
+        failed_note = failed_codes_note(df)
         
         if df.empty:
             return "未找到符合条件的基金持仓数据"
@@ -74,44 +71,23 @@ def register_fund_portfolio_tools(mcp):
         elif 'ann_date' in df.columns:
             df = df.sort_values(by='ann_date', ascending=False)
             
-        display_cap = 50
-        
-        # Smart Truncation Logic
-        if not limit and len(df) > display_cap:
-            head_df = df.head(display_cap)
-            for _, row in head_df.iterrows():
-                result.append(format_row(row))
-            result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条，建议通过 limit 参数获取更多) ...")
-        else:
-            if limit:
-                display_df = df.head(limit)
-            else:
-                display_df = df.head(display_cap)
-            
-            for _, row in display_df.iterrows():
-                result.append(format_row(row))
-                
-            if limit and len(df) > limit:
-                 result.append(f"... (共 {len(df)} 条，仅显示前 {limit} 条)")
-            elif not limit and len(df) > display_cap:
-                 result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
-             
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
+        result.extend(paginate(df, format_rows, "公募基金持仓"))
+
+        if failed_note:
+            result.append(failed_note)
         return "\n".join(result)
 
-def format_row(row) -> str:
-    info_parts = []
-    if pd.notna(row.get('ts_code')): info_parts.append(f"基金: {row['ts_code']}")
-    if pd.notna(row.get('end_date')): info_parts.append(f"截止: {row['end_date']}")
-    if pd.notna(row.get('symbol')): info_parts.append(f"股票: {row['symbol']}")
-    
-    if pd.notna(row.get('mkv')): 
-        mkv = row['mkv']
-        info_parts.append(f"市值: {mkv:,.2f}元")
-        
-    if pd.notna(row.get('amount')): 
-        amt = row['amount']
-        info_parts.append(f"数量: {amt:,.0f}股")
-        
-    if pd.notna(row.get('stk_mkv_ratio')): info_parts.append(f"占比: {row['stk_mkv_ratio']}%")
-    
-    return " | ".join(info_parts)
+COLUMNS = [
+    Col('ts_code', '基金'),
+    Col('end_date', '截止'),
+    Col('symbol', '股票'),
+    Col('mkv', '市值', '元', fmt=',.2f'),
+    Col('amount', '数量', '股', fmt=',.0f'),
+    Col('stk_mkv_ratio', '占比', '%'),
+]
+
+def format_rows(df: pd.DataFrame) -> List[str]:
+    return render_rows(df, COLUMNS)
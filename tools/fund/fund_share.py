@@ -1,11 +1,16 @@
 import pandas as pd
+from typing import List
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
+from .fund_utils import failed_codes_note, fetch_multi_code
 
 def register_fund_share_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def fund_share(ts_code: str = "", trade_date: str = "", start_date: str = "", end_date: str = "", market: str = "", limit: int = None, offset: int = None) -> str:
+    def fund_share(ts_code: str = "", trade_date: str = "", start_date: str = "", end_date: str = "", market: str = "", limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取基金规模数据，包含上海和深圳ETF基金。
         支持时间序列数据的智能截断展示（显示头部和尾部数据）。
@@ -18,8 +23,12 @@ def register_fund_share_tools(mcp):
             market: 市场代码（SH上交所 ，SZ深交所）
             limit: 单次返回数据长度
             offset: 请求数据的开始位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool fund_share called with ts_code='{ts_code}', trade_date='{trade_date}', market='{market}'...")
+        log_debug("Tool fund_share called with ts_code='%s', trade_date='%s', market='%s'...", ts_code, trade_date, market)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         
         # Construct API parameters
@@ -38,20 +47,8 @@ def register_fund_share_tools(mcp):
         
         fields = 'ts_code,trade_date,fd_share'
         
-        if ts_code and ',' in ts_code:
-            code_list = [c.strip() for c in ts_code.split(',') if c.strip()]
-            df_list = []
-            for code in code_list:
-                api_params['ts_code'] = code
-                temp_df = pro.fund_share(**api_params, fields=fields)
-                if not temp_df.empty:
-                    df_list.append(temp_df)
-            if df_list:
-                df = pd.concat(df_list, ignore_index=True)
-            else:
-                df = pd.DataFrame()
-        else:
-            df = pro.fund_share(**api_params, fields=fields)
+        df = fetch_multi_code(pro.fund_share, api_params, fields=fields)
+        failed_note = failed_codes_note(df)
         
         if df.empty:
             return "未找到符合条件的基金规模数据"
@@ -72,47 +69,21 @@ def register_fund_share_tools(mcp):
         elif 'trade_date' in df.columns:
             df = df.sort_values(by='trade_date', ascending=False)
 
-        display_cap = 50
-        
-        # Smart Truncation Logic:
-        # If no strict limit is set, and data exceeds cap, show Head + Tail
-        if not limit and len(df) > display_cap:
-            head_df = df.head(45)
-            tail_df = df.tail(5)
-            
-            for _, row in head_df.iterrows():
-                result.append(format_row(row))
-            
-            result.append(f"... (中间省略 {len(df) - 50} 条数据) ...")
-            
-            for _, row in tail_df.iterrows():
-                result.append(format_row(row))
-        else:
-            # Standard logic: strictly follow limit or cap
-            if limit:
-                display_df = df.head(limit)
-            else:
-                display_df = df.head(display_cap)
-                
-            for _, row in display_df.iterrows():
-                result.append(format_row(row))
-                
-            if limit and len(df) > limit:
-                 result.append(f"... (共 {len(df)} 条，仅显示前 {limit} 条)")
-            elif not limit and len(df) > display_cap:
-                 result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
-             
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
+        result.extend(paginate(df, format_rows, "基金规模份额"))
+
+        if failed_note:
+            result.append(failed_note)
         return "\n".join(result)
 
-def format_row(row) -> str:
-    info_parts = []
-    if pd.notna(row.get('ts_code')): info_parts.append(f"代码: {row['ts_code']}")
-    if pd.notna(row.get('trade_date')): info_parts.append(f"日期: {row['trade_date']}")
-    
+COLUMNS = [
+    Col('ts_code', '代码'),
+    Col('trade_date', '日期'),
     # Format float with commas
-    share = row.get('fd_share')
-    if pd.notna(share):
-        share_str = f"{share:,.2f}"
-        info_parts.append(f"份额(万): {share_str}")
-        
-    return " | ".join(info_parts)
+    Col('fd_share', '份额(万)', fmt=',.2f'),
+]
+
+def format_rows(df: pd.DataFrame) -> List[str]:
+    return render_rows(df, COLUMNS)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from typing import Callable, Optional
+
+import pandas as pd
+
+from tools.stock.quote.quote_utils import split_ts_codes
+from utils.fanout import fan_out, raise_if_all_failed
+from utils.logger import log_warning
+
+
+def fetch_multi_code(
+    api_func: Callable[..., pd.DataFrame],
+    api_params: dict,
+    max_workers: Optional[int] = None,
+    **extra_params,
+) -> pd.DataFrame:
+    """Call a single-code fund endpoint for every code in api_params["ts_code"].
+
+    Codes are de-duplicated and fetched concurrently (capped by max_workers),
+    then concatenated once in request order. Per-code failures end up in
+    ``df.attrs["failed_codes"]``; if every code fails the first error is raised.
+    """
+    codes = split_ts_codes(api_params.get("ts_code") or "")
+    api_params = {k: v for k, v in api_params.items() if k != "ts_code"}
+    api_params.update(extra_params)
+    if len(codes) <= 1:
+        if codes:
+            api_params["ts_code"] = codes[0]
+        return api_func(**api_params)
+
+    results = fan_out(
+        lambda code: api_func(**api_params, ts_code=code), codes, max_workers=max_workers, label="fund_code",
+    )
+    raise_if_all_failed(results)
+
+    frames = []
+    failed_codes = {}
+    for result in results:
+        if result.error is not None:
+            log_warning("fetch_multi_code: %s failed: %s", result.item, result.error)
+            failed_codes[result.item] = str(result.error)
+        elif result.value is not None and not result.value.empty:
+            frames.append(result.value)
+
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if failed_codes:
+        df.attrs["failed_codes"] = failed_codes
+    return df
+
+
+def failed_codes_note(df: pd.DataFrame) -> Optional[str]:
+    """One-line summary of codes that failed in fetch_multi_code, if any."""
+    failed_codes = df.attrs.get("failed_codes")
+    if not failed_codes:
+        return None
+    return "查询失败代码: " + ",".join(f"{code}({str(error)[:80]})" for code, error in failed_codes.items())
@@ -1,12 +1,14 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_stk_mins_tools(mcp):
     @mcp.tool()
     @handle_exception
     def stk_mins(ts_code: str, freq: str = "5min", start_date: str = "",
-                 end_date: str = "", trade_time: str = "") -> str:
+                 end_date: str = "", trade_time: str = "", output_format: str = "text") -> str:
         """
         获取股票历史分钟数据，支持5min/15min/30min/60min行情。
         
@@ -16,8 +18,12 @@ def register_stk_mins_tools(mcp):
             start_date: 开始日期 格式：2025-06-01 09:00:00
             end_date: 结束时间 格式：2025-06-20 19:00:00
             trade_time: 单个交易日（YYYYMMDD）。传入时返回该日全量分钟数据
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool stk_mins called with ts_code='{ts_code}', freq='{freq}'...")
+        log_debug("Tool stk_mins called with ts_code='%s', freq='%s'...", ts_code, freq)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         allowed_freqs = {"5min", "15min", "30min", "60min"}
         if freq not in allowed_freqs:
             raise ValueError(
@@ -45,24 +51,20 @@ def register_stk_mins_tools(mcp):
         if 'trade_time' in df.columns:
             df = df.sort_values('trade_time', ascending=False)
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         result = [f"--- size: {len(df)} ---"]
-        display_cap = 50
-        display_df = df.head(display_cap)
-        
-        for _, row in display_df.iterrows():
-            info_parts = []
-            if pd.notna(row.get('ts_code')): info_parts.append(f"代码: {row['ts_code']}")
-            if pd.notna(row.get('trade_time')): info_parts.append(f"时间: {row['trade_time']}")
-            if pd.notna(row.get('close')): info_parts.append(f"收: {row['close']}")
-            if pd.notna(row.get('open')): info_parts.append(f"开: {row['open']}")
-            if pd.notna(row.get('high')): info_parts.append(f"高: {row['high']}")
-            if pd.notna(row.get('low')): info_parts.append(f"低: {row['low']}")
-            if pd.notna(row.get('vol')): info_parts.append(f"量: {row['vol']}")
-            if pd.notna(row.get('amount')): info_parts.append(f"额: {row['amount']}")
-            
-            result.append(" | ".join(info_parts))
-            
-        if len(df) > display_cap:
-             result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
-             
+        columns = [
+            Col('ts_code', '代码'),
+            Col('trade_time', '时间'),
+            Col('close', '收'),
+            Col('open', '开'),
+            Col('high', '高'),
+            Col('low', '低'),
+            Col('vol', '量'),
+            Col('amount', '额'),
+        ]
+        result.extend(paginate(df, lambda page: render_rows(page, columns), "分钟行情"))
+
         return "\n".join(result)
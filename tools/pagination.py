@@ -0,0 +1,17 @@
+from utils.logger import log_debug, handle_exception
+from utils.cursor import fetch_page as read_cursor_page
+
+
+def register_pagination_tools(mcp):
+    @mcp.tool()
+    @handle_exception
+    def fetch_page(cursor: str) -> str:
+        """
+        获取之前查询结果的下一页。结果较多的工具只返回第一页，并在末尾给出游标；
+        用该游标调用本工具即可继续翻页，无需重新查询上游数据。
+
+        参数:
+            cursor: 上一页末尾给出的游标 (e.g., 'a1b2c3d4e5f6@50')
+        """
+        log_debug("Tool fetch_page called with cursor='%s'", cursor)
+        return read_cursor_page(cursor)
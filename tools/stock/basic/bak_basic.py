@@ -1,19 +1,25 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_bak_basic_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def bak_basic(trade_date: str = '', ts_code: str = '') -> str:
+    def bak_basic(trade_date: str = '', ts_code: str = '', output_format: str = 'text') -> str:
         """
         获取备用基础列表数据 (bak_basic)。
         
         参数:
             trade_date: 交易日期 (YYYYMMDD, 可选)
             ts_code: 股票代码 (可选)
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool bak_basic called with trade_date='{trade_date}', ts_code='{ts_code}'...")
+        log_debug("Tool bak_basic called with trade_date='%s', ts_code='%s'...", trade_date, ts_code)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         params = {
             'trade_date': trade_date,
@@ -30,28 +36,25 @@ def register_bak_basic_tools(mcp):
         if df.empty:
             return "未找到备用基础列表数据"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         results = [f"--- 备用基础列表数据 (Total: {len(df)}) ---"]
         
-        # Limit display
-        df_limited = df.head(50) 
         
-        for _, row in df_limited.iterrows():
-             info = []
-             if pd.notna(row.get('trade_date')): info.append(f"日期:{row['trade_date']}")
-             if pd.notna(row.get('ts_code')): info.append(f"代码:{row['ts_code']}")
-             if pd.notna(row.get('name')): info.append(f"名称:{row['name']}")
-             if pd.notna(row.get('industry')): info.append(f"行业:{row['industry']}")
-             if pd.notna(row.get('area')): info.append(f"地域:{row['area']}")
-             if pd.notna(row.get('pe')): info.append(f"PE:{row['pe']}")
-             if pd.notna(row.get('float_share')): info.append(f"流通股:{row['float_share']}亿")
-             if pd.notna(row.get('total_share')): info.append(f"总股本:{row['total_share']}亿")
-             if pd.notna(row.get('total_assets')): info.append(f"总资产:{row['total_assets']}亿")
-             if pd.notna(row.get('eps')): info.append(f"EPS:{row['eps']}")
-             if pd.notna(row.get('pb')): info.append(f"PB:{row['pb']}")
-
-             results.append(" | ".join(info))
-            
-        if len(df) > 50:
-            results.append(f"... (共 {len(df)} 条，仅显示前 50 条)")
+        columns = [
+            Col('trade_date', '日期'),
+            Col('ts_code', '代码'),
+            Col('name', '名称'),
+            Col('industry', '行业'),
+            Col('area', '地域'),
+            Col('pe', 'PE'),
+            Col('float_share', '流通股', '亿'),
+            Col('total_share', '总股本', '亿'),
+            Col('total_assets', '总资产', '亿'),
+            Col('eps', 'EPS'),
+            Col('pb', 'PB'),
+        ]
+        results.extend(paginate(df, lambda page: render_rows(page, columns, sep=":"), "备用基础列表数据"))
             
         return "\n".join(results)
@@ -1,19 +1,25 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_bse_mapping_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def bse_mapping(o_code: str = '', n_code: str = '') -> str:
+    def bse_mapping(o_code: str = '', n_code: str = '', output_format: str = 'text') -> str:
         """
         获取北交所股票代码变更后新旧代码映射表数据 (bse_mapping)。
         
         参数:
             o_code: 旧代码 (可选)
             n_code: 新代码 (可选)
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool bse_mapping called with o_code='{o_code}', n_code='{n_code}'...")
+        log_debug("Tool bse_mapping called with o_code='%s', n_code='%s'...", o_code, n_code)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         params = {
             'o_code': o_code,
@@ -30,21 +36,18 @@ def register_bse_mapping_tools(mcp):
         if df.empty:
             return "未找到北交所新旧代码映射数据"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         results = [f"--- 北交所新旧代码映射数据 (Total: {len(df)}) ---"]
         
-        # Limit display if too large (although docs say max 300 total, 1000 per call, let's limit output to 50)
-        df_limited = df.head(50) 
         
-        for _, row in df_limited.iterrows():
-             info = []
-             if pd.notna(row.get('name')): info.append(f"名称:{row['name']}")
-             if pd.notna(row.get('o_code')): info.append(f"原代码:{row['o_code']}")
-             if pd.notna(row.get('n_code')): info.append(f"新代码:{row['n_code']}")
-             if pd.notna(row.get('list_date')): info.append(f"上市日期:{row['list_date']}")
-
-             results.append(" | ".join(info))
-            
-        if len(df) > 50:
-            results.append(f"... (共 {len(df)} 条，仅显示前 50 条)")
+        columns = [
+            Col('name', '名称'),
+            Col('o_code', '原代码'),
+            Col('n_code', '新代码'),
+            Col('list_date', '上市日期'),
+        ]
+        results.extend(paginate(df, lambda page: render_rows(page, columns, sep=":"), "北交所新旧代码映射数据"))
             
         return "\n".join(results)
@@ -1,11 +1,13 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_namechange_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def namechange(ts_code: str = '', start_date: str = '', end_date: str = '', limit: int = None, offset: int = None) -> str:
+    def namechange(ts_code: str = '', start_date: str = '', end_date: str = '', limit: int = None, offset: int = None, output_format: str = 'text') -> str:
         """
         获取上市公司历史名称变更记录 (namechange)。
         
@@ -15,8 +17,12 @@ def register_namechange_tools(mcp):
             end_date: 公告结束日期 (YYYYMMDD格式, 可选)
             limit: 单次返回数据长度 (可选)
             offset: 请求数据的开始位移量 (可选)
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool namechange called with ts_code='{ts_code}'...")
+        log_debug("Tool namechange called with ts_code='%s'...", ts_code)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         params = {
             'ts_code': ts_code,
@@ -39,24 +45,21 @@ def register_namechange_tools(mcp):
         # Remove duplicate records
         df = df.drop_duplicates()
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         results = [f"--- 历史名称变更记录 (Total: {len(df)}) ---"]
         
-        # Limit display if too large
-        df_limited = df.head(50)
         
         # ts_code, name, start_date, end_date, ann_date, change_reason
-        for _, row in df_limited.iterrows():
-             info = []
-             if pd.notna(row.get('ts_code')): info.append(f"代码:{row['ts_code']}")
-             if pd.notna(row.get('name')): info.append(f"名称:{row['name']}")
-             if pd.notna(row.get('start_date')): info.append(f"开始日期:{row['start_date']}")
-             if pd.notna(row.get('end_date')): info.append(f"结束日期:{row['end_date']}")
-             if pd.notna(row.get('ann_date')): info.append(f"公告日期:{row['ann_date']}")
-             if pd.notna(row.get('change_reason')): info.append(f"原因:{row['change_reason']}")
-             
-             results.append(" | ".join(info))
-            
-        if len(df) > 50:
-            results.append(f"... (共 {len(df)} 条，仅显示前 50 条)")
+        columns = [
+            Col('ts_code', '代码'),
+            Col('name', '名称'),
+            Col('start_date', '开始日期'),
+            Col('end_date', '结束日期'),
+            Col('ann_date', '公告日期'),
+            Col('change_reason', '原因'),
+        ]
+        results.extend(paginate(df, lambda page: render_rows(page, columns, sep=":"), "历史名称变更记录"))
             
         return "\n".join(results)
@@ -1,19 +1,25 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_new_share_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def new_share(start_date: str = '', end_date: str = '') -> str:
+    def new_share(start_date: str = '', end_date: str = '', output_format: str = 'text') -> str:
         """
         获取新股上市列表数据 (new_share)。
         
         参数:
             start_date: 上网发行开始日期 (YYYYMMDD, 可选)
             end_date: 上网发行结束日期 (YYYYMMDD, 可选)
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool new_share called with start_date='{start_date}', end_date='{end_date}'...")
+        log_debug("Tool new_share called with start_date='%s', end_date='%s'...", start_date, end_date)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         params = {
             'start_date': start_date,
@@ -30,26 +36,23 @@ def register_new_share_tools(mcp):
         if df.empty:
             return "未找到新股上市列表数据"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         results = [f"--- 新股上市列表数据 (Total: {len(df)}) ---"]
         
-        # Limit display
-        df_limited = df.head(50) 
         
-        for _, row in df_limited.iterrows():
-             info = []
-             if pd.notna(row.get('ts_code')): info.append(f"代码:{row['ts_code']}")
-             if pd.notna(row.get('name')): info.append(f"名称:{row['name']}")
-             if pd.notna(row.get('ipo_date')): info.append(f"上网发行:{row['ipo_date']}")
-             if pd.notna(row.get('issue_date')): info.append(f"上市日期:{row['issue_date']}")
-             if pd.notna(row.get('price')): info.append(f"发行价:{row['price']}")
-             if pd.notna(row.get('pe')): info.append(f"市盈率:{row['pe']}")
-             if pd.notna(row.get('limit_amount')): info.append(f"申购上限:{row['limit_amount']}万股")
-             if pd.notna(row.get('funds')): info.append(f"募资:{row['funds']}亿元")
-             if pd.notna(row.get('ballot')): info.append(f"中签率:{row['ballot']}%")
-
-             results.append(" | ".join(info))
-            
-        if len(df) > 50:
-            results.append(f"... (共 {len(df)} 条，仅显示前 50 条)")
+        columns = [
+            Col('ts_code', '代码'),
+            Col('name', '名称'),
+            Col('ipo_date', '上网发行'),
+            Col('issue_date', '上市日期'),
+            Col('price', '发行价'),
+            Col('pe', '市盈率'),
+            Col('limit_amount', '申购上限', '万股'),
+            Col('funds', '募资', '亿元'),
+            Col('ballot', '中签率', '%'),
+        ]
+        results.extend(paginate(df, lambda page: render_rows(page, columns, sep=":"), "新股上市列表数据"))
             
         return "\n".join(results)
@@ -1,11 +1,13 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_st_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def st(ts_code: str = '', pub_date: str = '', imp_date: str = '', limit: int = None, offset: int = None) -> str:
+    def st(ts_code: str = '', pub_date: str = '', imp_date: str = '', limit: int = None, offset: int = None, output_format: str = 'text') -> str:
         """
         获取ST风险警示板股票列表。
         
@@ -15,8 +17,12 @@ def register_st_tools(mcp):
             imp_date: 实施日期 (YYYYMMDD格式, 可选)
             limit: 单次返回数据长度 (可选)
             offset: 请求数据的开始位移量 (可选)
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool st called with ts_code='{ts_code}', pub_date='{pub_date}', imp_date='{imp_date}'...")
+        log_debug("Tool st called with ts_code='%s', pub_date='%s', imp_date='%s'...", ts_code, pub_date, imp_date)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         params = {
             'ts_code': ts_code,
@@ -36,25 +42,21 @@ def register_st_tools(mcp):
         if df.empty:
             return "未找到ST风险警示板股票数据"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         results = [f"--- ST风险警示板股票列表 (Total: {len(df)}) ---"]
         
-        # Limit display if too large
-        df_limited = df.head(50)
         
         # ts_code, name, pub_date, imp_date, st_tpye, st_reason, st_explain
-        for _, row in df_limited.iterrows():
-             info = []
-             if pd.notna(row.get('ts_code')): info.append(f"代码:{row['ts_code']}")
-             if pd.notna(row.get('name')): info.append(f"名称:{row['name']}")
-             if pd.notna(row.get('pub_date')): info.append(f"发布日期:{row['pub_date']}")
-             if pd.notna(row.get('imp_date')): info.append(f"实施日期:{row['imp_date']}")
-             if pd.notna(row.get('st_tpye')): info.append(f"类型:{row['st_tpye']}")
-             if pd.notna(row.get('st_reason')): info.append(f"原因:{row['st_reason']}")
-             # st_explain might be long, maybe truncate? keeping it for now.
-             
-             results.append(" | ".join(info))
-            
-        if len(df) > 50:
-            results.append(f"... (共 {len(df)} 条，仅显示前 50 条)")
+        columns = [
+            Col('ts_code', '代码'),
+            Col('name', '名称'),
+            Col('pub_date', '发布日期'),
+            Col('imp_date', '实施日期'),
+            Col('st_tpye', '类型'),
+            Col('st_reason', '原因'),
+        ]
+        results.extend(paginate(df, lambda page: render_rows(page, columns, sep=":"), "ST风险警示板股票列表"))
             
         return "\n".join(results)
@@ -1,11 +1,13 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows, truncate
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_stk_managers_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def stk_managers(ts_code: str = '', ann_date: str = '', start_date: str = '', end_date: str = '', limit: int = None, offset: int = None) -> str:
+    def stk_managers(ts_code: str = '', ann_date: str = '', start_date: str = '', end_date: str = '', limit: int = None, offset: int = None, output_format: str = 'text') -> str:
         """
         获取上市公司管理层信息 (stk_managers)。
         
@@ -16,8 +18,12 @@ def register_stk_managers_tools(mcp):
             end_date: 公告结束日期 (可选)
             limit: 单次返回数据长度 (可选)
             offset: 请求数据的开始位移量 (可选)
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool stk_managers called with ts_code='{ts_code}'...")
+        log_debug("Tool stk_managers called with ts_code='%s'...", ts_code)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         params = {
             'ts_code': ts_code,
@@ -41,34 +47,27 @@ def register_stk_managers_tools(mcp):
         # Remove duplicate records
         df = df.drop_duplicates()
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         results = [f"--- 上市公司管理层信息 (Total: {len(df)}) ---"]
         
-        # Limit display if too large
-        df_limited = df.head(20) # Managers list can be long, 20 seem reasonable
         
-        for _, row in df_limited.iterrows():
-             info = []
-             if pd.notna(row.get('ts_code')): info.append(f"代码:{row['ts_code']}")
-             if pd.notna(row.get('ann_date')): info.append(f"公告:{row['ann_date']}")
-             if pd.notna(row.get('name')): info.append(f"姓名:{row['name']}")
-             if pd.notna(row.get('gender')): info.append(f"性别:{row['gender']}")
-             if pd.notna(row.get('lev')): info.append(f"岗位类别:{row['lev']}")
-             if pd.notna(row.get('title')): info.append(f"职务:{row['title']}")
-             if pd.notna(row.get('edu')): info.append(f"学历:{row['edu']}")
-             if pd.notna(row.get('national')): info.append(f"国籍:{row['national']}")
-             if pd.notna(row.get('birthday')): info.append(f"出生:{row['birthday']}")
-             if pd.notna(row.get('begin_date')): info.append(f"上任:{row['begin_date']}")
-             if pd.notna(row.get('end_date')): info.append(f"离任:{row['end_date']}")
-             
-             # Resume is usually long text
-             if pd.notna(row.get('resume')):
-                 bg = str(row['resume'])
-                 if len(bg) > 50: bg = bg[:50] + "..."
-                 info.append(f"简历:{bg}")
-
-             results.append(" | ".join(info))
-            
-        if len(df) > 20:
-            results.append(f"... (共 {len(df)} 条，仅显示前 20 条)")
+        columns = [
+            Col('ts_code', '代码'),
+            Col('ann_date', '公告'),
+            Col('name', '姓名'),
+            Col('gender', '性别'),
+            Col('lev', '岗位类别'),
+            Col('title', '职务'),
+            Col('edu', '学历'),
+            Col('national', '国籍'),
+            Col('birthday', '出生'),
+            Col('begin_date', '上任'),
+            Col('end_date', '离任'),
+            # Resume is usually long text
+            Col('resume', '简历', convert=truncate(50)),
+        ]
+        results.extend(paginate(df, lambda page: render_rows(page, columns, sep=":"), "上市公司管理层信息", max_rows=20))
             
         return "\n".join(results)
@@ -1,19 +1,25 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_stk_rewards_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def stk_rewards(ts_code: str, end_date: str = '') -> str:
+    def stk_rewards(ts_code: str, end_date: str = '', output_format: str = 'text') -> str:
         """
         获取上市公司管理层薪酬和持股信息 (stk_rewards)。
         
         参数:
             ts_code: 股票代码 (必选, 支持单个或多个)
             end_date: 报告期 (可选)
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool stk_rewards called with ts_code='{ts_code}'...")
+        log_debug("Tool stk_rewards called with ts_code='%s'...", ts_code)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         params = {
             'ts_code': ts_code,
@@ -30,26 +36,21 @@ def register_stk_rewards_tools(mcp):
         if df.empty:
             return "未找到上市公司管理层薪酬和持股信息"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         results = [f"--- 上市公司管理层薪酬和持股信息 (Total: {len(df)}) ---"]
         
-        # Limit display if too large
-        df_limited = df.head(50) # Rewards list can be long
         
-        for _, row in df_limited.iterrows():
-             info = []
-             if pd.notna(row.get('ts_code')): info.append(f"代码:{row['ts_code']}")
-             if pd.notna(row.get('ann_date')): info.append(f"公告:{row['ann_date']}")
-             if pd.notna(row.get('end_date')): info.append(f"截止:{row['end_date']}")
-             if pd.notna(row.get('name')): info.append(f"姓名:{row['name']}")
-             if pd.notna(row.get('title')): info.append(f"职务:{row['title']}")
-             
-             # Format reward and hold_vol
-             if pd.notna(row.get('reward')): info.append(f"报酬:{row['reward']}万元")
-             if pd.notna(row.get('hold_vol')): info.append(f"持股:{row['hold_vol']}股")
-
-             results.append(" | ".join(info))
-            
-        if len(df) > 50:
-            results.append(f"... (共 {len(df)} 条，仅显示前 50 条)")
+        columns = [
+            Col('ts_code', '代码'),
+            Col('ann_date', '公告'),
+            Col('end_date', '截止'),
+            Col('name', '姓名'),
+            Col('title', '职务'),
+            Col('reward', '报酬', '万元'),
+            Col('hold_vol', '持股', '股'),
+        ]
+        results.extend(paginate(df, lambda page: render_rows(page, columns, sep=":"), "上市公司管理层薪酬和持股信息"))
             
         return "\n".join(results)
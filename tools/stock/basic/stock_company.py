@@ -1,11 +1,13 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows, truncate
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_stock_company_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def stock_company(ts_code: str = '', exchange: str = '', limit: int = None, offset: int = None) -> str:
+    def stock_company(ts_code: str = '', exchange: str = '', limit: int = None, offset: int = None, output_format: str = 'text') -> str:
         """
         获取上市公司基础信息 (stock_company)。
         
@@ -14,8 +16,12 @@ def register_stock_company_tools(mcp):
             exchange: 交易所代码 (SSE上交所 SZSE深交所 BSE北交所, 可选)
             limit: 单次返回数据长度 (可选)
             offset: 请求数据的开始位移量 (可选)
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool stock_company called with ts_code='{ts_code}', exchange='{exchange}'...")
+        log_debug("Tool stock_company called with ts_code='%s', exchange='%s'...", ts_code, exchange)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         params = {
             'ts_code': ts_code,
@@ -34,41 +40,29 @@ def register_stock_company_tools(mcp):
         if df.empty:
             return "未找到上市公司基础信息"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         results = [f"--- 上市公司基础信息 (Total: {len(df)}) ---"]
         
-        # Limit display if too large
-        df_limited = df.head(10) # Company info is detailed, limit to 10 by default if list
         
-        for _, row in df_limited.iterrows():
-             info = []
-             if pd.notna(row.get('ts_code')): info.append(f"代码:{row['ts_code']}")
-             if pd.notna(row.get('com_name')): info.append(f"公司名称:{row['com_name']}")
-             if pd.notna(row.get('exchange')): info.append(f"交易所:{row['exchange']}")
-             if pd.notna(row.get('chairman')): info.append(f"法人代表:{row['chairman']}")
-             if pd.notna(row.get('manager')): info.append(f"总经理:{row['manager']}")
-             if pd.notna(row.get('secretary')): info.append(f"董秘:{row['secretary']}")
-             if pd.notna(row.get('reg_capital')): info.append(f"注册资本:{row['reg_capital']}万元")
-             if pd.notna(row.get('setup_date')): info.append(f"注册日期:{row['setup_date']}")
-             if pd.notna(row.get('province')): info.append(f"省份:{row['province']}")
-             if pd.notna(row.get('city')): info.append(f"城市:{row['city']}")
-             
-             # Detailed info, maybe truncate or put on new lines? 
-             # For a list, keep it compact. If single result (ts_code specified), could be more detailed.
-             # Given the format " | ".join(info), I'll add concise fields.
-             
-             if pd.notna(row.get('website')): info.append(f"主页:{row['website']}")
-             if pd.notna(row.get('email')): info.append(f"Email:{row['email']}")
-             if pd.notna(row.get('employees')): info.append(f"员工人数:{row['employees']}")
-             
-             # main_business and introduction can be very long. 
-             if pd.notna(row.get('main_business')): 
-                 mb = str(row['main_business'])
-                 if len(mb) > 50: mb = mb[:50] + "..."
-                 info.append(f"主营:{mb}")
-
-             results.append(" | ".join(info))
-            
-        if len(df) > 10:
-            results.append(f"... (共 {len(df)} 条，仅显示前 10 条)")
+        columns = [
+            Col('ts_code', '代码'),
+            Col('com_name', '公司名称'),
+            Col('exchange', '交易所'),
+            Col('chairman', '法人代表'),
+            Col('manager', '总经理'),
+            Col('secretary', '董秘'),
+            Col('reg_capital', '注册资本', '万元'),
+            Col('setup_date', '注册日期'),
+            Col('province', '省份'),
+            Col('city', '城市'),
+            Col('website', '主页'),
+            Col('email', 'Email'),
+            Col('employees', '员工人数'),
+            # main_business and introduction can be very long.
+            Col('main_business', '主营', convert=truncate(50)),
+        ]
+        results.extend(paginate(df, lambda page: render_rows(page, columns, sep=":"), "上市公司基础信息", max_rows=10))
             
         return "\n".join(results)
@@ -1,11 +1,13 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_stock_st_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def stock_st(ts_code: str = '', trade_date: str = '', start_date: str = '', end_date: str = '', exchange: str = '', limit: int = None, offset: int = None) -> str:
+    def stock_st(ts_code: str = '', trade_date: str = '', start_date: str = '', end_date: str = '', exchange: str = '', limit: int = None, offset: int = None, output_format: str = 'text') -> str:
         """
         获取ST股票列表，可根据交易日期获取历史上每天的ST列表。
         
@@ -17,8 +19,12 @@ def register_stock_st_tools(mcp):
             exchange: 交易所过滤 (可选, 例如 'SZSE', 'SSE', 'BSE') -- *本地增强参数*
             limit: 单次返回数据长度 (可选)
             offset: 请求数据的开始位移量 (可选)
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool stock_st called with ts_code='{ts_code}', trade_date='{trade_date}', exchange='{exchange}'...")
+        log_debug("Tool stock_st called with ts_code='%s', trade_date='%s', exchange='%s'...", ts_code, trade_date, exchange)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         params = {
             'ts_code': ts_code,
@@ -77,24 +83,21 @@ def register_stock_st_tools(mcp):
             end = start + limit if limit else None
             df = df.iloc[start:end]
             
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         results = [f"--- ST股票列表 (Total: {len(df)}) ---"]
         
         # Limit display if too large to save tokens
         # If user just asked for count, the 'Total' above is enough.
-        # But we still show some data.
-        df_limited = df.head(50)
         
         # ts_code   name trade_date type type_name
-        for _, row in df_limited.iterrows():
-             info = []
-             if pd.notna(row.get('trade_date')): info.append(f"日期:{row['trade_date']}")
-             if pd.notna(row.get('ts_code')): info.append(f"代码:{row['ts_code']}")
-             if pd.notna(row.get('name')): info.append(f"名称:{row['name']}")
-             if pd.notna(row.get('type_name')): info.append(f"说明:{row['type_name']}")
-             
-             results.append(" | ".join(info))
-            
-        if len(df) > 50:
-            results.append(f"... (共 {len(df)} 条，仅显示前 50 条)")
+        columns = [
+            Col('trade_date', '日期'),
+            Col('ts_code', '代码'),
+            Col('name', '名称'),
+            Col('type_name', '说明'),
+        ]
+        results.extend(paginate(df, lambda page: render_rows(page, columns, sep=":"), "ST股票列表"))
             
         return "\n".join(results)
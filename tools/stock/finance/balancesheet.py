@@ -1,13 +1,15 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, money, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_balancesheet_tools(mcp):
     @mcp.tool()
     @handle_exception
     def balancesheet(ts_code: str, ann_date: str = "", f_ann_date: str = "", start_date: str = "",
                end_date: str = "", period: str = "", report_type: str = "", comp_type: str = "", 
-               limit: int = None, offset: int = None) -> str:
+               limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取上市公司资产负债表数据。支持多期趋势查询。
 
@@ -18,12 +20,16 @@ def register_balancesheet_tools(mcp):
             start_date / end_date: 公告日期范围
             limit: 返回条数，默认8。趋势分析请设 limit=12 或更大，而非逐期调用
             offset: 位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
 
         用法:
             - 多期趋势: balancesheet(ts_code="300760.SZ", limit=12, report_type="1")
             - 查单期: balancesheet(ts_code="300760.SZ", period="20251231")
         """
-        log_debug(f"Tool balancesheet called with ts_code='{ts_code}', period='{period}'...")
+        log_debug("Tool balancesheet called with ts_code='%s', period='%s'...", ts_code, period)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         if not ts_code:
             return "错误：必须提供 ts_code 参数（股票代码），否则会返回随机公司的数据"
         pro = get_pro_client()
@@ -59,22 +65,10 @@ def register_balancesheet_tools(mcp):
         # Reverse to chronological order for trend charts
         df = df.iloc[::-1].reset_index(drop=True)
 
-        result = [f"--- 财务数据 (共 {len(df)} 期) ---"]
+        if is_structured(output_format):
+            return structured_output(df, output_format)
 
-        display_df = df
-        
-        def format_money(val):
-            if pd.isna(val):
-                return ""
-            try:
-                val_float = float(val)
-                if abs(val_float) > 1e8:
-                    return f"{val_float/1e8:.2f}亿"
-                elif abs(val_float) > 1e4:
-                    return f"{val_float/1e4:.2f}万"
-                return str(val)
-            except:
-                return str(val)
+        result = [f"--- 财务数据 (共 {len(df)} 期) ---"]
 
         REPORT_TYPE_MAP = {
             '1': '合并报表', '2': '单季合并', '3': '调整单季合并表', '4': '调整合并报表',
@@ -82,40 +76,34 @@ def register_balancesheet_tools(mcp):
             '9': '母公司调整表', '10': '母公司调整前报表', '11': '母公司调整前合并报表', '12': '母公司调整前报表'
         }
 
-        for _, row in display_df.iterrows():
-            info_parts = []
-            if pd.notna(row.get('ts_code')): info_parts.append(f"代码: {row['ts_code']}")
-            if pd.notna(row.get('end_date')): info_parts.append(f"报告期: {row['end_date']}")
-            
-            r_type = str(row['report_type']) if pd.notna(row.get('report_type')) else ""
-            if r_type:
-                r_type_str = REPORT_TYPE_MAP.get(r_type, r_type)
-                info_parts.append(f"类型: {r_type_str}")
-            
+        columns = [
+            Col('ts_code', '代码'),
+            Col('end_date', '报告期'),
+            Col('report_type', '类型', convert=lambda s: s.astype(str).map(lambda r: REPORT_TYPE_MAP.get(r, r) or None)),
             # Add some key financial metrics for quick view
-            if pd.notna(row.get('total_assets')): info_parts.append(f"总资产: {format_money(row['total_assets'])}")
-            if pd.notna(row.get('total_liab')): info_parts.append(f"总负债: {format_money(row['total_liab'])}")
-            if pd.notna(row.get('total_cur_assets')): info_parts.append(f"流动资产: {format_money(row['total_cur_assets'])}")
-            if pd.notna(row.get('total_cur_liab')): info_parts.append(f"流动负债: {format_money(row['total_cur_liab'])}")
-            if pd.notna(row.get('total_nca')): info_parts.append(f"非流动资产: {format_money(row['total_nca'])}")
-            if pd.notna(row.get('total_ncl')): info_parts.append(f"非流动负债: {format_money(row['total_ncl'])}")
-            if pd.notna(row.get('total_hldr_eqy_exc_min_int')): info_parts.append(f"股东权益: {format_money(row['total_hldr_eqy_exc_min_int'])}")
-            if pd.notna(row.get('money_cap')): info_parts.append(f"货币资金: {format_money(row['money_cap'])}")
-            if pd.notna(row.get('inventories')): info_parts.append(f"存货: {format_money(row['inventories'])}")
-            if pd.notna(row.get('accounts_receiv')): info_parts.append(f"应收账款: {format_money(row['accounts_receiv'])}")
-            if pd.notna(row.get('prepayment')): info_parts.append(f"预付款项: {format_money(row['prepayment'])}")
-            if pd.notna(row.get('fix_assets')): info_parts.append(f"固定资产: {format_money(row['fix_assets'])}")
-            if pd.notna(row.get('intan_assets')): info_parts.append(f"无形资产: {format_money(row['intan_assets'])}")
-            if pd.notna(row.get('goodwill')): info_parts.append(f"商誉: {format_money(row['goodwill'])}")
-            if pd.notna(row.get('st_borr')): info_parts.append(f"短期借款: {format_money(row['st_borr'])}")
-            if pd.notna(row.get('lt_borr')): info_parts.append(f"长期借款: {format_money(row['lt_borr'])}")
-            if pd.notna(row.get('notes_payable')): info_parts.append(f"应付票据: {format_money(row['notes_payable'])}")
-            if pd.notna(row.get('acct_payable')): info_parts.append(f"应付账款: {format_money(row['acct_payable'])}")
-            if pd.notna(row.get('contract_liab')): info_parts.append(f"合同负债: {format_money(row['contract_liab'])}")
+            Col('total_assets', '总资产', convert=money),
+            Col('total_liab', '总负债', convert=money),
+            Col('total_cur_assets', '流动资产', convert=money),
+            Col('total_cur_liab', '流动负债', convert=money),
+            Col('total_nca', '非流动资产', convert=money),
+            Col('total_ncl', '非流动负债', convert=money),
+            Col('total_hldr_eqy_exc_min_int', '股东权益', convert=money),
+            Col('money_cap', '货币资金', convert=money),
+            Col('inventories', '存货', convert=money),
+            Col('accounts_receiv', '应收账款', convert=money),
+            Col('prepayment', '预付款项', convert=money),
+            Col('fix_assets', '固定资产', convert=money),
+            Col('intan_assets', '无形资产', convert=money),
+            Col('goodwill', '商誉', convert=money),
+            Col('st_borr', '短期借款', convert=money),
+            Col('lt_borr', '长期借款', convert=money),
+            Col('notes_payable', '应付票据', convert=money),
+            Col('acct_payable', '应付账款', convert=money),
+            Col('contract_liab', '合同负债', convert=money),
+        ]
+        # Pages are newest first; periods within a page in chronological order for trend charts
+        result.extend(paginate(df.iloc[::-1], lambda page: render_rows(page.iloc[::-1], columns), "资产负债表"))
 
-            result.append(" | ".join(info_parts))
-            
-             
         # Add a note about the full data
         result.append("\n(更多字段请在代码中查看 'fields' 列表)")
 
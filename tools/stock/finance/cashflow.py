@@ -1,13 +1,15 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, money, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_cashflow_tools(mcp):
     @mcp.tool()
     @handle_exception
     def cashflow(ts_code: str, ann_date: str = "", f_ann_date: str = "", start_date: str = "",
                end_date: str = "", period: str = "", report_type: str = "", comp_type: str = "", 
-               is_calc: int = None, limit: int = None, offset: int = None) -> str:
+               is_calc: int = None, limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取上市公司现金流量表数据。支持多期趋势查询。
 
@@ -19,12 +21,16 @@ def register_cashflow_tools(mcp):
             is_calc: 是否计算报表
             limit: 返回条数，默认8。趋势分析请设 limit=12 或更大，而非逐期调用
             offset: 位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
 
         用法:
             - 多期趋势: cashflow(ts_code="300760.SZ", limit=12, report_type="1")
             - 查单期: cashflow(ts_code="300760.SZ", period="20251231")
         """
-        log_debug(f"Tool cashflow called with ts_code='{ts_code}', period='{period}'...")
+        log_debug("Tool cashflow called with ts_code='%s', period='%s'...", ts_code, period)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         if not ts_code:
             return "错误：必须提供 ts_code 参数（股票代码），否则会返回随机公司的数据"
         pro = get_pro_client()
@@ -61,22 +67,10 @@ def register_cashflow_tools(mcp):
         # Reverse to chronological order for trend charts
         df = df.iloc[::-1].reset_index(drop=True)
 
-        result = [f"--- 财务数据 (共 {len(df)} 期) ---"]
+        if is_structured(output_format):
+            return structured_output(df, output_format)
 
-        display_df = df
-        
-        def format_money(val):
-            if pd.isna(val):
-                return ""
-            try:
-                val_float = float(val)
-                if abs(val_float) > 1e8:
-                    return f"{val_float/1e8:.2f}亿"
-                elif abs(val_float) > 1e4:
-                    return f"{val_float/1e4:.2f}万"
-                return str(val)
-            except:
-                return str(val)
+        result = [f"--- 财务数据 (共 {len(df)} 期) ---"]
 
         REPORT_TYPE_MAP = {
             '1': '合并报表', '2': '单季合并', '3': '调整单季合并表', '4': '调整合并报表',
@@ -84,31 +78,25 @@ def register_cashflow_tools(mcp):
             '9': '母公司调整表', '10': '母公司调整前报表', '11': '母公司调整前合并报表', '12': '母公司调整前报表'
         }
 
-        for _, row in display_df.iterrows():
-            info_parts = []
-            if pd.notna(row.get('ts_code')): info_parts.append(f"代码: {row['ts_code']}")
-            if pd.notna(row.get('end_date')): info_parts.append(f"报告期: {row['end_date']}")
-            
-            r_type = str(row['report_type']) if pd.notna(row.get('report_type')) else ""
-            if r_type:
-                r_type_str = REPORT_TYPE_MAP.get(r_type, r_type)
-                info_parts.append(f"类型: {r_type_str}")
-            
+        columns = [
+            Col('ts_code', '代码'),
+            Col('end_date', '报告期'),
+            Col('report_type', '类型', convert=lambda s: s.astype(str).map(lambda r: REPORT_TYPE_MAP.get(r, r) or None)),
             # Add some key financial metrics for quick view
-            if pd.notna(row.get('net_profit')): info_parts.append(f"净利润: {format_money(row['net_profit'])}")
-            if pd.notna(row.get('n_cashflow_act')): info_parts.append(f"经营净现金流: {format_money(row['n_cashflow_act'])}")
-            if pd.notna(row.get('c_fr_sale_sg')): info_parts.append(f"销售收现: {format_money(row['c_fr_sale_sg'])}")
-            if pd.notna(row.get('c_paid_goods_s')): info_parts.append(f"购买付现: {format_money(row['c_paid_goods_s'])}")
-            if pd.notna(row.get('c_paid_to_for_empl')): info_parts.append(f"支付职工: {format_money(row['c_paid_to_for_empl'])}")
-            if pd.notna(row.get('c_paid_for_taxes')): info_parts.append(f"支付税费: {format_money(row['c_paid_for_taxes'])}")
-            if pd.notna(row.get('n_cashflow_inv_act')): info_parts.append(f"投资净现金流: {format_money(row['n_cashflow_inv_act'])}")
-            if pd.notna(row.get('n_cash_flows_fnc_act')): info_parts.append(f"筹资净现金流: {format_money(row['n_cash_flows_fnc_act'])}")
-            if pd.notna(row.get('free_cashflow')): info_parts.append(f"自由现金流: {format_money(row['free_cashflow'])}")
-            if pd.notna(row.get('n_incr_cash_cash_equ')): info_parts.append(f"现金净增: {format_money(row['n_incr_cash_cash_equ'])}")
+            Col('net_profit', '净利润', convert=money),
+            Col('n_cashflow_act', '经营净现金流', convert=money),
+            Col('c_fr_sale_sg', '销售收现', convert=money),
+            Col('c_paid_goods_s', '购买付现', convert=money),
+            Col('c_paid_to_for_empl', '支付职工', convert=money),
+            Col('c_paid_for_taxes', '支付税费', convert=money),
+            Col('n_cashflow_inv_act', '投资净现金流', convert=money),
+            Col('n_cash_flows_fnc_act', '筹资净现金流', convert=money),
+            Col('free_cashflow', '自由现金流', convert=money),
+            Col('n_incr_cash_cash_equ', '现金净增', convert=money),
+        ]
+        # Pages are newest first; periods within a page in chronological order for trend charts
+        result.extend(paginate(df.iloc[::-1], lambda page: render_rows(page.iloc[::-1], columns), "现金流量表"))
 
-            result.append(" | ".join(info_parts))
-            
-             
         # Add a note about the full data
         result.append("\n(更多字段请在代码中查看 'fields' 列表)")
 
@@ -1,12 +1,14 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, join_parts, render_column, render_columns
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_disclosure_date_tools(mcp):
     @mcp.tool()
     @handle_exception
     def disclosure_date(ts_code: str, end_date: str = "", pre_date: str = "",
-               actual_date: str = "", limit: int = None, offset: int = None) -> str:
+               actual_date: str = "", limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取上市公司的财报披露计划日期。
 
@@ -17,8 +19,12 @@ def register_disclosure_date_tools(mcp):
             actual_date: 实际披露日期
             limit: 单次返回数据长度
             offset: 请求数据的开始位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool disclosure_date called with ts_code='{ts_code}', end_date='{end_date}'...")
+        log_debug("Tool disclosure_date called with ts_code='%s', end_date='%s'...", ts_code, end_date)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         params = {
             'ts_code': ts_code,
@@ -38,37 +44,23 @@ def register_disclosure_date_tools(mcp):
         if df.empty:
             return "未找到符合条件的财报披露计划数据"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         result = [f"--- size: {len(df)} ---"]
         
-        # Display cap
-        display_cap = 100
-        # If user explicitly set a limit that is smaller, use that.
-        if limit and limit < display_cap:
-             display_cap = limit
-             
-        display_df = df.head(display_cap)
-        
-        for _, row in display_df.iterrows():
-            info_parts = []
-            if pd.notna(row.get('ts_code')): info_parts.append(f"代码: {row['ts_code']}")
-            if pd.notna(row.get('end_date')): info_parts.append(f"报告期: {row['end_date']}")
-            
-            # Dates
-            dates = []
-            if pd.notna(row.get('pre_date')): dates.append(f"预计: {row['pre_date']}")
-            if pd.notna(row.get('actual_date')): dates.append(f"实际: {row['actual_date']}")
-            if dates: info_parts.append(" | ".join(dates))
-
-            # Modify history
-            if pd.notna(row.get('modify_date')): info_parts.append(f"修正记录: {row['modify_date']}")
-            
-             # Announce date
-            if pd.notna(row.get('ann_date')): info_parts.append(f"公告: {row['ann_date']}")
+        def render(page):
+            parts = [
+                render_column(page, Col('ts_code', '代码')),
+                render_column(page, Col('end_date', '报告期')),
+                # Dates
+                render_columns(page, [Col('pre_date', '预计'), Col('actual_date', '实际')]),
+                # Modify history
+                render_column(page, Col('modify_date', '修正记录')),
+                # Announce date
+                render_column(page, Col('ann_date', '公告')),
+            ]
+            return (join_parts(parts, "\n") + "\n---").tolist()
 
-            result.append("\n".join(info_parts))
-            result.append("---")
-            
-        if len(df) > display_cap:
-             result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
-             
+        result.extend(paginate(df, render, "财报披露计划", max_rows=100))
         return "\n".join(result)
@@ -1,13 +1,16 @@
 import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, first_nonempty, join_parts, prefix_nonempty, render_column, render_columns
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_dividend_tools(mcp):
     @mcp.tool()
     @handle_exception
     def dividend(ts_code: str, ann_date: str = "", record_date: str = "",
                ex_date: str = "", imp_ann_date: str = "", 
-               limit: int = None, offset: int = None) -> str:
+               limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取上市公司分红送股数据。
 
@@ -19,8 +22,12 @@ def register_dividend_tools(mcp):
             imp_ann_date: 实施公告日
             limit: 单次返回数据长度
             offset: 请求数据的开始位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool dividend called with ts_code='{ts_code}'...")
+        log_debug("Tool dividend called with ts_code='%s'...", ts_code)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         if not ts_code:
             return "错误：必须提供 ts_code 参数（股票代码），否则会返回随机公司的数据"
         pro = get_pro_client()
@@ -47,61 +54,50 @@ def register_dividend_tools(mcp):
         # Reverse to chronological order
         df = df.iloc[::-1].reset_index(drop=True)
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         result = [f"--- size: {len(df)} ---"]
-        
-        # Display cap
-        display_cap = 20
-        # If user explicitly set a limit that is smaller, use that.
-        if limit and limit < display_cap:
-             display_cap = limit
-             
-        display_df = df.head(display_cap)
 
-        for _, row in display_df.iterrows():
-            info_parts = []
-            if pd.notna(row.get('ts_code')): info_parts.append(f"代码: {row['ts_code']}")
-            if pd.notna(row.get('end_date')): info_parts.append(f"分红年度: {row['end_date']}")
-            if pd.notna(row.get('div_proc')): info_parts.append(f"进度: {row['div_proc']}")
-            
-            # Cash dividend
-            cash = ""
-            if pd.notna(row.get('cash_div_tax')) and row['cash_div_tax'] > 0:
-                 cash = f"{row['cash_div_tax']}元"
-            elif pd.notna(row.get('cash_div')) and row['cash_div'] > 0:
-                 cash = f"{row['cash_div']}元(税后)"
-            
-            if cash: info_parts.append(f"每股派息(税前): {cash}")
+        def positive(values):
+            # object dtype keeps integer values printing as integers
+            return values.astype(object).where(values > 0)
 
+        def render(page):
+            # Cash dividend
+            cash = first_nonempty(
+                render_column(page, Col('cash_div_tax', unit='元', convert=positive)),
+                render_column(page, Col('cash_div', unit='元(税后)', convert=positive)),
+            )
             # Stock dividend
-            stk = []
-            if pd.notna(row.get('stk_div')) and row['stk_div'] > 0: stk.append(f"送{row['stk_div']}")
-            if pd.notna(row.get('stk_bo_rate')) and row['stk_bo_rate'] > 0: stk.append(f"送{row['stk_bo_rate']}")
-            if pd.notna(row.get('stk_co_rate')) and row['stk_co_rate'] > 0: stk.append(f"转{row['stk_co_rate']}")
-            
-            if stk: info_parts.append(f"送转: {','.join(stk)}")
-
+            stk = render_columns(page, [
+                Col('stk_div', '送', convert=positive),
+                Col('stk_bo_rate', '送', convert=positive),
+                Col('stk_co_rate', '转', convert=positive),
+            ], sep="", joiner=",")
+            info_parts = [
+                render_column(page, Col('ts_code', '代码')),
+                render_column(page, Col('end_date', '分红年度')),
+                render_column(page, Col('div_proc', '进度')),
+                prefix_nonempty(cash, "每股派息(税前): "),
+                prefix_nonempty(stk, "送转: "),
+            ]
             # Key Dates
-            dates = []
-            if pd.notna(row.get('ann_date')): dates.append(f"公告: {row['ann_date']}")
-            if pd.notna(row.get('record_date')): dates.append(f"登记: {row['record_date']}")
-            if pd.notna(row.get('ex_date')): dates.append(f"除除: {row['ex_date']}")
-            if pd.notna(row.get('pay_date')): dates.append(f"派息: {row['pay_date']}")
-            
-            if dates:
-                dates_str = " | ".join(dates)
-                # If dates string is long, put it on a new line or just append if short
-                if len(info_parts) > 2:
-                     result.append(" | ".join(info_parts))
-                     result.append(f"  日期: {dates_str}")
-                     result.append("---")
-                     continue
-                else:
-                     info_parts.append(dates_str)
+            dates = render_columns(page, [
+                Col('ann_date', '公告'),
+                Col('record_date', '登记'),
+                Col('ex_date', '除除'),
+                Col('pay_date', '派息'),
+            ])
+
+            # Long rows put the dates on their own line, short rows append them inline
+            info_count = sum((part != "").astype(int) for part in info_parts)
+            info = join_parts(info_parts)
+            records = pd.Series(join_parts([info, dates])).where(
+                (dates == "") | (info_count <= 2), info + "\n  日期: " + dates
+            )
+            return (records + "\n---").tolist()
 
-            result.append(" | ".join(info_parts))
-            result.append("---")
-            
-        if len(df) > display_cap:
-             result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
-             
+        # Pages are newest first; periods within a page in chronological order for trend charts
+        result.extend(paginate(df.iloc[::-1], lambda page: render(page.iloc[::-1]), "分红送股", max_rows=20))
         return "\n".join(result)
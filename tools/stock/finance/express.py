@@ -1,12 +1,14 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, money, prefix_nonempty, render_columns
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_express_tools(mcp):
     @mcp.tool()
     @handle_exception
     def express(ts_code: str, ann_date: str = "", start_date: str = "",
-               end_date: str = "", period: str = "", limit: int = None, offset: int = None) -> str:
+               end_date: str = "", period: str = "", limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取上市公司业绩快报数据。
 
@@ -18,8 +20,12 @@ def register_express_tools(mcp):
             period: 报告期(每个季度最后一天的日期，比如20171231表示年报)
             limit: 单次返回数据长度
             offset: 请求数据的开始位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool express called with ts_code='{ts_code}', period='{period}'...")
+        log_debug("Tool express called with ts_code='%s', period='%s'...", ts_code, period)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         if not ts_code:
             return "错误：必须提供 ts_code 参数（股票代码），否则会返回随机公司的数据"
         pro = get_pro_client()
@@ -42,55 +48,30 @@ def register_express_tools(mcp):
         if df.empty:
             return "未找到符合条件的业绩快报数据"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         result = [f"--- size: {len(df)} ---"]
         
-        # Display cap
-        display_cap = 20
-        # If user explicitly set a limit that is smaller, use that.
-        if limit and limit < display_cap:
-             display_cap = limit
-             
-        display_df = df.head(display_cap)
-        
-        def format_money(val):
-            if pd.isna(val):
-                return ""
-            try:
-                val_float = float(val)
-                if abs(val_float) > 1e8:
-                    return f"{val_float/1e8:.2f}亿"
-                elif abs(val_float) > 1e4:
-                    return f"{val_float/1e4:.2f}万"
-                return str(val)
-            except:
-                return str(val)
-
-        for _, row in display_df.iterrows():
-            info_parts = []
-            if pd.notna(row.get('ts_code')): info_parts.append(f"代码: {row['ts_code']}")
-            if pd.notna(row.get('end_date')): info_parts.append(f"报告期: {row['end_date']}")
-            
+        columns = [
+            Col('ts_code', '代码'),
+            Col('end_date', '报告期'),
             # Key financial metrics
-            if pd.notna(row.get('revenue')): info_parts.append(f"营收: {format_money(row['revenue'])}")
-            if pd.notna(row.get('n_income')): info_parts.append(f"净利: {format_money(row['n_income'])}")
-            if pd.notna(row.get('total_assets')): info_parts.append(f"总资产: {format_money(row['total_assets'])}")
-            if pd.notna(row.get('total_hldr_eqy_exc_min_int')): info_parts.append(f"股东权益: {format_money(row['total_hldr_eqy_exc_min_int'])}")
-
+            Col('revenue', '营收', convert=money),
+            Col('n_income', '净利', convert=money),
+            Col('total_assets', '总资产', convert=money),
+            Col('total_hldr_eqy_exc_min_int', '股东权益', convert=money),
             # Growth metrics
-            if pd.notna(row.get('yoy_sales')): info_parts.append(f"营收同比: {row['yoy_sales']}%")
-            if pd.notna(row.get('yoy_dedu_np')): info_parts.append(f"扣非净利同比: {row['yoy_dedu_np']}%")
+            Col('yoy_sales', '营收同比', '%'),
+            Col('yoy_dedu_np', '扣非净利同比', '%'),
+        ]
 
-            result.append(" | ".join(info_parts))
-            
+        def render(page):
+            lines = render_columns(page, columns)
             # Summary
-            if pd.notna(row.get('perf_summary')):
-                result.append(f"  摘要: {row['perf_summary']}")
-            if pd.notna(row.get('remark')):
-                result.append(f"  备注: {row['remark']}")
-            
-            result.append("---")
-            
-        if len(df) > display_cap:
-             result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
-             
+            notes = render_columns(page, [Col('perf_summary', '  摘要'), Col('remark', '  备注')], joiner="\n")
+            return (lines + prefix_nonempty(notes, "\n") + "\n---").tolist()
+
+        # Records carry free-text summaries, so pages hold 20 of them
+        result.extend(paginate(df, render, "业绩快报", max_rows=20))
         return "\n".join(result)
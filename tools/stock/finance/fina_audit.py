@@ -1,12 +1,14 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, join_parts, money, render_column, render_columns
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_fina_audit_tools(mcp):
     @mcp.tool()
     @handle_exception
     def fina_audit(ts_code: str, ann_date: str = "", start_date: str = "",
-               end_date: str = "", period: str = "", limit: int = None, offset: int = None) -> str:
+               end_date: str = "", period: str = "", limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取上市公司定期财务审计意见数据。
 
@@ -18,8 +20,12 @@ def register_fina_audit_tools(mcp):
             period: 报告期(每个季度最后一天的日期，比如20171231表示年报)
             limit: 单次返回数据长度
             offset: 请求数据的开始位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool fina_audit called with ts_code='{ts_code}', period='{period}'...")
+        log_debug("Tool fina_audit called with ts_code='%s', period='%s'...", ts_code, period)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         params = {
             'ts_code': ts_code,
@@ -40,49 +46,25 @@ def register_fina_audit_tools(mcp):
         if df.empty:
             return "未找到符合条件的财务审计意见数据"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         result = [f"--- size: {len(df)} ---"]
         
-        # Display cap
-        display_cap = 20
-        # If user explicitly set a limit that is smaller, use that.
-        if limit and limit < display_cap:
-             display_cap = limit
-             
-        display_df = df.head(display_cap)
-        
-        def format_money(val):
-            if pd.isna(val):
-                return ""
-            try:
-                val_float = float(val)
-                if abs(val_float) > 1e8:
-                    return f"{val_float/1e8:.2f}亿"
-                elif abs(val_float) > 1e4:
-                    return f"{val_float/1e4:.2f}万"
-                return str(val)
-            except:
-                return str(val)
-
-        for _, row in display_df.iterrows():
-            info_parts = []
-            if pd.notna(row.get('ts_code')): info_parts.append(f"代码: {row['ts_code']}")
-            if pd.notna(row.get('end_date')): info_parts.append(f"报告期: {row['end_date']}")
-            if pd.notna(row.get('audit_result')): info_parts.append(f"结果: {row['audit_result']}")
-            
-            # Audit Details
-            details = []
-            if pd.notna(row.get('audit_agency')): details.append(f"机构: {row['audit_agency']}")
-            if pd.notna(row.get('audit_sign')): details.append(f"签字: {row['audit_sign']}")
-            if pd.notna(row.get('audit_fees')): details.append(f"费用: {format_money(row['audit_fees'])}")
-            
-            if details: info_parts.append(" | ".join(details))
-
-            if pd.notna(row.get('ann_date')): info_parts.append(f"公告: {row['ann_date']}")
+        def render(page):
+            parts = [
+                render_column(page, Col('ts_code', '代码')),
+                render_column(page, Col('end_date', '报告期')),
+                render_column(page, Col('audit_result', '结果')),
+                # Audit Details
+                render_columns(page, [
+                    Col('audit_agency', '机构'),
+                    Col('audit_sign', '签字'),
+                    Col('audit_fees', '费用', convert=money),
+                ]),
+                render_column(page, Col('ann_date', '公告')),
+            ]
+            return (join_parts(parts, "\n") + "\n---").tolist()
 
-            result.append("\n".join(info_parts))
-            result.append("---")
-            
-        if len(df) > display_cap:
-             result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
-             
+        result.extend(paginate(df, render, "财务审计意见", max_rows=20))
         return "\n".join(result)
@@ -1,12 +1,14 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, join_parts, render_column, render_columns
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_fina_indicator_tools(mcp):
     @mcp.tool()
     @handle_exception
     def fina_indicator(ts_code: str, ann_date: str = "", start_date: str = "",
-               end_date: str = "", period: str = "", limit: int = None, offset: int = None) -> str:
+               end_date: str = "", period: str = "", limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取上市公司财务指标数据（含ROE、毛利率、净利率、资产负债率、流动比率、速动比率等）。
         默认返回最近12期（3年），适合趋势分析。
@@ -17,12 +19,16 @@ def register_fina_indicator_tools(mcp):
             start_date / end_date: 报告期日期范围
             limit: 返回条数，默认12（近3年）。趋势分析请直接设置更大值，而非逐期调用
             offset: 位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
 
         用法:
             - 多期趋势: fina_indicator(ts_code="300760.SZ", limit=12)
             - 查单期: fina_indicator(ts_code="300760.SZ", period="20251231")
         """
-        log_debug(f"Tool fina_indicator called with ts_code='{ts_code}', period='{period}'...")
+        log_debug("Tool fina_indicator called with ts_code='%s', period='%s'...", ts_code, period)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         if not ts_code:
             return "错误：必须提供 ts_code 参数（股票代码），否则会返回随机公司的数据"
         pro = get_pro_client()
@@ -53,37 +59,32 @@ def register_fina_indicator_tools(mcp):
         # Reverse to chronological order (oldest first) for trend charts
         df = df.iloc[::-1].reset_index(drop=True)
 
-        result = [f"--- 财务指标 (共 {len(df)} 期) ---"]
-
-        def fmt(val, suffix="%"):
-            if pd.isna(val):
-                return "N/A"
-            return f"{val:.2f}{suffix}"
-
-        for _, row in df.iterrows():
-            info_parts = []
-            if pd.notna(row.get('ts_code')): info_parts.append(f"代码: {row['ts_code']}")
-            if pd.notna(row.get('end_date')): info_parts.append(f"报告期: {row['end_date']}")
+        if is_structured(output_format):
+            return structured_output(df, output_format)
 
-            ps = []
-            if pd.notna(row.get('eps')): ps.append(f"EPS:{row['eps']}")
-            if pd.notna(row.get('bps')): ps.append(f"BPS:{row['bps']}")
-            if ps: info_parts.append(" | ".join(ps))
-
-            prof = []
-            if pd.notna(row.get('roe')): prof.append(f"ROE:{fmt(row['roe'])}")
-            if pd.notna(row.get('grossprofit_margin')): prof.append(f"毛利率:{fmt(row['grossprofit_margin'])}")
-            if pd.notna(row.get('netprofit_margin')): prof.append(f"净利率:{fmt(row['netprofit_margin'])}")
-            if prof: info_parts.append(" | ".join(prof))
+        result = [f"--- 财务指标 (共 {len(df)} 期) ---"]
 
-            other = []
-            if pd.notna(row.get('debt_to_assets')): other.append(f"资产负债率:{fmt(row['debt_to_assets'])}")
-            if pd.notna(row.get('currentratio')): other.append(f"流动比率:{row['currentratio']:.2f}")
-            if pd.notna(row.get('quickratio')): other.append(f"速动比率:{row['quickratio']:.2f}")
-            if pd.notna(row.get('q_sales_yoy')): other.append(f"营收同比(单季):{fmt(row['q_sales_yoy'])}")
-            if pd.notna(row.get('q_profit_yoy')): other.append(f"净利同比(单季):{fmt(row['q_profit_yoy'])}")
-            if other: info_parts.append(" | ".join(other))
+        def render(page):
+            parts = [
+                render_column(page, Col('ts_code', '代码')),
+                render_column(page, Col('end_date', '报告期')),
+                render_columns(page, [Col('eps', 'EPS'), Col('bps', 'BPS')], sep=":"),
+                render_columns(page, [
+                    Col('roe', 'ROE', '%', fmt='.2f'),
+                    Col('grossprofit_margin', '毛利率', '%', fmt='.2f'),
+                    Col('netprofit_margin', '净利率', '%', fmt='.2f'),
+                ], sep=":"),
+                render_columns(page, [
+                    Col('debt_to_assets', '资产负债率', '%', fmt='.2f'),
+                    Col('currentratio', '流动比率', fmt='.2f'),
+                    Col('quickratio', '速动比率', fmt='.2f'),
+                    Col('q_sales_yoy', '营收同比(单季)', '%', fmt='.2f'),
+                    Col('q_profit_yoy', '净利同比(单季)', '%', fmt='.2f'),
+                ], sep=":"),
+            ]
+            return join_parts(parts, "\n").tolist()
 
-            result.append("\n".join(info_parts))
+        # Pages are newest first; periods within a page in chronological order for trend charts
+        result.extend(paginate(df.iloc[::-1], lambda page: render(page.iloc[::-1]), "财务指标"))
 
         return "\n---\n".join(result)
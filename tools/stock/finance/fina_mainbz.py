@@ -1,12 +1,15 @@
 import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, money, render_columns
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_fina_mainbz_tools(mcp):
     @mcp.tool()
     @handle_exception
     def fina_mainbz(ts_code: str, period: str = "", type: str = "P",
-               start_date: str = "", end_date: str = "", limit: int = None, offset: int = None) -> str:
+               start_date: str = "", end_date: str = "", limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取上市公司主营业务构成，分地区和产品两种方式。
 
@@ -18,8 +21,12 @@ def register_fina_mainbz_tools(mcp):
             end_date: 报告期结束日期
             limit: 单次返回数据长度
             offset: 请求数据的开始位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool fina_mainbz called with ts_code='{ts_code}', period='{period}', type='{type}'...")
+        log_debug("Tool fina_mainbz called with ts_code='%s', period='%s', type='%s'...", ts_code, period, type)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         if not ts_code:
             return "错误：必须提供 ts_code 参数（股票代码），否则会返回随机公司的数据"
         pro = get_pro_client()
@@ -47,54 +54,38 @@ def register_fina_mainbz_tools(mcp):
         # The data structure is usually multiple rows per report period (one per product/region)
         # We should group by end_date if multiple periods are returned, or just list them.
         
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         result = [f"--- size: {len(df)} ---"]
-        
-        # Display cap
-        display_cap = 50 # Main biz items can be numerous per report, so higher cap
-        # If user explicitly set a limit that is smaller, use that.
-        if limit and limit < display_cap:
-             display_cap = limit
-             
-        display_df = df.head(display_cap)
-        
-        def format_money(val):
-            if pd.isna(val):
-                return ""
-            try:
-                val_float = float(val)
-                if abs(val_float) > 1e8:
-                    return f"{val_float/1e8:.2f}亿"
-                elif abs(val_float) > 1e4:
-                    return f"{val_float/1e4:.2f}万"
-                return str(val)
-            except:
-                return str(val)
 
         # Basic grouping by period for better readability if ts_code is single
         # If multiple ts_codes (unlikely given API usually one at a time or VIP), we can just list.
         # Tushare interface for this usually requires ts_code.
-        
-        current_period = None
-        
-        for _, row in display_df.iterrows():
-            period = row.get('end_date')
-            if period != current_period:
-                if current_period is not None:
-                     result.append("---")
-                result.append(f"报告期: {period} | 代码: {row.get('ts_code')} | 类型: {type}")
-                current_period = period
-            
-            item_parts = []
-            if pd.notna(row.get('bz_item')): item_parts.append(f"项目: {row['bz_item']}")
-            if pd.notna(row.get('bz_sales')): item_parts.append(f"收入: {format_money(row['bz_sales'])}")
-            if pd.notna(row.get('bz_profit')): item_parts.append(f"利润: {format_money(row['bz_profit'])}")
-            if pd.notna(row.get('bz_cost')): item_parts.append(f"成本: {format_money(row['bz_cost'])}")
-            
-            result.append("  " + " | ".join(item_parts))
-            
-        result.append("---")
-            
-        if len(df) > display_cap:
-             result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
-             
+        columns = [
+            Col('bz_item', '项目'),
+            Col('bz_sales', '收入', convert=money),
+            Col('bz_profit', '利润', convert=money),
+            Col('bz_cost', '成本', convert=money),
+        ]
+
+        def render(page):
+            # One entry per row: the first row of each period carries its header
+            items = "  " + render_columns(page, columns)
+            periods = page.get('end_date', pd.Series([None] * len(page))).tolist()
+            codes = page.get('ts_code', pd.Series([None] * len(page))).tolist()
+
+            lines = []
+            current_period = None
+            for period, code, item in zip(periods, codes, items):
+                if period != current_period:
+                    header = f"报告期: {period} | 代码: {code} | 类型: {type}"
+                    item = header + "\n" + item if current_period is None else "---\n" + header + "\n" + item
+                    current_period = period
+                lines.append(item)
+            lines[-1] += "\n---"
+            return lines
+
+        # Main biz items can be numerous per report, so pages hold 50 of them
+        result.extend(paginate(df, render, "主营业务构成"))
         return "\n".join(result)
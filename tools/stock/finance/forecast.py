@@ -1,13 +1,15 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, join_parts, money, prefix_nonempty, render_column, render_columns
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_forecast_tools(mcp):
     @mcp.tool()
     @handle_exception
     def forecast(ts_code: str, ann_date: str = "", start_date: str = "",
                end_date: str = "", period: str = "", type: str = "", 
-               limit: int = None, offset: int = None) -> str:
+               limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取上市公司业绩预告数据。
 
@@ -20,8 +22,12 @@ def register_forecast_tools(mcp):
             type: 预告类型(预增/预减/扭亏/首亏/续亏/续盈/略增/略减)
             limit: 单次返回数据长度
             offset: 请求数据的开始位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool forecast called with ts_code='{ts_code}', period='{period}'...")
+        log_debug("Tool forecast called with ts_code='%s', period='%s'...", ts_code, period)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         if not ts_code:
             return "错误：必须提供 ts_code 参数（股票代码），否则会返回随机公司的数据"
         pro = get_pro_client()
@@ -49,81 +55,40 @@ def register_forecast_tools(mcp):
         # Reverse to chronological order
         df = df.iloc[::-1].reset_index(drop=True)
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         result = [f"--- size: {len(df)} ---"]
-        
-        # Display cap
-        display_cap = 20
-        # If user explicitly set a limit that is smaller, use that.
-        if limit and limit < display_cap:
-             display_cap = limit
-             
-        display_df = df.head(display_cap)
-        
-        def format_money(val):
-            if pd.isna(val):
-                return ""
-            try:
-                val_float = float(val)
-                if abs(val_float) > 1e8:
-                    return f"{val_float/1e8:.2f}亿"
-                elif abs(val_float) > 1e4:
-                    return f"{val_float/1e4:.2f}万"
-                return str(val)
-            except:
-                return str(val)
 
-        for _, row in display_df.iterrows():
-            info_parts = []
-            if pd.notna(row.get('ts_code')): info_parts.append(f"代码: {row['ts_code']}")
-            if pd.notna(row.get('end_date')): info_parts.append(f"报告期: {row['end_date']}")
-            if pd.notna(row.get('type')): info_parts.append(f"类型: {row['type']}")
-            
+        # Net profit figures are in 万元; scale to yuan before formatting
+        def wan_money(values):
+            return money(values.astype(float) * 10000)
+
+        def render(page):
             # Profit change range
-            p_change = ""
-            if pd.notna(row.get('p_change_min')): p_change += f"{row['p_change_min']}%"
-            if pd.notna(row.get('p_change_max')): 
-                if p_change: p_change += f" ~ {row['p_change_max']}%"
-                else: p_change = f"{row['p_change_max']}%"
-            if p_change: info_parts.append(f"变动幅度: {p_change}")
+            p_change = join_parts([
+                render_column(page, Col('p_change_min', unit='%')),
+                render_column(page, Col('p_change_max', unit='%')),
+            ], " ~ ")
+            n_profit = join_parts([
+                render_column(page, Col('net_profit_min', convert=wan_money)),
+                render_column(page, Col('net_profit_max', convert=wan_money)),
+            ], " ~ ")
 
-            # Net profit range (Original is in 万元, convert to Yuan for formatter if needed, or handle directly)
-            # Strategy: Convert '万元' to base unit (float) then pass to format_money.
-            # 1 万元 = 10000
-            
-            n_profit = ""
-            n_min = row.get('net_profit_min')
-            n_max = row.get('net_profit_max')
-            
-            formatted_min = ""
-            if pd.notna(n_min):
-                formatted_min = format_money(float(n_min) * 10000)
-            
-            formatted_max = ""
-            if pd.notna(n_max):
-                formatted_max = format_money(float(n_max) * 10000)
-                
-            if formatted_min: n_profit += formatted_min
-            if formatted_max:
-                if n_profit: n_profit += f" ~ {formatted_max}"
-                else: n_profit = formatted_max
-            
-            if n_profit: info_parts.append(f"预告净利: {n_profit}")
-            
-            # Last year
-            if pd.notna(row.get('last_parent_net')):
-                 info_parts.append(f"上年同期: {format_money(float(row['last_parent_net']) * 10000)}")
+            lines = join_parts([
+                render_column(page, Col('ts_code', '代码')),
+                render_column(page, Col('end_date', '报告期')),
+                render_column(page, Col('type', '类型')),
+                prefix_nonempty(p_change, "变动幅度: "),
+                prefix_nonempty(n_profit, "预告净利: "),
+                # Last year
+                render_column(page, Col('last_parent_net', '上年同期', convert=wan_money)),
+            ])
 
-            result.append(" | ".join(info_parts))
-            
             # Summary often contains important text, add it on a new line if present
-            if pd.notna(row.get('summary')):
-                result.append(f"  摘要: {row['summary']}")
-            if pd.notna(row.get('change_reason')):
-                result.append(f"  原因: {row['change_reason']}")
-                
-            result.append("---")
-            
-        if len(df) > display_cap:
-             result.append(f"... (共 {len(df)} 条，仅显示前 {display_cap} 条)")
-             
+            notes = render_columns(page, [Col('summary', '  摘要'), Col('change_reason', '  原因')], joiner="\n")
+            return (lines + prefix_nonempty(notes, "\n") + "\n---").tolist()
+
+        # Pages are newest first; periods within a page in chronological order for trend charts
+        result.extend(paginate(df.iloc[::-1], lambda page: render(page.iloc[::-1]), "业绩预告", max_rows=20))
         return "\n".join(result)
@@ -1,13 +1,15 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, money, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_income_tools(mcp):
     @mcp.tool()
     @handle_exception
     def income(ts_code: str, ann_date: str = "", f_ann_date: str = "", start_date: str = "",
                end_date: str = "", period: str = "", report_type: str = "", comp_type: str = "", 
-               limit: int = None, offset: int = None) -> str:
+               limit: int = None, offset: int = None, output_format: str = "text") -> str:
         """
         获取上市公司利润表数据。支持多期趋势查询。
 
@@ -18,12 +20,16 @@ def register_income_tools(mcp):
             start_date / end_date: 公告日期范围
             limit: 返回条数，默认8。趋势分析请设 limit=12 或更大，而非逐期调用
             offset: 位移量
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
 
         用法:
             - 多期趋势: income(ts_code="300760.SZ", limit=12, report_type="1")
             - 查单期: income(ts_code="300760.SZ", period="20251231")
         """
-        log_debug(f"Tool income called with ts_code='{ts_code}', period='{period}'...")
+        log_debug("Tool income called with ts_code='%s', period='%s'...", ts_code, period)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         if not ts_code:
             return "错误：必须提供 ts_code 参数（股票代码），否则会返回随机公司的数据"
         pro = get_pro_client()
@@ -59,22 +65,10 @@ def register_income_tools(mcp):
         # Reverse to chronological order for trend charts
         df = df.iloc[::-1].reset_index(drop=True)
 
-        result = [f"--- 财务数据 (共 {len(df)} 期) ---"]
+        if is_structured(output_format):
+            return structured_output(df, output_format)
 
-        display_df = df
-        
-        def format_money(val):
-            if pd.isna(val):
-                return ""
-            try:
-                val_float = float(val)
-                if abs(val_float) > 1e8:
-                    return f"{val_float/1e8:.2f}亿"
-                elif abs(val_float) > 1e4:
-                    return f"{val_float/1e4:.2f}万"
-                return str(val)
-            except:
-                return str(val)
+        result = [f"--- 财务数据 (共 {len(df)} 期) ---"]
 
         REPORT_TYPE_MAP = {
             '1': '合并报表', '2': '单季合并', '3': '调整单季合并表', '4': '调整合并报表',
@@ -82,34 +76,28 @@ def register_income_tools(mcp):
             '9': '母公司调整表', '10': '母公司调整前报表', '11': '母公司调整前合并报表', '12': '母公司调整前报表'
         }
 
-        for _, row in display_df.iterrows():
-            info_parts = []
-            if pd.notna(row.get('ts_code')): info_parts.append(f"代码: {row['ts_code']}")
-            if pd.notna(row.get('end_date')): info_parts.append(f"报告期: {row['end_date']}")
-            
-            r_type = str(row['report_type']) if pd.notna(row.get('report_type')) else ""
-            if r_type:
-                r_type_str = REPORT_TYPE_MAP.get(r_type, r_type)
-                info_parts.append(f"类型: {r_type_str}")
-            
+        columns = [
+            Col('ts_code', '代码'),
+            Col('end_date', '报告期'),
+            Col('report_type', '类型', convert=lambda s: s.astype(str).map(lambda r: REPORT_TYPE_MAP.get(r, r) or None)),
             # Add some key financial metrics for quick view
-            if pd.notna(row.get('basic_eps')): info_parts.append(f"EPS: {row['basic_eps']}")
-            if pd.notna(row.get('total_revenue')): info_parts.append(f"营收: {format_money(row['total_revenue'])}")
-            if pd.notna(row.get('total_cogs')): info_parts.append(f"营业总成本: {format_money(row['total_cogs'])}")
-            if pd.notna(row.get('oper_cost')): info_parts.append(f"营业成本: {format_money(row['oper_cost'])}")
-            if pd.notna(row.get('sell_exp')): info_parts.append(f"销售费用: {format_money(row['sell_exp'])}")
-            if pd.notna(row.get('admin_exp')): info_parts.append(f"管理费用: {format_money(row['admin_exp'])}")
-            if pd.notna(row.get('rd_exp')): info_parts.append(f"研发费用: {format_money(row['rd_exp'])}")
-            if pd.notna(row.get('fin_exp')): info_parts.append(f"财务费用: {format_money(row['fin_exp'])}")
-            if pd.notna(row.get('operate_profit')): info_parts.append(f"营业利润: {format_money(row['operate_profit'])}")
-            if pd.notna(row.get('total_profit')): info_parts.append(f"利润总额: {format_money(row['total_profit'])}")
-            if pd.notna(row.get('income_tax')): info_parts.append(f"所得税: {format_money(row['income_tax'])}")
-            if pd.notna(row.get('n_income')): info_parts.append(f"净利: {format_money(row['n_income'])}")
-            if pd.notna(row.get('n_income_attr_p')): info_parts.append(f"归母净利: {format_money(row['n_income_attr_p'])}")
+            Col('basic_eps', 'EPS'),
+            Col('total_revenue', '营收', convert=money),
+            Col('total_cogs', '营业总成本', convert=money),
+            Col('oper_cost', '营业成本', convert=money),
+            Col('sell_exp', '销售费用', convert=money),
+            Col('admin_exp', '管理费用', convert=money),
+            Col('rd_exp', '研发费用', convert=money),
+            Col('fin_exp', '财务费用', convert=money),
+            Col('operate_profit', '营业利润', convert=money),
+            Col('total_profit', '利润总额', convert=money),
+            Col('income_tax', '所得税', convert=money),
+            Col('n_income', '净利', convert=money),
+            Col('n_income_attr_p', '归母净利', convert=money),
+        ]
+        # Pages are newest first; periods within a page in chronological order for trend charts
+        result.extend(paginate(df.iloc[::-1], lambda page: render_rows(page.iloc[::-1], columns), "利润表"))
 
-            result.append(" | ".join(info_parts))
-            
-             
         # Add a note about the full data
         result.append("\n(更多字段请在代码中查看 'fields' 列表)")
 
@@ -1,12 +1,16 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cross_section import fetch_codes_for_day
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
+from tools.stock.quote.quote_utils import split_ts_codes
 
 def register_moneyflow_tools(mcp):
     @mcp.tool()
     @handle_exception
     def moneyflow(ts_code: str = '', trade_date: str = '', start_date: str = '',
-                  end_date: str = '', limit: int = None) -> str:
+                  end_date: str = '', limit: int = None, output_format: str = 'text') -> str:
         """
         获取个股资金流向数据（主力、超大单、大单、中单、小单净流入/流出）。
 
@@ -16,8 +20,12 @@ def register_moneyflow_tools(mcp):
             start_date: 开始日期 YYYYMMDD（可选）
             end_date: 结束日期 YYYYMMDD（可选）
             limit: 返回条数上限，默认20
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool moneyflow called: ts_code={ts_code}, start={start_date}, end={end_date}")
+        log_debug("Tool moneyflow called: ts_code=%s, start=%s, end=%s", ts_code, start_date, end_date)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         if not any([ts_code, trade_date, start_date, end_date]):
             return "错误：至少提供一个筛选条件（ts_code/trade_date/start_date/end_date）"
 
@@ -29,13 +37,16 @@ def register_moneyflow_tools(mcp):
             'end_date': end_date
         }
         api_params = {k: v for k, v in raw_params.items() if v}
+        date_params = dict(api_params)
 
         effective_limit = limit if limit else 20
         api_params['limit'] = effective_limit
 
         fields = 'ts_code,trade_date,net_mf_amount,buy_elg_amount,sell_elg_amount,buy_lg_amount,sell_lg_amount,buy_md_amount,sell_md_amount,buy_sm_amount,sell_sm_amount'
 
-        df = pro.moneyflow(**api_params, fields=fields)
+        df = fetch_codes_for_day(pro, "moneyflow", split_ts_codes(ts_code), date_params, fields=fields)
+        if df is None:
+            df = pro.moneyflow(**api_params, fields=fields)
         if df.empty:
             return "未找到符合条件的资金流向数据"
 
@@ -43,44 +54,38 @@ def register_moneyflow_tools(mcp):
         df = df.head(effective_limit)
         df = df.iloc[::-1].reset_index(drop=True)
 
-        result = [f"--- 个股资金流向 (共 {len(df)} 天) ---"]
-
-        def fmt(val):
-            if pd.isna(val):
-                return "N/A"
-            val_abs = abs(val)
-            if val_abs >= 1e8:
-                return f"{val/1e8:.2f}亿"
-            elif val_abs >= 1e4:
-                return f"{val/1e4:.2f}万"
-            return f"{val:.0f}"
-
-        for _, row in df.iterrows():
-            parts = []
-            if pd.notna(row.get('trade_date')):
-                parts.append(f"日期:{row['trade_date']}")
-
-            if pd.notna(row.get('net_mf_amount')):
-                nmf = row['net_mf_amount']
-                direction = "净流入" if nmf >= 0 else "净流出"
-                parts.append(f"主力{direction}:{fmt(nmf)}")
+        if is_structured(output_format):
+            return structured_output(df, output_format)
 
-            if pd.notna(row.get('buy_elg_amount')) and pd.notna(row.get('sell_elg_amount')):
-                elg_net = row['buy_elg_amount'] - row['sell_elg_amount']
-                parts.append(f"超大单:{fmt(elg_net)}")
-
-            if pd.notna(row.get('buy_lg_amount')) and pd.notna(row.get('sell_lg_amount')):
-                lg_net = row['buy_lg_amount'] - row['sell_lg_amount']
-                parts.append(f"大单:{fmt(lg_net)}")
-
-            if pd.notna(row.get('buy_md_amount')) and pd.notna(row.get('sell_md_amount')):
-                md_net = row['buy_md_amount'] - row['sell_md_amount']
-                parts.append(f"中单:{fmt(md_net)}")
-
-            if pd.notna(row.get('buy_sm_amount')) and pd.notna(row.get('sell_sm_amount')):
-                sm_net = row['buy_sm_amount'] - row['sell_sm_amount']
-                parts.append(f"小单:{fmt(sm_net)}")
+        result = [f"--- 个股资金流向 (共 {len(df)} 天) ---"]
 
-            result.append(" | ".join(parts))
+        def fmt(values):
+            magnitude = values.abs()
+            text = values.map("{:.0f}".format)
+            wan = magnitude >= 1e4
+            yi = magnitude >= 1e8
+            text[wan] = (values[wan] / 1e4).map("{:.2f}万".format)
+            text[yi] = (values[yi] / 1e8).map("{:.2f}亿".format)
+            return text
+
+        def net(size):
+            buy, sell = f'buy_{size}_amount', f'sell_{size}_amount'
+            if buy in df.columns and sell in df.columns:
+                return df[buy] - df[sell]
+            return None
+
+        flows = df.assign(**{f'{size}_net': net(size) for size in ('elg', 'lg', 'md', 'sm')})
+        columns = [
+            Col('trade_date', '日期'),
+            Col('net_mf_amount', convert=lambda s: s.ge(0).map({True: "主力净流入:", False: "主力净流出:"}) + fmt(s)),
+            Col('elg_net', '超大单', convert=fmt),
+            Col('lg_net', '大单', convert=fmt),
+            Col('md_net', '中单', convert=fmt),
+            Col('sm_net', '小单', convert=fmt),
+        ]
+        # Pages are newest first; days within a page in chronological order for charts
+        result.extend(paginate(
+            flows.iloc[::-1], lambda page: render_rows(page.iloc[::-1], columns, sep=":"), "个股资金流向",
+        ))
 
         return "\n".join(result)
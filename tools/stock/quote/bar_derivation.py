@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import os
+import random
+import threading
+from datetime import datetime
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.bar_store import BarStore, bar_store
+from utils.cache import CST
+from utils.logger import log_debug, log_warning
+from utils.resample import period_bounds, period_keys, resample_bars
+from utils.trade_calendar import TradingCalendar, trading_calendar
+
+# Build weekly/monthly bars from the locally stored daily series instead of
+# calling the weekly/monthly endpoints. MINISHARE_MCP_DERIVE_BARS=0 turns it off.
+DERIVE_BARS = os.getenv("MINISHARE_MCP_DERIVE_BARS", "1") != "0"
+# Share of derived results re-fetched from upstream in the background and
+# compared; a mismatch turns derivation off for that endpoint.
+VERIFY_RATE = float(os.getenv("MINISHARE_MCP_DERIVE_VERIFY_RATE", "0.05"))
+
+# Derived endpoint -> (daily source endpoint, period). index_weekly and
+# index_monthly are left to upstream: their units are not checked against
+# index_daily, so deriving them could change what the tools return.
+DERIVED_ENDPOINTS = {
+    "weekly": ("daily", "weekly"),
+    "monthly": ("daily", "monthly"),
+}
+BAR_COLUMNS = ["ts_code", "trade_date", "close", "open", "high", "low", "pre_close", "change", "pct_chg", "vol", "amount"]
+# Upstream weekly/monthly report vol in 股 and amount in 元 where daily uses
+# 手 and 千元, and pct_chg as a fraction rather than a percentage.
+UNIT_SCALES = {"vol": 100, "amount": 1000, "pct_chg": 0.01}
+# Column -> absolute tolerance; upstream rounds prices to 2 and pct_chg to
+# 4 decimals, vol and amount are compared relatively (VERIFY_RTOL).
+VERIFY_COLUMNS = {"open": 0.011, "high": 0.011, "low": 0.011, "close": 0.011, "pct_chg": 1e-4, "vol": 1.0, "amount": 1.0}
+VERIFY_RTOL = 1e-4
+
+FetchDaily = Callable[[str, list, dict], pd.DataFrame]
+
+
+class BarDeriver:
+    """Derives weekly/monthly stock bars from daily bars, in upstream units.
+
+    Only calls for a start_date/end_date range whose daily series the
+    BarStore serves are derived, so a daily + weekly + monthly analysis of
+    one code costs a single upstream daily fetch. The daily fetch starts at
+    the first period's first day, and only periods whose last trading day
+    (per the trading calendar) is published are returned, matching the
+    upstream endpoints. A sample of results is checked against upstream.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = DERIVE_BARS,
+        verify_rate: float = VERIFY_RATE,
+        store: Optional[BarStore] = None,
+        calendar: Optional[TradingCalendar] = None,
+        clock: Callable[[], datetime] = lambda: datetime.now(CST),
+        sample: Callable[[], float] = random.random,
+        run_in_background: Callable[[Callable[[], None]], None] = None,
+    ):
+        self.enabled = enabled
+        self.verify_rate = verify_rate
+        self._store = store if store is not None else bar_store
+        self._calendar = calendar if calendar is not None else trading_calendar
+        self._clock = clock
+        self._sample = sample
+        self._run_in_background = run_in_background or _start_thread
+        self.disabled: dict[str, str] = {}
+        self.derived = 0
+        self.verified = 0
+        self.mismatches = 0
+
+    def derive(self, pro, endpoint: str, codes: list[str], api_params: dict, fetch_daily: FetchDaily) -> Optional[pd.DataFrame]:
+        """Derived bars for codes, or None when the upstream endpoint should be used."""
+        if not self.enabled or endpoint not in DERIVED_ENDPOINTS or endpoint in self.disabled:
+            return None
+        if set(api_params) - {"start_date", "end_date"} or not api_params.get("start_date"):
+            return None
+        source, period = DERIVED_ENDPOINTS[endpoint]
+        start_date = api_params["start_date"]
+        end_date = api_params.get("end_date") or self._clock().strftime("%Y%m%d")
+        fetch_start = period_bounds(period_keys([start_date], period)[0], period)[0]
+        daily_params = {"start_date": fetch_start, "end_date": end_date}
+        store = self._store
+        if store is None or not store.supports(source, {"ts_code": ",".join(codes), **daily_params}):
+            return None
+        try:
+            self._calendar.ensure_loaded(pro)
+        except Exception as exc:
+            log_debug("BarDeriver: calendar unavailable: %s", exc)
+        if not self._calendar.loaded:
+            return None
+
+        daily = fetch_daily(source, codes, daily_params)
+        published = min(end_date, self._calendar.latest_completed() or end_date)
+        bars = resample_bars(
+            daily, period, start_date=fetch_start, end_date=published, clock=self._clock, daily_pre_close=True,
+        )
+        if bars.empty:
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        last_trading_days = np.array([
+            self._calendar.previous(period_bounds(key, period)[1])
+            for key in period_keys(bars["trade_date"].to_numpy(), period)
+        ])
+        complete = (last_trading_days != "") & (last_trading_days <= published)
+        in_range = (bars["trade_date"] >= start_date) & (bars["trade_date"] <= end_date)
+        bars = bars[complete & in_range].reset_index(drop=True)
+        bars = bars[[column for column in BAR_COLUMNS if column in bars.columns]]
+        for column, scale in UNIT_SCALES.items():
+            if column in bars.columns:
+                bars[column] = bars[column] * scale
+        self.derived += 1
+        log_debug("BarDeriver: %s for %s codes derived from %s (%s bars)", endpoint, len(codes), source, len(bars))
+
+        if self.verify_rate > 0 and self._sample() < self.verify_rate:
+            code = codes[0]
+            sample = bars[bars["ts_code"] == code]
+            self._run_in_background(
+                lambda: self.verify(endpoint, sample, getattr(pro, endpoint), {"ts_code": code, **api_params})
+            )
+        return bars
+
+    def verify(self, endpoint: str, derived: pd.DataFrame, fetch: Callable[..., pd.DataFrame], params: dict) -> bool:
+        """Compare derived bars with upstream for the same call; False on mismatch."""
+        try:
+            upstream = fetch(**params)
+        except Exception as exc:
+            log_debug("BarDeriver: verifying %s failed: %s", endpoint, exc)
+            return True
+        self.verified += 1
+        if upstream is None or upstream.empty:
+            return True
+        # Upstream bars may lag the daily series, but never lead it.
+        merged = derived.merge(upstream, on=["ts_code", "trade_date"], how="right", suffixes=("", "_upstream"))
+        problems = []
+        if merged["open"].isna().any():
+            problems.append("missing bars")
+        for column, atol in VERIFY_COLUMNS.items():
+            if f"{column}_upstream" not in merged.columns:
+                continue
+            both = merged[[column, f"{column}_upstream"]].dropna()
+            if not np.allclose(both[column], both[f"{column}_upstream"], rtol=VERIFY_RTOL, atol=atol):
+                problems.append(column)
+        if not problems:
+            return True
+        self.mismatches += 1
+        self.disabled[endpoint] = ",".join(problems)
+        log_warning("BarDeriver: %s %s differs from upstream (%s), derivation off", endpoint, params, self.disabled[endpoint])
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "derived": self.derived,
+            "verified": self.verified,
+            "mismatches": self.mismatches,
+            "disabled": dict(self.disabled),
+        }
+
+
+def _start_thread(task: Callable[[], None]):
+    threading.Thread(target=task, name="bar-derivation-verify", daemon=True).start()
+
+
+# Process-wide deriver used by the weekly and monthly tools.
+bar_deriver = BarDeriver()
@@ -1,11 +1,12 @@
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
-from .quote_utils import fetch_quote_data, format_quote_data, split_ts_codes
+from utils.structured import is_structured, structured_output, validate_output_format
+from .quote_utils import adjust_quote_data, fetch_quote_data, format_quote_data, split_ts_codes, validate_adj
 
 def register_daily_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def daily(ts_code: str = '', trade_date: str = '', start_date: str = '', end_date: str = '') -> str:
+    def daily(ts_code: str = '', trade_date: str = '', start_date: str = '', end_date: str = '', adj: str = '', output_format: str = 'text') -> str:
         """
         获取A股日线行情数据 (daily)，支持股票、沪深指数与申万行业指数(801xxx.SI)。
         
@@ -14,8 +15,16 @@ def register_daily_tools(mcp):
             trade_date: 交易日期 (YYYYMMDD, 可选)
             start_date: 开始日期 (YYYYMMDD, 可选)
             end_date: 结束日期 (YYYYMMDD, 可选)
+            adj: 复权类型 (qfq 前复权 / hfq 后复权, 默认不复权; 仅作用于股票, 可选)
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool daily called with ts_code='{ts_code}', trade_date='{trade_date}', start_date='{start_date}', end_date='{end_date}'...")
+        log_debug("Tool daily called with ts_code='%s', trade_date='%s', start_date='%s', end_date='%s', adj='%s'...", ts_code, trade_date, start_date, end_date, adj)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
+        adj_error = validate_adj(adj)
+        if adj_error:
+            return adj_error
         pro = get_pro_client()
         params = {
             'ts_code': ts_code,
@@ -35,8 +44,12 @@ def register_daily_tools(mcp):
             ts_code=ts_code,
             **api_params,
         )
+        df = adjust_quote_data(pro, df, adj)
         
         if df.empty:
             return "未找到日线行情数据"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         return format_quote_data(df, "daily", requested_codes)
@@ -1,12 +1,14 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
 from .trade_date_utils import resolve_trade_date
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_ggt_daily_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def ggt_daily(trade_date: str = '', start_date: str = '', end_date: str = '') -> str:
+    def ggt_daily(trade_date: str = '', start_date: str = '', end_date: str = '', output_format: str = 'text') -> str:
         """
         获取港股通每日成交统计 (ggt_daily)。
         
@@ -14,8 +16,12 @@ def register_ggt_daily_tools(mcp):
             trade_date: 单个交易日期 (YYYYMMDD, 可选)
             start_date: 区间开始日期 (YYYYMMDD)。仅与 end_date 同时传入时按区间查询
             end_date: 区间结束日期 (YYYYMMDD)。单独传入时归一化为当日或之前最近交易日
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool ggt_daily called with trade_date='{trade_date}', start_date='{start_date}', end_date='{end_date}'...")
+        log_debug("Tool ggt_daily called with trade_date='%s', start_date='%s', end_date='%s'...", trade_date, start_date, end_date)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         
         # Keep true range semantics only when both boundaries are explicit.
@@ -25,7 +31,7 @@ def register_ggt_daily_tools(mcp):
                 trade_date = resolved_date
                 start_date = ""
                 end_date = ""
-                log_debug(f"Normalized ggt_daily query to trading date: {trade_date}")
+                log_debug("Normalized ggt_daily query to trading date: %s", trade_date)
 
         params = {
             'trade_date': trade_date,
@@ -40,22 +46,19 @@ def register_ggt_daily_tools(mcp):
         if df.empty:
             return "未找到港股通每日成交统计数据"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         results = [f"--- 港股通每日成交统计 (Total: {len(df)}) ---"]
         
-        # Limit display if needed
-        df_limited = df.head(50) 
         
-        for _, row in df_limited.iterrows():
-             info = []
-             if pd.notna(row.get('trade_date')): info.append(f"日期:{row['trade_date']}")
-             if pd.notna(row.get('buy_amount')): info.append(f"买入额(亿):{row['buy_amount']}")
-             if pd.notna(row.get('buy_volume')): info.append(f"买入笔数(万):{row['buy_volume']}")
-             if pd.notna(row.get('sell_amount')): info.append(f"卖出额(亿):{row['sell_amount']}")
-             if pd.notna(row.get('sell_volume')): info.append(f"卖出笔数(万):{row['sell_volume']}")
-
-             results.append(" | ".join(info))
-            
-        if len(df) > 50:
-            results.append(f"... (共 {len(df)} 条，仅显示前 50 条)")
+        columns = [
+            Col('trade_date', '日期'),
+            Col('buy_amount', '买入额(亿)'),
+            Col('buy_volume', '买入笔数(万)'),
+            Col('sell_amount', '卖出额(亿)'),
+            Col('sell_volume', '卖出笔数(万)'),
+        ]
+        results.extend(paginate(df, lambda page: render_rows(page, columns, sep=":"), "港股通每日成交统计"))
             
         return "\n".join(results)
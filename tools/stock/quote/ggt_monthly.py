@@ -1,12 +1,14 @@
-import pandas as pd
 from datetime import datetime, timedelta
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_ggt_monthly_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def ggt_monthly(month: str = '', start_month: str = '', end_month: str = '') -> str:
+    def ggt_monthly(month: str = '', start_month: str = '', end_month: str = '', output_format: str = 'text') -> str:
         """
         获取港股通每月成交统计 (ggt_monthly)。
         
@@ -14,8 +16,12 @@ def register_ggt_monthly_tools(mcp):
             month: 月度 (YYYYMM, 可选, 若不指定则自动获取最近月度)
             start_month: 开始月度 (YYYYMM, 可选)
             end_month: 结束月度 (YYYYMM, 可选)
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool ggt_monthly called with month='{month}', start_month='{start_month}', end_month='{end_month}'...")
+        log_debug("Tool ggt_monthly called with month='%s', start_month='%s', end_month='%s'...", month, start_month, end_month)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         
         # Smart date logic: if no month args provided, default to latest month
@@ -23,9 +29,9 @@ def register_ggt_monthly_tools(mcp):
             try:
                 today = datetime.now()
                 month = today.strftime('%Y%m')
-                log_debug(f"No params provided. Automatically determined month: {month}")
+                log_debug("No params provided. Automatically determined month: %s", month)
             except Exception as e:
-                log_debug(f"Failed to auto-determine month: {e}")
+                log_debug("Failed to auto-determine month: %s", e)
 
         params = {
             'trade_date': month,
@@ -46,31 +52,28 @@ def register_ggt_monthly_tools(mcp):
                  prev_month = prev_month_dt.strftime('%Y%m')
                  
                  if prev_month != month:
-                     log_debug(f"Current month {month} empty, trying previous month: {prev_month}")
+                     log_debug("Current month %s empty, trying previous month: %s", month, prev_month)
                      api_params['trade_date'] = prev_month
                      df = pro.ggt_monthly(**api_params)
              except Exception as e:
-                 log_debug(f"Failed to retry previous month: {e}")
+                 log_debug("Failed to retry previous month: %s", e)
         
         if df.empty:
             return "未找到港股通每月成交统计数据"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         results = [f"--- 港股通每月成交统计 (Total: {len(df)}) ---"]
         
-        # Limit display if needed
-        df_limited = df.head(50) 
         
-        for _, row in df_limited.iterrows():
-             info = []
-             if pd.notna(row.get('month')): info.append(f"月度:{row['month']}")
-             if pd.notna(row.get('day_buy_amt')): info.append(f"日均买入(亿):{row['day_buy_amt']}")
-             if pd.notna(row.get('day_sell_amt')): info.append(f"日均卖出(亿):{row['day_sell_amt']}")
-             if pd.notna(row.get('total_buy_amt')): info.append(f"总买入(亿):{row['total_buy_amt']}")
-             if pd.notna(row.get('total_sell_amt')): info.append(f"总卖出(亿):{row['total_sell_amt']}")
-
-             results.append(" | ".join(info))
-            
-        if len(df) > 50:
-            results.append(f"... (共 {len(df)} 条，仅显示前 50 条)")
+        columns = [
+            Col('month', '月度'),
+            Col('day_buy_amt', '日均买入(亿)'),
+            Col('day_sell_amt', '日均卖出(亿)'),
+            Col('total_buy_amt', '总买入(亿)'),
+            Col('total_sell_amt', '总卖出(亿)'),
+        ]
+        results.extend(paginate(df, lambda page: render_rows(page, columns, sep=":"), "港股通每月成交统计"))
             
         return "\n".join(results)
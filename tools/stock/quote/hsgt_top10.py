@@ -1,12 +1,14 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
 from .trade_date_utils import resolve_trade_date
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_hsgt_top10_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def hsgt_top10(ts_code: str = '', trade_date: str = '', start_date: str = '', end_date: str = '', market_type: str = '') -> str:
+    def hsgt_top10(ts_code: str = '', trade_date: str = '', start_date: str = '', end_date: str = '', market_type: str = '', output_format: str = 'text') -> str:
         """
         获取沪深股通十大成交股 (hsgt_top10)。
         
@@ -16,8 +18,12 @@ def register_hsgt_top10_tools(mcp):
             start_date: 区间开始日期 (YYYYMMDD)。仅与 end_date 同时传入时按区间查询
             end_date: 区间结束日期 (YYYYMMDD)。单独传入时归一化为当日或之前最近交易日
             market_type: 市场类型（1：沪市 3：深市, 可选）
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool hsgt_top10 called with ts_code='{ts_code}', trade_date='{trade_date}', start_date='{start_date}', end_date='{end_date}', market_type='{market_type}'...")
+        log_debug("Tool hsgt_top10 called with ts_code='%s', trade_date='%s', start_date='%s', end_date='%s', market_type='%s'...", ts_code, trade_date, start_date, end_date, market_type)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         
         # Keep true range semantics only when both boundaries are explicit.
@@ -27,7 +33,7 @@ def register_hsgt_top10_tools(mcp):
                 trade_date = resolved_date
                 start_date = ""
                 end_date = ""
-                log_debug(f"Normalized hsgt_top10 query to trading date: {trade_date}")
+                log_debug("Normalized hsgt_top10 query to trading date: %s", trade_date)
 
         params = {
             'ts_code': ts_code,
@@ -44,24 +50,21 @@ def register_hsgt_top10_tools(mcp):
         if df.empty:
             return "未找到沪深股通十大成交股数据"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         results = [f"--- 沪深股通十大成交股 (Total: {len(df)}) ---"]
         
         # Limit display if needed, though usually top 10 list isn't huge per day
-        # But querying a range could result in many rows.
-        df_limited = df.head(50) 
         
-        for _, row in df_limited.iterrows():
-             info = []
-             if pd.notna(row.get('trade_date')): info.append(f"日期:{row['trade_date']}")
-             if pd.notna(row.get('ts_code')): info.append(f"代码:{row['ts_code']}")
-             if pd.notna(row.get('name')): info.append(f"名称:{row['name']}")
-             if pd.notna(row.get('rank')): info.append(f"排名:{row['rank']}")
-             if pd.notna(row.get('net_amount')): info.append(f"净买入:{row['net_amount']}")
-             if pd.notna(row.get('amount')): info.append(f"成交额:{row['amount']}")
-
-             results.append(" | ".join(info))
-            
-        if len(df) > 50:
-            results.append(f"... (共 {len(df)} 条，仅显示前 50 条)")
+        columns = [
+            Col('trade_date', '日期'),
+            Col('ts_code', '代码'),
+            Col('name', '名称'),
+            Col('rank', '排名'),
+            Col('net_amount', '净买入'),
+            Col('amount', '成交额'),
+        ]
+        results.extend(paginate(df, lambda page: render_rows(page, columns, sep=":"), "沪深股通十大成交股"))
             
         return "\n".join(results)
@@ -1,15 +1,32 @@
 from __future__ import annotations
 
-from typing import Iterable
+from datetime import datetime
+from typing import Iterable, Optional
 
 import pandas as pd
 
+from utils.adjust import ADJ_MODES, adjustment_engine
+from utils.bar_store import ROW_LIMITS
+from utils.code_resolver import code_resolver
+from utils.cross_section import fetch_codes_for_day
+from utils.cursor import result_cursors
+from utils.fanout import fan_out, raise_if_all_failed
+from utils.formatting import Col, render_rows
+from utils.logger import log_debug, log_warning
+from utils.resample import resample_bars
+from .bar_derivation import bar_deriver
+
 
 def split_ts_codes(ts_code: str) -> list[str]:
-    """Split the comma-separated code list commonly produced by LLM agents."""
+    """Split the comma-separated code list commonly produced by LLM agents.
+
+    Entries given as names, pinyin initials or bare symbols (e.g. "贵州茅台",
+    "payh", "600519") are resolved to ts_codes locally via code_resolver.
+    """
     if not ts_code:
         return []
-    return list(dict.fromkeys(code.strip() for code in ts_code.replace("，", ",").split(",") if code.strip()))
+    tokens = (code.strip() for code in ts_code.replace("，", ",").replace("、", ",").split(","))
+    return list(dict.fromkeys(code_resolver.resolve(token) for token in tokens if token))
 
 
 def is_index_code(ts_code: str) -> bool:
@@ -27,89 +44,238 @@ def is_sw_index_code(ts_code: str) -> bool:
     return exchange == "SI" and symbol.startswith("801")
 
 
+# Per-call row caps of the stock endpoints that accept comma-separated ts_code
+# lists. Index and Shenwan endpoints only take one code per call.
+BATCH_ROW_LIMITS = {"daily": 6000, "weekly": 6000, "monthly": 4500}
+MAX_CODES_PER_BATCH = 100
+# Rough bars per calendar day, padded so batches stay under the row cap.
+_BARS_PER_DAY = {"daily": 245 / 365, "weekly": 1 / 7, "monthly": 1 / 30}
+_ESTIMATE_MARGIN = 1.2
+
+
+# Periods without an upstream endpoint: built locally from index_daily or
+# sw_daily bars, for index codes only.
+RESAMPLED_PERIODS = ("quarterly", "yearly")
+UNSUPPORTED_RESAMPLE_NOTE = "季线/年线仅支持申万、中证等指数代码"
+
+
+def _estimate_rows_per_code(stock_api: str, api_params: dict) -> Optional[int]:
+    """Estimate rows one code returns for these params; None when unbounded."""
+    if api_params.get("trade_date"):
+        return 1
+    start_date = api_params.get("start_date")
+    if not start_date:
+        return None
+    end_date = api_params.get("end_date") or datetime.now().strftime("%Y%m%d")
+    try:
+        days = (datetime.strptime(end_date, "%Y%m%d") - datetime.strptime(start_date, "%Y%m%d")).days + 1
+    except ValueError:
+        return None
+    bars = max(days, 1) * _BARS_PER_DAY[stock_api] * _ESTIMATE_MARGIN
+    return int(bars) + 1
+
+
+def plan_quote_batches(codes: list[str], stock_api: str, index_api: str, api_params: dict) -> list[tuple[str, list[str]]]:
+    """Group codes into upstream calls as (api_name, codes) in request order.
+
+    Plain stock codes are packed into comma-joined batches sized to the
+    endpoint's row cap; index codes get one call each and all Shenwan codes
+    are collected into a single trailing sw_daily task.
+    """
+    row_limit = BATCH_ROW_LIMITS.get(stock_api)
+    rows_per_code = _estimate_rows_per_code(stock_api, api_params) if row_limit else None
+    batch_size = 1
+    if row_limit and rows_per_code:
+        batch_size = max(1, min(MAX_CODES_PER_BATCH, row_limit // rows_per_code))
+
+    tasks: list[tuple[str, list[str]]] = []
+    sw_codes: list[str] = []
+    batch: Optional[list[str]] = None
+    for code in codes:
+        if is_sw_index_code(code):
+            sw_codes.append(code)
+        elif is_index_code(code):
+            tasks.append((index_api, [code]))
+        else:
+            if batch is None or len(batch) >= batch_size:
+                batch = []
+                tasks.append((stock_api, batch))
+            batch.append(code)
+    if sw_codes:
+        tasks.append(("sw_daily", sw_codes))
+    return tasks
+
+
+def _fetch_stock_batch(pro, api_name: str, codes: list[str], **api_params) -> pd.DataFrame:
+    """Fetch one comma-joined batch, splitting it again if the row cap was hit."""
+    frame = getattr(pro, api_name)(**api_params, ts_code=",".join(codes))
+    row_limit = BATCH_ROW_LIMITS.get(api_name)
+    if len(codes) == 1 or not row_limit or frame is None or len(frame) < row_limit:
+        return frame
+    log_debug("%s batch of %s codes hit the %s-row cap, splitting", api_name, len(codes), row_limit)
+    middle = len(codes) // 2
+    parts = [
+        _fetch_stock_batch(pro, api_name, codes[:middle], **api_params),
+        _fetch_stock_batch(pro, api_name, codes[middle:], **api_params),
+    ]
+    parts = [part for part in parts if part is not None and not part.empty]
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+
 def fetch_quote_data(
     pro,
     stock_api: str,
     index_api: str,
     period: str,
     ts_code: str,
+    max_workers: Optional[int] = None,
     **api_params,
 ) -> pd.DataFrame:
-    """Fetch stock or index quotes, splitting multi-code requests locally."""
+    """Fetch stock or index quotes, fanning multi-code requests out concurrently.
+
+    Many stock codes for one date are answered from a single cross-section
+    (fetch_codes_for_day); otherwise stock codes are batched per
+    plan_quote_batches(). Codes that fail upstream are reported in ``df.attrs["failed_codes"]``
+    instead of failing the whole request; if every code fails, the first
+    error is raised as before. Weekly and monthly bars may be derived from
+    stored daily bars (bar_deriver). Quarterly and yearly bars are resampled from
+    index_api daily bars; stock codes are reported as failed for them.
+    """
     codes = split_ts_codes(ts_code)
     if not codes:
         return getattr(pro, stock_api)(**api_params)
 
     frames: list[pd.DataFrame] = []
-    sw_codes: list[str] = []
-    for code in codes:
-        if is_sw_index_code(code):
-            sw_codes.append(code)
-        else:
-            api_name = index_api if is_index_code(code) else stock_api
-            frame = getattr(pro, api_name)(**api_params, ts_code=code)
-            if frame is not None and not frame.empty:
-                frames.append(frame)
+    failed_codes: dict[str, str] = {}
+    if period in RESAMPLED_PERIODS:
+        failed_codes = {code: UNSUPPORTED_RESAMPLE_NOTE for code in codes if not is_index_code(code)}
+        codes = [code for code in codes if is_index_code(code)]
+    stock_codes = [code for code in codes if not is_index_code(code)]
+    section = fetch_codes_for_day(pro, stock_api, stock_codes, api_params)
+    if section is not None:
+        if not section.empty:
+            frames.append(section)
+        codes = [code for code in codes if is_index_code(code)]
+    tasks = plan_quote_batches(codes, stock_api, index_api, api_params)
 
-    if sw_codes:
-        frame = _fetch_sw_quote_data(
-            pro,
-            period=period,
-            codes=sw_codes,
-            **api_params,
-        )
-        if not frame.empty:
+    def fetch(task):
+        api_name, target = task
+        if api_name == "sw_daily":
+            return _fetch_sw_quote_data(pro, period=period, codes=target, max_workers=max_workers, **api_params)
+        if period in RESAMPLED_PERIODS:
+            frame = _mark_truncated(getattr(pro, index_api)(**api_params, ts_code=target[0]), index_api)
+            return resample_bars(frame, period, **_resample_range(api_params))
+        derived = bar_deriver.derive(pro, api_name, target, api_params, fetch_daily)
+        if derived is not None:
+            return derived
+        if api_name == stock_api:
+            return _fetch_stock_batch(pro, api_name, target, **api_params)
+        return getattr(pro, api_name)(**api_params, ts_code=target[0])
+
+    def fetch_daily(source: str, target: list[str], daily_params: dict) -> pd.DataFrame:
+        if source == "daily":
+            return _fetch_stock_batch(pro, source, target, **daily_params)
+        return getattr(pro, source)(**daily_params, ts_code=target[0])
+
+    results = fan_out(fetch, tasks, max_workers=max_workers, label="quote_batch")
+    if section is None:
+        raise_if_all_failed(results)
+
+    for result in results:
+        _, target = result.item
+        if result.error is not None:
+            for code in target:
+                log_warning("fetch_quote_data: %s failed: %s", code, result.error)
+                failed_codes[code] = str(result.error)
+            continue
+        frame = result.value
+        if frame is not None and not frame.empty:
+            failed_codes.update(frame.attrs.get("failed_codes", {}))
             frames.append(frame)
 
-    if not frames:
-        return pd.DataFrame()
-    return pd.concat(frames, ignore_index=True)
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if failed_codes:
+        df.attrs["failed_codes"] = failed_codes
+    return df
 
 
 def _fetch_sw_quote_data(
     pro,
     period: str,
     codes: list[str],
+    max_workers: Optional[int] = None,
     **api_params,
 ) -> pd.DataFrame:
-    """Fetch Shenwan daily bars and aggregate them for weekly/monthly tools."""
+    """Fetch Shenwan daily bars and aggregate them for weekly/monthly/quarterly/yearly tools."""
+    results = fan_out(
+        lambda code: pro.sw_daily(**api_params, ts_code=code), codes, max_workers=max_workers, label="sw_code",
+    )
+    raise_if_all_failed(results)
+
     frames: list[pd.DataFrame] = []
-    for code in codes:
-        frame = pro.sw_daily(**api_params, ts_code=code)
-        if frame is not None and not frame.empty:
-            frames.append(frame)
+    failed_codes: dict[str, str] = {}
+    for result in results:
+        if result.error is not None:
+            log_warning("_fetch_sw_quote_data: %s failed: %s", result.item, result.error)
+            failed_codes[result.item] = str(result.error)
+        elif result.value is not None and not result.value.empty:
+            frames.append(result.value)
 
     if not frames:
         return pd.DataFrame()
 
+    truncated = any(len(frame) >= ROW_LIMITS["sw_daily"] for frame in frames)
     daily = pd.concat(frames, ignore_index=True)
     daily = daily.sort_values(["ts_code", "trade_date"]).reset_index(drop=True)
     daily = daily.rename(columns={"pct_change": "pct_chg"})
+    if truncated:
+        daily.attrs["truncated"] = True
     if period == "daily":
+        if failed_codes:
+            daily.attrs["failed_codes"] = failed_codes
         return daily
 
-    daily["trade_date_dt"] = pd.to_datetime(daily["trade_date"], format="%Y%m%d")
-    frequency = "W-SUN" if period == "weekly" else "M"
-    daily["__period"] = daily["trade_date_dt"].dt.to_period(frequency).astype(str)
-    grouped = (
-        daily.groupby(["ts_code", "__period"], sort=False)
-        .agg(
-            trade_date=("trade_date", "max"),
-            name=("name", "first"),
-            open=("open", "first"),
-            high=("high", "max"),
-            low=("low", "min"),
-            close=("close", "last"),
-            vol=("vol", "sum"),
-            amount=("amount", "sum"),
-        )
-        .reset_index()
-    )
-    grouped = grouped.sort_values(["ts_code", "trade_date"])
-    grouped["pre_close"] = grouped.groupby("ts_code")["close"].shift(1)
-    grouped["change"] = grouped["close"] - grouped["pre_close"]
-    grouped["pct_chg"] = grouped["change"] / grouped["pre_close"] * 100
-    return grouped.drop(columns=["__period"])
+    grouped = resample_bars(daily, period, **_resample_range(api_params))
+    if failed_codes:
+        grouped.attrs["failed_codes"] = failed_codes
+    return grouped
+
+
+def validate_adj(adj: str) -> Optional[str]:
+    """Error message for an unsupported adj value, else None."""
+    if adj and adj not in ADJ_MODES:
+        return f"错误：adj 仅支持 {' / '.join(ADJ_MODES)}（留空为不复权）"
+    return None
+
+
+def adjust_quote_data(pro, df: pd.DataFrame, adj: str) -> pd.DataFrame:
+    """Apply qfq/hfq to the stock rows of df; index rows stay unadjusted."""
+    if not adj or df.empty or "ts_code" not in df.columns:
+        return df
+    codes = [code for code in df["ts_code"].unique() if not is_index_code(code)]
+    return adjustment_engine.adjust(pro, df, adj, codes=codes)
+
+
+def _mark_truncated(frame: pd.DataFrame, api_name: str) -> pd.DataFrame:
+    """frame, flagged ``attrs["truncated"]`` if it reached api_name's row cap.
+
+    Responses are newest-first, so a capped one may lack its oldest rows. The
+    flag goes on a shallow copy; the response itself may be a cached frame.
+    """
+    row_limit = ROW_LIMITS.get(api_name)
+    if frame is None or not row_limit or len(frame) < row_limit:
+        return frame
+    frame = frame.copy(deep=False)
+    frame.attrs["truncated"] = True
+    return frame
+
+
+def _resample_range(api_params: dict) -> dict:
+    """Requested range, so partially covered periods are never cached."""
+    return {
+        "start_date": api_params.get("start_date") or "",
+        "end_date": api_params.get("end_date") or api_params.get("trade_date") or "",
+    }
 
 
 def _select_display_rows(df: pd.DataFrame, requested_codes: Iterable[str], per_code_limit: int) -> pd.DataFrame:
@@ -151,46 +317,58 @@ def format_quote_data(df: pd.DataFrame, period: str, requested_codes: Iterable[s
         "daily": ("日线", ""),
         "weekly": ("周线", "周"),
         "monthly": ("月线", "月"),
+        "quarterly": ("季线", "季"),
+        "yearly": ("年线", "年"),
     }
     period_name, value_prefix = labels[period]
     display_df = _select_display_rows(df, requested_codes, per_code_limit=50)
     requested_code_list = list(requested_codes)
 
-    results = [f"--- {period_name}行情数据 (Total: {len(df)}) ---"]
-    for _, row in display_df.iterrows():
-        info = []
-        if pd.notna(row.get("trade_date")):
-            info.append(f"日期:{row['trade_date']}")
-        if pd.notna(row.get("ts_code")):
-            info.append(f"代码:{row['ts_code']}")
-        if pd.notna(row.get("name")):
-            info.append(f"名称:{row['name']}")
-        pre_close_label = {"daily": "昨收", "weekly": "上周收盘", "monthly": "上月收盘"}[period]
-        for field, label in (
-            ("open", "开盘"),
-            ("high", "最高"),
-            ("low", "最低"),
-            ("close", "收盘"),
-            ("pre_close", pre_close_label),
-            ("change", "涨跌额"),
-            ("pct_chg", "涨跌幅"),
-        ):
-            if pd.notna(row.get(field)):
-                info.append(f"{value_prefix}{label}:{row[field]}")
-        if pd.notna(row.get("pct_chg")):
-            info[-1] += "%"
-        if pd.notna(row.get("vol")):
-            info.append(f"{value_prefix}成交量:{row['vol']}手")
-        if pd.notna(row.get("amount")):
-            info.append(f"{value_prefix}成交额:{row['amount']}千元")
-        results.append(" | ".join(info))
+    adj_label = ADJ_MODES.get(df.attrs.get("adj", ""))
+    title = f"{period_name}行情数据 ({adj_label})" if adj_label else f"{period_name}行情数据"
+    results = [f"--- {title} (Total: {len(df)}) ---"]
+    pre_close_label = {
+        "daily": "昨收",
+        "weekly": "上周收盘",
+        "monthly": "上月收盘",
+        "quarterly": "上季收盘",
+        "yearly": "上年收盘",
+    }[period]
+    columns = [
+        Col("trade_date", "日期"),
+        Col("ts_code", "代码"),
+        Col("name", "名称"),
+        Col("open", f"{value_prefix}开盘"),
+        Col("high", f"{value_prefix}最高"),
+        Col("low", f"{value_prefix}最低"),
+        Col("close", f"{value_prefix}收盘"),
+        Col("pre_close", f"{value_prefix}{pre_close_label}"),
+        Col("change", f"{value_prefix}涨跌额"),
+        Col("pct_chg", f"{value_prefix}涨跌幅", "%"),
+        Col("vol", f"{value_prefix}成交量", "手"),
+        Col("amount", f"{value_prefix}成交额", "千元"),
+    ]
+    results.extend(render_rows(display_df, columns, sep=":"))
 
+    failed_codes = df.attrs.get("failed_codes", {})
     if "ts_code" in df.columns:
         found_codes = set(df["ts_code"].dropna())
-        missing_codes = [code for code in requested_code_list if code not in found_codes]
+        missing_codes = [
+            code for code in requested_code_list if code not in found_codes and code not in failed_codes
+        ]
         if missing_codes:
             results.append("未找到代码:" + ",".join(missing_codes))
+    if failed_codes:
+        results.append(
+            "查询失败代码:" + ",".join(f"{code}({str(error)[:80]})" for code, error in failed_codes.items())
+        )
 
     if len(display_df) < len(df):
-        results.append(f"... (共 {len(df)} 条，每个代码仅显示最近 50 条)")
+        note = f"共 {len(df)} 条，每个代码仅显示最近 50 条"
+        # Keep the whole result so every row can be paged without re-querying.
+        full_df = _select_display_rows(df, requested_code_list, per_code_limit=len(df))
+        cursor_id = result_cursors.open(full_df, lambda page: render_rows(page, columns, sep=":"), title)
+        if cursor_id:
+            note += f"；调用 fetch_page(cursor=\"{cursor_id}@0\") 可逐页查看全部"
+        results.append(f"... ({note})")
     return "\n".join(results)
@@ -1,11 +1,15 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
+from utils.formatting import Col, render_rows
+from utils.cross_section import fetch_codes_for_day
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
+from .quote_utils import split_ts_codes
 
 def register_stk_limit_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def stk_limit(ts_code: str = '', trade_date: str = '', start_date: str = '', end_date: str = '') -> str:
+    def stk_limit(ts_code: str = '', trade_date: str = '', start_date: str = '', end_date: str = '', output_format: str = 'text') -> str:
         """
         获取A股每日涨跌停价格 (stk_limit)。
         
@@ -14,8 +18,12 @@ def register_stk_limit_tools(mcp):
             trade_date: 交易日期 (YYYYMMDD, 可选)
             start_date: 开始日期 (YYYYMMDD, 可选)
             end_date: 结束日期 (YYYYMMDD, 可选)
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool stk_limit called with ts_code='{ts_code}', trade_date='{trade_date}', start_date='{start_date}', end_date='{end_date}'...")
+        log_debug("Tool stk_limit called with ts_code='%s', trade_date='%s', start_date='%s', end_date='%s'...", ts_code, trade_date, start_date, end_date)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         params = {
             'ts_code': ts_code,
@@ -26,27 +34,25 @@ def register_stk_limit_tools(mcp):
         # Filter out empty params
         api_params = {k: v for k, v in params.items() if v}
         
-        df = pro.stk_limit(**api_params)
+        df = fetch_codes_for_day(pro, "stk_limit", split_ts_codes(ts_code), api_params)
+        if df is None:
+            df = pro.stk_limit(**api_params)
         
         if df.empty:
             return "未找到涨跌停价格数据"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         results = [f"--- 每日涨跌停价格 (Total: {len(df)}) ---"]
         
-        # Limit display for large results
-        df_limited = df.head(50) 
-        
-        for _, row in df_limited.iterrows():
-             info = []
-             if pd.notna(row.get('trade_date')): info.append(f"日期:{row['trade_date']}")
-             if pd.notna(row.get('ts_code')): info.append(f"代码:{row['ts_code']}")
-             if pd.notna(row.get('pre_close')): info.append(f"昨收:{row['pre_close']}")
-             if pd.notna(row.get('up_limit')): info.append(f"涨停:{row['up_limit']}")
-             if pd.notna(row.get('down_limit')): info.append(f"跌停:{row['down_limit']}")
+        columns = [
+            Col('trade_date', '日期'),
+            Col('ts_code', '代码'),
+            Col('pre_close', '昨收'),
+            Col('up_limit', '涨停'),
+            Col('down_limit', '跌停'),
+        ]
+        results.extend(paginate(df, lambda page: render_rows(page, columns, sep=":"), "每日涨跌停价格"))
 
-             results.append(" | ".join(info))
-            
-        if len(df) > 50:
-            results.append(f"... (共 {len(df)} 条，仅显示前 50 条)")
-            
         return "\n".join(results)
@@ -1,12 +1,14 @@
-import pandas as pd
 from utils.logger import log_debug, handle_exception
 from utils.token_manager import get_pro_client
 from .trade_date_utils import resolve_trade_date
+from utils.formatting import Col, render_rows
+from utils.cursor import paginate
+from utils.structured import is_structured, structured_output, validate_output_format
 
 def register_suspend_d_tools(mcp):
     @mcp.tool()
     @handle_exception
-    def suspend_d(ts_code: str = '', trade_date: str = '', start_date: str = '', end_date: str = '', suspend_type: str = '') -> str:
+    def suspend_d(ts_code: str = '', trade_date: str = '', start_date: str = '', end_date: str = '', suspend_type: str = '', output_format: str = 'text') -> str:
         """
         获取A股每日停复牌信息 (suspend_d)。
         
@@ -16,8 +18,12 @@ def register_suspend_d_tools(mcp):
             start_date: 区间开始日期 (YYYYMMDD)。仅与 end_date 同时传入时按区间查询
             end_date: 区间结束日期 (YYYYMMDD)。单独传入时归一化为当日或之前最近交易日
             suspend_type: 停复牌类型：S-停牌, R-复牌 (可选)
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
         """
-        log_debug(f"Tool suspend_d called with ts_code='{ts_code}', trade_date='{trade_date}', start_date='{start_date}', end_date='{end_date}', suspend_type='{suspend_type}'...")
+        log_debug("Tool suspend_d called with ts_code='%s', trade_date='%s', start_date='%s', end_date='%s', suspend_type='%s'...", ts_code, trade_date, start_date, end_date, suspend_type)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
         pro = get_pro_client()
         
         # Keep true range semantics only when both boundaries are explicit.
@@ -29,7 +35,7 @@ def register_suspend_d_tools(mcp):
                 trade_date = resolved_date
                 start_date = ""
                 end_date = ""
-                log_debug(f"Normalized suspend_d query to trading date: {trade_date}")
+                log_debug("Normalized suspend_d query to trading date: %s", trade_date)
 
         params = {
             'ts_code': ts_code,
@@ -46,21 +52,18 @@ def register_suspend_d_tools(mcp):
         if df.empty:
             return "未找到停复牌信息"
 
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
         results = [f"--- 每日停复牌信息 (Total: {len(df)}) ---"]
         
-        # Limit display for large results
-        df_limited = df.head(50) 
         
-        for _, row in df_limited.iterrows():
-             info = []
-             if pd.notna(row.get('trade_date')): info.append(f"日期:{row['trade_date']}")
-             if pd.notna(row.get('ts_code')): info.append(f"代码:{row['ts_code']}")
-             if pd.notna(row.get('suspend_type')): info.append(f"类型:{row['suspend_type']}")
-             if pd.notna(row.get('suspend_timing')): info.append(f"时间段:{row['suspend_timing']}")
-
-             results.append(" | ".join(info))
-            
-        if len(df) > 50:
-            results.append(f"... (共 {len(df)} 条，仅显示前 50 条)")
+        columns = [
+            Col('trade_date', '日期'),
+            Col('ts_code', '代码'),
+            Col('suspend_type', '类型'),
+            Col('suspend_timing', '时间段'),
+        ]
+        results.extend(paginate(df, lambda page: render_rows(page, columns, sep=":"), "每日停复牌信息"))
             
         return "\n".join(results)
@@ -1,56 +1,17 @@
-from datetime import datetime, timedelta
-
-from utils.logger import log_debug
+from utils.trade_calendar import trading_calendar
 
 
 def resolve_trade_date(pro, start_date: str = "", end_date: str = "") -> str:
-    """Resolve one trading day, preferring fresh index data over trade_cal."""
-    if end_date:
-        anchor = datetime.strptime(end_date, "%Y%m%d")
-        start_check = (anchor - timedelta(days=20)).strftime("%Y%m%d")
-        end_check = end_date
-        prefer_previous = True
-    elif start_date:
-        anchor = datetime.strptime(start_date, "%Y%m%d")
-        start_check = start_date
-        end_check = (anchor + timedelta(days=20)).strftime("%Y%m%d")
-        prefer_previous = False
-    else:
-        # With no user-provided boundary, "latest" should mean the latest
-        # completed trading day rather than a possibly unpublished same-day bar.
-        anchor = datetime.now() - timedelta(days=1)
-        start_check = (anchor - timedelta(days=20)).strftime("%Y%m%d")
-        end_check = anchor.strftime("%Y%m%d")
-        prefer_previous = True
-
-    # TinyShare's trade_cal can lag behind its quote data. The Shanghai
-    # Composite index is a reliable A-share trading-day reference here.
-    dates = []
-    try:
-        df_index = pro.index_daily(
-            ts_code="000001.SH",
-            start_date=start_check,
-            end_date=end_check,
-        )
-        if df_index is not None and not df_index.empty:
-            dates = df_index["trade_date"].dropna().tolist()
-    except Exception as exc:
-        log_debug(f"Failed to resolve trade date from index_daily: {exc}")
+    """Resolve one trading day from the in-process trading calendar.
 
-    if not dates:
-        df_cal = pro.trade_cal(
-            start_date=start_check,
-            end_date=end_check,
-            is_open="1",
-        )
-        if df_cal is not None and not df_cal.empty:
-            dates = df_cal["cal_date"].dropna().tolist()
-
-    if not dates:
-        return ""
-
-    if prefer_previous:
-        eligible = [date for date in dates if date <= end_check]
-        return max(eligible) if eligible else ""
-    eligible = [date for date in dates if date >= start_check]
-    return min(eligible) if eligible else ""
+    ``pro`` is only used when the calendar still has to be loaded, or
+    refreshed after a market close; the lookup itself needs no network.
+    """
+    trading_calendar.ensure_loaded(pro)
+    if end_date:
+        return trading_calendar.latest(before=end_date)
+    if start_date:
+        return trading_calendar.next(start_date)
+    # With no user-provided boundary, "latest" should mean the latest
+    # completed trading day rather than a possibly unpublished same-day bar.
+    return trading_calendar.latest_completed()
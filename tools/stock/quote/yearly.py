@@ -0,0 +1,49 @@
+from utils.logger import log_debug, handle_exception
+from utils.token_manager import get_pro_client
+from utils.structured import is_structured, structured_output, validate_output_format
+from .quote_utils import UNSUPPORTED_RESAMPLE_NOTE, fetch_quote_data, format_quote_data, split_ts_codes
+
+def register_yearly_tools(mcp):
+    @mcp.tool()
+    @handle_exception
+    def yearly(ts_code: str, start_date: str = '', end_date: str = '', output_format: str = 'text') -> str:
+        """
+        获取指数年线行情数据 (yearly)，由日线聚合而成，支持申万行业指数(801xxx.SI)与中证/沪深指数。
+
+        参数:
+            ts_code: 指数代码，支持逗号分隔 (必填, e.g., '000300.SH,801080.SI')
+            start_date: 开始日期 (YYYYMMDD, 可选, e.g., '20100101')
+            end_date: 结束日期 (YYYYMMDD, 可选)
+            output_format: 输出格式 (text 文本 / json 列式JSON / arrow Arrow IPC(base64) / auto 按行数自动选择; 默认 text, 可选)
+        """
+        log_debug("Tool yearly called with ts_code='%s', start_date='%s', end_date='%s'...", ts_code, start_date, end_date)
+        format_error = validate_output_format(output_format)
+        if format_error:
+            return format_error
+        requested_codes = split_ts_codes(ts_code)
+        if not requested_codes:
+            return "错误：请提供指数代码 (ts_code)"
+
+        pro = get_pro_client()
+        params = {
+            'start_date': start_date,
+            'end_date': end_date
+        }
+        api_params = {k: v for k, v in params.items() if v}
+
+        df = fetch_quote_data(
+            pro,
+            stock_api="index_daily",
+            index_api="index_daily",
+            period="yearly",
+            ts_code=ts_code,
+            **api_params,
+        )
+
+        if df.empty:
+            return f"未找到年线行情数据（{UNSUPPORTED_RESAMPLE_NOTE}）"
+
+        if is_structured(output_format):
+            return structured_output(df, output_format)
+
+        return format_quote_data(df, "yearly", requested_codes)
@@ -0,0 +1,213 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .cache import CST
+from .fanout import fan_out, raise_if_all_failed
+from .logger import log_warning
+
+ADJ_MODES = {"qfq": "前复权", "hfq": "后复权"}
+PRICE_COLUMNS = ("open", "high", "low", "close", "pre_close")
+# Upstream per-call row caps of the factor endpoints; longer histories are paged.
+FACTOR_PAGE_SIZES = {"adj_factor": 6000, "fund_adj": 2000}
+MAX_PAGES = 20
+# A code's newest factors are re-checked after this many seconds, since a
+# factor for the next trading day is published before the open.
+FACTOR_REFRESH_SECONDS = 600
+# (factor endpoint, ts_code) histories kept; least recently used dropped first.
+MAX_SERIES = 4096
+
+
+def _day_after(date: str) -> str:
+    return (datetime.strptime(date, "%Y%m%d") + timedelta(days=1)).strftime("%Y%m%d")
+
+
+def _day_before(date: str) -> str:
+    return (datetime.strptime(date, "%Y%m%d") - timedelta(days=1)).strftime("%Y%m%d")
+
+
+class FactorHistory:
+    """Sorted adjustment factors of one code from ``start`` through the newest."""
+
+    __slots__ = ("dates", "factors", "start", "checked_at")
+
+    def __init__(self, dates: np.ndarray, factors: np.ndarray, start: str, checked_at: float):
+        self.dates = dates
+        self.factors = factors
+        self.start = start
+        self.checked_at = checked_at
+
+    @property
+    def latest(self) -> float:
+        return float(self.factors[-1]) if len(self.factors) else np.nan
+
+    def at(self, trade_dates: np.ndarray) -> np.ndarray:
+        """Factor in force on each date (the last one published on or before it)."""
+        if not len(self.dates):
+            return np.full(len(trade_dates), np.nan)
+        positions = np.searchsorted(self.dates, trade_dates, side="right") - 1
+        return self.factors[np.clip(positions, 0, None)]
+
+
+class AdjustmentEngine:
+    """Forward (qfq) and backward (hfq) price adjustment from adj factors.
+
+    Factor histories are cached per code and only extended: a request for
+    earlier dates fetches the missing head, and after ``refresh_after``
+    seconds only the tail after the newest known factor is fetched again.
+    Backward-adjusted prices (price * factor) never change once computed;
+    forward-adjusted prices are those divided by the code's latest factor,
+    so a new factor only rescales by one scalar instead of re-deriving the
+    series.
+    """
+
+    def __init__(
+        self,
+        refresh_after: float = FACTOR_REFRESH_SECONDS,
+        max_series: int = MAX_SERIES,
+        clock: Callable[[], float] = time.monotonic,
+        today: Callable[[], str] = lambda: datetime.now(CST).strftime("%Y%m%d"),
+    ):
+        self.refresh_after = refresh_after
+        self.max_series = max_series
+        self._clock = clock
+        self._today = today
+        self._histories: "OrderedDict[Tuple[str, str], FactorHistory]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.factor_fetches = 0
+
+    def factors(self, pro, factor_api: str, ts_code: str, start_date: str) -> FactorHistory:
+        """Factors of ts_code from start_date through the newest, fetching only what is missing."""
+        key = (factor_api, ts_code)
+        with self._lock:
+            history = self._histories.get(key)
+            if history is not None:
+                self._histories.move_to_end(key)
+        now = self._clock()
+        if history is None:
+            frame = self._fetch(pro, factor_api, ts_code, start_date, "")
+            history = self._build(frame, start_date, now)
+        else:
+            parts = [(history.dates, history.factors)]
+            start = history.start
+            if start_date < start:
+                head = self._fetch(pro, factor_api, ts_code, start_date, _day_before(start))
+                parts.insert(0, self._arrays(head))
+                start = start_date
+            checked_at = history.checked_at
+            if now - checked_at >= self.refresh_after:
+                tail_start = _day_after(history.dates[-1]) if len(history.dates) else start
+                if tail_start <= self._today():
+                    parts.append(self._arrays(self._fetch(pro, factor_api, ts_code, tail_start, "")))
+                checked_at = now
+            if len(parts) > 1 or checked_at != history.checked_at:
+                dates = np.concatenate([dates for dates, _ in parts])
+                factors = np.concatenate([factors for _, factors in parts])
+                history = FactorHistory(dates, factors, start, checked_at)
+        with self._lock:
+            self._histories[key] = history
+            self._histories.move_to_end(key)
+            while len(self._histories) > self.max_series:
+                self._histories.popitem(last=False)
+        return history
+
+    def _fetch(self, pro, factor_api: str, ts_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+        page_size = FACTOR_PAGE_SIZES.get(factor_api, 2000)
+        params = {"ts_code": ts_code, "start_date": start_date, "end_date": end_date, "fields": "trade_date,adj_factor"}
+        params = {key: value for key, value in params.items() if value}
+        frames = []
+        for page in range(MAX_PAGES):
+            frame = getattr(pro, factor_api)(**params, limit=page_size, offset=page * page_size)
+            self.factor_fetches += 1
+            if frame is None or frame.empty:
+                break
+            frames.append(frame)
+            if len(frame) < page_size:
+                break
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["trade_date", "adj_factor"])
+
+    @staticmethod
+    def _arrays(frame: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        frame = frame.dropna(subset=["adj_factor"]).drop_duplicates("trade_date").sort_values("trade_date")
+        return frame["trade_date"].astype(str).to_numpy(), frame["adj_factor"].to_numpy(dtype=float)
+
+    def _build(self, frame: pd.DataFrame, start: str, now: float) -> FactorHistory:
+        dates, factors = self._arrays(frame)
+        return FactorHistory(dates, factors, start, now)
+
+    def adjust(
+        self,
+        pro,
+        bars: pd.DataFrame,
+        how: str,
+        factor_api: str = "adj_factor",
+        codes: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Return bars with PRICE_COLUMNS adjusted (qfq or hfq) for ``codes``.
+
+        Rows of other codes are left as they are. Codes whose factors cannot
+        be fetched are dropped and listed in ``attrs["failed_codes"]``; if no
+        row is left, the first fetch error (or the failed codes) is raised.
+        """
+        if how not in ADJ_MODES:
+            raise ValueError(f"adj must be one of {', '.join(ADJ_MODES)}")
+        if bars is None or bars.empty or "ts_code" not in bars.columns:
+            return bars
+        present = set(bars["ts_code"].unique())
+        targets = [code for code in (codes if codes is not None else present) if code in present]
+        dates = bars["trade_date"].astype(str)
+        starts = dates.groupby(bars["ts_code"]).min().to_dict()
+        results = fan_out(
+            lambda code: self.factors(pro, factor_api, code, starts[code]), targets, max_workers=max_workers,
+            label="adj_factors",
+        )
+
+        adjusted = bars.copy()
+        failed_codes: Dict[str, str] = dict(bars.attrs.get("failed_codes", {}))
+        scale = np.ones(len(adjusted))
+        codes_column = adjusted["ts_code"].to_numpy()
+        date_values = dates.to_numpy()
+        for result in results:
+            rows = np.flatnonzero(codes_column == result.item)
+            if result.error is not None:
+                log_warning("AdjustmentEngine: factors for %s failed: %s", result.item, result.error)
+                failed_codes[result.item] = f"复权因子获取失败: {result.error}"
+                scale[rows] = np.nan
+                continue
+            history = result.value
+            if not len(history.dates):
+                failed_codes[result.item] = "无复权因子数据"
+                scale[rows] = np.nan
+                continue
+            factors = history.at(date_values[rows])
+            scale[rows] = factors if how == "hfq" else factors / history.latest
+
+        keep = ~np.isnan(scale)
+        if not keep.any():
+            raise_if_all_failed(results)
+            raise ValueError("复权失败: " + ",".join(f"{code}({reason})" for code, reason in failed_codes.items()))
+        for column in PRICE_COLUMNS:
+            if column in adjusted.columns:
+                adjusted[column] = pd.to_numeric(adjusted[column], errors="coerce") * scale
+        if {"close", "pre_close", "change"} <= set(adjusted.columns):
+            adjusted["change"] = adjusted["close"] - adjusted["pre_close"]
+        adjusted = adjusted[keep].reset_index(drop=True)
+        adjusted.attrs = dict(bars.attrs)
+        adjusted.attrs["adj"] = how
+        if failed_codes:
+            adjusted.attrs["failed_codes"] = failed_codes
+        return adjusted
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"series": len(self._histories), "factor_fetches": self.factor_fetches}
+
+
+# Process-wide engine shared by the quote and fund tools.
+adjustment_engine = AdjustmentEngine()
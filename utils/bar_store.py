@@ -0,0 +1,278 @@
+import importlib.util
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .cache import CST
+from .logger import log_debug
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Location of the Parquet store. Set MINISHARE_MCP_STORE_DIR to another
+# directory to move it, or to an empty string to turn the store off.
+DEFAULT_STORE_DIR = Path.home() / ".minishare_mcp" / "store"
+
+# Endpoints whose published bars never change, with the column that dates a
+# row and, for single-day lookups, the parameter of the same name.
+STORE_ENDPOINTS = {
+    "daily": "trade_date",
+    "index_daily": "trade_date",
+    "weekly": "trade_date",
+    "monthly": "trade_date",
+    "sw_daily": "trade_date",
+    "fund_daily": "trade_date",
+    "fund_nav": "nav_date",
+}
+# Days before today that are considered final; NAVs are published late.
+SETTLE_LAG_DAYS = {"fund_nav": 2}
+# Per-call row caps (conservative). A gap fetch that hits one is split up so a
+# truncated response is never recorded as complete.
+ROW_LIMITS = {"daily": 6000, "index_daily": 8000, "weekly": 6000, "monthly": 4500, "sw_daily": 4000, "fund_daily": 2000, "fund_nav": 2000}
+# Calls with any other parameter (limit, offset, market, ...) bypass the store.
+_STORE_PARAMS = {"ts_code", "start_date", "end_date", "fields", "trade_date", "nav_date"}
+_DATE_RE = re.compile(r"^\d{8}$")
+
+Range = Tuple[str, str]
+
+
+def _shift(date: str, days: int) -> str:
+    return (datetime.strptime(date, "%Y%m%d") + timedelta(days=days)).strftime("%Y%m%d")
+
+
+def _today() -> str:
+    return datetime.now(CST).strftime("%Y%m%d")
+
+
+def merge_ranges(ranges: List[Range]) -> List[Range]:
+    """Sort and merge inclusive YYYYMMDD ranges, joining adjacent days."""
+    merged: List[List[str]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= _shift(merged[-1][1], 1):
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def missing_ranges(covered: List[Range], start: str, end: str) -> List[Range]:
+    """Parts of [start, end] not covered by the (merged) covered ranges."""
+    gaps = []
+    cursor = start
+    for cov_start, cov_end in covered:
+        if cov_end < cursor:
+            continue
+        if cov_start > end:
+            break
+        if cov_start > cursor:
+            gaps.append((cursor, _shift(cov_start, -1)))
+        cursor = max(cursor, _shift(cov_end, 1))
+        if cursor > end:
+            return gaps
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Exclusive lock shared by threads and by the stock/fund server processes."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _atomic_write(path: Path, write: Callable[[Path], None]):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+class BarStore:
+    """On-disk Parquet store of settled historical bars.
+
+    Layout is ``<root>/<endpoint>/<ts_code>/<year>.parquet`` plus a
+    ``coverage.json`` listing the date ranges already fetched for that code,
+    so days without bars (holidays, suspensions) are not asked for again.
+    Reads and writes of one code directory hold a file lock, which makes the
+    store safe to share between server processes.
+    """
+
+    def __init__(self, root: Path, today: Callable[[], str] = _today):
+        self.root = Path(root)
+        self._today = today
+
+    def supports(self, endpoint: str, params: Dict[str, Any]) -> bool:
+        date_col = STORE_ENDPOINTS.get(endpoint)
+        if date_col is None or not params.get("ts_code") or set(params) - _STORE_PARAMS:
+            return False
+        start = params.get(date_col) or params.get("start_date")
+        end = params.get(date_col) or params.get("end_date") or self._today()
+        return all(isinstance(value, str) and _DATE_RE.match(value) for value in (start, end)) and start <= end
+
+    def fetch(self, endpoint: str, func: Callable[..., pd.DataFrame], params: Dict[str, Any]) -> pd.DataFrame:
+        """Serve endpoint(**params) from disk, fetching only uncovered ranges.
+
+        Days after the settle horizon are always fetched live and not stored.
+        """
+        date_col = STORE_ENDPOINTS[endpoint]
+        codes = list(dict.fromkeys(code.strip() for code in params["ts_code"].split(",") if code.strip()))
+        start = params.get(date_col) or params["start_date"]
+        end = params.get(date_col) or params.get("end_date") or self._today()
+        fields = params.get("fields")
+        settled = _shift(self._today(), -SETTLE_LAG_DAYS.get(endpoint, 1))
+
+        frames = []
+        stored_end = min(end, settled)
+        if start <= stored_end:
+            self._fill(endpoint, func, codes, start, stored_end)
+            frames.extend(self._read(endpoint, code, start, stored_end) for code in codes)
+        if end > settled:
+            live_start = max(start, _shift(settled, 1))
+            frames.append(func(ts_code=",".join(codes), start_date=live_start, end_date=end))
+
+        frames = [frame for frame in frames if frame is not None and not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        df = df.sort_values(date_col, ascending=False, kind="stable").reset_index(drop=True)
+        if fields:
+            columns = [field.strip() for field in fields.split(",") if field.strip()]
+            if any(column not in df.columns for column in columns):
+                log_debug("BarStore: %s fields %s not stored, fetching upstream", endpoint, fields)
+                return func(**params)
+            df = df[columns]
+        return df
+
+    def _code_dir(self, endpoint: str, code: str) -> Path:
+        return self.root / endpoint / re.sub(r"[^A-Za-z0-9._-]", "_", code)
+
+    def _coverage(self, code_dir: Path) -> List[Range]:
+        try:
+            return [tuple(item) for item in json.loads((code_dir / "coverage.json").read_text())]
+        except (OSError, ValueError):
+            return []
+
+    def _fill(self, endpoint: str, func: Callable[..., pd.DataFrame], codes: List[str], start: str, end: str):
+        """Fetch every uncovered range, batching codes that miss the same ranges."""
+        groups: Dict[Tuple[Range, ...], List[str]] = {}
+        for code in codes:
+            code_dir = self._code_dir(endpoint, code)
+            with _file_lock(code_dir / ".lock"):
+                gaps = missing_ranges(self._coverage(code_dir), start, end)
+            if gaps:
+                groups.setdefault(tuple(gaps), []).append(code)
+
+        for gaps, group in groups.items():
+            for gap_start, gap_end in gaps:
+                frame = self._fetch_complete(endpoint, func, group, gap_start, gap_end)
+                for code in group:
+                    self._write(endpoint, code, frame, gap_start, gap_end)
+
+    def _fetch_complete(self, endpoint, func, codes: List[str], start: str, end: str) -> pd.DataFrame:
+        """Fetch all default columns for codes/range, splitting at the row cap."""
+        log_debug("BarStore: fetching %s %s %s-%s", endpoint, codes, start, end)
+        frame = func(ts_code=",".join(codes), start_date=start, end_date=end)
+        if frame is None:
+            return pd.DataFrame()
+        if len(frame) < ROW_LIMITS.get(endpoint, 2000):
+            return frame
+        if len(codes) > 1:
+            middle = len(codes) // 2
+            parts = [
+                self._fetch_complete(endpoint, func, codes[:middle], start, end),
+                self._fetch_complete(endpoint, func, codes[middle:], start, end),
+            ]
+        else:
+            days = (datetime.strptime(end, "%Y%m%d") - datetime.strptime(start, "%Y%m%d")).days
+            if days < 1:
+                return frame
+            middle = _shift(start, days // 2)
+            parts = [
+                self._fetch_complete(endpoint, func, codes, start, middle),
+                self._fetch_complete(endpoint, func, codes, _shift(middle, 1), end),
+            ]
+        parts = [part for part in parts if not part.empty]
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+    def _write(self, endpoint: str, code: str, frame: pd.DataFrame, start: str, end: str):
+        date_col = STORE_ENDPOINTS[endpoint]
+        code_dir = self._code_dir(endpoint, code)
+        rows = frame
+        if not frame.empty and "ts_code" in frame.columns:
+            rows = frame[frame["ts_code"] == code]
+        if not rows.empty and date_col not in rows.columns:
+            log_debug("BarStore: %s response has no %s, not storing", endpoint, date_col)
+            return
+
+        with _file_lock(code_dir / ".lock"):
+            if not rows.empty:
+                for year, part in rows.groupby(rows[date_col].astype(str).str[:4]):
+                    path = code_dir / f"{year}.parquet"
+                    if path.exists():
+                        # A re-fetched day replaces the stored row, even if upstream revised its values
+                        part = pd.concat([pd.read_parquet(path), part], ignore_index=True)
+                        keys = [date_col]
+                        if "ts_code" in part.columns and part["ts_code"].nunique() > 1:
+                            keys.append("ts_code")
+                        part = part.drop_duplicates(subset=keys, keep="last")
+                    part = part.sort_values(date_col, ascending=False).reset_index(drop=True)
+                    _atomic_write(path, lambda tmp, part=part: part.to_parquet(tmp, index=False))
+            # Coverage is written last, so it never claims rows that are not on disk.
+            coverage = merge_ranges(self._coverage(code_dir) + [(start, end)])
+            _atomic_write(code_dir / "coverage.json", lambda tmp: tmp.write_text(json.dumps(coverage)))
+
+    def _read(self, endpoint: str, code: str, start: str, end: str) -> pd.DataFrame:
+        date_col = STORE_ENDPOINTS[endpoint]
+        code_dir = self._code_dir(endpoint, code)
+        frames = []
+        with _file_lock(code_dir / ".lock"):
+            for year in range(int(start[:4]), int(end[:4]) + 1):
+                path = code_dir / f"{year}.parquet"
+                if path.exists():
+                    frames.append(pd.read_parquet(path))
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        dates = df[date_col].astype(str)
+        return df[(dates >= start) & (dates <= end)]
+
+
+def _default_store() -> Optional[BarStore]:
+    root = os.getenv("MINISHARE_MCP_STORE_DIR")
+    if root == "":
+        return None
+    if importlib.util.find_spec("pyarrow") is None and importlib.util.find_spec("fastparquet") is None:
+        log_debug("BarStore disabled: no Parquet engine (pyarrow) installed.")
+        return None
+    return BarStore(Path(root) if root else DEFAULT_STORE_DIR)
+
+
+# Process-wide store used by UpstreamClient; None when disabled.
+bar_store = _default_store()
@@ -0,0 +1,240 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+# Memory budget for cached upstream responses; 0 disables the cache.
+DEFAULT_CACHE_MB = float(os.getenv("MINISHARE_MCP_CACHE_MB", "256"))
+
+CST = timezone(timedelta(hours=8))
+# Upstream EOD data is complete some time after the 15:00 close.
+MARKET_CLOSE = (15, 30)
+
+# Seconds each data class may be served from cache. "eod" is computed from the
+# clock instead (see ttl_for).
+DATA_CLASS_TTLS = {
+    "reference": 6 * 3600,
+    "finance": 3600,
+    "history": 12 * 3600,
+    "intraday": 60,
+    "corpus": 300,
+    "default": 60,
+}
+# Seconds an expired response is kept for serving while its endpoint's
+# circuit is open (see utils.circuit); it still counts against the budget.
+STALE_SECONDS = float(os.getenv("MINISHARE_MCP_STALE_HOURS", "24")) * 3600
+# Empty frames are cached briefly: data may simply not be published yet.
+EMPTY_TTL = 300
+
+ENDPOINT_DATA_CLASSES = {
+    "reference": (
+        "stock_basic", "trade_cal", "stock_company", "namechange", "new_share",
+        "fund_basic", "fund_company", "fund_manager", "index_basic", "index_classify",
+        "index_member_all", "ths_index", "ths_member", "hs_const", "concept", "concept_detail",
+        "etf_basic", "etf_index", "bak_basic", "bse_mapping", "stock_hsgt", "stock_st", "st",
+        "stk_managers", "stk_rewards",
+    ),
+    "finance": (
+        "income", "balancesheet", "cashflow", "fina_indicator", "fina_mainbz", "fina_audit",
+        "forecast", "express", "dividend", "disclosure_date", "top10_holders",
+        "top10_floatholders", "stk_holdernumber", "fund_portfolio", "fund_div",
+    ),
+    "eod": (
+        "daily", "weekly", "monthly", "pro_bar", "adj_factor", "daily_basic", "stk_limit",
+        "suspend_d", "moneyflow", "moneyflow_hsgt", "hsgt_top10", "ggt_top10", "ggt_daily",
+        "top_list", "top_inst", "margin", "margin_detail", "block_trade", "index_daily",
+        "index_weekly", "index_monthly", "index_dailybasic", "sw_daily", "ths_daily",
+        "fund_daily", "fund_adj", "fund_nav", "fund_share", "etf_share_size", "fund_factor_pro",
+        "cyq_perf", "stk_factor_pro", "ggt_monthly",
+    ),
+    "intraday": ("stk_mins", "rt_k", "realtime_quote"),
+    "corpus": (
+        "news", "major_news", "cctv_news", "anns_d", "irm_qa_sh", "irm_qa_sz",
+        "research_report", "npr",
+    ),
+}
+_ENDPOINT_CLASS = {
+    endpoint: data_class for data_class, endpoints in ENDPOINT_DATA_CLASSES.items() for endpoint in endpoints
+}
+
+
+def data_class_for(endpoint: str) -> str:
+    return _ENDPOINT_CLASS.get(endpoint, "default")
+
+
+def normalize_params(params: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    """Canonical, hashable form of call kwargs.
+
+    None/blank values are dropped (the SDK treats them as absent), strings are
+    stripped, and whitespace inside ``fields`` is removed while keeping the
+    column order, since that order shapes the returned frame.
+    """
+    items = []
+    for key, value in params.items():
+        if isinstance(value, str):
+            value = value.strip()
+            if key == "fields":
+                value = ",".join(part.strip() for part in value.split(",") if part.strip())
+        if value is None or value == "":
+            continue
+        if isinstance(value, (list, tuple)):
+            value = tuple(value)
+        items.append((key, value))
+    return tuple(sorted(items))
+
+
+def next_close(now: datetime) -> datetime:
+    """Next weekday MARKET_CLOSE in China time, strictly after now."""
+    now = now.astimezone(CST)
+    close = now.replace(hour=MARKET_CLOSE[0], minute=MARKET_CLOSE[1], second=0, microsecond=0)
+    if close <= now:
+        close += timedelta(days=1)
+    while close.weekday() >= 5:
+        close += timedelta(days=1)
+    return close
+
+
+def last_close(now: datetime) -> datetime:
+    """Most recent weekday MARKET_CLOSE at or before now (China time)."""
+    now = now.astimezone(CST)
+    close = now.replace(hour=MARKET_CLOSE[0], minute=MARKET_CLOSE[1], second=0, microsecond=0)
+    if close > now:
+        close -= timedelta(days=1)
+    while close.weekday() >= 5:
+        close -= timedelta(days=1)
+    return close
+
+
+def ttl_for(
+    endpoint: str,
+    params: Dict[str, Any],
+    now: Optional[datetime] = None,
+    published: Optional[Callable[[str], bool]] = None,
+) -> float:
+    """Seconds a response for endpoint/params may be served from cache.
+
+    ``published(day)`` tells whether upstream has published day's EOD data
+    (see TradingCalendar.published); without it that is taken as unknown.
+    """
+    data_class = data_class_for(endpoint)
+    if data_class != "eod":
+        return DATA_CLASS_TTLS[data_class]
+    now = (now or datetime.now(CST)).astimezone(CST)
+    last_date = params.get("trade_date") or params.get("end_date")
+    last_date = last_date.strip() if isinstance(last_date, str) else ""
+    # A response covering the latest close before its bars are published
+    # lacks them; keep it only briefly.
+    close_day = last_close(now).strftime("%Y%m%d")
+    if (not last_date or last_date >= close_day) and not (published is not None and published(close_day)):
+        return DATA_CLASS_TTLS["default"]
+    # A window that ends before today can no longer change.
+    if last_date and last_date < now.strftime("%Y%m%d"):
+        return DATA_CLASS_TTLS["history"]
+    return max((next_close(now) - now).total_seconds(), DATA_CLASS_TTLS["default"])
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    try:
+        return int(df.memory_usage(index=True, deep=True).sum())
+    except Exception:
+        return 0
+
+
+class _Entry(NamedTuple):
+    value: Any
+    expires_at: float
+    nbytes: int
+
+
+class ResponseCache:
+    """Thread-safe LRU of upstream responses with per-entry expiry.
+
+    The total size of stored values is kept under ``max_bytes`` by evicting
+    least recently used entries; a single value larger than the budget is not
+    stored at all. With ``stale_for`` set, expired entries stay readable
+    through ``get_stale()`` for that many more seconds.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, clock=time.monotonic, stale_for: float = 0):
+        if max_bytes is None:
+            max_bytes = int(DEFAULT_CACHE_MB * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self.stale_for = stale_for
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: Hashable, default: Any = None, record: bool = True) -> Any:
+        """The live value for key; ``record=False`` leaves the hit/miss counters alone."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= self._clock():
+                if entry.expires_at + self.stale_for <= self._clock():
+                    self._drop(key)
+                    self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += record
+                return default
+            self._entries.move_to_end(key)
+            self.hits += record
+            return entry.value
+
+    def get_stale(self, key: Hashable, default: Any = None) -> Any:
+        """The stored value even if expired, as long as it is within stale_for."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at + self.stale_for <= self._clock():
+                return default
+            self.stale_hits += 1
+            return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: float, nbytes: int = 0):
+        if not self.enabled or ttl <= 0 or nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(value, self._clock() + ttl, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key: Hashable):
+        self._bytes -= self._entries.pop(key).nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "stale_hits": self.stale_hits,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+# Process-wide cache shared by every pooled upstream client.
+response_cache = ResponseCache(stale_for=STALE_SECONDS)
@@ -0,0 +1,191 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from .logger import log_info, log_warning
+from .retry import is_transient
+
+# Seconds of recent upstream outcomes an endpoint's error rate is computed over.
+CIRCUIT_WINDOW = float(os.getenv("MINISHARE_MCP_CIRCUIT_WINDOW", "60"))
+# Failed share of those outcomes that opens the circuit...
+CIRCUIT_ERROR_RATE = float(os.getenv("MINISHARE_MCP_CIRCUIT_ERROR_RATE", "0.5"))
+# ...once the window holds at least this many requests.
+CIRCUIT_MIN_CALLS = int(os.getenv("MINISHARE_MCP_CIRCUIT_MIN_CALLS", "5"))
+# Seconds an open circuit fails fast before letting one probe request through.
+CIRCUIT_COOLDOWN = float(os.getenv("MINISHARE_MCP_CIRCUIT_COOLDOWN", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+STATE_LABELS = {CLOSED: "正常", OPEN: "熔断", HALF_OPEN: "探测中"}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an endpoint whose circuit is open."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"上游接口 {endpoint} 连续失败，已暂停请求，约 {max(1, round(retry_in))} 秒后恢复")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for one upstream endpoint.
+
+    Closed: requests pass and their outcomes are kept for ``window``
+    seconds; when at least ``min_calls`` of them are recorded and the failed
+    share reaches ``error_rate`` the circuit opens. Open: requests fail at
+    once until ``cooldown`` has passed. Half-open: a single probe request is
+    let through; its success closes the circuit, its failure opens it again.
+    Only transient failures count; an upstream answer rejecting bad
+    parameters shows the backend is up.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        window: float = CIRCUIT_WINDOW,
+        error_rate: float = CIRCUIT_ERROR_RATE,
+        min_calls: int = CIRCUIT_MIN_CALLS,
+        cooldown: float = CIRCUIT_COOLDOWN,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.endpoint = endpoint
+        self.window = window
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.state = CLOSED
+        self.opened = 0
+        self.rejected = 0
+
+    def call(self, func: Callable[[], Any]) -> Any:
+        self._before()
+        try:
+            result = func()
+        except Exception as exc:
+            self._record(not is_transient(exc, self.endpoint))
+            raise
+        except BaseException:
+            self._release_probe()
+            raise
+        self._record(True)
+        return result
+
+    def _before(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            retry_in = self._opened_at + self.cooldown - self._clock()
+            if self.state == OPEN and retry_in <= 0:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            self.rejected += 1
+        raise CircuitOpenError(self.endpoint, max(retry_in, 0))
+
+    def _record(self, ok: bool):
+        with self._lock:
+            now = self._clock()
+            if self.state != CLOSED:
+                self._probing = False
+                if ok:
+                    self.state = CLOSED
+                    self._reset()
+                    log_info("Circuit for %s closed after a successful probe", self.endpoint)
+                else:
+                    self._open(now)
+                return
+            self._outcomes.append((now, ok))
+            self._failures += not ok
+            self._prune(now)
+            calls = len(self._outcomes)
+            if calls >= self.min_calls and self._failures / calls >= self.error_rate:
+                self._open(now)
+
+    def _release_probe(self):
+        with self._lock:
+            self._probing = False
+
+    def _open(self, now: float):
+        self.state = OPEN
+        self._opened_at = now
+        self.opened += 1
+        self._reset()
+        log_warning("Circuit for %s opened; failing fast for %.0fs", self.endpoint, self.cooldown)
+
+    def _reset(self):
+        self._outcomes.clear()
+        self._failures = 0
+
+    def _prune(self, now: float):
+        while self._outcomes and self._outcomes[0][0] <= now - self.window:
+            self._failures -= not self._outcomes.popleft()[1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = self._clock()
+            if self.state == CLOSED:
+                self._prune(now)
+            calls = len(self._outcomes)
+            return {
+                "state": self.state,
+                "calls": calls,
+                "error_rate": self._failures / calls if calls else 0.0,
+                "retry_in": max(self._opened_at + self.cooldown - now, 0) if self.state == OPEN else 0,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+class CircuitBreakers:
+    """One CircuitBreaker per upstream endpoint, created on first use."""
+
+    def __init__(self, factory: Callable[[str], CircuitBreaker] = CircuitBreaker):
+        self._factory = factory
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = self._factory(endpoint)
+            return breaker
+
+    def call(self, endpoint: str, func: Callable[[], Any]) -> Any:
+        return self.get(endpoint).call(func)
+
+    def clear(self):
+        with self._lock:
+            self._breakers.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.endpoint: breaker.snapshot() for breaker in breakers}
+
+
+def circuit_summary(circuits: Optional[CircuitBreakers] = None) -> str:
+    """One-line circuit breaker summary for check_token_status."""
+    tripped = [
+        f"{endpoint} {STATE_LABELS[stats['state']]}"
+        + (f" (约 {max(1, round(stats['retry_in']))} 秒后探测)" if stats["state"] == OPEN else "")
+        for endpoint, stats in sorted((circuits or upstream_circuits).stats().items())
+        if stats["state"] != CLOSED
+    ]
+    return "上游熔断：" + ("、".join(tripped) if tripped else "无")
+
+
+# Process-wide breakers used by UpstreamClient.
+upstream_circuits = CircuitBreakers()
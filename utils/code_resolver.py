@@ -0,0 +1,159 @@
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from .logger import log_debug
+from .security_master import LOADERS, SecurityMaster, security_master
+
+# Already a ts_code (e.g. 600519.SH, 00700.HK, 110011.OF); matched case-insensitively.
+_CODE_RE = re.compile(r"^[0-9A-Z]{1,10}\.[A-Z]{2,4}$", re.IGNORECASE)
+# Prefix matches need at least this many characters (Chinese / Latin), and
+# at most PREFIX_CANDIDATES sorted keys sharing the prefix are ranked.
+MIN_PREFIX_LENGTH = 2
+MIN_ASCII_PREFIX_LENGTH = 3
+PREFIX_CANDIDATES = 50
+# Fuzzy candidates share at least one character bigram with the input and
+# are scored by Dice similarity over characters and bigrams together. Fuzzy
+# matching is only applied to Chinese input; short pinyin is too ambiguous.
+MIN_SIMILARITY = 0.5
+
+_ASSET_PRIORITY = {asset_type: rank for rank, asset_type in enumerate(LOADERS)}
+Rank = Tuple[int, int, int]
+
+
+def normalize(text: str) -> str:
+    """Case-, width- and whitespace-insensitive search key."""
+    return re.sub(r"\s+", "", unicodedata.normalize("NFKC", text)).lower()
+
+
+def _bigrams(key: str) -> Set[str]:
+    return {key[i:i + 2] for i in range(len(key) - 1)} if len(key) > 1 else {key}
+
+
+def _grams(key: str) -> Set[str]:
+    return set(key) | _bigrams(key)
+
+
+class _SearchIndex:
+    """Exact map, sorted keys (prefix search) and bigram postings (fuzzy search)
+    over every searchable alias of every security in one master snapshot."""
+
+    def __init__(self, snapshot):
+        best: Dict[str, Tuple[Rank, str]] = {}
+
+        def add(alias, code: str, rank: Rank):
+            if not isinstance(alias, str) or not alias.strip():
+                return
+            key = normalize(alias)
+            if key not in best or rank < best[key][0]:
+                best[key] = (rank, code)
+
+        securities = snapshot.securities
+        for record in securities.to_dict("records"):
+            code = record["ts_code"]
+            listed = 0 if record.get("list_status") in ("L", None) or pd.isna(record.get("list_status")) else 1
+            base = (_ASSET_PRIORITY.get(record["asset_type"], len(_ASSET_PRIORITY)), listed)
+            for alias in ("name", "symbol", "cnspell", "fullname"):
+                add(record.get(alias), code, base + (0,))
+
+        # Former names rank below every current alias.
+        known = set(securities["ts_code"])
+        former = snapshot.former_names
+        if not former.empty and {"ts_code", "name"} <= set(former.columns):
+            for code, name in zip(former["ts_code"].tolist(), former["name"].tolist()):
+                if code in known:
+                    add(name, code, (len(_ASSET_PRIORITY), 0, 1))
+
+        self.exact = {key: code for key, (_, code) in best.items()}
+        self.ranks = {key: rank for key, (rank, _) in best.items()}
+        self.keys = sorted(self.exact)
+        self.postings: Dict[str, List[str]] = defaultdict(list)
+        for key in self.keys:
+            for gram in _bigrams(key):
+                self.postings[gram].append(key)
+
+    def resolve(self, token: str) -> Optional[str]:
+        key = normalize(token)
+        if not key:
+            return None
+        code = self.exact.get(key)
+        if code is not None:
+            return code
+
+        ascii_key = key.isascii()
+        if key.isdigit():
+            return None
+        if len(key) >= (MIN_ASCII_PREFIX_LENGTH if ascii_key else MIN_PREFIX_LENGTH):
+            start = bisect_left(self.keys, key)
+            matches = [
+                candidate for candidate in self.keys[start:start + PREFIX_CANDIDATES] if candidate.startswith(key)
+            ]
+            if matches:
+                return self.exact[min(matches, key=lambda candidate: (self.ranks[candidate], len(candidate)))]
+        if ascii_key:
+            return None
+
+        candidates = set()
+        for gram in _bigrams(key):
+            candidates.update(self.postings.get(gram, ()))
+        grams = _grams(key)
+        best_key, best_score = None, 0.0
+        for candidate in candidates:
+            candidate_grams = _grams(candidate)
+            score = 2 * len(grams & candidate_grams) / (len(grams) + len(candidate_grams))
+            if score > best_score or (score == best_score and best_key and self.ranks[candidate] < self.ranks[best_key]):
+                best_key, best_score = candidate, score
+        if best_key is not None and best_score >= MIN_SIMILARITY:
+            return self.exact[best_key]
+        return None
+
+
+class CodeResolver:
+    """Turns names, pinyin initials, former names and bare symbols into ts_codes.
+
+    The search index is built from the security master's current snapshot on
+    first use and rebuilt whenever the master swaps in a new snapshot. Tokens
+    that already look like ts_codes are only upper-cased, and tokens that
+    cannot be resolved are returned unchanged.
+    """
+
+    def __init__(self, master: Optional[SecurityMaster] = None):
+        self._master = master or security_master
+        self._index: Optional[_SearchIndex] = None
+        self._indexed_snapshot = None
+        self._lock = threading.Lock()
+
+    def _current_index(self) -> Optional[_SearchIndex]:
+        snapshot = self._master.snapshot
+        if snapshot is None:
+            return None
+        if snapshot is not self._indexed_snapshot:
+            with self._lock:
+                if snapshot is not self._indexed_snapshot:
+                    self._index = _SearchIndex(snapshot)
+                    self._indexed_snapshot = snapshot
+                    log_debug("CodeResolver indexed %s aliases", len(self._index.keys))
+        return self._index
+
+    def warm(self):
+        self._current_index()
+
+    def resolve(self, token: str) -> str:
+        token = token.strip()
+        if _CODE_RE.match(token):
+            return token.upper()
+        index = self._current_index()
+        code = index.resolve(token) if index is not None else None
+        if code is None:
+            return token
+        log_debug("CodeResolver: '%s' -> %s", token, code)
+        return code
+
+
+# Process-wide resolver over the shared security master.
+code_resolver = CodeResolver()
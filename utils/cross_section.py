@@ -0,0 +1,210 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .logger import log_debug, log_warning
+
+# Parameter (and column) that dates one cross-section of an endpoint.
+DATE_PARAMS = {
+    "fund_nav": "nav_date",
+    "forecast": "ann_date",
+    "express": "ann_date",
+    "dividend": "ann_date",
+}
+# Cross-sections kept per endpoint; older dates are dropped first.
+MAX_DATES_PER_ENDPOINT = 3
+_SERVABLE_PARAMS = {"ts_code", "fields", "start_date", "end_date"}
+# Rows per page when pulling a cross-section (upstream per-call caps).
+PAGE_SIZES = {"fund_daily": 2000, "fund_nav": 2000, "fund_share": 2000, "fund_adj": 2000}
+DEFAULT_PAGE_SIZE = 5000
+MAX_PAGES = 20
+# Endpoints whose many-code, one-date queries are rewritten into a single
+# cross-section fetch, and the code count from which that pays off.
+PLANNED_ENDPOINTS = ("daily", "daily_basic", "stk_limit", "moneyflow", "fund_daily")
+CROSS_SECTION_MIN_CODES = int(os.getenv("MINISHARE_MCP_CROSS_SECTION_CODES", "30"))
+
+
+def date_param(endpoint: str) -> str:
+    return DATE_PARAMS.get(endpoint, "trade_date")
+
+
+def single_day(endpoint: str, params: Dict[str, Any]) -> Optional[str]:
+    """The one date a call asks for, or None if it spans several days."""
+    day = params.get(date_param(endpoint))
+    if day:
+        return day
+    start, end = params.get("start_date"), params.get("end_date")
+    return start if start and start == end else None
+
+
+def fetch_cross_section(pro, endpoint: str, day: str) -> pd.DataFrame:
+    """Pull every row of endpoint for one date, page by page.
+
+    If MAX_PAGES full pages come back the result may be cut short; it is
+    returned with ``attrs["truncated"]`` set and the store refuses it.
+    """
+    page_size = PAGE_SIZES.get(endpoint, DEFAULT_PAGE_SIZE)
+    func = getattr(pro, endpoint)
+    frames = []
+    truncated = False
+    for page in range(MAX_PAGES):
+        frame = func(**{date_param(endpoint): day}, limit=page_size, offset=page * page_size)
+        if frame is None or frame.empty:
+            break
+        frames.append(frame)
+        if len(frame) < page_size:
+            break
+    else:
+        truncated = True
+    result = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if truncated:
+        result.attrs["truncated"] = True
+    return result
+
+
+class _Section:
+    __slots__ = ("frame", "rows_by_code")
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame.reset_index(drop=True)
+        if "ts_code" in self.frame.columns:
+            groups = self.frame.groupby("ts_code", sort=False).indices
+            self.rows_by_code = {code: np.asarray(rows) for code, rows in groups.items()}
+        else:
+            self.rows_by_code = {}
+
+
+class CrossSectionStore:
+    """Whole-market snapshots of an endpoint for one date, indexed by ts_code.
+
+    Filled by the post-close sync and by cross-section fetches, and used to
+    answer per-code and full cross-section calls for the same date from
+    memory.
+    """
+
+    def __init__(self, max_dates: int = MAX_DATES_PER_ENDPOINT):
+        self.max_dates = max_dates
+        self._sections: Dict[str, "OrderedDict[str, _Section]"] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def put(self, endpoint: str, day: str, frame: pd.DataFrame):
+        if frame is None or frame.empty:
+            return
+        if frame.attrs.get("truncated"):
+            log_warning("CrossSectionStore: %s %s hit the %d-page cap, not storing", endpoint, day, MAX_PAGES)
+            return
+        section = _Section(frame)
+        with self._lock:
+            dates = self._sections.setdefault(endpoint, OrderedDict())
+            dates[day] = section
+            for old in sorted(dates)[:-self.max_dates]:
+                del dates[old]
+
+    def get(self, endpoint: str, day: str) -> Optional[pd.DataFrame]:
+        section = self._section(endpoint, day)
+        return section.frame if section is not None else None
+
+    def has(self, endpoint: str, day: str) -> bool:
+        return self._section(endpoint, day) is not None
+
+    def dates(self, endpoint: str) -> List[str]:
+        with self._lock:
+            return sorted(self._sections.get(endpoint, {}))
+
+    def _section(self, endpoint: str, day: str) -> Optional[_Section]:
+        with self._lock:
+            return self._sections.get(endpoint, {}).get(day)
+
+    def select(self, endpoint: str, day: str, codes: Optional[List[str]] = None,
+               fields: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """Rows for codes (all rows if None) from a stored section.
+
+        Stored sections are complete (truncated pulls are refused), so a code
+        the section lacks did not trade that day and simply has no rows.
+        Returns None when the section is missing or lacks a requested field,
+        so the caller falls back to upstream.
+        """
+        section = self._section(endpoint, day)
+        if section is None:
+            return None
+        frame = section.frame
+        if codes is not None:
+            rows = [section.rows_by_code[code] for code in codes if code in section.rows_by_code]
+            frame = frame.iloc[np.sort(np.concatenate(rows))] if rows else frame.iloc[:0]
+        if fields:
+            columns = [field.strip() for field in fields.split(",") if field.strip()]
+            if any(column not in frame.columns for column in columns):
+                return None
+            frame = frame[columns]
+        self.hits += 1
+        return frame.reset_index(drop=True)
+
+    def lookup(self, endpoint: str, params: Dict[str, Any]) -> Optional[pd.DataFrame]:
+        """Serve an SDK call from memory if it targets one stored date."""
+        date_key = date_param(endpoint)
+        if endpoint not in self._sections or set(params) - _SERVABLE_PARAMS - {date_key}:
+            return None
+        day = single_day(endpoint, params)
+        if not day:
+            return None
+        ts_code = params.get("ts_code")
+        codes = [code.strip() for code in ts_code.split(",") if code.strip()] if ts_code else None
+        frame = self.select(endpoint, day, codes, params.get("fields"))
+        if frame is not None:
+            log_debug("CrossSectionStore: served %s %s (%d rows) from memory", endpoint, day, len(frame))
+        return frame
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sections": {endpoint: sorted(dates) for endpoint, dates in self._sections.items() if dates},
+                "hits": self.hits,
+            }
+
+
+def fetch_codes_for_day(
+    pro,
+    endpoint: str,
+    codes: List[str],
+    params: Dict[str, Any],
+    fields: Optional[str] = None,
+    store: Optional[CrossSectionStore] = None,
+    min_codes: int = CROSS_SECTION_MIN_CODES,
+) -> Optional[pd.DataFrame]:
+    """Answer a one-date query for many codes from the market cross-section.
+
+    A stored cross-section for the date is always used; codes it lacks
+    get no rows. Otherwise, from ``min_codes`` codes on, the whole date is
+    fetched once by date, kept in the store and filtered locally. Returns
+    None when the caller should keep its per-code calls: other endpoints,
+    date ranges, extra filters, too few codes, a requested field the
+    cross-section lacks, or a pull cut off at MAX_PAGES.
+    """
+    store = store if store is not None else cross_sections
+    params = {key: value for key, value in params.items() if value and key != "ts_code"}
+    if endpoint not in PLANNED_ENDPOINTS or not codes or set(params) - _SERVABLE_PARAMS - {date_param(endpoint)}:
+        return None
+    day = single_day(endpoint, params)
+    if not day:
+        return None
+    frame = store.select(endpoint, day, codes, fields)
+    if frame is not None or store.has(endpoint, day) or len(codes) < min_codes:
+        return frame
+
+    section = fetch_cross_section(pro, endpoint, day)
+    log_debug("fetch_codes_for_day: %s %s for %d codes via one cross-section (%d rows)", endpoint, day, len(codes), len(section))
+    if section.attrs.get("truncated"):
+        return None
+    if section.empty:
+        return section
+    store.put(endpoint, day, section)
+    return store.select(endpoint, day, codes, fields)
+
+
+# Process-wide store shared by the sync daemon and every upstream client.
+cross_sections = CrossSectionStore()
@@ -0,0 +1,194 @@
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import pandas as pd
+
+from .cache import frame_nbytes
+from .logger import log_debug
+
+# Memory held by open result cursors; least recently used are evicted first.
+DEFAULT_CURSOR_MB = float(os.getenv("MINISHARE_MCP_CURSOR_MB", "64"))
+# Seconds a cursor stays readable after its last use.
+DEFAULT_CURSOR_TTL = float(os.getenv("MINISHARE_MCP_CURSOR_TTL", "1800"))
+# Approximate model tokens one page of tool output may use.
+PAGE_TOKENS = int(os.getenv("MINISHARE_MCP_PAGE_TOKENS", "4000"))
+PAGE_ROWS = 50
+
+# Renders a slice of the stored frame into output lines, one per row.
+Render = Callable[[pd.DataFrame], List[str]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: about four ASCII chars per token, one per CJK char."""
+    ascii_chars = sum(1 for char in text if char < "\x80")
+    return (ascii_chars + 3) // 4 + len(text) - ascii_chars
+
+
+def fit_lines(lines: List[str], budget: int) -> int:
+    """How many leading lines fit in budget tokens (always at least one)."""
+    used = 0
+    for count, line in enumerate(lines):
+        used += estimate_tokens(line) + 1
+        if used > budget and count:
+            return count
+    return len(lines)
+
+
+class _Cursor(NamedTuple):
+    frame: pd.DataFrame
+    render: Render
+    title: str
+    nbytes: int
+
+
+class CursorStore:
+    """Full tool results kept under a cursor id so later pages are sliced
+    from memory instead of re-running the upstream query.
+
+    The total frame size is kept under ``max_bytes`` by evicting least
+    recently used cursors, and a cursor expires ``ttl`` seconds after it
+    was last read.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        ttl: float = DEFAULT_CURSOR_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_bytes is None:
+            max_bytes = int(DEFAULT_CURSOR_MB * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._cursors: "OrderedDict[str, tuple[_Cursor, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.pages = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def open(self, frame: pd.DataFrame, render: Render, title: str = "") -> Optional[str]:
+        """Store frame and return its cursor id, or None if it cannot be kept."""
+        nbytes = frame_nbytes(frame)
+        if self.max_bytes <= 0 or self.ttl <= 0 or nbytes > self.max_bytes:
+            return None
+        cursor_id = secrets.token_hex(6)
+        with self._lock:
+            self._expire()
+            self._cursors[cursor_id] = (_Cursor(frame, render, title, nbytes), self._clock() + self.ttl)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._cursors)))
+                self.evictions += 1
+        return cursor_id
+
+    def get(self, cursor_id: str) -> Optional[_Cursor]:
+        with self._lock:
+            self._expire()
+            item = self._cursors.get(cursor_id)
+            if item is None:
+                return None
+            self._cursors[cursor_id] = (item[0], self._clock() + self.ttl)
+            self._cursors.move_to_end(cursor_id)
+            return item[0]
+
+    def _expire(self):
+        now = self._clock()
+        for cursor_id in [key for key, (_, expires_at) in self._cursors.items() if expires_at <= now]:
+            self._drop(cursor_id)
+            self.expirations += 1
+
+    def _drop(self, cursor_id: str):
+        self._bytes -= self._cursors.pop(cursor_id)[0].nbytes
+
+    def clear(self):
+        with self._lock:
+            self._cursors.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "cursors": len(self._cursors),
+                "bytes": self._bytes,
+                "pages": self.pages,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def _page_lines(frame: pd.DataFrame, render: Render, start: int, max_rows: int, budget: int) -> List[str]:
+    lines = render(frame.iloc[start:start + max_rows])
+    rows = fit_lines(lines, budget)
+    if rows == len(lines):
+        return lines
+    # Render the kept rows again: render may reorder rows within a page.
+    return render(frame.iloc[start:start + rows])
+
+
+def _next_cursor_note(cursor_id: str, shown_end: int, total: int) -> str:
+    return (f"... (共 {total} 条，已显示至第 {shown_end} 条；"
+            f"调用 fetch_page(cursor=\"{cursor_id}@{shown_end}\") 获取后续数据，无需重新查询)")
+
+
+def paginate(
+    frame: pd.DataFrame,
+    render: Render,
+    title: str,
+    max_rows: int = PAGE_ROWS,
+    token_budget: int = PAGE_TOKENS,
+    store: Optional["CursorStore"] = None,
+) -> List[str]:
+    """Lines of the first page of frame, plus a fetch_page cursor when rows remain.
+
+    A page holds at most ``max_rows`` rows and stops early once the rendered
+    lines exceed ``token_budget``. If the cursor store cannot keep the frame
+    the page ends with the plain "仅显示前 N 条" note instead.
+    """
+    store = store if store is not None else result_cursors
+    lines = _page_lines(frame, render, 0, max_rows, token_budget)
+    if len(lines) >= len(frame):
+        return lines
+    cursor_id = store.open(frame, render, title)
+    if cursor_id is None:
+        return lines + [f"... (共 {len(frame)} 条，仅显示前 {len(lines)} 条)"]
+    return lines + [_next_cursor_note(cursor_id, len(lines), len(frame))]
+
+
+def fetch_page(
+    cursor: str,
+    max_rows: int = PAGE_ROWS,
+    token_budget: int = PAGE_TOKENS,
+    store: Optional["CursorStore"] = None,
+) -> str:
+    """Next page of a stored result for a cursor of the form "<id>@<row>"."""
+    store = store if store is not None else result_cursors
+    cursor_id, _, start_text = cursor.strip().partition("@")
+    try:
+        start = int(start_text) if start_text else 0
+    except ValueError:
+        return f"错误：无效的游标 '{cursor}'"
+    entry = store.get(cursor_id)
+    if entry is None:
+        return f"错误：游标 '{cursor}' 不存在或已过期，请重新查询"
+    total = len(entry.frame)
+    if start < 0 or start >= total:
+        return f"错误：游标 '{cursor}' 超出结果范围 (共 {total} 条)"
+    lines = _page_lines(entry.frame, entry.render, start, max_rows, token_budget)
+    end = start + len(lines)
+    store.pages += 1
+    log_debug("fetch_page: %s rows %d-%d of %d served from cursor %s", entry.title, start + 1, end, total, cursor_id)
+    results = [f"--- {entry.title} (第 {start + 1}-{end} 条 / 共 {total} 条) ---"]
+    results.extend(lines)
+    if end < total:
+        results.append(_next_cursor_note(cursor_id, end, total))
+    return "\n".join(results)
+
+
+# Process-wide cursor store shared by every paginated tool.
+result_cursors = CursorStore()
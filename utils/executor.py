@@ -0,0 +1,113 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from .logger import log_debug
+
+DEFAULT_WORKERS = int(os.getenv("MINISHARE_MCP_WORKERS", "16"))
+DEFAULT_QUEUE_DEPTH = int(os.getenv("MINISHARE_MCP_QUEUE_DEPTH", "64"))
+
+
+class ToolExecutor:
+    """Bounded thread pool that runs blocking tool bodies off the event loop.
+
+    At most ``max_workers`` tools run at once and at most ``queue_depth`` more
+    may wait for a worker; further calls are rejected immediately instead of
+    piling up behind a slow upstream.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, queue_depth: int = DEFAULT_QUEUE_DEPTH):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if queue_depth < 0:
+            raise ValueError("queue_depth must not be negative")
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcp-tool")
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _acquire(self, name: str):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.queue_depth:
+                raise RuntimeError(f"服务繁忙：{name} 排队请求过多，请稍后重试")
+            self._in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) in the pool and await its result.
+
+        The call's slot is held until the worker finishes it. If the awaiting
+        task is cancelled (e.g. the client went away) while the call is still
+        queued, the call is dropped and its slot freed at once.
+        """
+        name = getattr(fn, "__name__", "tool")
+        self._acquire(name)
+        try:
+            # Carry context variables (e.g. per-call state) into the worker.
+            ctx = contextvars.copy_context()
+            future = self._pool.submit(ctx.run, fn, *args, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    def wrap(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """Turn a blocking tool function into an async one backed by the pool.
+
+        functools.wraps keeps __wrapped__, so FastMCP still derives the input
+        schema from the original signature and docstring.
+        """
+        if asyncio.iscoroutinefunction(fn):
+            return fn
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await self.run(fn, *args, **kwargs)
+
+        return wrapper
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+
+
+class ThreadedToolRegistrar:
+    """FastMCP stand-in for register_*_tools() that offloads every tool.
+
+    ``mcp.tool(...)`` decorators applied through this object register an async
+    wrapper that runs the original function on ``executor``; all other
+    attributes are forwarded to the wrapped FastMCP instance.
+    """
+
+    def __init__(self, mcp, executor: Optional[ToolExecutor] = None):
+        self._mcp = mcp
+        self.executor = executor or ToolExecutor()
+        log_debug("Tool executor ready: workers=%s, queue_depth=%s", self.executor.max_workers, self.executor.queue_depth)
+
+    def tool(self, *args, **kwargs):
+        register = self._mcp.tool(*args, **kwargs)
+
+        def decorator(fn):
+            register(self.executor.wrap(fn))
+            return fn
+
+        return decorator
+
+    def __getattr__(self, name):
+        return getattr(self._mcp, name)
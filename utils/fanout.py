@@ -0,0 +1,57 @@
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional
+
+from .tracing import MAX_ATTR_CHARS, tracer
+
+# Default per-request cap on concurrent upstream sub-calls.
+DEFAULT_FANOUT = int(os.getenv("MINISHARE_MCP_FANOUT", "8"))
+
+
+class FanOutResult(NamedTuple):
+    item: Any
+    value: Any = None
+    error: Optional[BaseException] = None
+
+
+def fan_out(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: Optional[int] = None,
+    label: str = "fan_out",
+) -> List[FanOutResult]:
+    """Call func(item) for every item concurrently, returning results in input order.
+
+    Failures are captured per item instead of aborting the batch. A private
+    pool is used per call, so fan-out from inside a tool worker thread can
+    never deadlock on a shared, already saturated pool. Each item runs in
+    a trace span named ``label``.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    def run(item):
+        with tracer.span(label, item=item) as span:
+            try:
+                return FanOutResult(item, func(item))
+            except Exception as exc:
+                if span is not None:
+                    span.error = f"{type(exc).__name__}: {exc}"[:MAX_ATTR_CHARS]
+                return FanOutResult(item, error=exc)
+
+    workers = min(max_workers or DEFAULT_FANOUT, len(items))
+    if workers <= 1:
+        return [run(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mcp-fanout") as pool:
+        # Each task gets its own copy of the caller's context variables.
+        futures = [pool.submit(contextvars.copy_context().run, run, item) for item in items]
+        return [future.result() for future in futures]
+
+
+def raise_if_all_failed(results: List[FanOutResult]):
+    """Re-raise the first error when no item succeeded, mirroring a single call."""
+    if results and all(result.error is not None for result in results):
+        raise results[0].error
@@ -1,11 +1,16 @@
 import functools
+import numpy as np
 import pandas as pd
-from typing import Optional, Callable, Any
-from .logger import log_debug
+from typing import Optional, Callable, Any, Iterable, List, NamedTuple, Sequence
+from .logger import log_debug, log_error, log_warning
+from .security_master import security_master
 
 def _get_stock_name(pro_api_instance, ts_code: str) -> str:
     """Helper function to get stock name from ts_code."""
-    log_debug(f"_get_stock_name called for ts_code: {ts_code}")
+    log_debug("_get_stock_name called for ts_code: %s", ts_code)
+    name = security_master.name_of(ts_code)
+    if name:
+        return name
     if not pro_api_instance:
         log_debug("_get_stock_name received no pro_api_instance. Cannot fetch name.")
         return ts_code
@@ -14,7 +19,7 @@ def _get_stock_name(pro_api_instance, ts_code: str) -> str:
         if not df_basic.empty:
             return df_basic.iloc[0]['name']
     except Exception as e:
-        log_debug(f"Warning: Failed to get stock name for {ts_code}: {e}")
+        log_warning("Failed to get stock name for %s: %s", ts_code, e)
     return ts_code
 
 def _fetch_latest_report_data(
@@ -35,20 +40,20 @@ def _fetch_latest_report_data(
     elif hasattr(api_func, '__name__'):
         func_name = api_func.__name__
 
-    log_debug(f"_fetch_latest_report_data called for {func_name}, period: {result_period_value}, is_list: {is_list_result}")
+    log_debug("_fetch_latest_report_data called for %s, period: %s, is_list: %s", func_name, result_period_value, is_list_result)
     try:
         df = api_func(**api_params)
         if df.empty:
-            log_debug(f"_fetch_latest_report_data: API call {func_name} returned empty DataFrame for {api_params.get('ts_code')}")
+            log_debug("_fetch_latest_report_data: API call %s returned empty DataFrame for %s", func_name, api_params.get('ts_code'))
             return None
 
         # Ensure 'ann_date' and the specified period field exist for sorting/filtering
         if 'ann_date' not in df.columns:
-            log_debug(f"Warning: _fetch_latest_report_data: 'ann_date' not in DataFrame columns for {func_name} on {api_params.get('ts_code')}. Returning raw df (or first row if not list).")
+            log_debug("Warning: _fetch_latest_report_data: 'ann_date' not in DataFrame columns for %s on %s. Returning raw df (or first row if not list).", func_name, api_params.get('ts_code'))
             return df if is_list_result else df.head(1)
 
         if result_period_field_name not in df.columns:
-            log_debug(f"Warning: _fetch_latest_report_data: Period field '{result_period_field_name}' not in DataFrame columns for {func_name} on {api_params.get('ts_code')}. Filtering by ann_date only.")
+            log_debug("Warning: _fetch_latest_report_data: Period field '%s' not in DataFrame columns for %s on %s. Filtering by ann_date only.", result_period_field_name, func_name, api_params.get('ts_code'))
             # Sort by ann_date to get the latest announcement(s)
             df_sorted_by_ann = df.sort_values(by='ann_date', ascending=False)
             if df_sorted_by_ann.empty:
@@ -62,7 +67,7 @@ def _fetch_latest_report_data(
         df_filtered_period = df[df[result_period_field_name].astype(str) == str(result_period_value)]
 
         if df_filtered_period.empty:
-            log_debug(f"_fetch_latest_report_data: No data found for period {result_period_value} after filtering by '{result_period_field_name}' for {func_name} on {api_params.get('ts_code')}. Original df had {len(df)} rows.")
+            log_debug("_fetch_latest_report_data: No data found for period %s after filtering by '%s' for %s on %s. Original df had %s rows.", result_period_value, result_period_field_name, func_name, api_params.get('ts_code'), len(df))
             # Fallback: if strict period filtering yields nothing, but original df had data,
             # it might be that ann_date is more reliable or the period was slightly off.
             # For now, let's return None if period match fails, to be strict.
@@ -78,16 +83,164 @@ def _fetch_latest_report_data(
         df_latest_ann = df_sorted_by_ann[df_sorted_by_ann['ann_date'] == latest_ann_date]
 
         if is_list_result:
-            log_debug(f"_fetch_latest_report_data: Returning {len(df_latest_ann)} rows for latest announcement on {latest_ann_date} (list_result=True)")
+            log_debug("_fetch_latest_report_data: Returning %s rows for latest announcement on %s (list_result=True)", len(df_latest_ann), latest_ann_date)
             return df_latest_ann # Return all rows for the latest announcement date for this period
         else:
             # Return only the top-most row (which is the latest announcement for that period)
-            log_debug(f"_fetch_latest_report_data: Returning 1 row for latest announcement on {latest_ann_date} (list_result=False)")
+            log_debug("_fetch_latest_report_data: Returning 1 row for latest announcement on %s (list_result=False)", latest_ann_date)
             return df_latest_ann.head(1)
 
     except Exception as e:
-        log_debug(f"Error in _fetch_latest_report_data calling {func_name} for {api_params.get('ts_code', 'N/A')}, period {result_period_value}: {e}")
-        import traceback
-        import sys
-        traceback.print_exc(file=sys.stderr)
+        log_error("_fetch_latest_report_data calling %s for %s, period %s failed: %s",
+                  func_name, api_params.get('ts_code', 'N/A'), result_period_value, e, exc_info=True)
         return None
+
+
+# ---------------------------------------------------------------------------
+# Vectorized row rendering
+#
+# Tools describe each output field once as a Col and render whole DataFrames
+# column by column instead of walking rows with iterrows(). A rendered column
+# is an object array holding "label: value unit" where the value is present
+# and "" where it is NaN/None or the column is absent, so rows can be joined
+# with the same skip-missing semantics as the old per-row
+# ``if pd.notna(row.get(field)): parts.append(...)`` code.
+# ---------------------------------------------------------------------------
+
+class Col(NamedTuple):
+    """One output field of a row.
+
+    field:   DataFrame column name.
+    label:   text before the separator; with an empty label only the value is shown.
+    unit:    text appended after the value.
+    fmt:     format spec applied to each value, e.g. ",.2f" (same as f"{v:,.2f}").
+    convert: vectorized transform of the non-null values (Series -> Series/array);
+             values it maps to None/NaN are treated as missing.
+    """
+    field: str
+    label: str = ""
+    unit: str = ""
+    fmt: Optional[str] = None
+    convert: Optional[Callable[[pd.Series], Any]] = None
+
+
+def _blank(n: int) -> np.ndarray:
+    return np.full(n, "", dtype=object)
+
+
+def text_column(df: pd.DataFrame, field: str, default: str = "", width: Optional[int] = None) -> np.ndarray:
+    """str() of every value in a column (NaN included), like str(row.get(field, default))."""
+    if field not in df.columns:
+        return np.full(len(df), default[:width] if width else default, dtype=object)
+    values = df[field].astype(str)
+    if width is not None:
+        values = values.str.slice(0, width)
+    return values.to_numpy(dtype=object)
+
+
+def render_column(df: pd.DataFrame, col: Col, sep: str = ": ") -> np.ndarray:
+    """Render one Col for every row; "" where the value is missing."""
+    out = _blank(len(df))
+    if col.field not in df.columns:
+        return out
+    series = df[col.field]
+    mask = series.notna().to_numpy()
+    if not mask.any():
+        return out
+    values = series[mask]
+    if col.convert is not None:
+        values = pd.Series(col.convert(values), index=values.index)
+        present = values.notna().to_numpy()
+        mask[mask] = present
+        values = values[present]
+    head = f"{col.label}{sep}" if col.label else ""
+    # tolist() yields Python scalars, so values print exactly as they did
+    # when formatted one row at a time.
+    spec = col.fmt or ""
+    out[mask] = [f"{head}{format(value, spec)}{col.unit}" for value in values.tolist()]
+    return out
+
+
+def join_parts(parts: Sequence[np.ndarray], joiner: str = " | ") -> np.ndarray:
+    """Element-wise joiner.join() of rendered columns, skipping empty entries."""
+    if not parts:
+        return np.array([], dtype=object)
+    joined = np.empty(len(parts[0]), dtype=object)
+    joined[:] = [joiner.join(filter(None, row)) for row in zip(*parts)]
+    return joined
+
+
+def prefix_nonempty(values: np.ndarray, prefix: str, suffix: str = "") -> np.ndarray:
+    """Wrap non-empty entries with prefix/suffix, leaving "" entries empty."""
+    values = np.asarray(values, dtype=object)
+    return np.where(values != "", prefix + values + suffix, values)
+
+
+def first_nonempty(*parts: np.ndarray) -> np.ndarray:
+    """Element-wise first non-empty entry among the rendered parts."""
+    chosen = np.asarray(parts[0], dtype=object)
+    for part in parts[1:]:
+        chosen = np.where(chosen != "", chosen, np.asarray(part, dtype=object))
+    return chosen
+
+
+def render_columns(df: pd.DataFrame, columns: Iterable[Col], sep: str = ": ", joiner: str = " | ") -> np.ndarray:
+    """Render columns for every row and join each row's parts with joiner."""
+    columns = list(columns)
+    if not columns:
+        return _blank(len(df))
+    return join_parts([render_column(df, col, sep) for col in columns], joiner)
+
+
+def render_rows(df: pd.DataFrame, columns: Iterable[Col], sep: str = ": ", joiner: str = " | ") -> List[str]:
+    """List of output lines, one per row; see render_columns."""
+    return render_columns(df, columns, sep, joiner).tolist()
+
+
+def truncate(width: int, ellipsis: str = "...") -> Callable[[pd.Series], pd.Series]:
+    """Col.convert that shortens text longer than width to width chars + ellipsis."""
+    def convert(values: pd.Series) -> pd.Series:
+        text = values.astype(str)
+        return text.where(text.str.len() <= width, text.str.slice(0, width) + ellipsis)
+    return convert
+
+
+def map_values(mapping: dict, default: Optional[str] = None) -> Callable[[pd.Series], pd.Series]:
+    """Col.convert that looks values up in mapping, keeping unmapped values
+    as-is unless a default is given."""
+    def convert(values: pd.Series) -> pd.Series:
+        fallback = values if default is None else default
+        return values.map(mapping).where(values.isin(list(mapping)), fallback)
+    return convert
+
+
+def format_money(val) -> str:
+    """Scale a number to 亿/万 with two decimals; small values are shown as-is."""
+    if pd.isna(val):
+        return ""
+    try:
+        val_float = float(val)
+        if abs(val_float) > 1e8:
+            return f"{val_float/1e8:.2f}亿"
+        elif abs(val_float) > 1e4:
+            return f"{val_float/1e4:.2f}万"
+        return str(val)
+    except (TypeError, ValueError):
+        return str(val)
+
+
+def money(values: pd.Series) -> pd.Series:
+    """Vectorized format_money, usable as Col.convert."""
+    numeric = pd.to_numeric(values, errors="coerce")
+    if numeric.isna().any():
+        # Non-numeric strings keep format_money's per-value fallback.
+        return values.map(format_money)
+    magnitude = numeric.abs().to_numpy()
+    yi = magnitude > 1e8
+    wan = (magnitude > 1e4) & ~yi
+    small = ~(yi | wan)
+    text = np.empty(len(values), dtype=object)
+    text[yi] = [f"{value / 1e8:.2f}亿" for value in numeric[yi].tolist()]
+    text[wan] = [f"{value / 1e4:.2f}万" for value in numeric[wan].tolist()]
+    text[small] = [str(value) for value in values[small].tolist()]
+    return pd.Series(text, index=values.index)
@@ -1,64 +1,90 @@
+import os
 import sys
+import atexit
 import logging
 import functools
-import traceback
+import itertools
+import queue
+from collections import defaultdict
+from logging.handlers import QueueHandler, QueueListener
+
+from .metrics import metrics
+from .tracing import tracer
+
+# Level of the server log (DEBUG, INFO, WARNING, ...). Debug lines, the
+# per-call chatter, are dropped before any formatting unless enabled.
+LOG_LEVEL = os.getenv("MINISHARE_MCP_LOG_LEVEL", "INFO").upper()
+# log_sampled() keeps one in this many lines per key.
+LOG_SAMPLE_EVERY = max(1, int(os.getenv("MINISHARE_MCP_LOG_SAMPLE", "10")))
 
-# Logger for debugging
 logger = logging.getLogger("minishare_mcp")
-logger.setLevel(logging.INFO)
+logger.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+logger.propagate = False
 
-# Create logging handler
+# Records are queued by the calling thread and written to stderr by a
+# listener thread, so a slow terminal or pipe never blocks a tool worker.
 handler = logging.StreamHandler(sys.stderr)
-handler.setLevel(logging.INFO)
+handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener = QueueListener(_log_queue, handler, respect_handler_level=True)
 
-# Create logging formatter
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-
-# Add handler to logger
 if not logger.handlers:
-    logger.addHandler(handler)
+    logger.addHandler(QueueHandler(_log_queue))
+    _listener.start()
+    atexit.register(_listener.stop)
+
+_sample_counters = defaultdict(itertools.count)
+
+def log_debug(message: str, *args):
+    """Debug-level log line; pass %-style args so formatting only happens when enabled."""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(message, *args)
+
+def log_info(message: str, *args):
+    logger.info(message, *args)
+
+def log_warning(message: str, *args):
+    logger.warning(message, *args)
 
-def log_debug(message: str):
-    """Unified logging function"""
-    logger.info(message)
+def log_error(message: str, *args, exc_info: bool = False):
+    logger.error(message, *args, exc_info=exc_info)
+
+def log_sampled(key: str, message: str, *args, every: int = None):
+    """Debug line for per-call chatter, kept once per ``every`` calls with this key."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if next(_sample_counters[key]) % (every or LOG_SAMPLE_EVERY) == 0:
+        logger.debug(message, *args)
+
+class frame_summary:
+    """Lazy log argument describing a tool's upstream response."""
+
+    __slots__ = ("df",)
+
+    def __init__(self, df):
+        self.df = df
+
+    def __str__(self):
+        df = self.df
+        return (f"type={type(df).__name__}, empty={getattr(df, 'empty', 'N/A')}, "
+                f"shape={getattr(df, 'shape', 'N/A')}, columns={list(getattr(df, 'columns', []))}")
 
 def handle_exception(func):
-    """Unified exception handler decorator"""
+    """Unified exception handler decorator; also records the call's metrics and trace.
+
+    Failed upstream requests are retried inside UpstreamClient (utils.retry),
+    so the tool itself runs once.
+    """
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        try:
-           return func(*args, **kwargs)
-        except Exception as e:
-            logger.error(f"Error in {func.__name__}: {str(e)}")
-            traceback.print_exc(file=sys.stderr)
-            last_error = e
-            # Retry once for transient errors
-            if _is_transient(e):
-                logger.warning(f"Transient error in {func.__name__}, retrying once...")
-                import time
-                time.sleep(1)
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e2:
-                    logger.error(f"Retry also failed in {func.__name__}: {str(e2)}")
-                    last_error = e2
-            # Let FastMCP convert the exception into a tool result with
-            # isError=true. Returning a string here would hide upstream failures.
-            raise last_error
+        with metrics.invocation(func.__name__), tracer.trace(func.__name__, params=kwargs):
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                logger.error("Error in %s: %s", func.__name__, e, exc_info=True)
+                # Let FastMCP convert the exception into a tool result with
+                # isError=true. Returning a string here would hide upstream failures.
+                raise
+            metrics.record_output(result)
+            return result
     return wrapper
-
-# Errors that are likely transient and worth retrying
-_TRANSIENT_EXCEPTIONS = (
-    TypeError, ConnectionError, TimeoutError, OSError,
-)
-_TRANSIENT_MESSAGES = (
-    '处理服务端响应失败', 'timeout', 'timed out', 'connection reset',
-    'temporarily unavailable', 'rate limit',
-)
-
-def _is_transient(e: Exception) -> bool:
-    if isinstance(e, _TRANSIENT_EXCEPTIONS):
-        return True
-    msg = str(e).lower()
-    return any(kw in msg for kw in _TRANSIENT_MESSAGES)
@@ -0,0 +1,236 @@
+import contextlib
+import contextvars
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Histogram bucket upper bounds (the +Inf bucket is implicit).
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CALLS_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+# Where an upstream-layer call was answered from: a synced cross-section,
+# the response cache, an expired cache entry behind an open circuit, the
+# on-disk BarStore, or an SDK request; "error" is a failed call.
+SOURCES = ("section", "cache", "stale", "store", "upstream", "error")
+# Sources that cost an SDK request.
+UPSTREAM_SOURCES = ("upstream", "error")
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * len(self.bounds)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for index, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+
+class Invocation:
+    """Per tool call counters, filled from the tool's worker and fan-out threads."""
+
+    __slots__ = ("tool", "upstream_calls", "cache_hits", "rows", "retries", "_lock")
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.upstream_calls = 0
+        self.cache_hits = 0
+        self.rows = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def add(self, source: str, rows: int):
+        with self._lock:
+            if source in UPSTREAM_SOURCES:
+                self.upstream_calls += 1
+            else:
+                self.cache_hits += 1
+            self.rows += rows
+
+
+_current: contextvars.ContextVar[Optional[Invocation]] = contextvars.ContextVar("tool_invocation", default=None)
+
+
+def current_invocation() -> Optional[Invocation]:
+    return _current.get()
+
+
+class MetricsRegistry:
+    """Process-wide tool and upstream counters, rendered as Prometheus text.
+
+    ``invocation()`` wraps one tool call (handle_exception does this) and
+    ``record_call()`` is fed by UpstreamClient for every ``pro.<endpoint>``
+    call, so calls are attributed to the tool that made them, including
+    the ones issued from fan-out threads.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.tool_calls: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.latency: Dict[str, Histogram] = {}
+        self.upstream_per_call: Dict[str, Histogram] = {}
+        self.requests: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self.rows: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.output_bytes: Dict[str, int] = defaultdict(int)
+        self.retries: Dict[str, int] = defaultdict(int)
+
+    @contextlib.contextmanager
+    def invocation(self, tool: str) -> Iterator[Invocation]:
+        """Time a tool call; nested calls are attributed to the outer tool."""
+        outer = _current.get()
+        if outer is not None:
+            yield outer
+            return
+        current = Invocation(tool)
+        token = _current.set(current)
+        started = self._clock()
+        status = "error"
+        try:
+            yield current
+            status = "ok"
+        finally:
+            _current.reset(token)
+            self._finish(current, status, self._clock() - started)
+
+    def _finish(self, current: Invocation, status: str, elapsed: float):
+        tool = current.tool
+        with self._lock:
+            self.tool_calls[(tool, status)] += 1
+            self.latency.setdefault(tool, Histogram(LATENCY_BUCKETS)).observe(elapsed)
+            self.upstream_per_call.setdefault(tool, Histogram(CALLS_BUCKETS)).observe(current.upstream_calls)
+            if current.retries:
+                self.retries[tool] += current.retries
+
+    def record_call(self, endpoint: str, source: str, rows: int = 0):
+        if source not in SOURCES:
+            raise ValueError(f"unknown source: {source}")
+        current = _current.get()
+        tool = current.tool if current is not None else ""
+        if current is not None:
+            current.add(source, rows)
+        with self._lock:
+            self.requests[(tool, endpoint, source)] += 1
+            self.rows[(tool, endpoint)] += rows
+
+    def record_output(self, text: object):
+        current = _current.get()
+        if current is None or not isinstance(text, str):
+            return
+        with self._lock:
+            self.output_bytes[current.tool] += len(text.encode("utf-8"))
+
+    def record_retry(self):
+        current = _current.get()
+        if current is not None:
+            with current._lock:
+                current.retries += 1
+
+    def clear(self):
+        with self._lock:
+            for table in (self.tool_calls, self.latency, self.upstream_per_call, self.requests,
+                          self.rows, self.output_bytes, self.retries):
+                table.clear()
+
+    def render(self) -> str:
+        """Prometheus text exposition (format 0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            _metric(lines, "minishare_tool_calls_total", "Tool invocations by outcome.",
+                     {(("tool", tool), ("status", status)): value for (tool, status), value in self.tool_calls.items()})
+            _histograms(lines, "minishare_tool_latency_seconds", "Tool latency.", self.latency)
+            _histograms(lines, "minishare_tool_upstream_calls", "Upstream requests per tool invocation.",
+                        self.upstream_per_call)
+            _metric(lines, "minishare_upstream_requests_total",
+                     f"pro.<endpoint> calls by tool and where they were answered ({', '.join(SOURCES)}).",
+                     {(("tool", tool), ("endpoint", endpoint), ("source", source)):
+                      self.requests.get((tool, endpoint, source), 0)
+                      for tool, endpoint in {(tool, endpoint) for tool, endpoint, _ in self.requests}
+                      for source in SOURCES})
+            _metric(lines, "minishare_upstream_rows_total", "Rows returned by pro.<endpoint> calls.",
+                     {(("tool", tool), ("endpoint", endpoint)): value for (tool, endpoint), value in self.rows.items()})
+            _metric(lines, "minishare_tool_output_bytes_total", "UTF-8 bytes of tool output.",
+                     {(("tool", tool),): value for tool, value in self.output_bytes.items()})
+            _metric(lines, "minishare_tool_retries_total", "Upstream requests retried after transient errors, by tool.",
+                     {(("tool", tool),): value for tool, value in self.retries.items()})
+        _cache_gauges(lines)
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _metric(lines: List[str], name: str, help_text: str, values: dict, kind: str = "counter"):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in sorted(values.items()):
+        lines.append(f"{name}{_labels(labels)} {value}")
+
+
+def _histograms(lines: List[str], name: str, help_text: str, histograms: Dict[str, Histogram]):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for tool, histogram in sorted(histograms.items()):
+        for bound, count in zip(histogram.bounds, histogram.counts):
+            lines.append(f"{name}_bucket{_labels((('tool', tool), ('le', bound)))} {count}")
+        lines.append(f"{name}_bucket{_labels((('tool', tool), ('le', '+Inf')))} {histogram.count}")
+        lines.append(f"{name}_sum{_labels((('tool', tool),))} {histogram.total:.6f}")
+        lines.append(f"{name}_count{_labels((('tool', tool),))} {histogram.count}")
+
+
+def _cache_gauges(lines: List[str]):
+    # Imported here: the cache modules log through utils.logger, which imports this module.
+    from .cache import response_cache
+    from .circuit import CLOSED, HALF_OPEN, OPEN, upstream_circuits
+    from .cross_section import cross_sections
+    from .cursor import result_cursors
+    from .retry import upstream_retries
+    from .singleflight import upstream_flights
+
+    stats = response_cache.stats()
+    _metric(lines, "minishare_response_cache_lookups_total", "Response cache lookups by result.",
+             {(("result", "hit"),): stats["hits"], (("result", "miss"),): stats["misses"]})
+    _metric(lines, "minishare_response_cache_stale_hits_total", "Expired responses served while a circuit was open.",
+             {(): stats["stale_hits"]})
+    _metric(lines, "minishare_response_cache_bytes", "Bytes held by the response cache.",
+             {(): stats["bytes"]}, kind="gauge")
+    _metric(lines, "minishare_singleflight_collapsed_total", "Upstream requests shared with an in-flight call.",
+             {(): upstream_flights.stats()["collapsed"]})
+    _metric(lines, "minishare_cross_section_hits_total", "Calls answered from stored cross-sections.",
+             {(): cross_sections.stats()["hits"]})
+    _metric(lines, "minishare_result_cursors", "Open result cursors.",
+             {(): result_cursors.stats()["cursors"]}, kind="gauge")
+    retry_stats = upstream_retries.stats()
+    _metric(lines, "minishare_retry_budget_exhausted_total", "Transient failures raised because the retry budget was empty.",
+             {(): retry_stats["exhausted"]})
+    _metric(lines, "minishare_retry_budget_tokens", "Retries left in the process-wide retry budget.",
+             {(): round(retry_stats["tokens"], 2)}, kind="gauge")
+    circuits = upstream_circuits.stats()
+    state_codes = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+    _metric(lines, "minishare_circuit_state", "Upstream circuit state (0 closed, 1 half-open, 2 open).",
+             {(("endpoint", endpoint),): state_codes[item["state"]] for endpoint, item in circuits.items()},
+             kind="gauge")
+    _metric(lines, "minishare_circuit_opened_total", "Times an upstream circuit opened.",
+             {(("endpoint", endpoint),): item["opened"] for endpoint, item in circuits.items()})
+    _metric(lines, "minishare_circuit_rejected_total", "Upstream requests failed fast by an open circuit.",
+             {(("endpoint", endpoint),): item["rejected"] for endpoint, item in circuits.items()})
+
+
+# Process-wide registry fed by handle_exception and UpstreamClient.
+metrics = MetricsRegistry()
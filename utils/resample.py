@@ -0,0 +1,225 @@
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .cache import CST
+
+PERIODS = ("weekly", "monthly", "quarterly", "yearly")
+# (ts_code, period) series whose completed bars are kept; least recently
+# used series are dropped first.
+MAX_SERIES = 4096
+
+# first_pre_close is the pre_close of the period's first daily bar.
+BAR_COLUMNS = ("trade_date", "name", "open", "high", "low", "close", "vol", "amount", "first_pre_close")
+Bar = Tuple[str, object, float, float, float, float, float, float, float]
+
+
+def period_keys(trade_dates, period: str) -> np.ndarray:
+    """Integer period key per YYYYMMDD date; keys increase with time.
+
+    Weeks run Monday-Sunday and are numbered from the Unix epoch, months,
+    quarters and years count from year 0.
+    """
+    if period == "weekly":
+        days = pd.to_datetime(pd.Series(trade_dates, dtype=str), format="%Y%m%d").to_numpy()
+        days = days.astype("datetime64[D]").astype(np.int64)
+        # 1970-01-01 was a Thursday: shift by 3 so weeks start on Monday.
+        return (days + 3) // 7
+    values = np.asarray(trade_dates, dtype=str).astype(np.int64)
+    year, month = values // 10000, values // 100 % 100
+    if period == "monthly":
+        return year * 12 + month - 1
+    if period == "quarterly":
+        return year * 4 + (month - 1) // 3
+    if period == "yearly":
+        return year
+    raise ValueError(f"unknown period: {period}")
+
+
+def period_bounds(key: int, period: str) -> Tuple[str, str]:
+    """First and last calendar day (YYYYMMDD) of a period key."""
+    if period == "weekly":
+        start = date(1970, 1, 1) + timedelta(days=int(key) * 7 - 3)
+        end = start + timedelta(days=6)
+    else:
+        months = {"monthly": 1, "quarterly": 3, "yearly": 12}[period]
+        # Month index (year * 12 + month - 1) of the period's first month.
+        first = int(key) * months
+        start = date(first // 12, first % 12 + 1, 1)
+        after = first + months
+        end = date(after // 12, after % 12 + 1, 1) - timedelta(days=1)
+    return start.strftime("%Y%m%d"), end.strftime("%Y%m%d")
+
+
+class PeriodBarCache:
+    """Completed period bars per (ts_code, period), keyed by period key.
+
+    A bar is only stored once its period has ended and the daily rows it
+    was built from covered the whole period, so it never changes again.
+    """
+
+    def __init__(self, max_series: int = MAX_SERIES):
+        self.max_series = max_series
+        self._series: "OrderedDict[Tuple[str, str], Dict[int, Bar]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, ts_code: str, period: str) -> Dict[int, Bar]:
+        with self._lock:
+            bars = self._series.get((ts_code, period))
+            if bars is None:
+                return {}
+            self._series.move_to_end((ts_code, period))
+            return dict(bars)
+
+    def update(self, ts_code: str, period: str, bars: Dict[int, Bar]):
+        if not bars:
+            return
+        with self._lock:
+            self._series.setdefault((ts_code, period), {}).update(bars)
+            self._series.move_to_end((ts_code, period))
+            while len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "series": len(self._series),
+                "bars": sum(len(bars) for bars in self._series.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def resample_bars(
+    daily: pd.DataFrame,
+    period: str,
+    cache: Optional[PeriodBarCache] = None,
+    start_date: str = "",
+    end_date: str = "",
+    clock: Callable[[], datetime] = lambda: datetime.now(CST),
+    daily_pre_close: bool = False,
+) -> pd.DataFrame:
+    """Aggregate daily bars (ts_code, trade_date, OHLC, vol, amount) into
+    weekly, monthly, quarterly or yearly bars.
+
+    Rows are grouped by (ts_code, integer period key) and reduced with NumPy
+    reduceat. Bars of completed periods come from ``cache`` when present,
+    so a repeated query only recomputes the open period. pre_close chains
+    each code's bars in order, or with ``daily_pre_close`` is the first
+    daily bar's (ex-rights adjusted) pre_close; change and pct_chg follow.
+    Set ``daily.attrs["truncated"]`` when the response may have hit the
+    upstream row cap, so no code's oldest period is cached as complete.
+    """
+    if daily is None or daily.empty:
+        return pd.DataFrame()
+    cache = cache if cache is not None else period_bars
+    truncated = bool(daily.attrs.get("truncated"))
+    daily = daily.sort_values(["ts_code", "trade_date"], kind="stable").reset_index(drop=True)
+    codes = daily["ts_code"].to_numpy()
+    dates = daily["trade_date"].astype(str).to_numpy()
+    keys = period_keys(dates, period)
+
+    rows = len(daily)
+    boundary = np.ones(rows, dtype=bool)
+    boundary[1:] = (codes[1:] != codes[:-1]) | (keys[1:] != keys[:-1])
+    starts = np.flatnonzero(boundary)
+    group_codes, group_keys = codes[starts], keys[starts]
+    groups = len(starts)
+    first_of_code = np.ones(groups, dtype=bool)
+    first_of_code[1:] = group_codes[1:] != group_codes[:-1]
+
+    series = {code: cache.get(code, period) for code in dict.fromkeys(group_codes)}
+    cached = [series[code].get(int(key)) for code, key in zip(group_codes, group_keys)]
+    reuse = np.array([bar is not None for bar in cached], dtype=bool)
+    cache.hits += int(reuse.sum())
+    cache.misses += int(groups - reuse.sum())
+
+    has_name = "name" in daily.columns
+    columns = {
+        "trade_date": np.empty(groups, dtype=object),
+        "name": np.full(groups, None, dtype=object),
+        **{column: np.full(groups, np.nan) for column in BAR_COLUMNS[2:]},
+    }
+
+    compute = np.flatnonzero(~reuse)
+    if len(compute):
+        # Reduce only the rows of groups that have to be (re)computed.
+        group_of_row = np.cumsum(boundary) - 1
+        selected = ~reuse[group_of_row]
+        sub_boundary = boundary[selected]
+        sub_starts = np.flatnonzero(sub_boundary)
+        sub_ends = np.append(sub_starts[1:], selected.sum()) - 1
+
+        def values(column):
+            if column not in daily.columns:
+                return np.full(len(sub_boundary), np.nan)
+            return pd.to_numeric(daily[column], errors="coerce").to_numpy(dtype=float)[selected]
+
+        columns["trade_date"][compute] = dates[selected][sub_ends]
+        if has_name:
+            columns["name"][compute] = daily["name"].to_numpy()[selected][sub_starts]
+        columns["open"][compute] = values("open")[sub_starts]
+        columns["close"][compute] = values("close")[sub_ends]
+        columns["high"][compute] = np.fmax.reduceat(values("high"), sub_starts)
+        columns["low"][compute] = np.fmin.reduceat(values("low"), sub_starts)
+        columns["vol"][compute] = np.add.reduceat(np.nan_to_num(values("vol")), sub_starts)
+        columns["amount"][compute] = np.add.reduceat(np.nan_to_num(values("amount")), sub_starts)
+        columns["first_pre_close"][compute] = values("pre_close")[sub_starts]
+
+    for index in np.flatnonzero(reuse):
+        for column, value in zip(BAR_COLUMNS, cached[index]):
+            columns[column][index] = value
+
+    _remember_completed(
+        cache, period, columns, group_codes, group_keys, compute, first_of_code, start_date, end_date,
+        clock().strftime("%Y%m%d"), truncated,
+    )
+
+    close = columns["close"]
+    if daily_pre_close and "pre_close" in daily.columns:
+        pre_close = columns["first_pre_close"]
+    else:
+        pre_close = np.empty(groups)
+        pre_close[0] = np.nan
+        pre_close[1:] = close[:-1]
+        pre_close[first_of_code] = np.nan
+    result = pd.DataFrame({"ts_code": group_codes, **columns}).drop(columns="first_pre_close")
+    if not has_name:
+        result = result.drop(columns="name")
+    result["pre_close"] = pre_close
+    result["change"] = close - pre_close
+    result["pct_chg"] = result["change"] / pre_close * 100
+    return result
+
+
+def _remember_completed(cache, period, columns, group_codes, group_keys, compute, first_of_code,
+                        start_date, end_date, today, truncated=False):
+    """Store freshly computed bars whose period is over and fully covered."""
+    fresh: Dict[str, Dict[int, Bar]] = {}
+    for index in compute:
+        key = int(group_keys[index])
+        period_start, period_end = period_bounds(key, period)
+        if period_end >= today or (end_date and period_end > end_date):
+            continue
+        # A code's first group may start mid-period: the range starts inside
+        # it, or a newest-first response cut at the row cap lost its oldest rows.
+        if first_of_code[index] and (truncated or not (start_date and period_start >= start_date)):
+            continue
+        bar = tuple(columns[column][index] for column in BAR_COLUMNS)
+        fresh.setdefault(group_codes[index], {})[key] = bar
+    for code, bars in fresh.items():
+        cache.update(code, period, bars)
+
+
+# Process-wide cache of completed SW/index period bars.
+period_bars = PeriodBarCache()
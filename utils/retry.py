@@ -0,0 +1,161 @@
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from .logger import log_warning
+from .metrics import metrics
+
+# Retries the whole process may spend in a burst; refilled at RETRY_REFILL per second.
+RETRY_BUDGET = float(os.getenv("MINISHARE_MCP_RETRY_BUDGET", "20"))
+RETRY_REFILL = float(os.getenv("MINISHARE_MCP_RETRY_REFILL", "0.2"))
+
+
+class RetryRule(NamedTuple):
+    # Total attempts, the first call included.
+    attempts: int = 3
+    # Backoff before retry n is uniform in [0, min(max_delay, base_delay * 2 ** n)].
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    # Extra error messages that are transient for this endpoint.
+    messages: Tuple[str, ...] = ()
+
+
+DEFAULT_RULE = RetryRule()
+# Per-endpoint overrides; endpoints not listed use DEFAULT_RULE.
+ENDPOINT_RULES: Dict[str, RetryRule] = {
+    # Corpus endpoints are limited per minute, so a short backoff only
+    # spends budget on requests that will be refused again.
+    "news": RetryRule(base_delay=2.0, max_delay=20.0),
+    "major_news": RetryRule(base_delay=2.0, max_delay=20.0),
+    "cctv_news": RetryRule(base_delay=2.0, max_delay=20.0),
+    "anns_d": RetryRule(base_delay=2.0, max_delay=20.0),
+    "research_report": RetryRule(base_delay=2.0, max_delay=20.0),
+    # Minute bars are the heaviest responses; one retry is enough.
+    "stk_mins": RetryRule(attempts=2),
+}
+
+# Network-level failures; requests' exceptions derive from OSError.
+TRANSIENT_EXCEPTIONS = (ConnectionError, TimeoutError, OSError)
+# Local filesystem errors (BarStore, cache files) are not fixed by waiting.
+PERMANENT_EXCEPTIONS = (FileNotFoundError, PermissionError, IsADirectoryError, NotADirectoryError)
+TRANSIENT_MESSAGES = (
+    '处理服务端响应失败', '每分钟最多访问', 'timeout', 'timed out', 'connection reset',
+    'temporarily unavailable', 'rate limit',
+)
+# Upstream refusals that no retry can change.
+PERMANENT_MESSAGES = ('没有访问该接口的权限', '积分不足', '请指定正确的接口名')
+
+
+def rule_for(endpoint: str) -> RetryRule:
+    return ENDPOINT_RULES.get(endpoint, DEFAULT_RULE)
+
+
+def is_transient(exc: BaseException, endpoint: str = "") -> bool:
+    """Whether exc is worth retrying; programming errors (TypeError, KeyError, ...) never are."""
+    message = str(exc).lower()
+    if isinstance(exc, PERMANENT_EXCEPTIONS) or any(kw in message for kw in PERMANENT_MESSAGES):
+        return False
+    if isinstance(exc, TRANSIENT_EXCEPTIONS):
+        return True
+    return any(kw in message for kw in TRANSIENT_MESSAGES + rule_for(endpoint).messages)
+
+
+class RetryBudget:
+    """Token bucket shared by every retry in the process.
+
+    A retry takes one token; when the bucket is empty failures are raised
+    at once, so a degraded backend sees at most ``capacity`` extra requests
+    in a burst and ``refill`` per second after that.
+    """
+
+    def __init__(self, capacity: float = RETRY_BUDGET, refill: float = RETRY_REFILL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.refill = refill
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _fill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill)
+        self._updated = now
+
+    def take(self) -> bool:
+        with self._lock:
+            self._fill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._fill()
+            return self._tokens
+
+
+class RetryPolicy:
+    """Retries one upstream sub-call with exponential backoff and full jitter.
+
+    UpstreamClient runs each endpoint fetch through ``call()``, so only the
+    request that failed is repeated, never the tool around it. Sleeps wait on
+    an event that ``close()`` sets, so shutdown does not sit out a backoff.
+    """
+
+    def __init__(
+        self,
+        budget: Optional[RetryBudget] = None,
+        jitter: Callable[[float, float], float] = random.uniform,
+    ):
+        self.budget = budget if budget is not None else RetryBudget()
+        self._jitter = jitter
+        self._closed = threading.Event()
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.exhausted = 0
+
+    def call(self, endpoint: str, func: Callable[[], Any]) -> Any:
+        attempt = 0
+        while True:
+            try:
+                return func()
+            except Exception as exc:
+                delay = self._backoff(endpoint, exc, attempt)
+                if delay is None or self._closed.wait(delay):
+                    raise
+            attempt += 1
+
+    def _backoff(self, endpoint: str, exc: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying, or None to give up and raise exc."""
+        rule = rule_for(endpoint)
+        if attempt + 1 >= rule.attempts or self._closed.is_set() or not is_transient(exc, endpoint):
+            return None
+        if not self.budget.take():
+            with self._lock:
+                self.exhausted += 1
+            log_warning("Retry budget exhausted, not retrying %s: %s", endpoint, exc)
+            return None
+        with self._lock:
+            self.retries += 1
+        metrics.record_retry()
+        delay = self._jitter(0, min(rule.max_delay, rule.base_delay * 2 ** attempt))
+        log_warning("Transient error in %s (attempt %d/%d), retrying in %.2fs: %s",
+                    endpoint, attempt + 1, rule.attempts, delay, exc)
+        return delay
+
+    def close(self):
+        """Stop retrying and wake every sleeping retry so it raises now."""
+        self._closed.set()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {"retries": self.retries, "exhausted": self.exhausted, "tokens": self.budget.tokens}
+
+
+# Process-wide policy used by UpstreamClient.
+upstream_retries = RetryPolicy()
@@ -0,0 +1,261 @@
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .cache import CST
+from .logger import log_debug, log_warning
+
+STOCK_FIELDS = (
+    "ts_code,symbol,name,area,industry,market,list_date,fullname,enname,cnspell,"
+    "exchange,curr_type,list_status,delist_date,is_hs"
+)
+STOCK_LIST_STATUSES = ("L", "D", "P")
+# Upstream row cap assumed for paged reference endpoints.
+PAGE_SIZE = 5000
+MAX_PAGES = 20
+# After a failed build, fall back to upstream for this long before retrying.
+RETRY_AFTER = 300
+
+# Columns of the combined lookup table built from every asset type.
+SECURITY_COLUMNS = [
+    "ts_code", "symbol", "name", "fullname", "asset_type", "cnspell", "industry", "area", "list_status",
+]
+
+
+def _paged(func: Callable[..., pd.DataFrame], **params) -> pd.DataFrame:
+    """Call a reference endpoint page by page until a short page comes back."""
+    frames = []
+    for page in range(MAX_PAGES):
+        frame = func(**params, limit=PAGE_SIZE, offset=page * PAGE_SIZE)
+        if frame is None or frame.empty:
+            break
+        frames.append(frame)
+        if len(frame) < PAGE_SIZE:
+            break
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def _load_stocks(pro) -> pd.DataFrame:
+    frames = [_paged(pro.stock_basic, list_status=status, fields=STOCK_FIELDS) for status in STOCK_LIST_STATUSES]
+    frames = [frame for frame in frames if not frame.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def _load_indices(pro) -> pd.DataFrame:
+    return _paged(pro.index_basic, fields="ts_code,name,market,list_date")
+
+
+def _load_sw_indices(pro) -> pd.DataFrame:
+    df = pro.index_classify(src="SW2021", fields="index_code,industry_name,level")
+    if df is None or df.empty:
+        return pd.DataFrame()
+    return df.rename(columns={"index_code": "ts_code", "industry_name": "name"})
+
+
+def _load_etfs(pro) -> pd.DataFrame:
+    df = _paged(pro.etf_basic, fields="ts_code,csname,list_status")
+    return df.rename(columns={"csname": "name"})
+
+
+def _load_funds(pro) -> pd.DataFrame:
+    frames = [_paged(pro.fund_basic, market=market, fields="ts_code,name,status") for market in ("E", "O")]
+    frames = [frame for frame in frames if not frame.empty]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return df.rename(columns={"status": "list_status"})
+
+
+def _load_former_names(pro) -> pd.DataFrame:
+    return _paged(pro.namechange, fields="ts_code,name,start_date,end_date")
+
+
+# Asset types in lookup priority: the first type listing a code owns it.
+LOADERS = {
+    "stock": _load_stocks,
+    "index": _load_indices,
+    "sw_index": _load_sw_indices,
+    "etf": _load_etfs,
+    "fund": _load_funds,
+}
+
+
+def _hash_index(values: pd.Series, lower: bool = False) -> Dict[str, np.ndarray]:
+    """Map each non-null value to the row positions holding it.
+
+    ``values`` must carry a RangeIndex, so index labels are row positions.
+    """
+    values = values.dropna().astype(str)
+    if lower:
+        values = values.str.lower()
+    groups = values.groupby(values, sort=False).groups
+    return {key: np.asarray(labels, dtype=int) for key, labels in groups.items()}
+
+
+class _Snapshot:
+    """One immutable load of the master; swapped in whole on refresh."""
+
+    def __init__(self, frames: Dict[str, pd.DataFrame], loaded_on: str, former_names: Optional[pd.DataFrame] = None):
+        self.loaded_on = loaded_on
+        self.former_names = former_names if former_names is not None else pd.DataFrame()
+        self.stocks = frames.get("stock", pd.DataFrame()).reset_index(drop=True)
+
+        parts = []
+        for asset_type, frame in frames.items():
+            if frame.empty or "ts_code" not in frame.columns:
+                continue
+            part = frame.reindex(columns=SECURITY_COLUMNS).copy()
+            part["asset_type"] = asset_type
+            parts.append(part)
+        table = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=SECURITY_COLUMNS)
+        self.securities = table.drop_duplicates("ts_code", keep="first").reset_index(drop=True)
+
+        self.by_code = {code: row for row, code in enumerate(self.securities["ts_code"].tolist())}
+        self.by_name = _hash_index(self.securities["name"])
+        self.by_cnspell = _hash_index(self.securities["cnspell"], lower=True)
+        self.stock_indexes = {
+            column: _hash_index(self.stocks[column])
+            for column in ("ts_code", "name", "industry", "area", "list_status", "exchange", "market", "is_hs")
+            if column in self.stocks.columns
+        }
+
+
+class SecurityMaster:
+    """In-memory security master for stocks, indices, SW indices, ETFs and funds.
+
+    Hash indexes on ts_code, name, cnspell, industry and area make name
+    resolution O(1) and filtered stock listings O(k) in the matched rows.
+    The master is loaded on first use and reloaded once per calendar day;
+    reloads after the first run in the background while the previous
+    snapshot keeps serving lookups.
+    """
+
+    def __init__(self, clock: Callable[[], datetime] = lambda: datetime.now(CST)):
+        self._clock = clock
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._failed_at: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def snapshot(self) -> Optional[_Snapshot]:
+        """Current snapshot (replaced, never mutated, on refresh)."""
+        return self._snapshot
+
+    def ensure_loaded(self, pro) -> bool:
+        """Make sure a snapshot exists; returns False if it could not be built."""
+        today = self._clock().strftime("%Y%m%d")
+        snapshot = self._snapshot
+        if snapshot is None:
+            if self._failed_at is not None and time.monotonic() - self._failed_at < RETRY_AFTER:
+                return False
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._build(pro, today)
+                    self._failed_at = None if self._snapshot is not None else time.monotonic()
+            return self._snapshot is not None
+        if snapshot.loaded_on != today:
+            self._refresh_in_background(pro, today)
+        return True
+
+    def _refresh_in_background(self, pro, today: str):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                snapshot = self._build(pro, today)
+                if snapshot is not None:
+                    self._snapshot = snapshot
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=refresh, name="security-master-refresh", daemon=True).start()
+
+    @staticmethod
+    def _build(pro, today: str) -> Optional[_Snapshot]:
+        frames = {}
+        for asset_type, loader in LOADERS.items():
+            try:
+                frames[asset_type] = loader(pro)
+            except Exception as exc:
+                log_warning("SecurityMaster: loading %s failed: %s", asset_type, exc)
+                frames[asset_type] = pd.DataFrame()
+        if frames["stock"].empty:
+            log_debug("SecurityMaster: stock_basic returned nothing, master not built.")
+            return None
+        try:
+            former_names = _load_former_names(pro)
+        except Exception as exc:
+            log_warning("SecurityMaster: loading namechange failed: %s", exc)
+            former_names = pd.DataFrame()
+        snapshot = _Snapshot(frames, today, former_names)
+        log_debug("SecurityMaster loaded: %s", {asset_type: len(frame) for asset_type, frame in frames.items()})
+        return snapshot
+
+    # -- lookups ---------------------------------------------------------
+
+    def lookup(self, ts_code: str) -> Optional[dict]:
+        """Row of the combined table for ts_code, or None."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        row = snapshot.by_code.get(ts_code)
+        return None if row is None else snapshot.securities.iloc[row].to_dict()
+
+    def name_of(self, ts_code: str) -> Optional[str]:
+        record = self.lookup(ts_code)
+        name = record.get("name") if record else None
+        return name if isinstance(name, str) and name else None
+
+    def codes_by_name(self, name: str) -> List[str]:
+        """Codes whose name is exactly ``name`` (all asset types)."""
+        return self._codes("by_name", name)
+
+    def codes_by_cnspell(self, cnspell: str) -> List[str]:
+        """Codes whose pinyin initials equal ``cnspell`` (case-insensitive)."""
+        return self._codes("by_cnspell", cnspell.lower())
+
+    def _codes(self, index_name: str, key: str) -> List[str]:
+        snapshot = self._snapshot
+        rows = getattr(snapshot, index_name).get(key) if snapshot is not None else None
+        if rows is None:
+            return []
+        return snapshot.securities["ts_code"].to_numpy()[rows].tolist()
+
+    def stocks(self, ts_codes: Optional[Iterable[str]] = None, **filters: str) -> pd.DataFrame:
+        """Stock rows matching every non-empty filter (exact column values).
+
+        Filters are column names of stock_basic (name, industry, area,
+        list_status, exchange, market, is_hs); ts_codes selects by code.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise RuntimeError("security master not loaded")
+        indexes = snapshot.stock_indexes
+        empty = np.array([], dtype=int)
+        selections = []
+        if ts_codes is not None:
+            code_index = indexes.get("ts_code", {})
+            selections.append(np.concatenate([code_index.get(code, empty) for code in ts_codes] or [empty]))
+        for column, value in filters.items():
+            if value:
+                selections.append(indexes.get(column, {}).get(value, empty))
+        if not selections:
+            return snapshot.stocks
+        rows = selections[0]
+        for other in selections[1:]:
+            rows = np.intersect1d(rows, other)
+        return snapshot.stocks.iloc[np.sort(np.unique(rows))]
+
+
+# Process-wide master shared by every tool.
+security_master = SecurityMaster()
@@ -0,0 +1,111 @@
+import base64
+import io
+import json
+import os
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+OUTPUT_FORMATS = ("text", "json", "arrow", "auto")
+# From this many rows "auto" sends Arrow IPC instead of column JSON.
+ARROW_MIN_ROWS = int(os.getenv("MINISHARE_MCP_ARROW_ROWS", "2000"))
+# DataFrame.attrs passed through to structured output.
+META_ATTRS = ("adj", "failed_codes")
+
+
+def validate_output_format(output_format: str) -> Optional[str]:
+    """Error message for an unsupported output_format value, else None."""
+    if output_format and output_format not in OUTPUT_FORMATS:
+        return f"错误：output_format 仅支持 {' / '.join(OUTPUT_FORMATS)}（默认 text）"
+    return None
+
+
+def is_structured(output_format: str) -> bool:
+    return bool(output_format) and output_format != "text"
+
+
+def _meta(df: pd.DataFrame) -> Dict[str, Any]:
+    return {key: df.attrs[key] for key in META_ATTRS if df.attrs.get(key)}
+
+
+def _json_value(value: Any) -> Any:
+    """Plain Python value for one cell; None for NaN, pd.NA, NaT and ±inf,
+    which JSON cannot carry. Array cells become lists."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    if np.ndim(value) == 0 and pd.isna(value):
+        return None
+    return value
+
+
+def _column_values(values: pd.Series) -> list:
+    # Nullable extension dtypes (Int64, Float64, boolean) hold pd.NA and take the generic path.
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind in "iub":
+        return values.tolist()
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind == "f":
+        array = values.to_numpy()
+        return np.where(np.isfinite(array), array, None).tolist()
+    return [_json_value(value) for value in values.astype(object).tolist()]
+
+
+def to_column_json(df: pd.DataFrame) -> str:
+    """Column-oriented JSON: {"columns": [...], "data": {column: [values]}}.
+
+    Numbers keep full precision (shortest round-trip repr); missing values
+    and ±inf are null.
+    """
+    payload = {
+        "format": "json",
+        "rows": len(df),
+        "columns": [str(column) for column in df.columns],
+        "dtypes": {str(column): str(dtype) for column, dtype in df.dtypes.items()},
+        "data": {str(column): _column_values(df[column]) for column in df.columns},
+    }
+    meta = _meta(df)
+    if meta:
+        payload["meta"] = meta
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, default=str)
+
+
+def to_arrow_ipc(df: pd.DataFrame) -> str:
+    """Arrow IPC stream of df, base64-encoded inside a small JSON envelope."""
+    import pyarrow as pa
+
+    frame = df.reset_index(drop=True)
+    try:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type object columns are sent as strings.
+        mixed = frame.select_dtypes(include="object").columns
+        frame = frame.astype({column: str for column in mixed})
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    payload = {
+        "format": "arrow",
+        "encoding": "base64",
+        "rows": len(df),
+        "columns": [str(column) for column in df.columns],
+        "data": base64.b64encode(sink.getvalue()).decode("ascii"),
+    }
+    meta = _meta(df)
+    if meta:
+        payload["meta"] = meta
+    return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def structured_output(df: Optional[pd.DataFrame], output_format: str) -> str:
+    """Whole df in output_format (json, arrow, or auto by row count)."""
+    if df is None:
+        df = pd.DataFrame()
+    if output_format == "auto":
+        output_format = "arrow" if len(df) >= ARROW_MIN_ROWS else "json"
+    if output_format == "arrow":
+        return to_arrow_ipc(df)
+    return to_column_json(df)
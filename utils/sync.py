@@ -0,0 +1,182 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .cache import CST
+from .cross_section import CrossSectionStore, cross_sections, date_param, fetch_cross_section
+from .logger import log_debug, log_info, log_warning
+from .token_manager import get_pro_client
+from .trade_calendar import TradingCalendar, last_close, trading_calendar
+from .upstream import UpstreamClient
+
+# End-of-day datasets pulled as whole-market cross-sections, per category.
+SYNC_DATASETS = {
+    "stock": ("daily", "daily_basic", "stk_limit", "moneyflow", "top_list", "hsgt_top10"),
+    "fund": ("fund_daily", "fund_nav", "fund_share", "fund_adj"),
+    "finance": ("forecast", "express", "dividend"),
+}
+# Sync categories used when none are configured, per served tool category.
+DEFAULT_SYNC_BY_TOOL_CATEGORY = {"stock": ("stock", "finance"), "fund": ("fund",), "corpus": ()}
+# Seconds between sync passes; datasets still unpublished are retried.
+SYNC_INTERVAL = float(os.getenv("MINISHARE_MCP_SYNC_INTERVAL", "600"))
+
+
+def resolve_sync_categories(requested: Optional[Iterable[str]], tool_categories: Optional[Iterable[str]]) -> List[str]:
+    """Expand --sync / MINISHARE_MCP_SYNC values; "none" disables syncing."""
+    values = []
+    for value in requested or []:
+        values.extend(part.strip() for part in value.split(",") if part.strip())
+    if not values:
+        env = os.getenv("MINISHARE_MCP_SYNC", "")
+        values = [part.strip() for part in env.split(",") if part.strip()]
+    if not values:
+        categories = []
+        for category in tool_categories or DEFAULT_SYNC_BY_TOOL_CATEGORY:
+            categories.extend(DEFAULT_SYNC_BY_TOOL_CATEGORY.get(category, ()))
+        values = categories
+    if "none" in values:
+        return []
+    unknown = [value for value in values if value not in SYNC_DATASETS]
+    if unknown:
+        raise ValueError(f"Unknown sync categories: {','.join(unknown)} (choose from {','.join(SYNC_DATASETS)})")
+    return list(dict.fromkeys(values))
+
+
+class SyncDaemon:
+    """Background job that pulls end-of-day cross-sections once per trading day.
+
+    Each pass targets the latest trading day whose close has passed and
+    fetches every configured dataset not yet in the CrossSectionStore.
+    Datasets that come back empty (not published yet) are retried on the
+    next pass, every ``interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        categories: Iterable[str],
+        store: Optional[CrossSectionStore] = None,
+        calendar: Optional[TradingCalendar] = None,
+        clock: Callable[[], datetime] = lambda: datetime.now(CST),
+        interval: float = SYNC_INTERVAL,
+    ):
+        self._client_factory = client_factory
+        self.categories = list(categories)
+        self.endpoints = [endpoint for category in self.categories for endpoint in SYNC_DATASETS[category]]
+        self._store = store if store is not None else cross_sections
+        self._calendar = calendar if calendar is not None else trading_calendar
+        self._clock = clock
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # (endpoint, day) pulls that hit the page cap; not stored, not retried.
+        self._truncated: set = set()
+
+    def target_date(self) -> str:
+        """Latest trading day whose close has passed."""
+        return self._calendar.previous(last_close(self._clock()).strftime("%Y%m%d"))
+
+    def run_once(self) -> Dict[str, Any]:
+        """One sync pass; returns rows fetched (or the error) per endpoint."""
+        pro = self._client_factory()
+        # Bulk pulls bypass the response cache; the store holds the result.
+        if isinstance(pro, UpstreamClient):
+            pro = pro.sdk
+        self._calendar.ensure_loaded(pro)
+        day = self.target_date()
+        if not day:
+            log_debug("SyncDaemon: no trading day known yet, skipping pass")
+            return {}
+        results: Dict[str, Any] = {}
+        for endpoint in self.endpoints:
+            if self._store.has(endpoint, day) or (endpoint, day) in self._truncated:
+                continue
+            try:
+                frame = fetch_cross_section(pro, endpoint, day)
+            except Exception as exc:
+                log_warning("SyncDaemon: %s %s failed: %s", endpoint, day, exc)
+                results[endpoint] = exc
+                continue
+            if frame.attrs.get("truncated"):
+                self._truncated.add((endpoint, day))
+            self._store.put(endpoint, day, frame)
+            results[endpoint] = len(frame)
+        if results:
+            log_info("SyncDaemon pass for %s: %s", day, ", ".join(f"{k}={v}" for k, v in results.items()))
+        return results
+
+    def start(self):
+        if self._thread is not None or not self.endpoints:
+            return
+        self._thread = threading.Thread(target=self._loop, name="eod-sync", daemon=True)
+        self._thread.start()
+        log_info("SyncDaemon started for %s every %.0fs", ",".join(self.categories), self.interval)
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as exc:
+                log_warning("SyncDaemon pass failed: %s", exc)
+            self._stop.wait(self.interval)
+
+
+class FakeSyncClient:
+    """Offline stand-in for the SDK client used by ``--sync-offline``.
+
+    Every endpoint returns deterministic rows for ``codes`` on the requested
+    date (honouring limit/offset); trade_cal and index_daily report weekdays
+    as trading days.
+    """
+
+    def __init__(self, codes: Iterable[str] = ("000001.SZ", "600000.SH", "510300.SH")):
+        self.codes = list(codes)
+        self.calls: List[tuple] = []
+
+    def trade_cal(self, start_date, end_date, **kwargs) -> pd.DataFrame:
+        days = pd.bdate_range(start_date, end_date).strftime("%Y%m%d")
+        return pd.DataFrame({"cal_date": days})
+
+    def index_daily(self, start_date, end_date, **kwargs) -> pd.DataFrame:
+        end = min(end_date, (datetime.now(CST) - timedelta(days=1)).strftime("%Y%m%d"))
+        days = pd.bdate_range(start_date, end).strftime("%Y%m%d") if end >= start_date else []
+        return pd.DataFrame({"trade_date": list(days)[::-1]})
+
+    def __getattr__(self, endpoint: str):
+        if endpoint.startswith("_"):
+            raise AttributeError(endpoint)
+
+        def fetch(limit: Optional[int] = None, offset: int = 0, **params) -> pd.DataFrame:
+            self.calls.append((endpoint, params, limit, offset))
+            day = params.get(date_param(endpoint)) or params.get("start_date") or ""
+            seed = sum(map(ord, endpoint + day))
+            values = np.round(np.random.default_rng(seed).uniform(1, 100, len(self.codes)), 2)
+            frame = pd.DataFrame({"ts_code": self.codes, date_param(endpoint): day, "close": values, "vol": values * 100})
+            end = None if limit is None else offset + limit
+            return frame.iloc[offset:end].reset_index(drop=True)
+
+        return fetch
+
+
+def start_sync(categories: List[str], offline: bool = False) -> Optional[SyncDaemon]:
+    """Start the post-close sync for server.py.
+
+    Offline mode drives a FakeSyncClient into a private store and calendar,
+    so fake rows never reach tool responses.
+    """
+    if not categories:
+        return None
+    if offline:
+        client = FakeSyncClient()
+        daemon = SyncDaemon(lambda: client, categories, store=CrossSectionStore(), calendar=TradingCalendar())
+    else:
+        daemon = SyncDaemon(get_pro_client, categories)
+    daemon.start()
+    return daemon
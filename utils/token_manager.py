@@ -1,61 +1,151 @@
 import os
-import sys
-import traceback
+import threading
+import time
 from pathlib import Path
-from typing import Optional
-from dotenv import load_dotenv, set_key
+from typing import Any, Callable, Dict, Optional, Tuple
+from dotenv import dotenv_values, set_key
 import tinyshare as ts  # minishare 数据 SDK（pip 包名仍为 tinyshare）
-from .logger import log_debug
+from .logger import log_debug, log_error, log_info
+from .upstream import UpstreamClient
 
 ENV_FILE = Path.home() / ".minishare_mcp" / ".env"
-log_debug(f"ENV_FILE path resolved to: {ENV_FILE}")
+log_debug("ENV_FILE path resolved to: %s", ENV_FILE)
+
+# Authenticated SDK clients, built once per (kind, token) and shared by all
+# tool calls. Entries are dropped when the matching set_*_token runs.
+_CLIENTS: Dict[Tuple[str, str], Any] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _get_or_create_client(kind: str, token: str, factory: Callable[[str], Any]):
+    """Return the pooled client for kind/token, creating it on first use."""
+    key = (kind, token)
+    client = _CLIENTS.get(key)
+    if client is not None:
+        return client
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            log_info("Creating pooled %s client.", kind)
+            client = factory(token)
+            _CLIENTS[key] = client
+    return client
+
+
+def invalidate_clients(kind: Optional[str] = None):
+    """Drop pooled clients of one kind ('data' / 'corpus'), or all of them."""
+    with _CLIENTS_LOCK:
+        for key in list(_CLIENTS):
+            if kind is None or key[0] == kind:
+                del _CLIENTS[key]
 
 def init_env_file():
     """初始化环境变量文件"""
-    log_debug("init_env_file called.")
     try:
-        log_debug(f"Attempting to create directory: {ENV_FILE.parent}")
         ENV_FILE.parent.mkdir(parents=True, exist_ok=True)
-        log_debug(f"Directory {ENV_FILE.parent} ensured.")
         if not ENV_FILE.exists():
-            log_debug(f"ENV_FILE {ENV_FILE} does not exist, attempting to touch.")
             ENV_FILE.touch()
-            log_debug(f"ENV_FILE {ENV_FILE} touched.")
-        else:
-            log_debug(f"ENV_FILE {ENV_FILE} already exists.")
-        load_dotenv(ENV_FILE)
-        log_debug("load_dotenv(ENV_FILE) called.")
+            log_debug("ENV_FILE %s created.", ENV_FILE)
     except Exception as e_fs:
-        log_debug(f"ERROR in init_env_file filesystem operations: {str(e_fs)}")
-        traceback.print_exc(file=sys.stderr)
+        log_error("init_env_file filesystem operations failed: %s", e_fs, exc_info=True)
+
+
+# ============================================================================
+# In-memory token store
+# ============================================================================
+# Tokens are resolved from the process environment and ENV_FILE once, then
+# served from memory. ENV_FILE is re-read only when its mtime changes (checked
+# at most every _ENV_CHECK_INTERVAL seconds) or when set_*_token writes it.
+
+# Variable names per token kind, in lookup order.
+_TOKEN_ENV_KEYS = {
+    "data": ("TINYSHARE_TOKEN", "MINISHARE_DATA_TOKEN"),
+    "corpus": ("MINISHARE_TOKEN", "MINISHARE_CORPUS_TOKEN"),
+}
+_ENV_CHECK_INTERVAL = 1.0
+
+_TOKENS: Dict[str, Optional[str]] = {}
+_TOKENS_LOCK = threading.Lock()
+_token_state = {"loaded": False, "mtime": None, "checked_at": 0.0}
+
+
+def _env_file_mtime() -> Optional[float]:
+    try:
+        return ENV_FILE.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _load_tokens():
+    """(Re)load every token kind from the environment and ENV_FILE."""
+    init_env_file()
+    file_values = dotenv_values(ENV_FILE)
+    tokens = {}
+    for kind, keys in _TOKEN_ENV_KEYS.items():
+        # Process environment wins over the file, as load_dotenv() did.
+        tokens[kind] = next(
+            (value for value in (os.getenv(key) or file_values.get(key) for key in keys) if value),
+            None,
+        )
+    _TOKENS.clear()
+    _TOKENS.update(tokens)
+    _token_state["mtime"] = _env_file_mtime()
+    _token_state["loaded"] = True
+    log_debug("Token store loaded: %s", {kind: "TOKEN_FOUND" if value else "NOT_FOUND" for kind, value in tokens.items()})
+
+
+def _refresh_tokens_if_stale():
+    now = time.monotonic()
+    if _token_state["loaded"] and now - _token_state["checked_at"] < _ENV_CHECK_INTERVAL:
+        return
+    with _TOKENS_LOCK:
+        if not _token_state["loaded"]:
+            _load_tokens()
+        elif now - _token_state["checked_at"] >= _ENV_CHECK_INTERVAL:
+            if _env_file_mtime() != _token_state["mtime"]:
+                log_debug("ENV_FILE changed on disk, reloading tokens.")
+                _load_tokens()
+                invalidate_clients()
+        _token_state["checked_at"] = now
+
+
+def _get_token(kind: str) -> Optional[str]:
+    _refresh_tokens_if_stale()
+    return _TOKENS.get(kind)
+
+
+def _remember_token(kind: str, token: str):
+    """Record a token written by set_*_token without re-reading ENV_FILE."""
+    with _TOKENS_LOCK:
+        if not _token_state["loaded"]:
+            _load_tokens()
+        _TOKENS[kind] = token
+        _token_state["mtime"] = _env_file_mtime()
+        _token_state["checked_at"] = time.monotonic()
+
 
 def get_data_token() -> Optional[str]:
     """获取数据授权码（行情/财报类）"""
-    log_debug("get_data_token called.")
-    init_env_file()
-    token = os.getenv("TINYSHARE_TOKEN") or os.getenv("MINISHARE_DATA_TOKEN")
-    log_debug(f"get_data_token: os.getenv result: {'TOKEN_FOUND' if token else 'NOT_FOUND'}")
-    return token
+    return _get_token("data")
 
 def set_data_token(token: str):
     """设置数据授权码"""
-    log_debug(f"set_data_token called with token: {'********' if token else 'None'}")
+    log_debug("set_data_token called.")
     init_env_file()
     try:
         set_key(ENV_FILE, "MINISHARE_DATA_TOKEN", token)
-        log_debug(f"set_key executed for data token")
+        _remember_token("data", token)
         ts.set_token(token)
-        log_debug("data SDK set_token executed.")
+        invalidate_clients("data")
     except Exception as e:
-        log_debug(f"ERROR in set_data_token: {str(e)}")
-        traceback.print_exc(file=sys.stderr)
+        log_error("set_data_token failed: %s", e, exc_info=True)
 
 def get_pro_client():
     """Helper to get an authenticated data pro client"""
     token = get_data_token()
     if not token:
         raise ValueError("Data token not configured")
-    return ts.pro_api(token)
+    return _get_or_create_client("data", token, lambda t: UpstreamClient(ts.pro_api(t), "data"))
 
 
 # ============================================================================
@@ -64,11 +154,7 @@ def get_pro_client():
 
 def get_corpus_token() -> Optional[str]:
     """获取语料授权码（新闻/研报/公告类）"""
-    log_debug("get_corpus_token called.")
-    init_env_file()
-    token = os.getenv("MINISHARE_TOKEN") or os.getenv("MINISHARE_CORPUS_TOKEN")
-    log_debug(f"get_corpus_token: os.getenv result: {'TOKEN_FOUND' if token else 'NOT_FOUND'}")
-    return token
+    return _get_token("corpus")
 
 def set_corpus_token(token: str):
     """设置语料授权码"""
@@ -76,10 +162,10 @@ def set_corpus_token(token: str):
     init_env_file()
     try:
         set_key(ENV_FILE, "MINISHARE_CORPUS_TOKEN", token)
-        log_debug("set_key executed for corpus token")
+        _remember_token("corpus", token)
+        invalidate_clients("corpus")
     except Exception as e:
-        log_debug(f"ERROR in set_corpus_token: {str(e)}")
-        traceback.print_exc(file=sys.stderr)
+        log_error("set_corpus_token failed: %s", e, exc_info=True)
 
 def get_corpus_client():
     """Helper to get an authenticated corpus pro client for news/research endpoints"""
@@ -87,4 +173,4 @@ def get_corpus_client():
     if not token:
         raise ValueError("Corpus token not configured")
     import minishare as ms
-    return ms.pro_api(token)
+    return _get_or_create_client("corpus", token, lambda t: UpstreamClient(ms.pro_api(t), "corpus"))
@@ -0,0 +1,191 @@
+import contextlib
+import contextvars
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# JSONL file that receives one line per finished tool trace; empty disables tracing.
+TRACE_FILE = os.getenv("MINISHARE_MCP_TRACE_FILE", "")
+# Share of tool calls traced when a trace file is configured.
+TRACE_SAMPLE = float(os.getenv("MINISHARE_MCP_TRACE_SAMPLE", "1"))
+# Longest attribute value kept on a span.
+MAX_ATTR_CHARS = 200
+
+
+class Span:
+    __slots__ = ("name", "span_id", "parent_id", "start", "end", "attrs", "error")
+
+    def __init__(self, name: str, span_id: int, parent_id: Optional[int], start: float, attrs: Dict[str, Any]):
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.start = start
+        self.end: Optional[float] = None
+        self.attrs = attrs
+        self.error: Optional[str] = None
+
+    def set(self, **attrs):
+        self.attrs.update(_clean(attrs))
+
+
+class Trace:
+    """Spans of one tool invocation; spans may be added from fan-out threads."""
+
+    def __init__(self, started_at: float):
+        self.trace_id = secrets.token_hex(8)
+        self.started_at = started_at
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, parent_id: Optional[int], start: float, attrs: Dict[str, Any]) -> Span:
+        with self._lock:
+            span = Span(name, len(self.spans), parent_id, start, attrs)
+            self.spans.append(span)
+        return span
+
+    def to_dict(self) -> Dict[str, Any]:
+        root = self.spans[0]
+        origin = root.start
+        return {
+            "trace_id": self.trace_id,
+            "tool": root.name,
+            "started_at": round(self.started_at, 3),
+            "duration_ms": _ms(root.end - origin),
+            "error": root.error,
+            "spans": [
+                {
+                    "id": span.span_id,
+                    "parent": span.parent_id,
+                    "name": span.name,
+                    "start_ms": _ms(span.start - origin),
+                    "duration_ms": _ms((span.end if span.end is not None else span.start) - span.start),
+                    "attrs": span.attrs,
+                    "error": span.error,
+                }
+                for span in self.spans
+            ],
+        }
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def _clean(attrs: Dict[str, Any]) -> Dict[str, Any]:
+    cleaned = {}
+    for key, value in attrs.items():
+        if value is None or value == "":
+            continue
+        if not isinstance(value, (int, float, bool)):
+            value = str(value)
+            if len(value) > MAX_ATTR_CHARS:
+                value = value[:MAX_ATTR_CHARS] + "..."
+        cleaned[key] = value
+    return cleaned
+
+
+# (trace, current span) of the running tool call, if it is being traced.
+_active: contextvars.ContextVar[Optional[tuple]] = contextvars.ContextVar("trace_span", default=None)
+
+
+class Tracer:
+    """Span tree per tool invocation, exported as one JSON line per trace.
+
+    ``trace()`` opens the root span for a tool call (handle_exception does
+    this) and ``span()`` adds a child of the current span. Fan-out workers
+    copy the caller's context, so their sub-calls nest under the span that
+    issued them. With no trace file configured, or for calls not sampled,
+    both are no-ops.
+    """
+
+    def __init__(
+        self,
+        path: str = TRACE_FILE,
+        sample_rate: float = TRACE_SAMPLE,
+        clock: Callable[[], float] = time.perf_counter,
+        wall_clock: Callable[[], float] = time.time,
+        sample: Callable[[], float] = random.random,
+    ):
+        self.path = path
+        self.sample_rate = sample_rate
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._sample = sample
+        self._lock = threading.Lock()
+        self._file = None
+        self.exported = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path) and self.sample_rate > 0
+
+    def configure(self, path: str, sample_rate: Optional[float] = None):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.path = path
+            if sample_rate is not None:
+                self.sample_rate = sample_rate
+
+    @contextlib.contextmanager
+    def trace(self, name: str, **attrs) -> Iterator[Optional[Span]]:
+        """Root span of a tool call; inside another trace it is a child span."""
+        if _active.get() is not None:
+            with self.span(name, **attrs) as span:
+                yield span
+            return
+        if not self.enabled or self._sample() >= self.sample_rate:
+            yield None
+            return
+        trace = Trace(self._wall_clock())
+        root = trace.add(name, None, self._clock(), _clean(attrs))
+        token = _active.set((trace, root))
+        try:
+            yield root
+        except BaseException as exc:
+            root.error = f"{type(exc).__name__}: {exc}"[:MAX_ATTR_CHARS]
+            raise
+        finally:
+            root.end = self._clock()
+            _active.reset(token)
+            self._export(trace)
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attrs) -> Iterator[Optional[Span]]:
+        active = _active.get()
+        if active is None:
+            yield None
+            return
+        trace, parent = active
+        span = trace.add(name, parent.span_id, self._clock(), _clean(attrs))
+        token = _active.set((trace, span))
+        try:
+            yield span
+        except BaseException as exc:
+            span.error = f"{type(exc).__name__}: {exc}"[:MAX_ATTR_CHARS]
+            raise
+        finally:
+            span.end = self._clock()
+            _active.reset(token)
+
+    def _export(self, trace: Trace):
+        line = json.dumps(trace.to_dict(), ensure_ascii=False, default=str)
+        try:
+            with self._lock:
+                if self._file is None:
+                    self._file = open(self.path, "a", encoding="utf-8")
+                self._file.write(line + "\n")
+                self._file.flush()
+                self.exported += 1
+        except OSError:
+            # Tracing must never fail a tool call.
+            pass
+
+
+# Process-wide tracer used by handle_exception, UpstreamClient and fan_out.
+tracer = Tracer()
@@ -0,0 +1,167 @@
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from .cache import CST, last_close
+from .logger import log_debug, log_warning
+
+# trade_cal is loaded once from here through the end of next year.
+CALENDAR_START = "20000101"
+# trade_cal can lag behind quote data, so recent Shanghai Composite bars are
+# merged in; they also mark the latest day whose data has been published.
+REFERENCE_INDEX = "000001.SH"
+RECENT_INDEX_DAYS = 40
+# Seconds between index probes after a close while that day's bar is not
+# published yet.
+PUBLISH_RECHECK = 300
+
+
+def _ymd(moment: datetime) -> str:
+    return moment.strftime("%Y%m%d")
+
+
+def _dates(df, column: str) -> List[str]:
+    return [str(value) for value in df[column].dropna().tolist()]
+
+
+class TradingCalendar:
+    """In-process SSE trading calendar answering date queries without I/O.
+
+    Open days live in one sorted list, so every lookup is a bisect. The
+    calendar is loaded on first use and refreshed incrementally (a few recent
+    index bars) the first time it is used after each market close, then
+    every PUBLISH_RECHECK seconds until that day's index bar is published.
+    """
+
+    def __init__(self, clock: Callable[[], datetime] = lambda: datetime.now(CST)):
+        self._clock = clock
+        self._days: List[str] = []
+        self._published_through = ""
+        self._has_trade_cal = False
+        self._loaded_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    @property
+    def published_through(self) -> str:
+        """Latest day with reference index data, or "" if unknown."""
+        return self._published_through
+
+    def ensure_loaded(self, pro):
+        """Load the calendar, or refresh it if a close has passed since."""
+        now = self._clock()
+        if not self._stale(now):
+            return
+        with self._lock:
+            if self._loaded_at is None or not self._has_trade_cal:
+                self._load(pro, now)
+            elif self._stale(now):
+                self._refresh(pro, now)
+
+    def _stale(self, now: datetime) -> bool:
+        loaded_at = self._loaded_at
+        if loaded_at is None:
+            return True
+        close = last_close(now)
+        if loaded_at < close:
+            return True
+        if self.published(_ymd(close)):
+            return False
+        return (now - loaded_at).total_seconds() >= PUBLISH_RECHECK
+
+    def published(self, day: str) -> bool:
+        """Whether day's EOD data is out: its reference index bar is published,
+        or trade_cal says the market did not open that day (a weekday holiday)."""
+        return self._published_through >= day or (self._has_trade_cal and not self.is_open(day))
+
+    def _load(self, pro, now: datetime):
+        days = set()
+        try:
+            df = pro.trade_cal(
+                exchange="SSE",
+                start_date=CALENDAR_START,
+                end_date=f"{now.year + 1}1231",
+                is_open="1",
+                fields="cal_date",
+            )
+            if df is not None and not df.empty:
+                days.update(_dates(df, "cal_date"))
+                self._has_trade_cal = True
+        except Exception as exc:
+            log_warning("TradingCalendar: trade_cal failed: %s", exc)
+        index_days = self._index_days(pro, _ymd(now - timedelta(days=RECENT_INDEX_DAYS)), _ymd(now))
+        days.update(index_days)
+        if not days:
+            return
+        self._days = sorted(days.union(self._days))
+        self._published_through = max(index_days, default=self._published_through)
+        self._loaded_at = now
+        log_debug("TradingCalendar loaded %s open days, published through %s", len(self._days), self._published_through)
+
+    def _refresh(self, pro, now: datetime):
+        since = self._published_through or _ymd(now - timedelta(days=RECENT_INDEX_DAYS))
+        index_days = self._index_days(pro, since, _ymd(now))
+        if not index_days:
+            return
+        self._days = sorted(set(self._days).union(index_days))
+        self._published_through = max(self._published_through, max(index_days))
+        self._loaded_at = now
+
+    @staticmethod
+    def _index_days(pro, start_date: str, end_date: str) -> List[str]:
+        try:
+            df = pro.index_daily(ts_code=REFERENCE_INDEX, start_date=start_date, end_date=end_date)
+            if df is not None and not df.empty:
+                return _dates(df, "trade_date")
+        except Exception as exc:
+            log_warning("TradingCalendar: index_daily failed: %s", exc)
+        return []
+
+    # -- queries ---------------------------------------------------------
+
+    def is_open(self, date: str) -> bool:
+        index = bisect_left(self._days, date)
+        return index < len(self._days) and self._days[index] == date
+
+    def previous(self, date: str, inclusive: bool = True) -> str:
+        """Latest open day on or before (or strictly before) date."""
+        index = (bisect_right if inclusive else bisect_left)(self._days, date)
+        return self._days[index - 1] if index > 0 else ""
+
+    def next(self, date: str, inclusive: bool = True) -> str:
+        """Earliest open day on or after (or strictly after) date."""
+        index = (bisect_left if inclusive else bisect_right)(self._days, date)
+        return self._days[index] if index < len(self._days) else ""
+
+    def shift(self, date: str, n: int) -> str:
+        """The open day n trading days after (n > 0) or before (n < 0) date."""
+        if n == 0:
+            return date if self.is_open(date) else ""
+        if n > 0:
+            index = bisect_right(self._days, date) + n - 1
+        else:
+            index = bisect_left(self._days, date) + n
+        return self._days[index] if 0 <= index < len(self._days) else ""
+
+    def between(self, start_date: str, end_date: str) -> List[str]:
+        """Open days in [start_date, end_date], ascending."""
+        return self._days[bisect_left(self._days, start_date):bisect_right(self._days, end_date)]
+
+    def latest(self, before: Optional[str] = None) -> str:
+        """Latest published open day, on or before ``before`` if given."""
+        bound = before or _ymd(self._clock())
+        if self._published_through:
+            bound = min(bound, self._published_through)
+        return self.previous(bound)
+
+    def latest_completed(self) -> str:
+        """Latest published open day before today, i.e. one whose data is final."""
+        return self.latest(before=_ymd(self._clock() - timedelta(days=1)))
+
+
+# Process-wide calendar shared by every tool.
+trading_calendar = TradingCalendar()
@@ -0,0 +1,165 @@
+import functools
+from typing import Any, Callable, Optional
+
+import pandas as pd
+
+from .bar_store import BarStore, bar_store
+from .cross_section import CrossSectionStore, cross_sections
+from .cache import EMPTY_TTL, ResponseCache, frame_nbytes, normalize_params, response_cache, ttl_for
+from .circuit import CircuitBreakers, CircuitOpenError, upstream_circuits
+from .logger import log_warning
+from .metrics import metrics
+from .retry import RetryPolicy, upstream_retries
+from .singleflight import SingleFlight, upstream_flights
+from .trade_calendar import TradingCalendar, trading_calendar
+from .tracing import tracer
+
+# Default for ``store``: the process-wide BarStore. Pass None for no store.
+_DEFAULT = object()
+
+
+class UpstreamClient:
+    """Wraps an SDK pro client so every ``client.<endpoint>(...)`` call goes
+    through the shared response cache.
+
+    Tools keep calling ``pro.daily(...)`` as before. Responses are cached per
+    (kind, endpoint, normalized params) for the endpoint's data-class TTL; each
+    caller receives its own copy of the frame. Non-DataFrame results and
+    exceptions are never cached. Concurrent identical misses share a single
+    upstream request. Calls for a single date that a synced cross-section
+    covers are answered from memory, and on a miss historical bars are
+    served from the on-disk BarStore when it covers the call. Each request
+    that does reach the SDK is retried on its own under the RetryPolicy and
+    passes its endpoint's circuit breaker; while a circuit is open, a call
+    with an expired cached response gets that response instead of an error.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        kind: str,
+        cache: Optional[ResponseCache] = None,
+        store: Optional[BarStore] = _DEFAULT,
+        flights: Optional[SingleFlight] = None,
+        sections: Optional[CrossSectionStore] = None,
+        retries: Optional[RetryPolicy] = None,
+        circuits: Optional[CircuitBreakers] = None,
+        calendar: Optional[TradingCalendar] = None,
+    ):
+        self._client = client
+        self._kind = kind
+        self._cache = cache if cache is not None else response_cache
+        self._store = store if store is not _DEFAULT else bar_store
+        self._flights = flights if flights is not None else upstream_flights
+        self._sections = sections if sections is not None else cross_sections
+        self._retries = retries if retries is not None else upstream_retries
+        self._circuits = circuits if circuits is not None else upstream_circuits
+        self._calendar = calendar if calendar is not None else trading_calendar
+
+    @property
+    def sdk(self) -> Any:
+        """The wrapped SDK client, for bulk jobs that must bypass caching."""
+        return self._client
+
+    def __getattr__(self, name: str):
+        target = getattr(self._client, name)
+        if name.startswith("_") or not callable(target):
+            return target
+        return functools.partial(self.call, name, target)
+
+    def call(self, endpoint: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        with tracer.span(endpoint, params=_present(kwargs)) as span:
+            try:
+                source, result = self._resolve(endpoint, func, args, kwargs)
+            except Exception:
+                metrics.record_call(endpoint, "error")
+                raise
+            rows = len(result) if isinstance(result, pd.DataFrame) else 0
+            metrics.record_call(endpoint, source, rows)
+            if span is not None:
+                span.set(source=source, rows=rows)
+            return result
+
+    def _resolve(self, endpoint: str, func: Callable[..., Any], args: tuple, kwargs: dict):
+        """(source, result) where source is "section", "cache", "stale", "store" or "upstream"."""
+        if not args:
+            local = self._sections.lookup(endpoint, _present(kwargs))
+            if local is not None:
+                return "section", local.copy()
+        key = (self._kind, endpoint, args, normalize_params(kwargs))
+        try:
+            hash(key)
+        except TypeError:
+            return self._fetch(endpoint, func, args, kwargs)
+        if self._cache.enabled:
+            cached = self._cache.get(key)
+            if cached is not None:
+                return "cache", cached.copy()
+
+        # The shared frame is never handed out directly: every caller,
+        # including the one that fetched it, gets a private copy.
+        try:
+            source, result = self._flights.do(key, lambda: self._load(key, endpoint, func, args, kwargs))
+        except CircuitOpenError as exc:
+            stale = self._cache.get_stale(key)
+            if stale is None:
+                raise
+            log_warning("%s; serving expired cached response", exc)
+            return "stale", stale.copy() if isinstance(stale, pd.DataFrame) else stale
+        return source, result.copy() if isinstance(result, pd.DataFrame) else result
+
+    def _load(self, key, endpoint: str, func: Callable[..., Any], args: tuple, kwargs: dict):
+        # A leader that finished between our cache miss and joining the
+        # flight has already filled the cache.
+        if self._cache.enabled:
+            cached = self._cache.get(key, record=False)
+            if cached is not None:
+                return "cache", cached
+        source, result = self._fetch(endpoint, func, args, kwargs)
+        if isinstance(result, pd.DataFrame):
+            ttl = ttl_for(endpoint, kwargs, published=self._calendar.published)
+            if result.empty:
+                ttl = min(ttl, EMPTY_TTL)
+            self._cache.set(key, result, ttl, frame_nbytes(result))
+        return source, result
+
+    def _fetch(self, endpoint: str, func: Callable[..., Any], args: tuple, kwargs: dict):
+        """(source, result): "store" if the BarStore answered without an SDK request."""
+        store = self._store
+        if store is not None and not args:
+            params = _present(kwargs)
+            if store.supports(endpoint, params):
+                sent: list = []
+                result = store.fetch(endpoint, functools.partial(self._remote, endpoint, func, sent), params)
+                return ("upstream" if sent else "store"), result
+        return "upstream", self._request(endpoint, func, *args, **kwargs)
+
+    def _remote(self, endpoint: str, func: Callable[..., Any], sent: list, **params) -> Any:
+        """BarStore gap/live fetches; today's bars may already be synced."""
+        local = self._sections.lookup(endpoint, _present(params))
+        if local is not None:
+            return local
+        sent.append(params)
+        return self._request(endpoint, func, **params)
+
+    def _request(self, endpoint: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """One SDK request, retried on transient errors; each attempt passes the circuit."""
+        return self._retries.call(endpoint, lambda: self._circuits.call(endpoint, lambda: func(*args, **kwargs)))
+
+
+def _present(params: dict) -> dict:
+    """Drop None/"" kwargs, which the SDK treats as absent."""
+    return {key: value for key, value in params.items() if value is not None and value != ""}
+
+
+def cache_summary(cache: Optional[ResponseCache] = None, flights: Optional[SingleFlight] = None) -> str:
+    """One-line cache and request-coalescing summary for check_token_status."""
+    stats = (cache or response_cache).stats()
+    flight_stats = (flights or upstream_flights).stats()
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = f"{stats['hits'] / lookups:.0%}" if lookups else "-"
+    return (
+        f"响应缓存：命中 {stats['hits']} / 未命中 {stats['misses']} (命中率 {hit_rate})，"
+        f"{stats['entries']} 条 / {stats['bytes'] / 1024 / 1024:.1f}MB，"
+        f"合并并发请求 {flight_stats['collapsed']} 次"
+    )